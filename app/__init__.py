@@ -1,15 +1,23 @@
 # Initialisation Flask
 
 import os
-from flask import Flask
+from flask import Flask, jsonify
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from config import DevelopmentConfig, ProductionConfig
 from flask_cors import CORS
 from .extension import db
 from app.extension import init_extension
 from app.routes import register_routes
+from app.commands import register_commands
+from app.utils.pool_bd import options_moteur, installer_metriques_pool, metriques_pool
+from app.utils.replicas import binds_replicas
+from app.utils.json_rapide import installer_json
+from app.utils.compression import installer_compression
+from app.utils.demarrage import ChronoDemarrage
 
-def create_app():
+def create_app(config_overrides=None):
     app = Flask(__name__)
+    chrono = ChronoDemarrage()  # durée des phases (flask startup-profile)
     
     # Enable CORS for the app
     CORS(
@@ -32,10 +40,44 @@ def create_app():
     else:
         app.config.from_object(ProductionConfig)
 
+    # Surcharges explicites (tests, benchmarks, outils CLI)
+    if config_overrides:
+        app.config.update(config_overrides)
+
+    # Profil du pool de connexions, selon l'URI finale
+    if "SQLALCHEMY_ENGINE_OPTIONS" not in (config_overrides or {}):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options_moteur(app.config)
+    if "SQLALCHEMY_BINDS" not in (config_overrides or {}):
+        app.config["SQLALCHEMY_BINDS"] = binds_replicas(app.config)
+
+    # Encodage JSON des réponses (orjson si disponible)
+    installer_json(app)
+
     # Initialize extensions
-    init_extension(app)
+    with chrono.phase("extensions"):
+        init_extension(app)
+        with app.app_context():
+            installer_metriques_pool(db.engine)
+
+    # Pool saturé : réponse rapide plutôt qu'une erreur 500
+    @app.errorhandler(PoolTimeoutError)
+    def pool_sature(e):
+        metriques_pool.compter("delais_depasses")
+        db.session.rollback()
+        reponse = jsonify({"error": "Service momentanément saturé, réessayez"})
+        reponse.headers["Retry-After"] = "1"
+        return reponse, 503
 
     # Register blueprints or routes here if needed
-    register_routes(app)
-    
+    with chrono.phase("routes"):
+        register_routes(app)
+
+    # Compression gzip / brotli des réponses
+    installer_compression(app)
+
+    # Commandes CLI (flask seed-load, ...)
+    with chrono.phase("commandes"):
+        register_commands(app)
+
+    app.extensions["demarrage"] = chrono.durees
     return app
\ No newline at end of file
@@ -0,0 +1,12 @@
+from app.commands import seed_load, partitions, archive, demarrage, notifications, risques, suppressions, appareils
+
+def register_commands(app):
+    app.cli.add_command(seed_load.seed_load_command)
+    app.cli.add_command(partitions.partitions_group)
+    app.cli.add_command(archive.archive_group)
+    app.cli.add_command(demarrage.startup_profile_command)
+    app.cli.add_command(demarrage.swagger_build_command)
+    app.cli.add_command(notifications.notify_worker_command)
+    app.cli.add_command(risques.risk_decay_command)
+    app.cli.add_command(suppressions.purge_deletions_command)
+    app.cli.add_command(appareils.devices_group)
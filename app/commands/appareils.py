@@ -0,0 +1,61 @@
+# -------------------------------------------------------------
+# app/commands/appareils.py
+# -------------------------------------------------------------
+# Commandes `flask devices ...` : registre des appareils et passerelles
+# d'ingestion (voir app/services/appareil_service.py).
+#
+#   flask --app run devices add-gateway --nom "Service cardio"
+#   flask --app run devices add --capteur 12 --medecin 3 --passerelle 1
+#   flask --app run devices revoke 7
+#
+# Clés et secrets ne sont affichés qu'une fois : seule l'empreinte des
+# clés d'appareil est conservée en base.
+# -------------------------------------------------------------
+
+import click
+from flask.cli import with_appcontext
+
+from app.services.appareil_service import enregistrer_appareil, enregistrer_passerelle, \
+    revoquer_appareil, revoquer_passerelle
+
+
+@click.group("devices")
+def devices_group():
+    """Appareils et passerelles autorisés à envoyer des mesures."""
+
+
+@devices_group.command("add-gateway")
+@click.option("--nom", required=True, help="Nom de la passerelle")
+@with_appcontext
+def add_gateway_command(nom):
+    """Enregistre une passerelle et affiche son secret HMAC."""
+    passerelle, secret = enregistrer_passerelle(nom)
+    click.echo(f"Passerelle {passerelle.id} enregistrée")
+    click.echo(f"Secret (X-Signature) : {secret}")
+
+
+@devices_group.command("add")
+@click.option("--capteur", "capteur_id", type=int, required=True, help="Capteur alimenté par l'appareil")
+@click.option("--medecin", "medecin_id", type=int, default=None, help="Médecin référent")
+@click.option("--passerelle", "passerelle_id", type=int, default=None, help="Passerelle autorisée à relayer")
+@with_appcontext
+def add_command(capteur_id, medecin_id, passerelle_id):
+    """Enregistre un appareil et affiche sa clé d'API."""
+    try:
+        appareil, cle = enregistrer_appareil(capteur_id, medecin_id, passerelle_id)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Appareil {appareil.id} enregistré (capteur {capteur_id})")
+    click.echo(f"Clé (X-Cle-Appareil) : {cle}")
+
+
+@devices_group.command("revoke")
+@click.argument("appareil_id", type=int)
+@click.option("--passerelle", is_flag=True, help="Révoquer la passerelle APPAREIL_ID")
+@with_appcontext
+def revoke_command(appareil_id, passerelle):
+    """Révoque un appareil (ou une passerelle)."""
+    revoque = revoquer_passerelle(appareil_id) if passerelle else revoquer_appareil(appareil_id)
+    if not revoque:
+        raise click.ClickException("Identifiant inconnu")
+    click.echo(("Passerelle" if passerelle else "Appareil") + f" {appareil_id} révoqué(e)")
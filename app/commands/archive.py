@@ -0,0 +1,48 @@
+# -------------------------------------------------------------
+# app/commands/archive.py
+# -------------------------------------------------------------
+# Commandes `flask archive ...` : archive colonnaire des mesures
+# anciennes (voir app/services/archive_service.py).
+#
+#   flask --app run archive build --jusqu-a 2026-01-01
+#
+# À planifier avant la rétention des partitions : un mois doit être
+# archivé avant d'être détaché puis supprimé.
+# -------------------------------------------------------------
+
+import click
+from flask.cli import with_appcontext
+
+from app.services.archive_service import construire_archive, lire_manifeste, dossier_archive
+
+
+@click.group("archive")
+def archive_group():
+    """Archive colonnaire des mesures anciennes."""
+
+
+@archive_group.command("build")
+@click.option("--jusqu-a", "jusqu_a", type=click.DateTime(), required=True,
+              help="Nouvel horizon : les mesures antérieures sont archivées")
+@click.option("--dossier", type=click.Path(file_okay=False), default=None,
+              help="Dossier de l'archive (défaut : ARCHIVE_COLONNES_DIR)")
+@with_appcontext
+def build_command(jusqu_a, dossier):
+    """Archive les mesures antérieures à --jusqu-a."""
+    try:
+        rapport = construire_archive(jusqu_a, dossier=dossier)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"{rapport['lignes']} mesure(s) archivée(s) dans {rapport['fichiers']} fichier(s), "
+               f"horizon {rapport['horizon']:%Y-%m-%d %H:%M}")
+
+
+@archive_group.command("status")
+@with_appcontext
+def status_command():
+    """Affiche l'horizon de l'archive."""
+    manifeste = lire_manifeste()
+    if manifeste is None:
+        click.echo("Aucune archive" + ("" if dossier_archive() else " (ARCHIVE_COLONNES_DIR vide)."))
+        return
+    click.echo(f"Horizon : {manifeste['horizon']:%Y-%m-%d %H:%M}, id max : {manifeste['id_max']}")
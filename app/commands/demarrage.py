@@ -0,0 +1,58 @@
+# -------------------------------------------------------------
+# app/commands/demarrage.py
+# -------------------------------------------------------------
+# Commandes liées au démarrage des workers :
+#
+#   flask --app run startup-profile --top 15
+#   flask --app run swagger-build static/apispec.json
+#
+# startup-profile mesure, dans un processus neuf, le temps d'import
+# de l'application (python -X importtime) puis celui de create_app()
+# (cProfile + durée des phases). swagger-build écrit la spec OpenAPI
+# dans un fichier servi ensuite tel quel (SWAGGER_SPEC_FICHIER).
+# -------------------------------------------------------------
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.utils.demarrage import profil_imports, profil_init
+from app.utils.swagger import ecrire_spec
+
+
+@click.command("startup-profile")
+@click.option("--top", default=15, show_default=True, help="Nombre de points chauds affichés")
+def startup_profile_command(top):
+    """Temps d'import et d'initialisation de l'application."""
+    try:
+        total, paquets, modules = profil_imports()
+        init = profil_init()
+    except RuntimeError as e:
+        raise click.ClickException(f"Profilage impossible : {e}")
+
+    click.echo(f"Import de l'application : {total:.1f} ms")
+    click.echo("  Paquets (temps propre cumulé) :")
+    for nom, duree in sorted(paquets.items(), key=lambda p: -p[1])[:top]:
+        click.echo(f"    {duree:8.1f} ms  {nom}")
+    click.echo("  Modules (temps propre) :")
+    for nom, duree in sorted(modules.items(), key=lambda m: -m[1])[:top]:
+        click.echo(f"    {duree:8.1f} ms  {nom}")
+
+    click.echo(f"create_app() : {init['init_ms']:.1f} ms")
+    for phase, duree in init["phases"].items():
+        click.echo(f"    {duree:8.1f} ms  {phase}")
+    click.echo("  Fonctions (temps cumulé) :")
+    for nom, cumule, propre in sorted(init["fonctions"], key=lambda f: -f[1])[:top]:
+        click.echo(f"    {cumule:8.1f} ms  (propre {propre:.1f})  {nom}")
+
+
+@click.command("swagger-build")
+@click.argument("fichier", type=click.Path(dir_okay=False))
+@with_appcontext
+def swagger_build_command(fichier):
+    """Génère la spec OpenAPI dans FICHIER."""
+    if "swagger" not in current_app.extensions:
+        raise click.ClickException("Swagger est désactivé (SWAGGER_ACTIVE=False)")
+    nb_chemins = ecrire_spec(current_app, fichier)
+    click.echo(f"Spec écrite dans {fichier} ({nb_chemins} chemin(s)) ; "
+               f"servie via SWAGGER_SPEC_FICHIER={fichier}")
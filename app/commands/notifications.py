@@ -0,0 +1,65 @@
+# -------------------------------------------------------------
+# app/commands/notifications.py
+# -------------------------------------------------------------
+# Commande `flask notify-worker` : envoie les notifications d'alertes
+# mises en file par l'ingestion (voir notification_service).
+#
+#   flask --app run notify-worker               # boucle (Procfile : notify)
+#   flask --app run notify-worker --une-fois    # un passage (cron, tests)
+#
+# Tant qu'un lot est plein, le suivant est traité sans attendre ; sinon
+# le worker attend NOTIFICATIONS_INTERVALLE_S secondes. Une alerte
+# critique part donc en quelques secondes, sans rien coûter à
+# l'ingestion. SIGTERM termine le lot en cours puis arrête le worker.
+# -------------------------------------------------------------
+
+import signal
+import time
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.extension import db
+from app.services.notification_service import traiter_lot, purger_notifications
+
+PURGE_INTERVALLE_S = 3600
+
+
+@click.command("notify-worker")
+@click.option("--une-fois", is_flag=True, help="Un seul passage puis arrêt")
+@click.option("--lot", type=int, default=None, help="Destinataires par passage (défaut : NOTIFICATIONS_TAILLE_LOT)")
+@click.option("--intervalle", type=float, default=None,
+              help="Attente entre deux passages, en secondes (défaut : NOTIFICATIONS_INTERVALLE_S)")
+@with_appcontext
+def notify_worker_command(une_fois, lot, intervalle):
+    """Envoie les notifications d'alertes en attente."""
+    config = current_app.config
+    lot = lot or config.get("NOTIFICATIONS_TAILLE_LOT", 100)
+    intervalle = config.get("NOTIFICATIONS_INTERVALLE_S", 1.0) if intervalle is None else intervalle
+    arret = []
+    if not une_fois:
+        signal.signal(signal.SIGTERM, lambda *_: arret.append(True))
+        click.echo(f"notify-worker : lots de {lot}, intervalle {intervalle} s")
+
+    derniere_purge = 0.0
+    while not arret:
+        try:
+            bilan = traiter_lot(lot)
+            if time.monotonic() - derniere_purge > PURGE_INTERVALLE_S and not une_fois:
+                jours = config.get("NOTIFICATIONS_RETENTION_JOURS", 30)
+                purger_notifications(datetime.utcnow() - timedelta(days=jours))
+                derniere_purge = time.monotonic()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception("notify-worker : échec du passage : %s", e)
+            bilan = None
+
+        if bilan and (bilan["emails"] or bilan["echecs"]):
+            click.echo(f"{bilan['emails']} e-mail(s), {bilan['notifications']} notification(s) envoyée(s), "
+                       f"{bilan['echecs']} échec(s), {bilan['abandons']} abandon(s)")
+        if une_fois:
+            return
+        if bilan is None or bilan["dues"] < lot:
+            time.sleep(intervalle)
@@ -0,0 +1,64 @@
+# -------------------------------------------------------------
+# app/commands/partitions.py
+# -------------------------------------------------------------
+# Commandes `flask partitions ...` : gestion des partitions mensuelles
+# de donnees_medicales / analyseur (voir app/services/partition_service.py).
+#
+#   flask --app run partitions maintain --mois-avance 3 \
+#       --retention-mois 24 --archive-dir /var/backups/s3dpa
+#
+# À planifier quotidiennement (cron, Render cron job).
+# -------------------------------------------------------------
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.services.partition_service import TABLES_PARTITIONNEES, partitions_mensuelles, \
+    maintenir_partitions, est_partitionnee
+
+
+@click.group("partitions")
+def partitions_group():
+    """Partitions mensuelles des mesures et analyses."""
+
+
+@partitions_group.command("maintain")
+@click.option("--mois-avance", type=int, default=None,
+              help="Mois futurs à pré-créer (défaut : PARTITIONS_MOIS_AVANCE)")
+@click.option("--retention-mois", type=int, default=None,
+              help="Mois conservés, 0 = tout garder (défaut : RETENTION_MOIS)")
+@click.option("--archive-dir", type=click.Path(file_okay=False), default=None,
+              help="Dossier des archives CSV gzip (défaut : ARCHIVE_DIR)")
+@with_appcontext
+def maintain_command(mois_avance, retention_mois, archive_dir):
+    """Crée les partitions à venir et applique la rétention."""
+    config = current_app.config
+    rapport = maintenir_partitions(
+        mois_avance=config.get("PARTITIONS_MOIS_AVANCE", 3) if mois_avance is None else mois_avance,
+        retention_mois=config.get("RETENTION_MOIS", 0) if retention_mois is None else retention_mois,
+        dossier_archive=archive_dir or config.get("ARCHIVE_DIR") or None,
+    )
+
+    if not rapport["partitionnee"]:
+        click.echo("Tables non partitionnées (SGBD autre que PostgreSQL ou migration absente).")
+        return
+    for nom in rapport["creees"]:
+        click.echo(f"Créée : {nom}")
+    for d in rapport["detachees"]:
+        click.echo(f"Détachée : {d['partition']}" + (f" → {d['archive']}" if d["archive"] else ""))
+    click.echo(f"{len(rapport['creees'])} partition(s) créée(s), "
+               f"{len(rapport['detachees'])} détachée(s)")
+
+
+@partitions_group.command("list")
+@with_appcontext
+def list_command():
+    """Liste les partitions mensuelles attachées."""
+    if not est_partitionnee(TABLES_PARTITIONNEES[0]):
+        click.echo("Tables non partitionnées.")
+        return
+    for table in TABLES_PARTITIONNEES:
+        mois = sorted(partitions_mensuelles(table))
+        etendue = f"{mois[0]:%Y-%m} → {mois[-1]:%Y-%m}" if mois else "aucune"
+        click.echo(f"{table} : {len(mois)} partition(s), {etendue}")
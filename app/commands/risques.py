@@ -0,0 +1,37 @@
+# -------------------------------------------------------------
+# app/commands/risques.py
+# -------------------------------------------------------------
+# Commande `flask risk-decay` : décroissance périodique des scores de
+# risque matérialisés (voir risque_service).
+#
+#   flask --app run risk-decay                 # à planifier (cron, ~15 min)
+#   flask --app run risk-decay --recalculer    # reconstruction complète
+#
+# Les mises à jour incrémentales gardent les scores exacts à la date de
+# leur dernière écriture ; ce passage les ramène tous à maintenant pour
+# que le tri par l'index (medecin_id, score) suive le risque courant.
+# --recalculer reconstruit la table depuis les alertes et etats_mesures
+# (à lancer une fois après la migration).
+# -------------------------------------------------------------
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.extension import db
+from app.services.risque_service import decroitre_scores, recalculer_scores
+
+
+@click.command("risk-decay")
+@click.option("--recalculer", is_flag=True, help="Reconstruit tous les scores depuis les alertes et les mesures")
+@click.option("--lot", type=int, default=None, help="Scores par transaction (défaut : RISQUE_TAILLE_LOT)")
+@with_appcontext
+def risk_decay_command(recalculer, lot):
+    """Décroît (ou recalcule) les scores de risque des patients."""
+    if recalculer:
+        nombre = recalculer_scores(db.session.connection())
+        db.session.commit()
+        click.echo(f"{nombre} score(s) recalculé(s)")
+        return
+    nombre = decroitre_scores(db.session, taille_lot=lot or current_app.config.get("RISQUE_TAILLE_LOT", 1000))
+    click.echo(f"{nombre} score(s) décru(s)")
@@ -0,0 +1,59 @@
+# -------------------------------------------------------------
+# app/commands/seed_load.py
+# -------------------------------------------------------------
+# Commande `flask seed-load` : génère un jeu de données de taille
+# production (voir app/services/seed_service.py).
+#
+#   flask --app run seed-load --medecins 2000 --patients 20000 \
+#       --jours 30 --intervalle 15 --taux-anomalie 0.02 --manifeste seed.json
+# -------------------------------------------------------------
+
+import json
+
+import click
+from flask.cli import with_appcontext
+
+from app.services.seed_service import charger_volumes
+
+
+@click.command("seed-load")
+@click.option("--medecins", default=100, show_default=True, help="Nombre de médecins")
+@click.option("--patients", default=1000, show_default=True, help="Nombre de patients")
+@click.option("--proches-par-patient", default=1, show_default=True)
+@click.option("--jours", default=7.0, show_default=True, help="Profondeur d'historique (jours)")
+@click.option("--intervalle", default=15, show_default=True,
+              help="Minutes entre deux mesures d'un même capteur")
+@click.option("--taux-anomalie", default=0.02, show_default=True,
+              help="Proportion de mesures hors seuils")
+@click.option("--sans-analyses", is_flag=True, help="Ne pas générer analyses et alertes")
+@click.option("--methode", type=click.Choice(["auto", "copy", "insert"]), default="auto",
+              show_default=True, help="COPY (PostgreSQL) ou INSERT groupés")
+@click.option("--graine", default=42, show_default=True)
+@click.option("--manifeste", type=click.Path(dir_okay=False), default=None,
+              help="Fichier JSON décrivant le jeu généré (utilisé par benchmarks.replay)")
+@with_appcontext
+def seed_load_command(medecins, patients, proches_par_patient, jours, intervalle,
+                      taux_anomalie, sans_analyses, methode, graine, manifeste):
+    """Génère un jeu de données volumineux via écritures groupées."""
+    mesures_prevues = int(patients * 3 * jours * 24 * 60 / intervalle)
+    click.echo(f"Génération : {medecins} médecins, {patients} patients, "
+               f"~{mesures_prevues} mesures")
+
+    resultat = charger_volumes(
+        medecins=medecins,
+        patients=patients,
+        proches_par_patient=proches_par_patient,
+        jours=jours,
+        intervalle_minutes=intervalle,
+        taux_anomalie=taux_anomalie,
+        analyses=not sans_analyses,
+        graine=graine,
+        methode=methode,
+        progression=click.echo,
+    )
+
+    click.echo(f"Terminé ({resultat['methode']}) : {resultat['volumes']}")
+    if manifeste:
+        with open(manifeste, "w", encoding="utf-8") as f:
+            json.dump(resultat, f, indent=2)
+        click.echo(f"Manifeste écrit dans {manifeste}")
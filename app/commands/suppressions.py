@@ -0,0 +1,29 @@
+# -------------------------------------------------------------
+# app/commands/suppressions.py
+# -------------------------------------------------------------
+# Commande `flask purge-deletions` : termine les suppressions différées
+# (patients, capteurs ou dissociations de plus de SUPPRESSION_TAILLE_LOT
+# mesures, voir suppression_service).
+#
+#   flask --app run purge-deletions            # à planifier (cron, ~5 min)
+#   flask --app run purge-deletions --lot 1000
+#
+# Chaque lot de mesures est supprimé dans sa propre transaction : les
+# verrous restent courts et l'ingestion continue pendant la purge. Une
+# suppression interrompue reprend au passage suivant.
+# -------------------------------------------------------------
+
+import click
+from flask.cli import with_appcontext
+
+from app.services.suppression_service import traiter_suppressions
+
+
+@click.command("purge-deletions")
+@click.option("--lot", type=int, default=None, help="Mesures par transaction (défaut : SUPPRESSION_TAILLE_LOT)")
+@with_appcontext
+def purge_deletions_command(lot):
+    """Termine les suppressions différées en attente."""
+    bilan = traiter_suppressions(lot)
+    click.echo(f"{bilan['terminees']} suppression(s) terminée(s), {bilan['mesures']} mesure(s) supprimée(s), "
+               f"{bilan['echecs']} échec(s)")
@@ -0,0 +1,326 @@
+# -------------------------------------------------------------
+# app/ingestion_asgi.py
+# -------------------------------------------------------------
+# Surface d'ingestion ASGI pour les passerelles de capteurs, déployée
+# à côté de l'application WSGI (asgi.py, `uvicorn asgi:app`) :
+#
+#   POST /v1/ingestion/donnees   corps NDJSON, une lecture par ligne
+#   GET  /v1/ingestion/sante     état du lotisseur
+#
+# - POST authentifié sur les en-têtes avant toute lecture du corps,
+#   comme POST /v1/donnees : clé d'appareil, lot signé par une
+#   passerelle (corps mis en tampon, traité seulement si la signature
+#   est conforme) ou JWT d'un médecin ; 401 / 403 sinon
+# - appareil / passerelle : patient, capteur et médecin de chaque
+#   lecture résolus par le registre (caches mémoire chauds : sans accès
+#   base), jamais lus dans le corps
+# - une connexion lente n'occupe qu'une coroutine (et non un worker
+#   gunicorn) : des milliers de passerelles par processus
+# - les lectures sont validées au fil du flux, envoyées au Lotisseur
+#   par paquets de INGESTION_TAILLE_LOT, puis enregistrées en lots
+#   communs à toutes les connexions (ingestion_service.enregistrer_lot)
+# - les lectures horodatées par l'appareil passent par une fenêtre de
+#   réordonnancement propre à la connexion (INGESTION_RETARD_MAX_S)
+# - base : pool asyncpg (SQLAlchemy asyncio) si le pilote est installé,
+#   sinon le moteur synchrone de l'application dans un thread
+# Modèles, configuration et analyse sont ceux de l'application Flask.
+# -------------------------------------------------------------
+
+import asyncio
+
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from sqlalchemy.engine import make_url
+
+from app.extension import db
+from app.services.appareil_service import completer_lecture
+from app.services.ingestion_service import valider_lecture, enregistrer_lot, fenetre_depuis_config
+from app.services.risque_service import demi_vie_h
+from app.utils.autorisation import source_ingestion
+from app.utils.lotisseur import Lotisseur
+from app.utils.pool_bd import options_moteur
+
+try:
+    import asyncpg  # noqa: F401
+    from sqlalchemy.ext.asyncio import create_async_engine
+except ImportError:  # dépendance optionnelle
+    asyncpg = None
+
+ERREURS_MAX = 20   # erreurs détaillées dans la réponse
+
+
+# -------------------------------------------------------------
+# Accès base : même interface pour asyncpg et le repli en thread
+# -------------------------------------------------------------
+class BaseIngestion:
+    def __init__(self, app):
+        self.config = app.config
+        with app.app_context():
+            self.moteur_sync = db.engine
+        self.moteur_async = None
+        url = make_url(app.config["SQLALCHEMY_DATABASE_URI"])
+        if (asyncpg is not None and app.config.get("INGESTION_DB_ASYNC", True)
+                and url.get_backend_name() == "postgresql"):
+            url_async = url.set(drivername="postgresql+asyncpg")
+            options = options_moteur({
+                **app.config,
+                "GUNICORN_WORKERS": 1,
+                "GUNICORN_THREADS": app.config.get("INGESTION_ECRIVAINS", 2),
+            }, uri=url_async.render_as_string(hide_password=False))
+            self.moteur_async = create_async_engine(url_async, **options)
+
+    @property
+    def pilote(self):
+        return "asyncpg" if self.moteur_async is not None else f"{self.moteur_sync.dialect.driver} (thread)"
+
+    async def executer(self, fonction, *args):
+        """Exécute fonction(connexion, *args) dans une transaction."""
+        if self.moteur_async is not None:
+            async with self.moteur_async.begin() as connexion:
+                return await connexion.run_sync(fonction, *args)
+
+        def transaction():
+            with self.moteur_sync.begin() as connexion:
+                return fonction(connexion, *args)
+        return await asyncio.to_thread(transaction)
+
+    async def fermer(self):
+        if self.moteur_async is not None:
+            await self.moteur_async.dispose()
+
+
+# -------------------------------------------------------------
+# Classe ApplicationIngestion : application ASGI
+# -------------------------------------------------------------
+class ApplicationIngestion:
+    def __init__(self, app):
+        self.app = app
+        self.config = app.config
+        self.base = BaseIngestion(app)
+        self.lotisseur = Lotisseur(
+            self._enregistrer,
+            taille_lot=self.config.get("INGESTION_TAILLE_LOT", 500),
+            delai_s=self.config.get("INGESTION_DELAI_LOT_MS", 50) / 1000,
+            ecrivains=self.config.get("INGESTION_ECRIVAINS", 2),
+            file_max=self.config.get("INGESTION_FILE_MAX", 1000),
+        )
+        self.connexions = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._cycle_de_vie(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _cycle_de_vie(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.lotisseur.demarrer()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.lotisseur.arreter()
+                await self.base.fermer()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        route = (scope["method"], scope["path"].rstrip("/"))
+        if route == ("POST", "/v1/ingestion/donnees"):
+            source, refus = await asyncio.to_thread(self._authentifier, scope)
+            if refus is not None:
+                statut, corps = refus
+            else:
+                await self.lotisseur.demarrer()  # serveurs sans lifespan
+                self.connexions += 1
+                try:
+                    statut, corps = await self._ingerer(receive, source)
+                finally:
+                    self.connexions -= 1
+        elif route == ("GET", "/v1/ingestion/sante"):
+            statut, corps = 200, {
+                "pilote": self.base.pilote,
+                "connexions": self.connexions,
+                "en_attente": self.lotisseur.en_attente,
+                "lots": self.lotisseur.lots,
+                "lectures": self.lotisseur.elements,
+            }
+        else:
+            statut, corps = 404, {"error": "Route introuvable"}
+        if statut is not None:
+            await self._repondre(send, statut, corps)
+
+    def _authentifier(self, scope):
+        """
+        Source d'ingestion lue dans les en-têtes de la connexion, avec les
+        vérifications des routes WSGI (autorisation.source_ingestion) ;
+        retourne (source, None) ou (None, (statut, corps) du refus).
+        Exécutée dans un thread : le registre peut lire la base.
+        """
+        entetes = [(nom.decode("latin-1"), valeur.decode("latin-1")) for nom, valeur in scope.get("headers", [])]
+        with self.app.test_request_context(scope["path"], method=scope["method"], headers=entetes):
+            try:
+                source, refus = source_ingestion(corps_entier=False)
+            except (JWTExtendedException, PyJWTError):
+                return None, (401, {"error": "Jeton absent ou invalide"})
+        if refus is not None:
+            message, statut = refus
+            return None, (statut, {"error": message})
+        return source, None
+
+    def _completer(self, donnees, source):
+        """Patient, capteur et médecin d'un appareil ou d'une passerelle, résolus par le registre."""
+        if not source:
+            return donnees
+        with self.app.app_context():
+            return completer_lecture(donnees, source)
+
+    async def _repondre(self, send, statut, corps):
+        contenu = self.app.json.dumps(corps).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": statut,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(contenu)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": contenu})
+
+    async def _enregistrer(self, paquets):
+        """
+        Un lot = une transaction ; rapport redécoupé par paquet :
+        par lecture None, ("rejet", erreur), ("doublon", donnee_id)
+        ou ("tardive", None) (enregistrée par la voie de correction).
+        """
+        lectures = [l for paquet in paquets for l in paquet]
+        rapport = await self.base.executer(enregistrer_lot, lectures, demi_vie_h(self.config))
+
+        issues = {i: ("tardive", None) for i in rapport["tardives"]}
+        issues.update((i, ("rejet", erreur)) for i, erreur in rapport["rejets"])
+        issues.update((i, ("doublon", donnee_id)) for i, donnee_id in rapport["doublons"])
+        resultats, debut = [], 0
+        for paquet in paquets:
+            fin = debut + len(paquet)
+            resultats.append([issues.get(i) for i in range(debut, fin)])
+            debut = fin
+        return resultats
+
+    # ---------------------------------------------------------
+    # Lecture du flux NDJSON
+    # ---------------------------------------------------------
+    @staticmethod
+    async def _morceaux(receive):
+        """Morceaux du corps ; None si le client s'est déconnecté."""
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                yield None
+                return
+            yield message.get("body", b"")
+            if not message.get("more_body", False):
+                return
+
+    @staticmethod
+    async def _relire(fichier, taille=65536):
+        try:
+            for morceau in iter(lambda: fichier.read(taille), b""):
+                yield morceau
+        finally:
+            fichier.close()
+
+    async def _ingerer(self, receive, source):
+        taille_lot = self.config.get("INGESTION_TAILLE_LOT", 500)
+        ligne_max = self.config.get("INGESTION_LIGNE_MAX", 65536)
+        bilan = {"recues": 0, "enregistrees": 0, "rejetees": 0, "doublons": 0, "tardives": 0,
+                 "reordonnees": 0, "confirmees_jusqu_a": 0, "erreurs": [], "doublons_detail": []}
+        paquet, numeros = [], []   # lectures validées et leur numéro de ligne
+        fenetre = fenetre_depuis_config(self.config)
+        tampon = b""
+
+        def rejeter(numero, erreur):
+            bilan["rejetees"] += 1
+            if len(bilan["erreurs"]) < ERREURS_MAX:
+                bilan["erreurs"].append({"ligne": numero, "erreur": erreur})
+
+        async def envoyer():
+            issues = await self.lotisseur.soumettre(list(paquet))
+            for numero, issue in zip(numeros, issues):
+                if issue is None or issue[0] == "tardive":
+                    bilan["enregistrees"] += 1
+                    if issue is not None:
+                        bilan["tardives"] += 1
+                elif issue[0] == "rejet":
+                    rejeter(numero, issue[1])
+                else:
+                    bilan["doublons"] += 1
+                    if len(bilan["doublons_detail"]) < ERREURS_MAX:
+                        bilan["doublons_detail"].append({"ligne": numero, "donnee_id": issue[1]})
+            paquet.clear()
+            numeros.clear()
+            # Lignes reçues jusqu'ici traitées, hors lectures encore en attente
+            en_attente = fenetre.premier_en_attente()
+            bilan["confirmees_jusqu_a"] = bilan["recues"] if en_attente is None else en_attente - 1
+
+        def ajouter(liberees):
+            for numero, lecture in liberees:
+                paquet.append(lecture)
+                numeros.append(numero)
+
+        def traiter(ligne):
+            ligne = ligne.strip()
+            if not ligne:
+                return
+            bilan["recues"] += 1
+            numero = bilan["recues"]
+            try:
+                donnees = self.app.json.loads(ligne)
+            except ValueError:
+                rejeter(numero, "JSON invalide")
+                return
+            try:
+                lecture = valider_lecture(self._completer(donnees, source))
+            except (ValueError, PermissionError) as e:
+                rejeter(numero, str(e))
+                return
+            if donnees.get("date_heure_mesure") is not None:
+                ajouter(fenetre.ajouter(numero, lecture))
+                bilan["reordonnees"] = fenetre.reordonnees
+            else:  # horodatée à la réception : déjà dans l'ordre
+                ajouter([(numero, lecture)])
+
+        morceaux = self._morceaux(receive)
+        corps_signe = source.pop("corps_signe", None)
+        if corps_signe is not None:
+            # Lot signé : corps entier mis en tampon, relu une fois la signature vérifiée
+            async for morceau in morceaux:
+                if morceau is None:
+                    return None, bilan
+                corps_signe.ajouter(morceau)
+            fichier = corps_signe.verifier()
+            if fichier is None:
+                return 401, {"error": "Signature de passerelle invalide ou expirée"}
+            morceaux = self._relire(fichier)
+
+        try:
+            async for morceau in morceaux:
+                if morceau is None:
+                    return None, bilan   # lignes non confirmées : renvoyées par la passerelle
+                tampon += morceau
+                *lignes, tampon = tampon.split(b"\n")
+                for ligne in lignes:
+                    traiter(ligne)
+                    if len(paquet) >= taille_lot:
+                        await envoyer()
+                if len(tampon) > ligne_max:
+                    return 413, {**bilan, "error": f"Ligne de plus de {ligne_max} octets"}
+            traiter(tampon)
+            ajouter(fenetre.vider())
+            if paquet:
+                await envoyer()
+        except Exception as e:
+            self.app.logger.exception("Échec de l'ingestion : %s", e)
+            return 503, {**bilan, "error": "Enregistrement impossible, renvoyez les lignes "
+                                           "après confirmees_jusqu_a"}
+        bilan["confirmees_jusqu_a"] = bilan["recues"]
+        return 200, bilan
@@ -7,3 +7,11 @@ from .donnees_medicales import DonneesMedicale
 from .analyseur import Analyseur
 from .alerte import Alerte
 from .enums import TypeCapteur, TypeAlerte, UrgenceEnum
+from .cle_ingestion import CleIngestion
+from .etat_mesure import EtatMesure
+from .notification import Notification
+from .score_risque import ScoreRisque
+from .suppression import Suppression
+from .patient_capteur import PatientCapteur
+from .appareil import Passerelle, Appareil
+from .version_reference import VersionReference
@@ -1,5 +1,5 @@
 # Importation des types de colonnes et des clés étrangères
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Enum, Index, text
 
 # Importation des relations ORM
 from sqlalchemy.orm import relationship
@@ -16,16 +16,29 @@ from .enums import UrgenceEnum, TypeAlerte
 # Modèle représentant une alerte médicale déclenchée pour un patient
 class Alerte(db.Model):
     __tablename__ = 'alerte'  # Table des alertes médicales
+    __table_args__ = (
+        # Dernières alertes d'un médecin (tableau de bord)
+        Index('ix_alerte_medecin_date', 'medecin_id', 'date_heure_alerte'),
+        # Alertes non traitées d'un médecin, comptées par urgence
+        Index('ix_alerte_medecin_non_traitees', 'medecin_id', 'niveau_urgence',
+              postgresql_where=text('etat_traitement = false'),
+              sqlite_where=text('etat_traitement = 0')),
+    )
 
     # Identifiant unique de l’alerte
     id = Column(Integer, primary_key=True)
 
     # Référence au patient concerné
-    patient_id = Column(Integer, ForeignKey('patient.id'), nullable=False)
+    patient_id = Column(Integer, ForeignKey('patient.id', ondelete='CASCADE'), nullable=False, index=True)
 
-    # Référence au médecin responsable ou notifié
+    # Référence au médecin responsable ou notifié (sans cascade : l'historique
+    # clinique d'un médecin est conservé, voir suppression_service)
     medecin_id = Column(Integer, ForeignKey('medecin.id'), nullable=False)
 
+    # Mesure à l'origine de l'alerte (sans clé étrangère : donnees_medicales
+    # est partitionnée et sa clé primaire inclut la date de mesure)
+    donnee_medicale_id = Column(Integer, index=True)
+
     # Date et heure de déclenchement de l’alerte
     date_heure_alerte = Column(DateTime, default=datetime.utcnow)
 
@@ -41,11 +54,15 @@ class Alerte(db.Model):
     # État de traitement : False = non traitée, True = résolue
     etat_traitement = Column(Boolean, default=False)
 
+    # Acquittement : date et auteur (médecin) du passage à l'état traité
+    date_acquittement = Column(DateTime)
+    acquittee_par = Column(Integer, ForeignKey('personne.id', ondelete='SET NULL'), index=True)
+
     # Relation vers le patient concerné
-    patient = relationship('Patient', back_populates='alertes')
+    patient = relationship('Patient', back_populates='alertes', foreign_keys=[patient_id])
 
     # Relation vers le médecin responsable
-    medecin = relationship('Medecin', back_populates='alertes')
+    medecin = relationship('Medecin', back_populates='alertes', foreign_keys=[medecin_id])
     
 # -------------------------------------------------------------
 # Classe Alerte : modèle représentant une alerte médicale
@@ -53,5 +70,6 @@ class Alerte(db.Model):
 # - Déclenchée lorsqu'une donnée médicale dépasse un seuil critique
 # - Reliée à un patient et au médecin responsable
 # - Contient le niveau d'urgence et le type d'alerte (via des enums)
-# - Stocke une description et l'état de traitement (résolue ou non)
+# - Stocke une description et l'état de traitement (résolue ou non),
+#   avec la date et l'auteur de l'acquittement
 # - Permet de suivre les événements critiques dans le système
\ No newline at end of file
@@ -1,5 +1,5 @@
 # Importation des types de colonnes et des clés étrangères
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, ForeignKeyConstraint, Index
 
 # Importation des relations ORM
 from sqlalchemy.orm import relationship
@@ -13,18 +13,33 @@ from app.extension import db
 # Modèle représentant une analyse médicale effectuée par un médecin
 class Analyseur(db.Model):
     __tablename__ = 'analyseur'  # Table des analyses médicales
+    __table_args__ = (
+        # La mesure est référencée par sa clé primaire partitionnée
+        # (id, date_heure_mesure) sous PostgreSQL
+        ForeignKeyConstraint(
+            ['donnee_medicale_id', 'date_heure_mesure'],
+            ['donnees_medicales.id', 'donnees_medicales.date_heure_mesure'],
+            name='analyseur_donnee_medicale_fkey', ondelete='CASCADE'
+        ),
+        Index('ix_analyseur_donnee', 'donnee_medicale_id'),
+        Index('ix_analyseur_medecin', 'medecin_id'),
+        Index('ix_analyseur_patient', 'patient_id'),
+    )
 
     # Identifiant unique de l’analyse
     id = Column(Integer, primary_key=True)
 
     # Référence au patient concerné
-    patient_id = Column(Integer, ForeignKey('patient.id'), nullable=False)
+    patient_id = Column(Integer, ForeignKey('patient.id', ondelete='CASCADE'), nullable=False)
 
-    # Référence au médecin ayant effectué l’analyse
+    # Référence au médecin ayant effectué l’analyse (sans cascade, comme les alertes)
     medecin_id = Column(Integer, ForeignKey('medecin.id'), nullable=False)
 
     # Référence à la donnée médicale analysée
-    donnee_medicale_id = Column(Integer, ForeignKey('donnees_medicales.id'), nullable=False)
+    donnee_medicale_id = Column(Integer, nullable=False)
+
+    # Date de la mesure analysée : même partition mensuelle que la donnée
+    date_heure_mesure = Column(DateTime, nullable=False)
 
     # Résultat de l’analyse (ex : "normal", "anomalie détectée")
     resultat = Column(String(255))
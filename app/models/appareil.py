@@ -0,0 +1,62 @@
+# Importation des types de colonnes et des clés étrangères
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey
+
+# Importation de la date/heure actuelle pour l'enregistrement
+from datetime import datetime
+
+# Accès à l'instance SQLAlchemy
+from app.extension import db
+
+# Passerelle : relaie les lectures de plusieurs appareils en lots signés
+class Passerelle(db.Model):
+    __tablename__ = 'passerelles'  # Passerelles enregistrées
+
+    # Identifiant unique de la passerelle
+    id = Column(Integer, primary_key=True)
+
+    # Nom libre (site, chambre, modèle)
+    nom = Column(String(100), nullable=False)
+
+    # Secret partagé des signatures HMAC-SHA256 (conservé en clair : il
+    # sert à recalculer la signature de chaque lot)
+    secret = Column(String(64), nullable=False)
+
+    # Passerelle révoquée : ses lots sont refusés
+    actif = Column(Boolean, default=True, nullable=False)
+
+    date_creation = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# Appareil : capteur physique qui envoie ses lectures lui-même ou via une passerelle
+class Appareil(db.Model):
+    __tablename__ = 'appareils'  # Registre des appareils
+
+    # Identifiant de l'appareil (device_id des lectures)
+    id = Column(Integer, primary_key=True)
+
+    # Capteur logique alimenté par l'appareil ; le patient est celui de
+    # l'affectation active de ce capteur (patient_capteur)
+    capteur_id = Column(Integer, ForeignKey('capteur.id', ondelete='CASCADE'), nullable=False, unique=True)
+
+    # Médecin référent, destinataire des analyses et alertes
+    medecin_id = Column(Integer, ForeignKey('medecin.id', ondelete='SET NULL'), index=True)
+
+    # Passerelle autorisée à relayer ses lectures (facultative)
+    passerelle_id = Column(Integer, ForeignKey('passerelles.id', ondelete='SET NULL'), index=True)
+
+    # Empreinte SHA-256 (hex) de la clé d'API ; la clé n'est pas conservée
+    cle_hash = Column(String(64), nullable=False)
+
+    # Appareil révoqué : ses lectures sont refusées
+    actif = Column(Boolean, default=True, nullable=False)
+
+    date_creation = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+# -------------------------------------------------------------
+# Classes Passerelle et Appareil : registre des sources d'ingestion
+# -------------------------------------------------------------
+# - Un appareil s'authentifie par sa clé d'API (X-Cle-Appareil), une
+#   passerelle par une signature HMAC du lot (X-Signature)
+# - Le registre résout patient, capteur et médecin : les lectures ne
+#   portent plus que l'identifiant de l'appareil et les valeurs
+# - Voir appareil_service (vérification et résolution en cache mémoire)
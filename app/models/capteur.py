@@ -1,5 +1,5 @@
 # Importation des types de colonnes SQLAlchemy
-from sqlalchemy import Column, Integer, Float, Enum, Date
+from sqlalchemy import Column, Integer, Float, Enum, Date, DateTime
 
 # Importation des relations ORM
 from sqlalchemy.orm import relationship
@@ -20,8 +20,11 @@ class Capteur(db.Model):
     # Type de capteur (ex : température, tension, fréquence cardiaque)
     type = Column(Enum(TypeCapteur), nullable=False)
 
+    # Date d'archivage (suppression douce) : capteur masqué, mesures conservées
+    date_suppression = Column(DateTime)
+
     # Relation avec les données médicales collectées par ce capteur
-    donnees_mesures = relationship('DonneesMedicale', back_populates='capteur')
+    donnees_mesures = relationship('DonneesMedicale', back_populates='capteur', passive_deletes=True)
     
 # -------------------------------------------------------------
 # Classe Capteur : modèle représentant un capteur biomédical
@@ -0,0 +1,49 @@
+# Importation des types de colonnes et des contraintes
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, UniqueConstraint
+
+# Importation de la date/heure actuelle pour la réception
+from datetime import datetime
+
+# Accès à l'instance SQLAlchemy
+from app.extension import db
+
+# Clé d'idempotence d'une lecture envoyée par une passerelle
+class CleIngestion(db.Model):
+    __tablename__ = 'cles_ingestion'  # Clés déjà reçues
+    __table_args__ = (
+        # Une séquence par capteur ; NULL (pas de séquence) ne bloque rien
+        UniqueConstraint('capteur_id', 'sequence_appareil', name='uq_cles_ingestion_sequence'),
+        UniqueConstraint('id_lecture', name='uq_cles_ingestion_id_lecture'),
+    )
+
+    # Identifiant unique de la clé
+    id = Column(Integer, primary_key=True)
+
+    # Capteur émetteur
+    capteur_id = Column(Integer, ForeignKey('capteur.id', ondelete='CASCADE'), nullable=False)
+
+    # Numéro de séquence attribué par l'appareil (croissant par capteur)
+    sequence_appareil = Column(BigInteger)
+
+    # Identifiant (UUID) attribué par le client
+    id_lecture = Column(String(36))
+
+    # Mesure enregistrée pour cette clé (sans clé étrangère : donnees_medicales
+    # est partitionnée et sa clé primaire inclut la date de mesure)
+    donnee_medicale_id = Column(Integer)
+
+    # Date de la mesure (partition de la mesure, rétention des clés)
+    date_heure_mesure = Column(DateTime, nullable=False, index=True)
+
+    # Date de première réception
+    date_reception = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+# -------------------------------------------------------------
+# Classe CleIngestion : clé d'idempotence des lectures
+# -------------------------------------------------------------
+# - (capteur_id, sequence_appareil) et/ou id_lecture fournis par la passerelle
+# - Table non partitionnée : les contraintes d'unicité d'une table
+#   partitionnée doivent inclure la clé de partition (date de mesure),
+#   ce qui ne protégerait pas contre un renvoi avec une autre date
+# - Une clé déjà présente signale un renvoi : la lecture est ignorée
+#   (INSERT ... ON CONFLICT DO NOTHING) et la mesure existante est rapportée
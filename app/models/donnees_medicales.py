@@ -1,5 +1,5 @@
 # Importation des types de colonnes et des clés étrangères
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index, DDL, event
 
 # Importation des relations ORM
 from sqlalchemy.orm import relationship
@@ -13,21 +13,28 @@ from app.extension import db
 # Modèle représentant une donnée médicale mesurée par un capteur
 class DonneesMedicale(db.Model):
     __tablename__ = 'donnees_medicales'  # Table des mesures médicales
+    __table_args__ = (
+        # Historique d'un patient par date (consultation, statistiques)
+        Index('ix_donnees_medicales_patient_date', 'patient_id', 'date_heure_mesure'),
+        # Mesures d'un capteur (affectations, suppressions)
+        Index('ix_donnees_medicales_capteur', 'capteur_id', 'date_heure_mesure'),
+    )
 
     # Identifiant unique de la donnée
     id = Column(Integer, primary_key=True)
 
     # Référence au patient concerné
-    patient_id = Column(Integer, ForeignKey('patient.id'), nullable=False)
+    patient_id = Column(Integer, ForeignKey('patient.id', ondelete='CASCADE'), nullable=False)
 
     # Référence au capteur ayant effectué la mesure
-    capteur_id = Column(Integer, ForeignKey('capteur.id'), nullable=False)
+    capteur_id = Column(Integer, ForeignKey('capteur.id', ondelete='CASCADE'), nullable=False)
 
     # Valeur mesurée (ex : tension, température, etc.)
     valeur_mesuree = Column(Float, nullable=False)
 
     # Date et heure de la mesure (défaut : maintenant)
-    date_heure_mesure = Column(DateTime, default=datetime.utcnow)
+    # Clé de partitionnement mensuel sous PostgreSQL (voir partition_service)
+    date_heure_mesure = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relation vers le patient concerné
     patient = relationship('Patient', back_populates='donnees_phys')
@@ -36,7 +43,7 @@ class DonneesMedicale(db.Model):
     capteur = relationship('Capteur', back_populates='donnees_mesures')
 
     # Relation vers les analyses effectuées sur cette donnée
-    analyses = relationship('Analyseur', back_populates='donnee_medicale')
+    analyses = relationship('Analyseur', back_populates='donnee_medicale', passive_deletes=True)
 
     def __repr__(self):
         return f"<DonneeMedicale(patient={self.patient_id}, capteur={self.capteur_id}, valeur={self.valeur_mesuree})>"
@@ -48,4 +55,15 @@ class DonneesMedicale(db.Model):
 # - Reliée à un patient et à un capteur via des clés étrangères
 # - Contient la valeur mesurée et la date/heure de la mesure
 # - Permet de retrouver les analyses associées à cette donnée
-# - Sert de base pour le suivi médical automatisé ou manuel
\ No newline at end of file
+# - Sert de base pour le suivi médical automatisé ou manuel
+
+
+# Sous PostgreSQL, les migrations créent la clé primaire partitionnée
+# (id, date_heure_mesure) référencée par analyseur_donnee_medicale_fkey.
+# Une base créée par db.create_all() (tests, poste de développement) n'a
+# que la clé id : la clé unique équivalente est ajoutée à la création.
+event.listen(
+    DonneesMedicale.__table__, "after_create",
+    DDL("ALTER TABLE donnees_medicales ADD CONSTRAINT donnees_medicales_id_date_key "
+        "UNIQUE (id, date_heure_mesure)").execute_if(dialect="postgresql")
+)
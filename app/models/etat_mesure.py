@@ -0,0 +1,50 @@
+# Importation des types de colonnes et des clés étrangères
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+
+# Importation de la date/heure actuelle pour la mise à jour
+from datetime import datetime
+
+# Accès à l'instance SQLAlchemy
+from app.extension import db
+
+# Agrégats courants des mesures d'un capteur pour un patient
+class EtatMesure(db.Model):
+    __tablename__ = 'etats_mesures'  # Un état par couple (patient, capteur)
+
+    # Patient concerné
+    patient_id = Column(Integer, ForeignKey('patient.id', ondelete='CASCADE'), primary_key=True)
+
+    # Capteur concerné
+    capteur_id = Column(Integer, ForeignKey('capteur.id', ondelete='CASCADE'), primary_key=True, index=True)
+
+    # Médecin de la mesure la plus récente (tableau de bord du médecin)
+    medecin_id = Column(Integer, ForeignKey('medecin.id', ondelete='SET NULL'), index=True)
+
+    # Mesure la plus récente en temps de l'appareil (sans clé étrangère :
+    # donnees_medicales est partitionnée)
+    derniere_donnee_id = Column(Integer)
+    derniere_valeur = Column(Float)
+    date_derniere_mesure = Column(DateTime)
+
+    # Agrégats cumulés (commutatifs : une lecture tardive s'y ajoute
+    # sans recalcul)
+    nb_mesures = Column(Integer, default=0, nullable=False)
+    somme_valeurs = Column(Float, default=0.0, nullable=False)
+    valeur_min = Column(Float)
+    valeur_max = Column(Float)
+    nb_anomalies = Column(Integer, default=0, nullable=False)
+
+    # Lectures arrivées après une mesure plus récente (voie de correction)
+    nb_tardives = Column(Integer, default=0, nullable=False)
+
+    # Date de la dernière mise à jour
+    date_maj = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+# -------------------------------------------------------------
+# Classe EtatMesure : état courant d'un couple (patient, capteur)
+# -------------------------------------------------------------
+# - Tenu à jour par ingestion_service.mettre_a_jour_etats, dans la
+#   transaction qui insère les mesures
+# - La dernière mesure suit le temps de l'appareil, pas l'ordre d'arrivée
+# - Une lecture plus ancienne que la dernière mesure ne met à jour que
+#   les agrégats (nb_tardives compte ces corrections)
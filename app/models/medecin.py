@@ -15,7 +15,7 @@ class Medecin(Personne):
     __tablename__ = 'medecin'  # Table spécifique aux médecins
 
     # Clé primaire liée à la table 'personne' (héritage par jointure)
-    id = Column(Integer, ForeignKey('personne.id'), primary_key=True)
+    id = Column(Integer, ForeignKey('personne.id', ondelete='CASCADE'), primary_key=True)
 
     # Champ spécifique au médecin : sa spécialité médicale
     specialite = Column(String(100))
@@ -29,7 +29,7 @@ class Medecin(Personne):
     analyses = relationship('Analyseur', back_populates='medecin')
 
     # Relation avec les alertes générées ou gérées par ce médecin
-    alertes = relationship('Alerte', back_populates='medecin')
+    alertes = relationship('Alerte', back_populates='medecin', foreign_keys='Alerte.medecin_id')
     
 # -------------------------------------------------------------
 # Classe Medecin : modèle représentant un professionnel de santé
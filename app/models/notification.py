@@ -0,0 +1,50 @@
+# Importation des types de colonnes et des clés étrangères
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index
+
+# Importation de la date/heure actuelle pour la mise en file
+from datetime import datetime
+
+# Accès à l'instance SQLAlchemy
+from app.extension import db
+
+# Notification d'une alerte à un destinataire (file d'envoi « outbox »)
+class Notification(db.Model):
+    __tablename__ = 'notifications'  # Notifications à envoyer ou envoyées
+    __table_args__ = (
+        # Prochaines notifications à envoyer (notify-worker)
+        Index('ix_notifications_etat_prochain_essai', 'etat', 'prochain_essai'),
+    )
+
+    # Identifiant unique de la notification
+    id = Column(Integer, primary_key=True)
+
+    # Alerte notifiée (supprimée avec l'alerte)
+    alerte_id = Column(Integer, ForeignKey('alerte.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    # Destinataire : médecin de l'alerte ou proche du patient
+    destinataire_id = Column(Integer, ForeignKey('personne.id', ondelete='CASCADE'), nullable=False, index=True)
+    email = Column(String(120), nullable=False)
+
+    # Alerte critique : envoyée sans attendre le regroupement en résumé
+    critique = Column(Boolean, default=False, nullable=False)
+
+    # État d'envoi : en_attente, envoyee, echec (abandonnée), annulee (alerte acquittée avant l'envoi)
+    etat = Column(String(20), default='en_attente', nullable=False)
+
+    # Tentatives d'envoi et date de la prochaine (attente exponentielle)
+    tentatives = Column(Integer, default=0, nullable=False)
+    prochain_essai = Column(DateTime, default=datetime.utcnow, nullable=False)
+    derniere_erreur = Column(String(255))
+
+    # Dates de mise en file et d'envoi
+    date_creation = Column(DateTime, default=datetime.utcnow, nullable=False)
+    date_envoi = Column(DateTime)
+
+# -------------------------------------------------------------
+# Classe Notification : file d'envoi transactionnelle des alertes
+# -------------------------------------------------------------
+# - Écrite dans la transaction qui crée l'alerte (notification_service.
+#   mettre_en_file) : pas d'alerte sans notification, ni l'inverse
+# - Envoyée hors requête par `flask notify-worker`, qui regroupe les
+#   notifications d'un même destinataire en un seul e-mail
+# - Une ligne par destinataire : état et tentatives propres à chacun
@@ -15,7 +15,7 @@ class Patient(Personne):
     __tablename__ = 'patient'  # Table spécifique aux patients
 
     # Clé primaire liée à la table 'personne' (héritage par jointure)
-    id = Column(Integer, ForeignKey('personne.id'), primary_key=True)
+    id = Column(Integer, ForeignKey('personne.id', ondelete='CASCADE'), primary_key=True)
 
     # Configuration de l’héritage polymorphique : identifie cette classe comme 'patient'
     __mapper_args__ = {
@@ -23,16 +23,16 @@ class Patient(Personne):
     }
 
     # Relation avec les données médicales du patient
-    donnees_phys = relationship('DonneesMedicale', back_populates='patient')
+    donnees_phys = relationship('DonneesMedicale', back_populates='patient', passive_deletes=True)
 
     # Relation avec les proches associés à ce patient
-    proches = relationship('Proche', back_populates='patient', foreign_keys='Proche.patient_id')
+    proches = relationship('Proche', back_populates='patient', foreign_keys='Proche.patient_id', passive_deletes=True)
 
     # Relation avec les analyses médicales du patient
-    analyses = relationship('Analyseur', back_populates='patient')
+    analyses = relationship('Analyseur', back_populates='patient', passive_deletes=True)
 
     # Relation avec les alertes générées pour ce patient
-    alertes = relationship('Alerte', back_populates='patient')
+    alertes = relationship('Alerte', back_populates='patient', foreign_keys='Alerte.patient_id', passive_deletes=True)
     
     
 # -------------------------------------------------------------
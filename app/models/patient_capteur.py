@@ -0,0 +1,39 @@
+# Importation des types de colonnes et des clés étrangères
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, text
+
+# Importation de la date/heure actuelle pour le début d'affectation
+from datetime import datetime
+
+# Accès à l'instance SQLAlchemy
+from app.extension import db
+
+# Affectation d'un capteur à un patient sur une période
+class PatientCapteur(db.Model):
+    __tablename__ = 'patient_capteur'  # Périodes d'affectation
+    __table_args__ = (
+        # Une seule affectation active par couple ; sert aussi les capteurs
+        # d'un patient (préfixe patient_id)
+        Index('uq_patient_capteur_active', 'patient_id', 'capteur_id', unique=True,
+              postgresql_where=text('date_fin IS NULL'),
+              sqlite_where=text('date_fin IS NULL')),
+    )
+
+    # Identifiant unique de l'affectation
+    id = Column(Integer, primary_key=True)
+
+    # Patient et capteur affectés
+    patient_id = Column(Integer, ForeignKey('patient.id', ondelete='CASCADE'), nullable=False)
+    capteur_id = Column(Integer, ForeignKey('capteur.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    # Période d'affectation : active tant que date_fin est vide
+    date_debut = Column(DateTime, default=datetime.utcnow, nullable=False)
+    date_fin = Column(DateTime)
+
+# -------------------------------------------------------------
+# Classe PatientCapteur : affectation d'un capteur à un patient
+# -------------------------------------------------------------
+# - Créée par POST /patients/<id>/capteurs/<capteur_id>, ou à la première
+#   mesure d'un couple encore inconnu (voir mettre_a_jour_etats)
+# - La dissociation clôt la période (date_fin) : les mesures restent
+# - Les listes de capteurs d'un patient lisent cette table par index,
+#   sans parcourir les mesures
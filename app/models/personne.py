@@ -1,6 +1,7 @@
 # Importation des types de colonnes SQLAlchemy
 from sqlalchemy import Column, Integer, String
-from sqlalchemy import Column, Integer, String, Date  # doublon à fusionner
+from sqlalchemy import Column, Integer, String, Date, DateTime  # doublon à fusionner
+from sqlalchemy import func
 
 # Importation de l'instance SQLAlchemy et du module de hachage bcrypt
 from app.extension import db, bcrypt
@@ -22,6 +23,9 @@ class Personne(db.Model):
     adresse = Column(String(255))
     date_naissance = Column(Date)
 
+    # Date d'archivage (suppression douce) : compte désactivé, historique conservé
+    date_suppression = Column(DateTime)
+
     # Mot de passe haché
     mot_de_passe = Column(String(255), nullable=False)
 
@@ -31,6 +35,11 @@ class Personne(db.Model):
     # Champ technique utilisé pour l’héritage polymorphique
     type = db.Column(db.String(50))
 
+    # Index fonctionnel : recherche d'email insensible à la casse (login)
+    __table_args__ = (
+        db.Index('ix_personne_email_lower', func.lower(email)),
+    )
+
     # Configuration de l’héritage : permet à SQLAlchemy de distinguer les sous-classes
     __mapper_args__ = {
         'polymorphic_identity': 'personne',  # Identité par défaut
@@ -13,13 +13,13 @@ class Proche(Personne):
     __tablename__ = 'proche'  # Table spécifique aux proches
 
     # Clé primaire liée à la table 'personne' (héritage par jointure)
-    id = Column(Integer, ForeignKey('personne.id'), primary_key=True) 
+    id = Column(Integer, ForeignKey('personne.id', ondelete='CASCADE'), primary_key=True) 
 
     # Type de lien avec le patient (ex : mère, frère, ami)
     lien_parente = Column(String(100))
 
     # Clé étrangère vers le patient concerné
-    patient_id = Column(Integer, ForeignKey('patient.id'), nullable=False)
+    patient_id = Column(Integer, ForeignKey('patient.id', ondelete='CASCADE'), nullable=False, index=True)
 
     # Relation bidirectionnelle avec le modèle Patient
     patient = relationship('Patient', back_populates='proches', foreign_keys=[patient_id])
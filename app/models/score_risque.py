@@ -0,0 +1,55 @@
+# Importation des types de colonnes et des clés étrangères
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Enum, Index
+
+# Importation de la date/heure actuelle pour la mise à jour
+from datetime import datetime
+
+# Accès à l'instance SQLAlchemy
+from app.extension import db
+
+# Importation de l'énumération des niveaux d'urgence
+from .enums import UrgenceEnum
+
+# Score de risque courant d'un patient, tenu à jour de façon incrémentale
+class ScoreRisque(db.Model):
+    __tablename__ = 'scores_risque'  # Un score par patient
+    __table_args__ = (
+        # Patients les plus à risque d'un médecin (top-K par parcours d'index)
+        Index('ix_scores_risque_medecin_score', 'medecin_id', 'score'),
+        # Tri de tous les patients par risque
+        Index('ix_scores_risque_score', 'score'),
+    )
+
+    # Patient concerné
+    patient_id = Column(Integer, ForeignKey('patient.id', ondelete='CASCADE'), primary_key=True)
+
+    # Médecin de la dernière mesure ou alerte du patient
+    medecin_id = Column(Integer, ForeignKey('medecin.id', ondelete='SET NULL'))
+
+    # Score total à date_reference : score_alertes + score_ecarts
+    score = Column(Float, default=0.0, nullable=False)
+
+    # Alertes non traitées pondérées par urgence, avec décroissance dans le temps
+    score_alertes = Column(Float, default=0.0, nullable=False)
+
+    # Écart des dernières mesures aux seuils de leur capteur
+    score_ecarts = Column(Float, default=0.0, nullable=False)
+
+    # Nombre d'alertes non traitées
+    nb_alertes_non_traitees = Column(Integer, default=0, nullable=False)
+
+    # Urgence et date de la dernière alerte (recherche par urgence)
+    derniere_urgence = Column(Enum(UrgenceEnum), index=True)
+    date_derniere_alerte = Column(DateTime)
+
+    # Date à laquelle score_alertes a été décru pour la dernière fois
+    date_reference = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+# -------------------------------------------------------------
+# Classe ScoreRisque : score de risque matérialisé d'un patient
+# -------------------------------------------------------------
+# - Tenu à jour par risque_service.mettre_a_jour_scores, dans la
+#   transaction qui crée une analyse ou change l'état d'une alerte
+# - score_alertes décroît de moitié toutes les RISQUE_DEMI_VIE_H heures ;
+#   `flask risk-decay` rafraîchit périodiquement la colonne indexée score
+# - Trier les patients par risque parcourt l'index, sans agréger les alertes
@@ -0,0 +1,41 @@
+# Importation des types de colonnes
+from sqlalchemy import Column, Integer, String, DateTime
+
+# Importation de la date/heure actuelle pour la création
+from datetime import datetime
+
+# Accès à l'instance SQLAlchemy
+from app.extension import db
+
+# Suppression volumineuse différée, traitée par lots
+class Suppression(db.Model):
+    __tablename__ = 'suppressions'  # Suppressions en attente ou terminées
+
+    # Identifiant unique de la suppression
+    id = Column(Integer, primary_key=True)
+
+    # Cible : patient, capteur ou patient_capteur (dissociation)
+    cible = Column(String(20), nullable=False)
+
+    # Patient et/ou capteur visés (sans clé étrangère : ils vont disparaître)
+    patient_id = Column(Integer)
+    capteur_id = Column(Integer)
+
+    # État : en_attente, terminee
+    etat = Column(String(20), default='en_attente', nullable=False, index=True)
+
+    # Mesures supprimées jusqu'ici et dernière erreur (nouvel essai au passage suivant)
+    lignes_supprimees = Column(Integer, default=0, nullable=False)
+    derniere_erreur = Column(String(255))
+
+    # Dates de demande et de fin
+    date_creation = Column(DateTime, default=datetime.utcnow, nullable=False)
+    date_fin = Column(DateTime)
+
+# -------------------------------------------------------------
+# Classe Suppression : suppression différée d'un patient ou d'un capteur
+# -------------------------------------------------------------
+# - Créée quand la cible a plus de SUPPRESSION_TAILLE_LOT mesures : la
+#   cible est archivée tout de suite, puis `flask purge-deletions` vide
+#   ses mesures par lots (une transaction courte par lot) avant de
+#   supprimer le reste en une fois
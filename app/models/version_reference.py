@@ -0,0 +1,22 @@
+# Importation des types de colonnes SQLAlchemy
+from sqlalchemy import Column, String, BigInteger
+
+# Accès à l'instance SQLAlchemy
+from app.extension import db
+
+# Compteur de version d'une table de référence (ex : capteur)
+class VersionReference(db.Model):
+    __tablename__ = 'versions_references'  # Une ligne par table de référence
+
+    # Nom de la référence ("capteur")
+    nom = Column(String(50), primary_key=True)
+
+    # Incrémenté à chaque modification de la référence
+    version = Column(BigInteger, default=0, nullable=False)
+
+# -------------------------------------------------------------
+# Classe VersionReference : version partagée d'une référence en cache
+# -------------------------------------------------------------
+# - Chaque worker garde la référence en mémoire (reference_service)
+#   et relit cette seule ligne pour savoir si elle a changé
+# - Incrémentée dans la transaction qui modifie la référence
@@ -7,6 +7,7 @@ from app.routes import (
     alerte_routes,
     donnees_medicales_route,
     analyse_route,
+    sante_routes,
 )
 
 def register_routes(app):
@@ -18,4 +19,5 @@ def register_routes(app):
     app.register_blueprint(alerte_routes.alerte_bp)
     app.register_blueprint(donnees_medicales_route.donnees_bp)
     app.register_blueprint(analyse_route.analyse_bp)
+    app.register_blueprint(sante_routes.sante_bp)
     
\ No newline at end of file
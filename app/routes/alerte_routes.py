@@ -1,19 +1,24 @@
-from flask import Blueprint, request, jsonify
-from flasgger import swag_from
-from sqlalchemy import or_, func
+from flask import Blueprint, request, jsonify, current_app
+from app.utils.swagger import swag_from
+from sqlalchemy import or_, func, cast, String
 from app.models import Alerte
 from flask_jwt_extended import jwt_required
-from app.utils.validation import validate_fields
+from app.utils.validation import validate_fields, parse_horodatage
+from app.utils.autorisation import get_identite
+from app.models.enums import TypeAlerte, UrgenceEnum
 from app.utils.serializers import serialize_alerte
 from app.services.alerte_service import (
     create_alerte,
     get_all_alertes,
+    lister_alertes_serialisees,
     get_alertes_by_patient,
     get_alertes_by_medecin,
     get_alerte_by_id,
     update_alerte_etat,
+    changer_etat_alertes,
     delete_alerte
 )
+from app.utils.replicas import lecture_replica
 
 alerte_bp = Blueprint("alerte_bp", __name__, url_prefix="/v1")
 
@@ -75,6 +80,8 @@ def create_alerte_route():
 })
 @jwt_required()
 def get_all_alertes_route():
+    if current_app.config.get("SERIALISATION_LIGNES", True):
+        return jsonify(lister_alertes_serialisees()), 200
     alertes = get_all_alertes()
     return jsonify([serialize_alerte(a) for a in alertes]), 200
 
@@ -99,6 +106,7 @@ def get_all_alertes_route():
     }
 })
 @jwt_required()
+@lecture_replica
 def search_alertes_route():
     q = request.args.get("q", "").lower().strip()
     if not q:
@@ -106,8 +114,9 @@ def search_alertes_route():
 
     alertes = Alerte.query.filter(
         or_(
-            func.lower(Alerte.type_alerte).like(f"%{q}%"),
-            func.lower(Alerte.niveau_urgence).like(f"%{q}%"),
+            # Cast explicite : PostgreSQL n'a pas de lower() sur les types ENUM
+            func.lower(cast(Alerte.type_alerte, String)).like(f"%{q}%"),
+            func.lower(cast(Alerte.niveau_urgence, String)).like(f"%{q}%"),
             func.lower(Alerte.description).like(f"%{q}%")
         )
     ).all()
@@ -143,6 +152,8 @@ def get_alerte_by_id_route(id):
 # -------------------------------------------------------------
 # Route PUT /alertes/<id>/etat : marquer une alerte comme traitée
 # -------------------------------------------------------------
+# - Réservé au médecin de l'alerte (enregistré comme acquitteur),
+#   comme PUT /alertes/etat
 @alerte_bp.route("/alertes/<int:id>/etat", methods=["PUT"])
 @swag_from({
     'tags': ['v1 - Alertes'],
@@ -165,19 +176,107 @@ def get_alerte_by_id_route(id):
     'security': [{'BearerAuth': []}],
     'responses': {
         200: {'description': 'État mis à jour'},
+        403: {'description': 'Réservé au médecin de l’alerte'},
         404: {'description': 'Alerte introuvable'}
     }
 })
 @jwt_required()
 def update_alerte_etat_route(id):
+    identite = get_identite()
+    if identite["role"] != "medecin":
+        return jsonify({"error": "Accès refusé"}), 403
     alerte = get_alerte_by_id(id)
     if not alerte:
         return jsonify({"error": "Alerte introuvable"}), 404
+    if alerte.medecin_id != identite["id"]:
+        return jsonify({"error": "Accès refusé"}), 403
 
     data = request.get_json()
-    update_alerte_etat(alerte, data["etat_traitement"])
+    update_alerte_etat(alerte, data["etat_traitement"], par=identite["id"])
     return jsonify({"message": "État de l’alerte mis à jour"}), 200
 
+
+def _enum_depuis(enum, valeur, champ):
+    for membre in enum:
+        if valeur in (membre.name, membre.value) or str(valeur).lower() == membre.value.lower():
+            return membre
+    raise ValueError(f"{champ} invalide")
+
+
+# -------------------------------------------------------------
+# Route PUT /alertes/etat : acquitter (ou rouvrir) des alertes en masse
+# -------------------------------------------------------------
+@alerte_bp.route("/alertes/etat", methods=["PUT"])
+@swag_from({
+    'tags': ['v1 - Alertes'],
+    'summary': 'Changer l’état de plusieurs alertes',
+    'description': 'Acquitte (ou rouvre) en une requête les alertes désignées par leurs IDs et/ou '
+                   'par un filtre. Seules les alertes du médecin connecté sont modifiées.',
+    'parameters': [{
+        'name': 'body',
+        'in': 'body',
+        'required': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'etat_traitement': {'type': 'boolean', 'example': True},
+                'ids': {'type': 'array', 'items': {'type': 'integer'}, 'example': [12, 13, 15]},
+                'filtre': {
+                    'type': 'object',
+                    'properties': {
+                        'patient_id': {'type': 'integer', 'example': 3},
+                        'type_alerte': {'type': 'string', 'example': 'Avertissement'},
+                        'niveau_urgence': {'type': 'string', 'example': 'Moyenne'},
+                        'avant': {'type': 'string', 'format': 'date-time', 'example': '2026-10-20T08:00:00'}
+                    }
+                }
+            },
+            'required': ['etat_traitement']
+        }
+    }],
+    'security': [{'BearerAuth': []}],
+    'responses': {
+        200: {'description': 'IDs des alertes modifiées ; les autres étaient déjà dans cet état, '
+                             'introuvables ou d’un autre médecin'},
+        400: {'description': 'Requête invalide (ni IDs ni filtre, valeur inconnue)'},
+        403: {'description': 'Réservé aux médecins'}
+    }
+})
+@jwt_required()
+def changer_etat_alertes_route():
+    identite = get_identite()
+    if identite["role"] != "medecin":
+        return jsonify({"error": "Accès refusé"}), 403
+
+    data = request.get_json(silent=True) or {}
+    ids, filtre = data.get("ids"), data.get("filtre") or {}
+    if not isinstance(data.get("etat_traitement"), bool):
+        return jsonify({"error": "etat_traitement (booléen) requis"}), 400
+    if ids is not None and (not isinstance(ids, list)
+                            or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids)):
+        return jsonify({"error": "ids doit être une liste d'entiers"}), 400
+    if not isinstance(filtre, dict):
+        return jsonify({"error": "filtre doit être un objet"}), 400
+    patient_id = filtre.get("patient_id")
+    if patient_id is not None and (not isinstance(patient_id, int) or isinstance(patient_id, bool)):
+        return jsonify({"error": "filtre.patient_id doit être un entier"}), 400
+    try:
+        criteres = {
+            "patient_id": patient_id,
+            "type_alerte": _enum_depuis(TypeAlerte, filtre["type_alerte"], "type_alerte")
+            if filtre.get("type_alerte") is not None else None,
+            "niveau_urgence": _enum_depuis(UrgenceEnum, filtre["niveau_urgence"], "niveau_urgence")
+            if filtre.get("niveau_urgence") is not None else None,
+            "avant": parse_horodatage(filtre["avant"]) if filtre.get("avant") is not None else None,
+        }
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if ids is None and all(v is None for v in criteres.values()):
+        return jsonify({"error": "ids ou filtre requis"}), 400
+
+    modifiees = changer_etat_alertes(data["etat_traitement"], identite["id"], ids=ids, **criteres)
+    return jsonify({"modifiees": len(modifiees), "ids": modifiees}), 200
+
 # -------------------------------------------------------------
 # Route GET /patients/<id>/alertes : alertes d’un patient
 # -------------------------------------------------------------
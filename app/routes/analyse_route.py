@@ -1,10 +1,10 @@
 # app/routes/analyse_route.py
 
-from flask import Blueprint, request, jsonify
-from flasgger import swag_from
+from flask import Blueprint, request, jsonify, current_app
+from app.utils.swagger import swag_from
 from flask_jwt_extended import jwt_required
 from app.services.analyse_service import (
-    create_analyse, get_all_analyses, get_analyses_by_medecin,
+    create_analyse, get_all_analyses, get_analyses_by_medecin, lister_analyses_serialisees,
     get_analyse_by_id, delete_analyse
 )
 from app.utils.serializers import serialize_analyse
@@ -66,6 +66,8 @@ def create_analyse_route():
     }
 })
 def get_all_analyses_route():
+    if current_app.config.get("SERIALISATION_LIGNES", True):
+        return jsonify(lister_analyses_serialisees()), 200
     analyses = get_all_analyses()
     return jsonify([serialize_analyse(a) for a in analyses]), 200
 
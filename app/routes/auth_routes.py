@@ -1,13 +1,15 @@
-from flask import Blueprint, request, jsonify
-from flasgger import swag_from
+from flask import Blueprint, request, jsonify, current_app
+from app.utils.swagger import swag_from
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.services.auth_service import (
     authenticate_user,
     generate_token,
     format_user_response,
-    get_user_by_id
+    get_profil_utilisateur
 )
 from app.extension import blacklist # Pour la gestion de la blacklist des tokens
+from app.extension import limiteur_login
+import math
 import json
 
 auth_bp = Blueprint("auth_bp", __name__, url_prefix="/v1/auth")
@@ -55,7 +57,9 @@ auth_bp = Blueprint("auth_bp", __name__, url_prefix="/v1/auth")
             }
         },
         400: {'description': 'Champs manquants'},
-        401: {'description': 'Identifiants invalides'}
+        401: {'description': 'Identifiants invalides'},
+        429: {'description': 'Trop de tentatives (en-tête Retry-After)'},
+        503: {'description': 'Service d’authentification saturé'}
     }
 })
 def login():
@@ -66,7 +70,22 @@ def login():
     if not email or not password:
         return jsonify({"error": "Email et mot de passe requis"}), 400
 
-    user = authenticate_user(email, password)
+    # Limitation par compte et par IP avant tout calcul bcrypt
+    config = current_app.config
+    attente = limiteur_login.consommer_tous([
+        (f"compte:{email.strip().lower()}", config["LOGIN_RAFALE_COMPTE"], config["LOGIN_RECHARGE_COMPTE_S"]),
+        (f"ip:{request.remote_addr}", config["LOGIN_RAFALE_IP"], config["LOGIN_RECHARGE_IP_S"]),
+    ])
+    if attente:
+        reponse = jsonify({"error": "Trop de tentatives, réessayez plus tard"})
+        reponse.headers["Retry-After"] = str(math.ceil(attente))
+        return reponse, 429
+
+    try:
+        user = authenticate_user(email, password)
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 503
+
     if not user:
         return jsonify({"error": "Identifiants invalides"}), 401
 
@@ -109,12 +128,12 @@ def get_current_user():
     identity_raw = get_jwt_identity()
     identity = json.loads(identity_raw) 
     
-    user = get_user_by_id(identity["id"])
+    profil = get_profil_utilisateur(identity["id"])
 
-    if not user:
+    if not profil:
         return jsonify({"error": "Utilisateur introuvable"}), 404
 
-    return jsonify(format_user_response(user)), 200
+    return jsonify(profil), 200
 
 # -------------------------------------------------------------
 # Route /logout : déconnexion (invalide le token courant)
@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from flasgger import swag_from
+from app.utils.swagger import swag_from
 from flask_jwt_extended import jwt_required
 from app.utils.validation import validate_fields
 from app.models.enums import TypeCapteur
@@ -9,6 +9,7 @@ from app.services.capteur_service import (
     get_capteur_by_id,
     delete_capteur,
 )
+from app.services.suppression_service import suppression_douce, reponse_suppression
 
 capteur_bp = Blueprint("capteur_bp", __name__, url_prefix="/v1")
 
@@ -100,5 +101,6 @@ def delete_capteur_route(id):
     if not capteur:
         return jsonify({"error": "Capteur introuvable"}), 404
 
-    delete_capteur(capteur)
-    return jsonify({"message": "Capteur supprimé"}), 200
+    corps, code = reponse_suppression(delete_capteur(capteur, douce=suppression_douce(request.args.get("douce"))),
+                                      "Capteur")
+    return jsonify(corps), code
@@ -3,26 +3,30 @@
 # -------------------------------------------------------------
 # Routes REST liées aux données médicales :
 # - CRUD
+# - Ingestion en flux (NDJSON, CBOR, MessagePack)
 # - Statistiques
 # - Capteurs d’un patient
 # -------------------------------------------------------------
 
-from flask import Blueprint, request, jsonify
-from flasgger import swag_from
-from flask_jwt_extended import jwt_required, get_jwt_identity
-import json
-from app.services.auth_service import get_user_by_id
-from app.services.proche_service import get_proche_by_id
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context, g
+from app.utils.swagger import swag_from
+from flask_jwt_extended import jwt_required
+from app.extension import db
+from app.utils.autorisation import require_patient_access, require_source_ingestion, require_source_flux
+from app.services.appareil_service import appareil_de_lecture, completer_lecture
 from app.services.donnee_medical_service import (
     create_donnee_medicale,
     get_all_donnees,
+    lister_donnees_serialisees,
     get_donnees_by_patient,
     get_stats_by_patient,
     delete_donnee,
     get_capteurs_by_patient,
     get_donnee_by_id
 )
-from app.utils.validation import validate_fields
+from app.services.ingestion_service import ingerer_flux, valider_lecture
+from app.utils.flux_lectures import DECODEURS, decodeur_pour, enregistrements_ndjson
+from app.utils.validation import validate_fields, parse_periode
 from app.utils.serializers import (
     serialize_donnee_medicale,
     serialize_capteur
@@ -34,26 +38,48 @@ donnees_bp = Blueprint("donnees_bp", __name__, url_prefix="/v1")
 # -------------------------------------------------------------
 # POST /donnees → ajouter une donnée médicale
 # -------------------------------------------------------------
+# - Authentification : clé d'API d'un appareil, lot signé par une
+#   passerelle, ou JWT d'un médecin (voir require_source_ingestion)
+# - Appareil / passerelle : patient, capteur et médecin résolus par le
+#   registre ; une lecture ne porte que appareil_id et ses valeurs
+# - Lectures validées comme en flux (valider_lecture) : une valeur non
+#   numérique est refusée (400), ou écartée d'une liste
 @donnees_bp.route("/donnees", methods=["POST"])
+@require_source_ingestion
 @swag_from({
     'tags': ['v1 - Données Médicales'],
     'summary': 'Créer une nouvelle donnée médicale',
-    'description': 'Cette route permet d’enregistrer une nouvelle mesure biomédicale captée par un capteur pour un patient donné.',
+    'description': 'Cette route permet d’enregistrer une nouvelle mesure biomédicale captée par un capteur pour un patient donné. '
+                   'date_heure_mesure (horodatage de l’appareil), sequence_appareil et id_lecture sont facultatifs ; '
+                   'un renvoi avec la même sequence_appareil (par capteur) ou le même id_lecture ne crée rien. '
+                   'Appareil : en-tête X-Cle-Appareil, corps {valeur_mesuree, ...}. '
+                   'Passerelle : en-têtes X-Passerelle, X-Horodatage, X-Signature (HMAC-SHA256 de '
+                   '"<horodatage>." + corps), lectures {appareil_id, valeur_mesuree, ...}. '
+                   'Médecin (JWT) : patient_id, capteur_id et medecin_id dans le corps.',
     'parameters': [
+        {'name': 'X-Cle-Appareil', 'in': 'header', 'type': 'string', 'required': False,
+         'description': '<appareil_id>.<secret>'},
+        {'name': 'X-Passerelle', 'in': 'header', 'type': 'integer', 'required': False},
+        {'name': 'X-Horodatage', 'in': 'header', 'type': 'integer', 'required': False,
+         'description': 'Secondes Unix'},
+        {'name': 'X-Signature', 'in': 'header', 'type': 'string', 'required': False},
         {
             'name': 'body',
             'in': 'body',
             'required': True,
             'schema': {
                 'example': {
-                    "patient_id": 1,
-                    "capteur_id": 2,
-                    "valeur_mesuree": 36.7
+                    "appareil_id": 7,
+                    "valeur_mesuree": 36.7,
+                    "date_heure_mesure": "2025-10-06T18:45:00Z",
+                    "sequence_appareil": 1042,
+                    "id_lecture": "0f8e7d0c-3b1a-4c5e-9f2d-7a6b5c4d3e2f"
                 }
             }
         }
     ],
     'responses': {
+        200: {'description': 'Renvoi : donnée déjà enregistrée, retournée telle quelle'},
         201: {
             'description': 'Donnée médicale enregistrée avec succès',
             'examples': {
@@ -70,21 +96,26 @@ donnees_bp = Blueprint("donnees_bp", __name__, url_prefix="/v1")
             }
         },
         400: {'description': 'Champs manquants ou invalides'},
+        401: {'description': 'Clé, signature ou jeton absent ou invalide'},
+        403: {'description': 'Appareil non rattaché à la passerelle, ou utilisateur non médecin'},
         500: {'description': 'Erreur interne du serveur'}
     }
 })
 def create_donnee_route():
     data = request.get_json()
+    source = g.source_ingestion
 
     # Si c’est une liste → plusieurs mesures d’un coup
     if isinstance(data, list):
         saved_donnees = []
         for item in data:
             try:
-                donnee = create_donnee_medicale(item)
+                valider_lecture(completer_lecture(item, source))
+                donnee = create_donnee_medicale(item, appareil=appareil_de_lecture(item, source))
                 saved_donnees.append(serialize_donnee_medicale(donnee))
-            except Exception as e:
-                print(f"Erreur sur {item}: {e}")
+            except Exception:
+                # Lecture écartée : la session repart propre pour les suivantes
+                db.session.rollback()
                 continue
 
         return jsonify({
@@ -94,16 +125,25 @@ def create_donnee_route():
 
     # Sinon → une seule donnée
     elif isinstance(data, dict):
-        required = ["patient_id", "capteur_id", "valeur_mesuree"]
+        required = ["valeur_mesuree"] if source else ["patient_id", "capteur_id", "valeur_mesuree"]
         if not validate_fields(data, required):
             return jsonify({"error": "Champs manquants"}), 400
 
         try:
-            donnee = create_donnee_medicale(data)
+            valider_lecture(completer_lecture(data, source))
+            donnee = create_donnee_medicale(data, appareil=appareil_de_lecture(data, source))
+            if getattr(donnee, "doublon", False):
+                # Renvoi (même sequence_appareil ou id_lecture) : rien n'est réécrit
+                return jsonify({
+                    "message": "Donnée médicale déjà enregistrée",
+                    "donnee": serialize_donnee_medicale(donnee)
+                }), 200
             return jsonify({
                 "message": "Donnée médicale enregistrée avec succès",
                 "donnee": serialize_donnee_medicale(donnee)
             }), 201
+        except PermissionError as e:
+            return jsonify({"error": str(e)}), 403
         except ValueError as e:
             return jsonify({"error": str(e)}), 400
         except Exception as e:
@@ -114,6 +154,88 @@ def create_donnee_route():
         return jsonify({"error": "Format JSON invalide"}), 400
 
 
+# -------------------------------------------------------------
+# POST /donnees/flux → ingestion en flux (NDJSON, CBOR, MessagePack)
+# -------------------------------------------------------------
+# - Corps décodé au fil de l'eau, enregistré par morceaux de
+#   INGESTION_TAILLE_LOT lectures (une transaction chacun)
+# - Réponse NDJSON en flux : un bilan par morceau, puis le bilan final
+# - Authentification vérifiée avant la lecture du corps, comme POST
+#   /donnees : clé d'appareil, lot signé par une passerelle (corps mis
+#   en tampon, traité seulement si la signature est conforme) ou JWT
+#   d'un médecin
+# - Appareil / passerelle : patient, capteur et médecin résolus par le
+#   registre pour chaque lecture
+@donnees_bp.route("/donnees/flux", methods=["POST"])
+@require_source_flux
+@swag_from({
+    'tags': ['v1 - Données Médicales'],
+    'summary': 'Ingestion en flux de lectures (NDJSON, CBOR, MessagePack)',
+    'description': "Corps de type application/x-ndjson, application/cbor-seq ou application/msgpack : "
+                   "une lecture par enregistrement. La mémoire utilisée ne dépend pas de la taille du corps. "
+                   "Appareil : en-tête X-Cle-Appareil, lectures {valeur_mesuree, ...}. "
+                   "Passerelle : en-têtes X-Passerelle, X-Horodatage, X-Signature (HMAC-SHA256 de "
+                   "\"<horodatage>.\" + corps), lectures {appareil_id, valeur_mesuree, ...}. "
+                   "Médecin (JWT) : lectures {patient_id, capteur_id, medecin_id, valeur_mesuree}.",
+    'consumes': ['application/x-ndjson', 'application/cbor-seq', 'application/msgpack'],
+    'produces': ['application/x-ndjson'],
+    'parameters': [
+        {'name': 'X-Cle-Appareil', 'in': 'header', 'type': 'string', 'required': False,
+         'description': '<appareil_id>.<secret>'},
+        {'name': 'X-Passerelle', 'in': 'header', 'type': 'integer', 'required': False},
+        {'name': 'X-Horodatage', 'in': 'header', 'type': 'integer', 'required': False,
+         'description': 'Secondes Unix'},
+        {'name': 'X-Signature', 'in': 'header', 'type': 'string', 'required': False},
+    ],
+    'security': [{'BearerAuth': []}],
+    'responses': {
+        200: {
+            'description': 'Un bilan JSON par ligne : un par morceau, puis le bilan final',
+            'examples': {
+                'application/x-ndjson': (
+                    '{"morceau": 1, "lignes": [1, 500], "recues": 500, "enregistrees": 499, '
+                    '"alertes": 12, "rejetees": 1, "erreurs": [{"ligne": 42, "erreur": "JSON invalide"}]}\n'
+                    '{"termine": true, "confirmees_jusqu_a": 500, "total": {...}}'
+                )
+            }
+        },
+        401: {'description': 'Clé, signature ou jeton absent ou invalide'},
+        403: {'description': 'Utilisateur non médecin'},
+        415: {'description': 'Content-Type non pris en charge'}
+    }
+})
+def ingerer_flux_route():
+    decodeur = decodeur_pour(request.mimetype)
+    if decodeur is None:
+        return jsonify({"error": "Content-Type attendu : " + ", ".join(sorted(DECODEURS))}), 415
+
+    source = g.source_ingestion
+    flux = request.stream
+    corps_signe = source.pop("corps_signe", None)
+    if corps_signe is not None:
+        flux = corps_signe.lire(request.stream)
+        if flux is None:
+            return jsonify({"error": "Signature de passerelle invalide ou expirée"}), 401
+
+    config = current_app.config
+    json_app = current_app.json
+    if decodeur is enregistrements_ndjson:
+        enregistrements = decodeur(flux, charger=json_app.loads,
+                                   taille_max=config.get("INGESTION_LIGNE_MAX", 65536))
+    else:
+        enregistrements = decodeur(flux)
+
+    def bilans():
+        try:
+            for bilan in ingerer_flux(enregistrements, config.get("INGESTION_TAILLE_LOT", 500), source=source):
+                yield json_app.dumps(bilan) + "\n"
+        finally:
+            if corps_signe is not None:
+                flux.close()   # tampon du lot signé
+
+    return Response(stream_with_context(bilans()), mimetype="application/x-ndjson")
+
+
 # -------------------------------------------------------------
 # GET /donnees → liste de toutes les données médicales
 # -------------------------------------------------------------
@@ -141,6 +263,8 @@ def create_donnee_route():
     }
 })
 def get_all_donnees_route():
+    if current_app.config.get("SERIALISATION_LIGNES", True):
+        return jsonify(lister_donnees_serialisees()), 200
     donnees = get_all_donnees()
     return jsonify([serialize_donnee_medicale(d) for d in donnees]), 200
 
@@ -150,6 +274,7 @@ def get_all_donnees_route():
 # -------------------------------------------------------------
 @donnees_bp.route("/donnees/patient/<int:patient_id>", methods=["GET"])
 @jwt_required()
+@require_patient_access()
 @swag_from({
     'tags': ['v1 - Données Médicales'],
     'summary': 'Obtenir les données médicales d’un patient',
@@ -161,6 +286,20 @@ def get_all_donnees_route():
             'type': 'integer',
             'required': True,
             'description': 'Identifiant du patient'
+        },
+        {
+            'name': 'from',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Début de période inclus (ISO 8601, ex: 2026-10-01T00:00:00)'
+        },
+        {
+            'name': 'to',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Fin de période exclue (ISO 8601)'
         }
     ],
     'responses': {
@@ -169,30 +308,11 @@ def get_all_donnees_route():
     }
 })
 def get_donnees_by_patient_route(patient_id):
-    # Autorisation : patient lui-même, medecin, ou proche lié
-    identity_raw = get_jwt_identity()
     try:
-        identity = json.loads(identity_raw)
-    except Exception:
-        identity = {"id": None, "role": None}
-
-    user_role = identity.get("role")
-    user_id = identity.get("id")
-
-    allowed = False
-    if user_role == 'medecin':
-        allowed = True
-    elif user_role == 'patient' and user_id == patient_id:
-        allowed = True
-    elif user_role == 'proche':
-        proche = get_proche_by_id(user_id)
-        if proche and proche.patient_id == patient_id:
-            allowed = True
-
-    if not allowed:
-        return jsonify({"error": "Accès non autorisé"}), 403
-
-    donnees = get_donnees_by_patient(patient_id)
+        periode = parse_periode(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    donnees = get_donnees_by_patient(patient_id, **periode)
     if not donnees:
         return jsonify({"message": "Aucune donnée trouvée"}), 404
     return jsonify([serialize_donnee_medicale(d) for d in donnees]), 200
@@ -203,6 +323,7 @@ def get_donnees_by_patient_route(patient_id):
 # -------------------------------------------------------------
 @donnees_bp.route("/donnees/patient/<int:patient_id>/stats", methods=["GET"])
 @jwt_required()
+@require_patient_access()
 @swag_from({
     'tags': ['v1 - Données Médicales'],
     'summary': 'Obtenir les statistiques médicales d’un patient',
@@ -214,6 +335,20 @@ def get_donnees_by_patient_route(patient_id):
             'type': 'integer',
             'required': True,
             'description': 'Identifiant du patient'
+        },
+        {
+            'name': 'from',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Début de période inclus (ISO 8601, ex: 2026-10-01T00:00:00)'
+        },
+        {
+            'name': 'to',
+            'in': 'query',
+            'type': 'string',
+            'required': False,
+            'description': 'Fin de période exclue (ISO 8601)'
         }
     ],
     'responses': {
@@ -229,30 +364,11 @@ def get_donnees_by_patient_route(patient_id):
     }
 })
 def get_stats_by_patient_route(patient_id):
-    # Autorisation identique à get_donnees_by_patient
-    identity_raw = get_jwt_identity()
     try:
-        identity = json.loads(identity_raw)
-    except Exception:
-        identity = {"id": None, "role": None}
-
-    user_role = identity.get("role")
-    user_id = identity.get("id")
-
-    allowed = False
-    if user_role == 'medecin':
-        allowed = True
-    elif user_role == 'patient' and user_id == patient_id:
-        allowed = True
-    elif user_role == 'proche':
-        proche = get_proche_by_id(user_id)
-        if proche and proche.patient_id == patient_id:
-            allowed = True
-
-    if not allowed:
-        return jsonify({"error": "Accès non autorisé"}), 403
-
-    stats = get_stats_by_patient(patient_id)
+        periode = parse_periode(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    stats = get_stats_by_patient(patient_id, **periode)
     if not stats:
         return jsonify({"message": "Aucune statistique trouvée"}), 404
     return jsonify(stats), 200
@@ -295,7 +411,7 @@ def delete_donnee_route(donnee_id):
 @swag_from({
     'tags': ['v1 - Données Médicales'],
     'summary': 'Lister les capteurs associés à un patient',
-    'description': 'Retourne tous les capteurs ayant déjà envoyé des mesures pour un patient donné.',
+    'description': 'Retourne les capteurs actuellement affectés au patient (affectations actives).',
     'parameters': [
         {
             'name': 'patient_id',
@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from sqlalchemy import or_, func
 from app.models import Medecin
-from flasgger import swag_from
+from app.utils.swagger import swag_from
 from app.utils.validation import validate_fields
 from app.utils.serializers import serialize_medecin
 from flask_jwt_extended import jwt_required
@@ -13,6 +13,10 @@ from app.services.medecin_service import (
     update_medecin,
     delete_medecin
 )
+from app.utils.replicas import lecture_replica
+from app.utils.autorisation import get_identite
+from app.services.dashboard_service import tableau_de_bord, LIMITE_MAX
+from app.services.suppression_service import suppression_douce, reponse_suppression
 
 medecin_bp = Blueprint("medecin_bp", __name__, url_prefix="/v1")
 
@@ -122,6 +126,7 @@ def get_all_medecins_route():
     }
 })
 @jwt_required()
+@lecture_replica
 def search_medecins_route():
     q = request.args.get("q", "").lower().strip()
     if not q:
@@ -165,6 +170,35 @@ def get_medecin_route(id):
         return jsonify({"error": "Médecin introuvable"}), 404
     return jsonify(serialize_medecin(medecin)), 200
 
+# -------------------------------------------------------------
+# Route GET /medecins/<id>/dashboard : tableau de bord de triage
+# -------------------------------------------------------------
+@medecin_bp.route("/medecins/<int:id>/dashboard", methods=["GET"])
+@swag_from({
+    'tags': ['v1 - Médecins'],
+    'summary': 'Tableau de bord du médecin',
+    'description': 'Alertes non traitées par urgence, dernières alertes et patients triés par risque, '
+                   'avec leurs dernières constantes. Réservé au médecin lui-même.',
+    'parameters': [
+        {'name': 'id', 'in': 'path', 'type': 'integer', 'required': True, 'description': 'ID du médecin'},
+        {'name': 'limite', 'in': 'query', 'type': 'integer', 'required': False,
+         'description': f'Nombre de dernières alertes (défaut 10, max {LIMITE_MAX})'}
+    ],
+    'security': [{'BearerAuth': []}],
+    'responses': {
+        200: {'description': 'Tableau de bord'},
+        403: {'description': 'Accès refusé'}
+    }
+})
+@jwt_required()
+def dashboard_medecin_route(id):
+    identite = get_identite()
+    if identite["role"] != "medecin" or identite["id"] != id:
+        return jsonify({"error": "Accès refusé"}), 403
+
+    limite = min(max(request.args.get("limite", 10, type=int), 1), LIMITE_MAX)
+    return jsonify(tableau_de_bord(id, limite)), 200
+
 # -------------------------------------------------------------
 # Route PUT /medecins/<id> : mettre à jour un médecin
 # -------------------------------------------------------------
@@ -214,18 +248,26 @@ def update_medecin_route(id):
 @swag_from({
     'tags': ['v1 - Médecins'],
     'summary': 'Supprimer un médecin',
-    'description': 'Supprime un médecin de la base de données.',
+    'description': 'Supprime un médecin de la base de données. Un médecin ayant des alertes ou '
+                   'des analyses ne peut être qu’archivé (douce=true).',
     'parameters': [{
         'name': 'id',
         'in': 'path',
         'type': 'integer',
         'required': True,
         'description': 'ID du médecin à supprimer'
+    }, {
+        'name': 'douce',
+        'in': 'query',
+        'type': 'boolean',
+        'required': False,
+        'description': 'Archiver au lieu de supprimer (défaut : SUPPRESSION_DOUCE)'
     }],
     'security': [{'BearerAuth': []}],
     'responses': {
-        200: {'description': 'Médecin supprimé'},
-        404: {'description': 'Médecin introuvable'}
+        200: {'description': 'Médecin supprimé ou archivé'},
+        404: {'description': 'Médecin introuvable'},
+        409: {'description': 'Historique clinique : archivage seulement'}
     }
 })
 @jwt_required()
@@ -234,5 +276,9 @@ def delete_medecin_route(id):
     if not medecin:
         return jsonify({"error": "Médecin introuvable"}), 404
 
-    delete_medecin(medecin)
-    return jsonify({"message": "Médecin supprimé"}), 200
\ No newline at end of file
+    try:
+        resultat = delete_medecin(medecin, douce=suppression_douce(request.args.get("douce")))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    corps, code = reponse_suppression(resultat, "Médecin")
+    return jsonify(corps), code
\ No newline at end of file
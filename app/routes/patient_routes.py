@@ -1,11 +1,17 @@
-from app import db
 from sqlalchemy import or_, func
-from flask import Blueprint, request, jsonify
-from flasgger import swag_from
-from app.utils.validation import validate_fields
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from app.utils.swagger import swag_from
+from app.utils.validation import validate_fields, parse_periode
+from app.utils.autorisation import require_patient_access
+from app.services.export_service import (
+    FORMATS_EXPORT,
+    GENERATEURS,
+    ouvrir_export,
+    parquet_disponible
+)
 from app.utils.serializers import serialize_patient, serialize_statistique, serialize_capteur, serialize_donnee_medicale
 from flask_jwt_extended import jwt_required
-from app.models import Capteur, Patient, Proche, Alerte, DonneesMedicale, Analyseur
+from app.models import Patient, Proche, DonneesMedicale, Analyseur, ScoreRisque, UrgenceEnum
 from app.services.donnee_medical_service import get_stats_by_patient
 from app.services.patient_service import (
     create_patient,
@@ -14,6 +20,10 @@ from app.services.patient_service import (
     update_patient,
     delete_patient
 )
+from app.services.suppression_service import suppression_douce, reponse_suppression, dissocier_capteur as purger_couple
+from app.services.affectation_service import capteurs_du_patient, capteurs_disponibles, associer, dissocier
+from app.services.capteur_service import get_capteur_by_id
+from app.utils.replicas import lecture_replica
 
 patient_bp = Blueprint("patient_bp", __name__, url_prefix="/v1")
 
@@ -161,6 +171,14 @@ def get_all_patients_route():
             'type': 'string',
             'required': False,
             'description': 'Filtrer les patients par niveau d’urgence de leur dernière alerte'
+        },
+        {
+            'name': 'tri',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['risque'],
+            'required': False,
+            'description': 'risque : patients les plus à risque d’abord (score de risque matérialisé)'
         }
     ],
     'security': [{'BearerAuth': []}],
@@ -169,11 +187,13 @@ def get_all_patients_route():
     }
 })
 @jwt_required()
+@lecture_replica
 def search_patients_route():
     q = request.args.get("q", "").lower().strip()
     urgence = request.args.get("urgence", "").strip()
+    tri = request.args.get("tri", "").strip()
 
-    query = Patient.query
+    query = Patient.query.filter(Patient.date_suppression.is_(None))
 
     # Filtre par mot-clé (nom, prénom, email)
     if q:
@@ -185,21 +205,16 @@ def search_patients_route():
             )
         )
 
-    patients = query.all()
-
-    # Si un niveau d’urgence est précisé → filtrer via les alertes du patient
+    # Urgence de la dernière alerte et tri par risque : lus dans scores_risque (index)
+    if urgence or tri == "risque":
+        query = query.outerjoin(ScoreRisque, ScoreRisque.patient_id == Patient.id)
     if urgence:
-        filtered_patients = []
-        for patient in patients:
-            # récupérer la dernière alerte (par date)
-            last_alert = (
-                Alerte.query.filter_by(patient_id=patient.id)
-                .order_by(Alerte.date_heure_alerte.desc())
-                .first()
-            )
-            if last_alert and last_alert.niveau_urgence.value.lower() == urgence.lower():
-                filtered_patients.append(patient)
-        patients = filtered_patients
+        niveaux = [u for u in UrgenceEnum if u.value.lower() == urgence.lower()]
+        query = query.filter(ScoreRisque.derniere_urgence.in_(niveaux))
+    if tri == "risque":
+        query = query.order_by(ScoreRisque.score.desc().nulls_last(), Patient.id)
+
+    patients = query.all()
 
     return jsonify([serialize_patient(p) for p in patients]), 200
 
@@ -275,14 +290,24 @@ def update_patient_route(id):
 @swag_from({
     'tags': ['v1 - Patients'],
     'summary': 'Supprimer un patient',
+    'description': 'Supprime le patient, ses proches, mesures, analyses et alertes. '
+                   'Au-delà de SUPPRESSION_TAILLE_LOT mesures, le patient est archivé et ses mesures '
+                   'sont supprimées par lots en arrière-plan (flask purge-deletions).',
     'parameters': [{
         'name': 'id',
         'in': 'path',
         'type': 'integer',
         'required': True
+    }, {
+        'name': 'douce',
+        'in': 'query',
+        'type': 'boolean',
+        'required': False,
+        'description': 'Archiver au lieu de supprimer (défaut : SUPPRESSION_DOUCE)'
     }],
     'responses': {
-        200: {'description': 'Patient supprimé'},
+        200: {'description': 'Patient supprimé ou archivé'},
+        202: {'description': 'Patient archivé, suppression des mesures programmée'},
         404: {'description': 'Patient introuvable'}
     }
 })
@@ -292,8 +317,9 @@ def delete_patient_route(id):
     if not patient:
         return jsonify({"error": "Patient introuvable"}), 404
 
-    delete_patient(patient)
-    return jsonify({"message": "Patient supprimé"}), 200
+    corps, code = reponse_suppression(delete_patient(patient, douce=suppression_douce(request.args.get("douce"))),
+                                      "Patient")
+    return jsonify(corps), code
 
 # -------------------------------------------------------------
 # Route GET /patients/<id>/capteurs : capteurs d'un patient
@@ -301,8 +327,8 @@ def delete_patient_route(id):
 @patient_bp.route("/patients/<int:id>/capteurs", methods=["GET"])
 @jwt_required()
 def get_capteurs_by_patient(id):
-    capteurs = db.session.query(Capteur).join(DonneesMedicale).filter(DonneesMedicale.patient_id == id).distinct().all()
-    
+    capteurs = capteurs_du_patient(id)
+
     if not capteurs:
         return jsonify({"error": "Aucun capteur trouvé"}), 404
 
@@ -346,10 +372,7 @@ def get_capteurs_by_patient(id):
 def get_capteurs_non_associes(id):
     """Retourne la liste des capteurs non encore associés à ce patient"""
 
-    capteurs_associes = db.session.query(Capteur.id).join(DonneesMedicale).filter(DonneesMedicale.patient_id == id)
-    capteurs_non_associes = db.session.query(Capteur).filter(~Capteur.id.in_(capteurs_associes)).all()
-
-    return jsonify([serialize_capteur(c) for c in capteurs_non_associes]), 200
+    return jsonify([serialize_capteur(c) for c in capteurs_disponibles(id)]), 200
 
 # -------------------------------------------------------------
 # Route POST /patients/<id>/capteurs/<capteur_id> → associer
@@ -379,20 +402,21 @@ def get_capteurs_non_associes(id):
     'responses': {
         201: {'description': 'Capteur associé avec succès'},
         400: {'description': 'Le capteur est déjà associé à ce patient'},
-        401: {'description': 'Authentification requise'}
+        401: {'description': 'Authentification requise'},
+        404: {'description': 'Patient ou capteur introuvable'}
     }
 })
 @jwt_required()
 def associer_capteur(id, capteur_id):
     """Associe un capteur à un patient (prépare la collecte de données)"""
 
-    existe = DonneesMedicale.query.filter_by(patient_id=id, capteur_id=capteur_id).first()
-    if existe:
-        return jsonify({"message": "Ce capteur est déjà associé à ce patient"}), 400
+    if not get_patient_by_id(id) or not get_capteur_by_id(capteur_id):
+        return jsonify({"error": "Patient ou capteur introuvable"}), 404
 
-    nouvelle = DonneesMedicale(patient_id=id, capteur_id=capteur_id, valeur_mesuree=0.0)
-    db.session.add(nouvelle)
-    db.session.commit()
+    try:
+        associer(id, capteur_id)
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
 
     return jsonify({"message": "Capteur associé au patient avec succès"}), 201
 
@@ -403,7 +427,9 @@ def associer_capteur(id, capteur_id):
 @swag_from({
     'tags': ['v1 - Patients'],
     'summary': 'Dissocier un capteur d’un patient',
-    'description': 'Supprime le lien entre un patient et un capteur, effaçant les données associées si nécessaire.',
+    'description': 'Clôt l’affectation du capteur au patient ; les mesures sont conservées, sauf avec '
+                   'purger=true. Au-delà de SUPPRESSION_TAILLE_LOT mesures, elles sont alors supprimées '
+                   'par lots en arrière-plan.',
     'parameters': [
         {
             'name': 'id',
@@ -418,27 +444,35 @@ def associer_capteur(id, capteur_id):
             'type': 'integer',
             'required': True,
             'description': 'Identifiant du capteur à dissocier'
+        },
+        {
+            'name': 'purger',
+            'in': 'query',
+            'type': 'boolean',
+            'required': False,
+            'description': 'Supprimer aussi les mesures du capteur pour ce patient'
         }
     ],
     'security': [{'BearerAuth': []}],
     'responses': {
         200: {'description': 'Capteur dissocié avec succès'},
+        202: {'description': 'Capteur dissocié, suppression des mesures programmée'},
         404: {'description': 'Capteur non associé à ce patient'},
         401: {'description': 'Authentification requise'}
     }
 })
 @jwt_required()
 def dissocier_capteur(id, capteur_id):
-    """Dissocie un capteur d’un patient (supprime le lien historique)"""
+    """Dissocie un capteur d’un patient (clôt la période d’affectation)"""
 
-    donnees = DonneesMedicale.query.filter_by(patient_id=id, capteur_id=capteur_id).all()
-    if not donnees:
+    if not dissocier(id, capteur_id):
         return jsonify({"error": "Ce capteur n’est pas associé à ce patient"}), 404
+    if request.args.get("purger", "").lower() not in ("1", "true", "oui", "yes"):
+        return jsonify({"message": "Capteur dissocié avec succès"}), 200
 
-    for d in donnees:
-        db.session.delete(d)
-    db.session.commit()
-
+    resultat = purger_couple(id, capteur_id)
+    if resultat["mode"] == "differee":
+        return jsonify({"message": "Capteur dissocié, suppression des mesures programmée", **resultat}), 202
     return jsonify({"message": "Capteur dissocié avec succès"}), 200
 
 # -------------------------------------------------------------
@@ -455,9 +489,66 @@ def dissocier_capteur(id, capteur_id):
     }
 })
 @jwt_required()
+@lecture_replica
 def get_mesures_patient(id):
     mesures = DonneesMedicale.query.filter_by(patient_id=id)\
         .order_by(DonneesMedicale.date_heure_mesure.desc())\
         .limit(20).all()
 
     return jsonify([serialize_donnee_medicale(m) for m in mesures]), 200
+
+
+# -------------------------------------------------------------
+# Route GET /patients/<id>/export : historique complet en flux
+# -------------------------------------------------------------
+@patient_bp.route("/patients/<int:id>/export", methods=["GET"])
+@jwt_required()
+@require_patient_access(parametre="id")
+@swag_from({
+    'tags': ['v1 - Patients'],
+    'summary': 'Exporter l’historique d’un patient',
+    'description': 'Envoie les mesures du patient en flux (mémoire constante côté serveur), '
+                   'avec analyses et alertes en colonnes jointes optionnelles. '
+                   'Compressé (brotli ou gzip) selon Accept-Encoding, hors Parquet.',
+    'produces': ['application/x-ndjson', 'text/csv', 'application/vnd.apache.parquet'],
+    'parameters': [
+        {'name': 'id', 'in': 'path', 'type': 'integer', 'required': True},
+        {'name': 'format', 'in': 'query', 'type': 'string',
+         'enum': ['ndjson', 'csv', 'parquet'], 'default': 'ndjson'},
+        {'name': 'from', 'in': 'query', 'type': 'string', 'required': False,
+         'description': 'Début de période inclus (ISO 8601)'},
+        {'name': 'to', 'in': 'query', 'type': 'string', 'required': False,
+         'description': 'Fin de période exclue (ISO 8601)'},
+        {'name': 'analyses', 'in': 'query', 'type': 'boolean', 'default': False},
+        {'name': 'alertes', 'in': 'query', 'type': 'boolean', 'default': False}
+    ],
+    'responses': {
+        200: {'description': 'Export en cours de transfert'},
+        400: {'description': 'Format ou période invalide'},
+        403: {'description': 'Accès non autorisé'},
+        501: {'description': 'Format Parquet indisponible (pyarrow non installé)'}
+    }
+})
+def export_patient_route(id):
+    format_export = request.args.get("format", "ndjson").lower()
+    if format_export not in FORMATS_EXPORT:
+        return jsonify({"error": f"Format inconnu : {format_export}"}), 400
+    if format_export == "parquet" and not parquet_disponible():
+        return jsonify({"error": "Format Parquet indisponible sur ce serveur"}), 501
+    try:
+        periode = parse_periode(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    resultat = ouvrir_export(
+        id,
+        analyses=request.args.get("analyses", "").lower() in ("1", "true"),
+        alertes=request.args.get("alertes", "").lower() in ("1", "true"),
+        **periode
+    )
+    morceaux = GENERATEURS[format_export](resultat)
+
+    type_mime, extension = FORMATS_EXPORT[format_export]
+    entetes = {"Content-Disposition": f"attachment; filename=patient_{id}.{extension}"}
+
+    return Response(stream_with_context(morceaux), content_type=type_mime, headers=entetes)
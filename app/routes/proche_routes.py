@@ -1,6 +1,6 @@
 from app.extension import db
 from flask import Blueprint, request, jsonify
-from flasgger import swag_from
+from app.utils.swagger import swag_from
 from sqlalchemy import or_, func
 from app.models import Proche
 from app.utils.validation import validate_fields
@@ -13,6 +13,7 @@ from app.services.proche_service import (
     update_proche,
     delete_proche
 )
+from app.utils.replicas import lecture_replica
 
 proche_bp = Blueprint("proche_bp", __name__, url_prefix="/v1")
 
@@ -128,6 +129,7 @@ def get_all_proches_route():
     }
 })
 @jwt_required()
+@lecture_replica
 def search_proches_route():
     q = request.args.get("q", "").lower().strip()
     if not q:
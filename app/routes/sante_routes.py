@@ -0,0 +1,45 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from app.utils.swagger import swag_from
+from app.utils.autorisation import get_identite
+from app.extension import db
+from app.utils.pool_bd import etat_pool
+
+sante_bp = Blueprint("sante_bp", __name__, url_prefix="/v1/sante")
+
+# -------------------------------------------------------------
+# GET /sante/pool : métriques de saturation du pool de connexions
+# -------------------------------------------------------------
+@sante_bp.route("/pool", methods=["GET"])
+@swag_from({
+    'tags': ['v1 - Santé'],
+    'summary': 'État du pool de connexions',
+    'description': 'Occupation du pool SQLAlchemy de ce worker et compteurs cumulés '
+                   '(emprunts, pic, connexions invalidées, attentes dépassées). Réservé aux médecins.',
+    'security': [{'BearerAuth': []}],
+    'responses': {
+        200: {
+            'description': 'Métriques du pool',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'pool': {'type': 'string', 'example': 'QueuePool'},
+                    'taille': {'type': 'integer'},
+                    'empruntees': {'type': 'integer'},
+                    'debordement': {'type': 'integer'},
+                    'saturation': {'type': 'number', 'example': 0.25},
+                    'pic_en_cours': {'type': 'integer'},
+                    'invalidations': {'type': 'integer'},
+                    'delais_depasses': {'type': 'integer'}
+                }
+            }
+        },
+        401: {'description': 'Token manquant ou invalide'},
+        403: {'description': 'Réservé aux médecins'}
+    }
+})
+@jwt_required()
+def etat_pool_route():
+    if get_identite()["role"] != "medecin":
+        return jsonify({"error": "Accès refusé"}), 403
+    return jsonify(etat_pool(db.engine)), 200
@@ -0,0 +1,106 @@
+# -------------------------------------------------------------
+# app/services/affectation_service.py
+# -------------------------------------------------------------
+# Affectations des capteurs aux patients (table patient_capteur) :
+# - une affectation active par couple (date_fin vide), garantie par
+#   l'index unique partiel uq_patient_capteur_active
+# - les listes de capteurs d'un patient sont des lectures indexées de
+#   cette table, en O(affectations) et non en O(mesures)
+# - une mesure d'un couple encore inconnu ouvre une affectation
+#   (ouvrir_affectations, appelée par mettre_a_jour_etats)
+# -------------------------------------------------------------
+
+from datetime import datetime
+
+from sqlalchemy import select, update, exists
+
+from app.extension import db
+from app.models import Capteur, PatientCapteur
+from app.services.appareil_service import invalider_capteur
+
+affectations = PatientCapteur.__table__
+
+
+def _active(patient_id, capteur_id):
+    return (affectations.c.patient_id == patient_id, affectations.c.capteur_id == capteur_id,
+            affectations.c.date_fin.is_(None))
+
+
+# -------------------------------------------------------------
+# Fonction capteurs_du_patient : capteurs affectés (actifs) à un patient
+# -------------------------------------------------------------
+def capteurs_du_patient(patient_id):
+    return (
+        Capteur.query
+        .join(PatientCapteur, PatientCapteur.capteur_id == Capteur.id)
+        .filter(PatientCapteur.patient_id == patient_id, PatientCapteur.date_fin.is_(None),
+                Capteur.date_suppression.is_(None))
+        .order_by(Capteur.id)
+        .all()
+    )
+
+
+# -------------------------------------------------------------
+# Fonction capteurs_disponibles : capteurs non affectés à ce patient
+# -------------------------------------------------------------
+def capteurs_disponibles(patient_id):
+    return (
+        Capteur.query
+        .filter(Capteur.date_suppression.is_(None),
+                ~exists().where(*_active(patient_id, Capteur.id)))
+        .order_by(Capteur.id)
+        .all()
+    )
+
+
+# -------------------------------------------------------------
+# Fonction est_affecte : affectation active du couple
+# -------------------------------------------------------------
+def est_affecte(patient_id, capteur_id):
+    return db.session.scalar(select(exists().where(*_active(patient_id, capteur_id))))
+
+
+# -------------------------------------------------------------
+# Fonction associer : ouvre une affectation
+# -------------------------------------------------------------
+# - ValueError si le capteur est déjà affecté à ce patient
+def associer(patient_id, capteur_id, maintenant=None):
+    if est_affecte(patient_id, capteur_id):
+        raise ValueError("Ce capteur est déjà associé à ce patient")
+    affectation = PatientCapteur(patient_id=patient_id, capteur_id=capteur_id,
+                                 date_debut=maintenant or datetime.utcnow())
+    db.session.add(affectation)
+    db.session.commit()
+    invalider_capteur(capteur_id)
+    return affectation
+
+
+# -------------------------------------------------------------
+# Fonction dissocier : clôt l'affectation active
+# -------------------------------------------------------------
+# - Retourne False si le couple n'était pas affecté ; les mesures restent
+def dissocier(patient_id, capteur_id, maintenant=None):
+    resultat = db.session.execute(
+        update(affectations).where(*_active(patient_id, capteur_id))
+        .values(date_fin=maintenant or datetime.utcnow())
+    )
+    db.session.commit()
+    invalider_capteur(capteur_id)
+    return resultat.rowcount > 0
+
+
+# -------------------------------------------------------------
+# Fonction ouvrir_affectations : couples vus pour la première fois
+# -------------------------------------------------------------
+# - {(patient_id, capteur_id): date de la première mesure} ; un couple
+#   déjà affecté est ignoré (index unique partiel, ON CONFLICT DO NOTHING)
+def ouvrir_affectations(connexion, couples):
+    if not couples:
+        return
+    from app.services.ingestion_service import _insert_sans_conflit  # import circulaire
+    connexion.execute(_insert_sans_conflit(connexion, affectations), [
+        {"patient_id": p, "capteur_id": c, "date_debut": debut}
+        for (p, c), debut in sorted(couples.items())
+    ])
+    for _, capteur_id in couples:
+        invalider_capteur(capteur_id)
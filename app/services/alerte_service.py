@@ -1,5 +1,12 @@
 from app import db
 from app.models.alerte import Alerte
+from app.services.dashboard_service import invalider_tableau_de_bord
+from app.services.notification_service import mettre_en_file
+from app.services.risque_service import mettre_a_jour_scores, alerte_evenement
+from app.utils.replicas import lecture_replica
+from app.utils.serialiseurs_lignes import PLAN_ALERTE
+from sqlalchemy import select, update
+from datetime import datetime
 
 # -------------------------------------------------------------
 # Fonction create_alerte : crée une nouvelle alerte
@@ -14,41 +21,109 @@ def create_alerte(data):
         etat_traitement=data.get("etat_traitement", False)
     )
     db.session.add(alerte)
+    db.session.flush()  # Génère alerte.id
+    mettre_en_file(db.session.connection(), [alerte.id])
+    mettre_a_jour_scores(db.session.connection(), [alerte_evenement(alerte, 0 if alerte.etat_traitement else 1)])
     db.session.commit()
     return alerte
 
 # -------------------------------------------------------------
 # Fonction get_alertes_by_patient : alertes d’un patient
 # -------------------------------------------------------------
+@lecture_replica
 def get_alertes_by_patient(patient_id):
     return Alerte.query.filter_by(patient_id=patient_id).all()
 
 # -------------------------------------------------------------
 # Fonction get_alertes_by_medecin : alertes d’un médecin
 # -------------------------------------------------------------
+@lecture_replica
 def get_alertes_by_medecin(medecin_id):
     return Alerte.query.filter_by(medecin_id=medecin_id).all()
 
 # -------------------------------------------------------------
 # Fonction update_alerte_etat : marquer une alerte comme traitée
 # -------------------------------------------------------------
-def update_alerte_etat(alerte, etat):
+def update_alerte_etat(alerte, etat, par=None):
+    if bool(alerte.etat_traitement) != bool(etat):
+        # Traitée : son poids quitte le score du patient ; rouverte : il y revient
+        mettre_a_jour_scores(db.session.connection(), [alerte_evenement(alerte, -1 if etat else 1)])
+        alerte.date_acquittement = datetime.utcnow() if etat else None
+        alerte.acquittee_par = par if etat else None
     alerte.etat_traitement = etat
     db.session.commit()
+    invalider_tableau_de_bord(alerte.medecin_id)
     return alerte
 
+# -------------------------------------------------------------
+# Fonction changer_etat_alertes : acquittement en masse
+# -------------------------------------------------------------
+# - Un seul UPDATE ... RETURNING : alertes désignées par ids et/ou par
+#   filtre (patient_id, type_alerte, niveau_urgence, avant = date
+#   d'alerte strictement antérieure), restreintes à celles du médecin
+#   medecin_id et qui changent réellement d'état
+# - Scores de risque et tableaux de bord mis à jour d'après les lignes
+#   retournées, dans la même transaction
+# - Retourne les ids modifiés
+def changer_etat_alertes(etat, medecin_id, ids=None, patient_id=None, type_alerte=None,
+                         niveau_urgence=None, avant=None, maintenant=None):
+    maintenant = maintenant or datetime.utcnow()
+    # NULL vaut non traitée : acquitter la couvre (IS NOT true), la
+    # rouvrir ne la touche pas (son poids compte déjà dans le score)
+    traitee = Alerte.etat_traitement.is_(True)
+    conditions = [Alerte.medecin_id == medecin_id, Alerte.etat_traitement.is_not(True) if etat else traitee]
+    if ids is not None:
+        conditions.append(Alerte.id.in_(ids))
+    if patient_id is not None:
+        conditions.append(Alerte.patient_id == patient_id)
+    if type_alerte is not None:
+        conditions.append(Alerte.type_alerte == type_alerte)
+    if niveau_urgence is not None:
+        conditions.append(Alerte.niveau_urgence == niveau_urgence)
+    if avant is not None:
+        conditions.append(Alerte.date_heure_alerte < avant)
+
+    modifiees = db.session.execute(
+        update(Alerte).where(*conditions)
+        .values(etat_traitement=etat,
+                date_acquittement=maintenant if etat else None,
+                acquittee_par=medecin_id if etat else None)
+        .returning(Alerte.id, Alerte.patient_id, Alerte.medecin_id, Alerte.niveau_urgence,
+                   Alerte.date_heure_alerte)
+        .execution_options(synchronize_session=False)
+    ).all()
+    mettre_a_jour_scores(db.session.connection(), [
+        {**ligne._mapping, "signe": -1 if etat else 1} for ligne in modifiees
+    ], maintenant=maintenant)
+    db.session.commit()
+    invalider_tableau_de_bord(medecin_id)
+    return [ligne.id for ligne in modifiees]
+
 # -------------------------------------------------------------
 # Fonction delete_alerte : supprimer une alerte
 # -------------------------------------------------------------
 def delete_alerte(alerte):
+    evenement = alerte_evenement(alerte, 0 if alerte.etat_traitement else -1, supprimee=True)
     db.session.delete(alerte)
+    db.session.flush()
+    mettre_a_jour_scores(db.session.connection(), [evenement])
     db.session.commit()
 
 # -------------------------------------------------------------
 # Fonction get_all_alertes : lister toutes les alertes
 # -------------------------------------------------------------
+@lecture_replica
 def get_all_alertes():
-    return Alerte.query.all()
+    return Alerte.query.order_by(Alerte.id).all()
+
+# -------------------------------------------------------------
+# Fonction lister_alertes_serialisees : voie rapide de GET /alertes
+# -------------------------------------------------------------
+# - Même résultat que get_all_alertes + serialize_alerte, sans objets ORM
+@lecture_replica
+def lister_alertes_serialisees():
+    requete = select(*PLAN_ALERTE.colonnes).order_by(Alerte.id)
+    return PLAN_ALERTE.serialiser(db.session.execute(requete))
 
 # -------------------------------------------------------------
 # Fonction get_alerte_by_id : récupérer une alerte par ID
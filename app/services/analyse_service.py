@@ -1,47 +1,75 @@
 from app import db
 from app.models import Analyseur, Alerte, enums
 from app.utils.seuils import SEUILS_CAPTEURS
+from app.services.notification_service import mettre_en_file
+from app.services.risque_service import mettre_a_jour_scores, alerte_evenement
+from app.services.reference_service import type_capteur as type_du_capteur
+from app.utils.replicas import lecture_replica
+from app.utils.serialiseurs_lignes import PLAN_ANALYSE, PatientAnalyse, MedecinAnalyse, \
+    MesureAnalyse, CapteurAnalyse
+from sqlalchemy import select
 
 
-def create_analyse(patient, medecin, donnee):
+def evaluer_valeur(type_capteur, valeur):
     """
-    Analyse automatique d'une donnée médicale déjà instanciée
+    Compare une valeur aux seuils de son capteur.
+    Retourne (resultat, seuil, anomalie) ; seuil vaut None si non défini.
     """
+    seuil = SEUILS_CAPTEURS.get(type_capteur)
 
-    capteur = donnee.capteur
-    valeur = donnee.valeur_mesuree
-    type_capteur = capteur.type
+    if not seuil:
+        return "Analyse non effectuée : seuil non défini pour ce capteur", None, False
 
-    seuil = SEUILS_CAPTEURS.get(type_capteur)
+    if valeur < seuil["min"] or valeur > seuil["max"]:
+        resultat = (
+            f"Anomalie détectée : valeur {valeur} "
+            f"hors seuil [{seuil['min']} - {seuil['max']}]"
+        )
+        return resultat, seuil, True
 
-    # Valeur par défaut
-    resultat = "Analyse non effectuée : seuil non défini pour ce capteur"
-
-    if seuil:
-        if valeur < seuil["min"] or valeur > seuil["max"]:
-            resultat = (
-                f"Anomalie détectée : valeur {valeur} "
-                f"hors seuil [{seuil['min']} - {seuil['max']}]"
-            )
-
-            # Création d’alerte
-            alerte = Alerte(
-                patient_id=patient.id,
-                medecin_id=medecin.id,
-                niveau_urgence=seuil["niveau_urgence"],
-                type_alerte=seuil["type_alerte"],
-                description=resultat,
-                etat_traitement=False
-            )
-            db.session.add(alerte)
-
-        else:
-            resultat = "Résultat normal : valeur dans les seuils"
+    return "Résultat normal : valeur dans les seuils", seuil, False
+
+
+def create_analyse(patient_id, medecin_id, donnee, type_capteur=None):
+    """
+    Analyse automatique d'une donnée médicale déjà instanciée
+    (l'état du couple patient/capteur doit déjà inclure la mesure).
+    Sans type_capteur, le type est lu dans la référence des capteurs en cache.
+    """
+
+    valeur = donnee.valeur_mesuree
+    type_capteur = type_capteur or type_du_capteur(donnee.capteur_id)
+
+    resultat, seuil, anomalie = evaluer_valeur(type_capteur, valeur)
+
+    if anomalie:
+        # Création d’alerte
+        alerte = Alerte(
+            patient_id=patient_id,
+            medecin_id=medecin_id,
+            donnee_medicale_id=donnee.id,
+            niveau_urgence=seuil["niveau_urgence"],
+            type_alerte=seuil["type_alerte"],
+            description=resultat,
+            etat_traitement=False
+        )
+        db.session.add(alerte)
+        db.session.flush()  # Génère alerte.id
+        # Notification envoyée par notify-worker, validée avec l'alerte
+        mettre_en_file(db.session.connection(), [alerte.id])
+
+    # Score de risque du patient : nouvelle alerte et écarts des dernières mesures
+    mettre_a_jour_scores(
+        db.session.connection(),
+        alertes=[alerte_evenement(alerte, 1)] if anomalie else (),
+        mesures={patient_id: medecin_id},
+    )
 
     analyse = Analyseur(
-        patient_id=patient.id,
-        medecin_id=medecin.id,
+        patient_id=patient_id,
+        medecin_id=medecin_id,
         donnee_medicale_id=donnee.id,
+        date_heure_mesure=donnee.date_heure_mesure,
         resultat=resultat
     )
 
@@ -49,11 +77,28 @@ def create_analyse(patient, medecin, donnee):
 
     return analyse
 
+@lecture_replica
 def get_all_analyses():
     """Récupère toutes les analyses."""
-    return Analyseur.query.order_by(Analyseur.date_analyse.desc()).all()
+    return Analyseur.query.order_by(Analyseur.date_analyse.desc(), Analyseur.id.desc()).all()
+
+
+@lecture_replica
+def lister_analyses_serialisees():
+    """Même résultat que get_all_analyses + serialize_analyse, sans objets ORM."""
+    requete = (
+        select(*PLAN_ANALYSE.colonnes)
+        .select_from(Analyseur)
+        .outerjoin(PatientAnalyse, PatientAnalyse.id == Analyseur.patient_id)
+        .outerjoin(MedecinAnalyse, MedecinAnalyse.id == Analyseur.medecin_id)
+        .outerjoin(MesureAnalyse, MesureAnalyse.id == Analyseur.donnee_medicale_id)
+        .outerjoin(CapteurAnalyse, CapteurAnalyse.id == MesureAnalyse.capteur_id)
+        .order_by(Analyseur.date_analyse.desc(), Analyseur.id.desc())
+    )
+    return PLAN_ANALYSE.serialiser(db.session.execute(requete))
 
 
+@lecture_replica
 def get_analyses_by_medecin(medecin_id):
     """Récupère toutes les analyses effectuées par un médecin."""
     return (
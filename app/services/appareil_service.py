@@ -0,0 +1,304 @@
+# -------------------------------------------------------------
+# app/services/appareil_service.py
+# -------------------------------------------------------------
+# Registre des appareils et des passerelles d'ingestion :
+# - un appareil s'authentifie par sa clé d'API, en-tête
+#   X-Cle-Appareil: <appareil_id>.<secret> ; seule l'empreinte SHA-256
+#   du secret est stockée
+# - une passerelle signe chaque lot : X-Passerelle: <id>,
+#   X-Horodatage: <secondes Unix>, X-Signature: HMAC-SHA256 hex de
+#   "<horodatage>." + corps brut, avec son secret partagé ; un corps lu
+#   en flux est mis en tampon et vérifié avant traitement (CorpsSigne)
+# - le registre résout capteur, type, patient (affectation active du
+#   capteur) et médecin référent : une lecture ne porte que
+#   appareil_id et ses valeurs
+# - vérifications et résolutions servies par des caches mémoire
+#   (APPAREILS_CACHE_TTL_S) : aucune lecture en base par requête une fois
+#   le cache chaud. Les modifications faites par ce processus les
+#   invalident ; celles des autres processus sont vues après le TTL.
+# -------------------------------------------------------------
+
+import hashlib
+import hmac
+import secrets
+import tempfile
+import time
+
+from flask import current_app
+from sqlalchemy import select, update
+
+from app.extension import db
+from app.models import Personne, Capteur, PatientCapteur, Passerelle, Appareil
+from app.utils.cache import CacheTTL, ABSENT
+
+appareils, passerelles = Appareil.__table__, Passerelle.__table__
+personne, capteur, affectations = Personne.__table__, Capteur.__table__, PatientCapteur.__table__
+
+# appareil_id → (cle_hash, capteur_id, medecin_id, passerelle_id) ; None si inconnu ou révoqué
+cache_appareils = CacheTTL(taille_max=100_000)
+# capteur_id → (type, patient_id) ; None si le capteur est archivé
+cache_capteurs = CacheTTL(taille_max=100_000)
+# passerelle_id → secret ; None si inconnue ou révoquée
+cache_passerelles = CacheTTL(taille_max=10_000)
+
+TAMPON_MEMOIRE_MAX = 1 << 20   # lot signé lu en flux : au-delà, tampon sur disque
+
+
+def _ttl():
+    return current_app.config.get("APPAREILS_CACHE_TTL_S", 0)
+
+
+def _empreinte(secret):
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+# -------------------------------------------------------------
+# Fonction enregistrer_passerelle : retourne (passerelle, secret)
+# -------------------------------------------------------------
+# - Le secret n'est communiqué qu'ici : à configurer sur la passerelle
+def enregistrer_passerelle(nom):
+    secret = secrets.token_hex(32)
+    passerelle = Passerelle(nom=nom, secret=secret)
+    db.session.add(passerelle)
+    db.session.commit()
+    cache_passerelles.invalider(passerelle.id)
+    return passerelle, secret
+
+
+# -------------------------------------------------------------
+# Fonction enregistrer_appareil : retourne (appareil, clé d'API)
+# -------------------------------------------------------------
+# - ValueError si le capteur est inconnu ou déjà équipé d'un appareil
+# - La clé n'est communiquée qu'ici ; seule son empreinte est stockée
+def enregistrer_appareil(capteur_id, medecin_id=None, passerelle_id=None):
+    if db.session.get(Capteur, capteur_id) is None:
+        raise ValueError("Capteur introuvable")
+    if db.session.scalar(select(appareils.c.id).where(appareils.c.capteur_id == capteur_id)):
+        raise ValueError("Ce capteur a déjà un appareil")
+    secret = secrets.token_urlsafe(32)
+    appareil = Appareil(capteur_id=capteur_id, medecin_id=medecin_id, passerelle_id=passerelle_id,
+                        cle_hash=_empreinte(secret))
+    db.session.add(appareil)
+    db.session.commit()
+    cache_appareils.invalider(appareil.id)
+    return appareil, f"{appareil.id}.{secret}"
+
+
+# -------------------------------------------------------------
+# Fonctions revoquer_appareil / revoquer_passerelle
+# -------------------------------------------------------------
+# - Retournent False si l'identifiant est inconnu
+def revoquer_appareil(appareil_id):
+    resultat = db.session.execute(update(appareils).where(appareils.c.id == appareil_id).values(actif=False))
+    db.session.commit()
+    cache_appareils.invalider(appareil_id)
+    return resultat.rowcount > 0
+
+
+def revoquer_passerelle(passerelle_id):
+    resultat = db.session.execute(
+        update(passerelles).where(passerelles.c.id == passerelle_id).values(actif=False))
+    db.session.commit()
+    cache_passerelles.invalider(passerelle_id)
+    return resultat.rowcount > 0
+
+
+# -------------------------------------------------------------
+# Invalidation des résolutions
+# -------------------------------------------------------------
+# - invalider_capteur : affectation ouverte ou close, type modifié
+# - vider_caches : suppressions et archivages (patients, médecins,
+#   capteurs), rares, qui peuvent toucher de nombreux appareils
+def invalider_capteur(capteur_id):
+    cache_capteurs.invalider(capteur_id)
+
+
+def vider_caches():
+    cache_appareils.vider()
+    cache_capteurs.vider()
+
+
+def _appareil(appareil_id):
+    entree = cache_appareils.get(appareil_id)
+    if entree is not ABSENT:
+        return entree
+    ligne = db.session.execute(
+        select(appareils.c.cle_hash, appareils.c.capteur_id, personne.c.id, appareils.c.passerelle_id)
+        .outerjoin(personne, (personne.c.id == appareils.c.medecin_id) & personne.c.date_suppression.is_(None))
+        .where(appareils.c.id == appareil_id, appareils.c.actif.is_(True))
+    ).first()
+    entree = tuple(ligne) if ligne else None
+    cache_appareils.set(appareil_id, entree, _ttl())
+    return entree
+
+
+def _capteur(capteur_id):
+    entree = cache_capteurs.get(capteur_id)
+    if entree is not ABSENT:
+        return entree
+    type_capteur = db.session.scalar(
+        select(capteur.c.type).where(capteur.c.id == capteur_id, capteur.c.date_suppression.is_(None)))
+    entree = None
+    if type_capteur is not None:
+        # Affectation active la plus récente, patient non archivé
+        patient_id = db.session.scalar(
+            select(affectations.c.patient_id)
+            .join(personne, personne.c.id == affectations.c.patient_id)
+            .where(affectations.c.capteur_id == capteur_id, affectations.c.date_fin.is_(None),
+                   personne.c.date_suppression.is_(None))
+            .order_by(affectations.c.date_debut.desc())
+            .limit(1)
+        )
+        entree = (type_capteur, patient_id)
+    cache_capteurs.set(capteur_id, entree, _ttl())
+    return entree
+
+
+# -------------------------------------------------------------
+# Fonction resoudre_appareil : identité d'ingestion d'un appareil
+# -------------------------------------------------------------
+# - {appareil_id, capteur_id, type, patient_id, medecin_id, passerelle_id}
+# - None si l'appareil est inconnu, révoqué ou son capteur archivé ;
+#   patient_id / medecin_id valent None sans affectation active ou
+#   sans médecin référent (lectures refusées par create_donnee_medicale)
+def resoudre_appareil(appareil_id):
+    entree = _appareil(appareil_id)
+    if entree is None:
+        return None
+    _, capteur_id, medecin_id, passerelle_id = entree
+    infos = _capteur(capteur_id)
+    if infos is None:
+        return None
+    return {"appareil_id": appareil_id, "capteur_id": capteur_id, "type": infos[0], "patient_id": infos[1],
+            "medecin_id": medecin_id, "passerelle_id": passerelle_id}
+
+
+# -------------------------------------------------------------
+# Fonction verifier_cle_appareil : en-tête X-Cle-Appareil
+# -------------------------------------------------------------
+# - Retourne l'identité résolue (voir resoudre_appareil) ou None
+def verifier_cle_appareil(entete):
+    appareil_id, _, secret = (entete or "").partition(".")
+    if not appareil_id.isdigit() or not secret:
+        return None
+    entree = _appareil(int(appareil_id))
+    if entree is None or not hmac.compare_digest(entree[0], _empreinte(secret)):
+        return None
+    return resoudre_appareil(int(appareil_id))
+
+
+# -------------------------------------------------------------
+# Fonction preparer_signature : lot signé, avant lecture du corps
+# -------------------------------------------------------------
+# - Retourne (passerelle_id, HMAC initialisé avec "<horodatage>.") ou
+#   None : passerelle inconnue ou révoquée, horodatage invalide
+# - Horodatage à plus de PASSERELLES_DERIVE_MAX_S de l'horloge du
+#   serveur : refusé (un lot rejoué plus tôt reste dédoublonné par
+#   sequence_appareil / id_lecture)
+def preparer_signature(passerelle_id, horodatage, maintenant=None):
+    if not (passerelle_id or "").isdigit() or not (horodatage or "").isdigit():
+        return None
+    derive = current_app.config.get("PASSERELLES_DERIVE_MAX_S", 300)
+    if abs((maintenant or time.time()) - int(horodatage)) > derive:
+        return None
+
+    passerelle_id = int(passerelle_id)
+    secret = cache_passerelles.get(passerelle_id)
+    if secret is ABSENT:
+        secret = db.session.scalar(select(passerelles.c.secret).where(
+            passerelles.c.id == passerelle_id, passerelles.c.actif.is_(True)))
+        cache_passerelles.set(passerelle_id, secret, _ttl())
+    if secret is None:
+        return None
+    return passerelle_id, hmac.new(secret.encode(), horodatage.encode() + b".", hashlib.sha256)
+
+
+def signature_conforme(mac, signature):
+    return bool(signature) and hmac.compare_digest(mac.hexdigest().encode(), signature.lower().encode())
+
+
+# -------------------------------------------------------------
+# Fonction verifier_signature : lot signé par une passerelle
+# -------------------------------------------------------------
+# - Retourne l'identifiant de la passerelle ou None
+def verifier_signature(passerelle_id, horodatage, signature, corps, maintenant=None):
+    preparee = preparer_signature(passerelle_id, horodatage, maintenant)
+    if preparee is None:
+        return None
+    passerelle_id, mac = preparee
+    mac.update(corps)
+    return passerelle_id if signature_conforme(mac, signature) else None
+
+
+# -------------------------------------------------------------
+# Classe CorpsSigne : lot signé lu en flux
+# -------------------------------------------------------------
+# - Le corps est copié dans un tampon (en mémoire jusqu'à
+#   TAMPON_MEMOIRE_MAX octets, puis sur disque) pendant le calcul du
+#   HMAC ; il n'est relu qu'une fois la signature vérifiée : aucune
+#   lecture d'un lot falsifié n'est traitée
+class CorpsSigne:
+    def __init__(self, mac, signature):
+        self.mac, self.signature = mac, signature
+        self.tampon = tempfile.SpooledTemporaryFile(max_size=TAMPON_MEMOIRE_MAX)
+
+    def ajouter(self, morceau):
+        self.mac.update(morceau)
+        self.tampon.write(morceau)
+
+    def verifier(self):
+        """Tampon relu depuis le début, ou None si la signature n'est pas conforme."""
+        if not signature_conforme(self.mac, self.signature):
+            self.tampon.close()
+            return None
+        self.tampon.seek(0)
+        return self.tampon
+
+    def lire(self, flux, taille=65536):
+        for morceau in iter(lambda: flux.read(taille), b""):
+            self.ajouter(morceau)
+        return self.verifier()
+
+
+# -------------------------------------------------------------
+# Fonction appareil_de_lecture : identité d'appareil d'une lecture
+# -------------------------------------------------------------
+# - source : {"appareil": identité} (clé d'appareil), {"passerelle_id":
+#   id} (lot signé) ou {} (JWT de médecin)
+# - Appareil authentifié : lui-même (appareil_id facultatif, sinon identique)
+# - Passerelle : appareil_id de la lecture, rattaché à cette passerelle
+# - Médecin : None (patient, capteur et médecin lus dans le corps)
+# - PermissionError sinon
+def appareil_de_lecture(lecture, source):
+    if "appareil" in source:
+        appareil = source["appareil"]
+        if lecture.get("appareil_id", appareil["appareil_id"]) != appareil["appareil_id"]:
+            raise PermissionError("Lecture d'un autre appareil")
+        return appareil
+    if "passerelle_id" in source:
+        appareil_id = lecture.get("appareil_id")
+        appareil = resoudre_appareil(appareil_id) if type(appareil_id) is int else None
+        if appareil is None or appareil["passerelle_id"] != source["passerelle_id"]:
+            raise PermissionError("Appareil inconnu ou non rattaché à cette passerelle")
+        return appareil
+    return None
+
+
+# -------------------------------------------------------------
+# Fonction completer_lecture : lecture brute d'une source authentifiée
+# -------------------------------------------------------------
+# - Appareil / passerelle : patient_id, capteur_id et medecin_id
+#   remplacés par ceux du registre, ceux du corps sont ignorés
+# - Médecin (source {}) : lecture inchangée
+# - PermissionError (voir appareil_de_lecture), ValueError sans
+#   affectation active ou sans médecin référent
+def completer_lecture(donnees, source):
+    if not source or not isinstance(donnees, dict):
+        return donnees
+    appareil = appareil_de_lecture(donnees, source)
+    if appareil["patient_id"] is None:
+        raise ValueError("Capteur de l'appareil affecté à aucun patient")
+    if appareil["medecin_id"] is None:
+        raise ValueError("Appareil sans médecin référent")
+    return {**donnees, "patient_id": appareil["patient_id"], "capteur_id": appareil["capteur_id"],
+            "medecin_id": appareil["medecin_id"]}
@@ -0,0 +1,298 @@
+# -------------------------------------------------------------
+# app/services/archive_service.py
+# -------------------------------------------------------------
+# Archive froide des mesures (format : app/utils/archive_colonnes.py) :
+# - un fichier par patient et par capteur :
+#   <ARCHIVE_COLONNES_DIR>/p<patient_id>/c<capteur_id>.s3dc
+# - manifeste.json mémorise l'horizon (mesures antérieures archivées)
+#   et le plus grand id archivé
+# - côté lecture, une mesure est « chaude » (lue dans PostgreSQL) si
+#   date_heure_mesure >= horizon ou id > id_max : une mesure arrivée
+#   en retard après la construction reste visible jusqu'à la suivante
+# - `flask archive build --jusqu-a <date>` archive les mesures de
+#   [horizon précédent, jusqu_a[ et les retardataires
+# Les lignes archivées restent en base jusqu'à la rétention des
+# partitions (flask partitions maintain) : elles sont simplement
+# ignorées par les lectures. Sans ARCHIVE_COLONNES_DIR, rien ne change.
+# - suppressions : une mesure archivée supprimée de la base est inscrite
+#   dans p<patient_id>/c<capteur_id>.supprimees (un id par ligne),
+#   écartée par les lectures (oublier_mesures) ; un patient, un capteur
+#   ou une dissociation purgés perdent leurs fichiers (oublier_archives)
+# -------------------------------------------------------------
+
+import heapq
+import json
+import os
+import shutil
+from collections import defaultdict
+from contextlib import ExitStack
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import select, or_
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.extension import db
+from app.models import DonneesMedicale, Capteur
+from app.utils.archive_colonnes import ajouter_lignes, LecteurArchive, TAILLE_BLOC
+
+MANIFESTE = "manifeste.json"
+EXTENSION = ".s3dc"
+SUPPRIMEES = ".supprimees"
+TAILLE_LOT_ARCHIVE = 5000
+LIGNES_PAR_AJOUT = TAILLE_BLOC * 16   # mémoire bornée pendant la construction
+
+_manifestes = {}   # chemin → (mtime, manifeste)
+
+
+def dossier_archive():
+    return current_app.config.get("ARCHIVE_COLONNES_DIR") or None
+
+
+def chemin_archive(dossier, patient_id, capteur_id):
+    return os.path.join(dossier, f"p{patient_id}", f"c{capteur_id}{EXTENSION}")
+
+
+def _chemin_supprimees(chemin):
+    return chemin[:-len(EXTENSION)] + SUPPRIMEES
+
+
+# -------------------------------------------------------------
+# Fonction lire_manifeste : {horizon, id_max} ou None
+# -------------------------------------------------------------
+# - Relu seulement si le fichier a changé (une lecture par requête)
+def lire_manifeste(dossier=None):
+    dossier = dossier or dossier_archive()
+    if not dossier:
+        return None
+    chemin = os.path.join(dossier, MANIFESTE)
+    try:
+        mtime = os.stat(chemin).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    en_cache = _manifestes.get(chemin)
+    if en_cache and en_cache[0] == mtime:
+        return en_cache[1]
+    with open(chemin, encoding="utf-8") as fichier:
+        brut = json.load(fichier)
+    manifeste = {"horizon": datetime.fromisoformat(brut["horizon"]), "id_max": brut["id_max"]}
+    _manifestes[chemin] = (mtime, manifeste)
+    return manifeste
+
+
+def _ecrire_manifeste(dossier, horizon, id_max):
+    chemin = os.path.join(dossier, MANIFESTE)
+    temporaire = chemin + ".tmp"
+    with open(temporaire, "w", encoding="utf-8") as fichier:
+        json.dump({"horizon": horizon.isoformat(), "id_max": id_max}, fichier)
+    os.replace(temporaire, chemin)  # remplacement atomique
+
+
+# -------------------------------------------------------------
+# Fonction filtrer_chaudes : exclut d'une requête les mesures archivées
+# -------------------------------------------------------------
+def filtrer_chaudes(query, manifeste):
+    if manifeste is None:
+        return query
+    return query.filter(or_(
+        DonneesMedicale.date_heure_mesure >= manifeste["horizon"],
+        DonneesMedicale.id > manifeste["id_max"],
+    ))
+
+
+# -------------------------------------------------------------
+# Fonction construire_archive : point d'entrée de `flask archive build`
+# -------------------------------------------------------------
+# - Lecture en flux triée par (patient, capteur, date) : les lignes
+#   d'un même fichier arrivent consécutivement et sont ajoutées par
+#   paquets de LIGNES_PAR_AJOUT
+# - Le manifeste n'est mis à jour qu'à la fin : une construction
+#   interrompue laisse des lignes en double dans les fichiers ; il
+#   faut alors supprimer le dossier et reconstruire
+def construire_archive(jusqu_a, dossier=None, taille_lot=TAILLE_LOT_ARCHIVE):
+    dossier = dossier or dossier_archive()
+    if not dossier:
+        raise ValueError("ARCHIVE_COLONNES_DIR n'est pas configuré")
+    manifeste = lire_manifeste(dossier)
+    if manifeste and jusqu_a <= manifeste["horizon"]:
+        return {"lignes": 0, "fichiers": 0, "horizon": manifeste["horizon"]}
+
+    requete = select(
+        DonneesMedicale.patient_id, DonneesMedicale.capteur_id, DonneesMedicale.id,
+        DonneesMedicale.date_heure_mesure, DonneesMedicale.valeur_mesuree,
+    ).where(DonneesMedicale.date_heure_mesure < jusqu_a)
+    if manifeste:
+        requete = requete.where(or_(
+            DonneesMedicale.date_heure_mesure >= manifeste["horizon"],
+            DonneesMedicale.id > manifeste["id_max"],
+        ))
+    requete = requete.order_by(
+        DonneesMedicale.patient_id, DonneesMedicale.capteur_id,
+        DonneesMedicale.date_heure_mesure, DonneesMedicale.id,
+    )
+
+    id_max = manifeste["id_max"] if manifeste else 0
+    total, fichiers = 0, set()
+    cle, paquet = None, []
+
+    def vider():
+        nonlocal total
+        if paquet:
+            total += ajouter_lignes(chemin_archive(dossier, *cle), paquet)
+            fichiers.add(cle)
+
+    resultat = db.session.execute(requete.execution_options(yield_per=taille_lot))
+    for patient_id, capteur_id, id_, date_heure, valeur in resultat:
+        if (patient_id, capteur_id) != cle or len(paquet) >= LIGNES_PAR_AJOUT:
+            vider()
+            cle, paquet = (patient_id, capteur_id), []
+        paquet.append((id_, date_heure, valeur))
+        id_max = max(id_max, id_)
+    vider()
+    db.session.rollback()  # libère le curseur serveur
+
+    os.makedirs(dossier, exist_ok=True)
+    _ecrire_manifeste(dossier, jusqu_a, id_max)
+    return {"lignes": total, "fichiers": len(fichiers), "horizon": jusqu_a}
+
+
+# -------------------------------------------------------------
+# Fonction oublier_mesures : mesures supprimées de la base
+# -------------------------------------------------------------
+# - mesures : (id, patient_id, capteur_id, date_heure_mesure) ; seules
+#   les mesures froides (archivées d'après le manifeste) sont inscrites
+# - À appeler après le commit de la suppression
+# - Retourne le nombre de mesures inscrites
+def oublier_mesures(mesures, dossier=None):
+    dossier = dossier or dossier_archive()
+    manifeste = lire_manifeste(dossier)
+    if manifeste is None:
+        return 0
+    par_fichier = defaultdict(list)
+    for id_, patient_id, capteur_id, date_heure in mesures:
+        if date_heure < manifeste["horizon"] and id_ <= manifeste["id_max"]:
+            par_fichier[(patient_id, capteur_id)].append(id_)
+
+    total = 0
+    for (patient_id, capteur_id), ids in par_fichier.items():
+        chemin = chemin_archive(dossier, patient_id, capteur_id)
+        if not os.path.exists(chemin):
+            continue
+        with open(_chemin_supprimees(chemin), "a", encoding="utf-8") as fichier:
+            fichier.write("".join(f"{id_}\n" for id_ in ids))
+        total += len(ids)
+    return total
+
+
+# -------------------------------------------------------------
+# Fonction oublier_archives : fichiers d'un patient, d'un capteur ou d'un couple
+# -------------------------------------------------------------
+# - patient_id seul : tout le répertoire du patient ; capteur_id seul :
+#   le fichier du capteur chez chaque patient ; les deux : le couple
+# - À appeler après le commit de la purge
+def oublier_archives(patient_id=None, capteur_id=None, dossier=None):
+    dossier = dossier or dossier_archive()
+    if not dossier or not os.path.isdir(dossier):
+        return
+    if capteur_id is None:
+        shutil.rmtree(os.path.join(dossier, f"p{patient_id}"), ignore_errors=True)
+        return
+    if patient_id is not None:
+        patients = [patient_id]
+    else:
+        patients = [int(nom[1:]) for nom in os.listdir(dossier) if nom.startswith("p") and nom[1:].isdigit()]
+    for p in patients:
+        chemin = chemin_archive(dossier, p, capteur_id)
+        for fichier in (chemin, _chemin_supprimees(chemin)):
+            try:
+                os.remove(fichier)
+            except FileNotFoundError:
+                pass
+
+
+# -------------------------------------------------------------
+# Lecture de la partie froide d'un patient
+# -------------------------------------------------------------
+def _fichiers_patient(dossier, patient_id):
+    repertoire = os.path.join(dossier, f"p{patient_id}")
+    if not os.path.isdir(repertoire):
+        return {}
+    return {
+        int(nom[1:-len(EXTENSION)]): os.path.join(repertoire, nom)
+        for nom in os.listdir(repertoire)
+        if nom.startswith("c") and nom.endswith(EXTENSION)
+    }
+
+
+def _supprimees(chemin):
+    try:
+        with open(_chemin_supprimees(chemin), encoding="utf-8") as fichier:
+            return {int(ligne) for ligne in fichier if ligne.strip()}
+    except FileNotFoundError:
+        return set()
+
+
+def mesures_archivees(patient_id, depuis=None, jusqu_a=None):
+    """
+    Mesures archivées d'un patient sur [depuis, jusqu_a[, par date
+    décroissante, sous forme d'objets DonneesMedicale détachés.
+    """
+    dossier = dossier_archive()
+    manifeste = lire_manifeste(dossier)
+    if manifeste is None or (depuis is not None and depuis >= manifeste["horizon"]):
+        return []
+
+    mesures = []
+    for capteur_id, chemin in _fichiers_patient(dossier, patient_id).items():
+        capteur = db.session.get(Capteur, capteur_id)
+        with LecteurArchive(chemin) as lecteur:
+            for id_, date_heure, valeur in lecteur.lignes(depuis, jusqu_a, _supprimees(chemin)):
+                mesure = DonneesMedicale(
+                    id=id_, patient_id=patient_id, capteur_id=capteur_id,
+                    valeur_mesuree=valeur, date_heure_mesure=date_heure,
+                )
+                # Relation posée sans passer par le backref (pas de cascade)
+                set_committed_value(mesure, "capteur", capteur)
+                mesures.append(mesure)
+    mesures.sort(key=lambda m: (m.date_heure_mesure, m.id), reverse=True)
+    return mesures
+
+
+def _avec_capteur(capteur_id, lignes):
+    for id_, date_heure, valeur in lignes:
+        yield capteur_id, id_, date_heure, valeur
+
+
+def lignes_archivees(patient_id, depuis=None, jusqu_a=None):
+    """
+    (capteur_id, id, date_heure, valeur) des mesures archivées d'un
+    patient sur [depuis, jusqu_a[, par date croissante, lues en flux
+    (fusion des fichiers de capteur, un bloc en mémoire par fichier).
+    """
+    dossier = dossier_archive()
+    manifeste = lire_manifeste(dossier)
+    if manifeste is None or (depuis is not None and depuis >= manifeste["horizon"]):
+        return
+    with ExitStack() as lecteurs:
+        flux = []
+        for capteur_id, chemin in _fichiers_patient(dossier, patient_id).items():
+            lecteur = lecteurs.enter_context(LecteurArchive(chemin))
+            flux.append(_avec_capteur(capteur_id, lecteur.lignes(depuis, jusqu_a, _supprimees(chemin))))
+        yield from heapq.merge(*flux, key=lambda l: (l[2], l[1]))
+
+
+def statistiques_archivees(patient_id, depuis=None, jusqu_a=None):
+    """{capteur_id: {nombre, min, max, somme}} des mesures archivées."""
+    dossier = dossier_archive()
+    manifeste = lire_manifeste(dossier)
+    if manifeste is None or (depuis is not None and depuis >= manifeste["horizon"]):
+        return {}
+
+    stats = {}
+    for capteur_id, chemin in _fichiers_patient(dossier, patient_id).items():
+        with LecteurArchive(chemin) as lecteur:
+            s = lecteur.statistiques(depuis, jusqu_a, _supprimees(chemin))
+        if s["nombre"]:
+            stats[capteur_id] = s
+    return stats
@@ -1,31 +1,102 @@
 # Importation de la fonction pour générer un token JWT
+from flask import current_app
 from flask_jwt_extended import create_access_token
+from sqlalchemy import select, update, func
+import logging
 
 # Importation du modèle Personne (classe mère des utilisateurs)
+from app.extension import db
 from app.models.personne import Personne
+from app.models.medecin import Medecin
+from app.models.proche import Proche
+from app.utils.cache import CacheTTL, ABSENT
+from app.utils.hachage import verifier_mot_de_passe, hacher_mot_de_passe, doit_rehacher
 import json
 
+logger = logging.getLogger(__name__)
+
+# Profils renvoyés par /me, conservés IDENTITE_CACHE_TTL_S secondes
+cache_identite = CacheTTL()
+
+
+# -------------------------------------------------------------
+# Fonction get_identifiants_par_email : lecture minimale pour le login
+# -------------------------------------------------------------
+# - Une seule requête sur la table personne (+ spécialité du médecin
+#   et patient du proche), sans charger la hiérarchie polymorphique
+# - Recherche insensible à la casse, servie par l'index lower(email)
+def get_identifiants_par_email(email):
+    personne = Personne.__table__
+    medecin = Medecin.__table__
+    proche = Proche.__table__
+    requete = (
+        select(
+            personne.c.id, personne.c.nom, personne.c.prenom, personne.c.email,
+            personne.c.role, personne.c.adresse, personne.c.date_naissance,
+            personne.c.mot_de_passe, medecin.c.specialite, proche.c.patient_id
+        )
+        .select_from(
+            personne
+            .outerjoin(medecin, medecin.c.id == personne.c.id)
+            .outerjoin(proche, proche.c.id == personne.c.id)
+        )
+        .where(func.lower(personne.c.email) == email.strip().lower(),
+               personne.c.date_suppression.is_(None))
+        .limit(1)
+    )
+    return db.session.execute(requete).first()
+
+
+# -------------------------------------------------------------
+# Fonction rehacher_mot_de_passe : met à jour un hash au coût courant
+# -------------------------------------------------------------
+def rehacher_mot_de_passe(user_id, mot_de_passe):
+    try:
+        db.session.execute(
+            update(Personne.__table__)
+            .where(Personne.__table__.c.id == user_id)
+            .values(mot_de_passe=hacher_mot_de_passe(mot_de_passe))
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        logger.exception("Échec du re-hachage du mot de passe de l'utilisateur %s", user_id)
+
 
 # -------------------------------------------------------------
 # Fonction authenticate_user : vérifie les identifiants
 # -------------------------------------------------------------
-# - Recherche l'utilisateur par email
-# - Vérifie que le mot de passe correspond via la méthode check_password
-# - Retourne l'objet utilisateur si les identifiants sont valides, sinon None
+# - Recherche l'utilisateur par email (colonnes utiles uniquement)
+# - Vérifie le mot de passe dans le pool bcrypt borné
+# - Recalcule le hash si son coût diffère de BCRYPT_LOG_ROUNDS
+# - Retourne la ligne utilisateur si les identifiants sont valides, sinon None
+# - Lève RuntimeError si le pool bcrypt est saturé
 def authenticate_user(email, mot_de_passe):
-    user = Personne.query.filter_by(email=email).first()
-    if user and user.check_password(mot_de_passe):
-        return user
-    return None
+    user = get_identifiants_par_email(email)
+    if not user or not verifier_mot_de_passe(user.mot_de_passe, mot_de_passe):
+        return None
+
+    if doit_rehacher(user.mot_de_passe):
+        rehacher_mot_de_passe(user.id, mot_de_passe)
+    return user
 
 # -------------------------------------------------------------
 # Fonction generate_token : génère un JWT pour l'utilisateur
 # -------------------------------------------------------------
 # - Crée un token contenant l'identité (id + rôle)
+# - Ajoute des claims signés utilisés pour l'autorisation sans accès base :
+#   rôle, patient rattaché (proche), spécialité (médecin)
 # - Sert à authentifier l'utilisateur dans les requêtes futures
 def generate_token(user):
     identity = json.dumps({"id": user.id, "role": user.role})
-    return create_access_token(identity=identity)
+    claims = {"role": user.role}
+
+    if user.role == "proche":
+        claims["patient_id"] = getattr(user, "patient_id", None)
+    elif user.role == "medecin":
+        claims["specialite"] = getattr(user, "specialite", None)
+
+    return create_access_token(identity=identity, additional_claims=claims)
 
 
 # -------------------------------------------------------------
@@ -54,12 +125,36 @@ def format_user_response(user):
     return base
 
 def get_user_by_id(user_id):
-    return Personne.query.get(user_id)
-    
+    # Compte archivé (suppression douce) : plus de profil
+    return Personne.query.filter_by(id=user_id, date_suppression=None).first()
+
+
+# -------------------------------------------------------------
+# Fonction get_profil_utilisateur : profil /me avec cache court
+# -------------------------------------------------------------
+# - IDENTITE_CACHE_TTL_S = 0 désactive le cache
+# - Retourne None si l'utilisateur n'existe pas (non mis en cache)
+def get_profil_utilisateur(user_id):
+    profil = cache_identite.get(user_id)
+    if profil is not ABSENT:
+        return profil
+
+    user = get_user_by_id(user_id)
+    if not user:
+        return None
+
+    profil = format_user_response(user)
+    cache_identite.set(user_id, profil, current_app.config.get("IDENTITE_CACHE_TTL_S", 0))
+    return profil
+
+
+def invalider_profil(user_id):
+    cache_identite.invalider(user_id)
+
 
 # -------------------------------------------------------------
 # auth_service.py : logique métier liée à l'authentification
 # -------------------------------------------------------------
-# - Vérifie les identifiants
+# - Vérifie les identifiants (lecture minimale, bcrypt en pool borné)
 # - Génère le token JWT
 # - Prépare les données utilisateur à renvoyer
\ No newline at end of file
@@ -1,51 +1,56 @@
 from app import db
 from app.models.capteur import Capteur
+from app.utils.replicas import lecture_replica
+from app.services.suppression_service import supprimer_capteur
+from app.services.appareil_service import invalider_capteur
+from app.services.reference_service import marquer_capteurs_modifies
 
 # -------------------------------------------------------------
 # Fonction create_capteur : crée un nouveau capteur
 # -------------------------------------------------------------
+# - Les types des capteurs sont en cache (reference_service) : toute
+#   écriture incrémente la version partagée avant le commit
 def create_capteur(data):
-    capteur = Capteur(
-        type=data["type"],
-        valeur=data.get("valeur"),
-        date_mesure=data.get("date_mesure")
-    )
+    capteur = Capteur(type=data["type"])
     db.session.add(capteur)
+    marquer_capteurs_modifies()
     db.session.commit()
     return capteur
 
 # -------------------------------------------------------------
 # Fonction get_all_capteurs : liste tous les capteurs
 # -------------------------------------------------------------
+@lecture_replica
 def get_all_capteurs():
-    return Capteur.query.all()
+    return Capteur.query.filter(Capteur.date_suppression.is_(None)).all()
 
 # -------------------------------------------------------------
 # Fonction get_capteur_by_id : récupère un capteur par ID
 # -------------------------------------------------------------
 def get_capteur_by_id(id):
-    return Capteur.query.get(id)
+    return Capteur.query.filter_by(id=id, date_suppression=None).first()
 
 # -------------------------------------------------------------
 # Fonction update_capteur : met à jour un capteur existant
 # -------------------------------------------------------------
 def update_capteur(capteur, data):
     capteur.type = data.get("type", capteur.type)
-    capteur.valeur = data.get("valeur", capteur.valeur)
-    capteur.date_mesure = data.get("date_mesure", capteur.date_mesure)
+    marquer_capteurs_modifies()
     db.session.commit()
+    invalider_capteur(capteur.id)
     return capteur
 
 # -------------------------------------------------------------
 # Fonction delete_capteur : supprime un capteur
 # -------------------------------------------------------------
-def delete_capteur(capteur):
-    db.session.delete(capteur)
-    db.session.commit()
+# - Suppression ensembliste, différée ou douce (voir suppression_service)
+def delete_capteur(capteur, douce=False):
+    return supprimer_capteur(capteur.id, douce=douce)
 
 # -------------------------------------------------------------
 # Fonction get_capteur_stats : statistiques des capteurs
 # -------------------------------------------------------------
+@lecture_replica
 def get_capteur_stats():
     from sqlalchemy import func
     return db.session.query(
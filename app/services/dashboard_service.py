@@ -0,0 +1,121 @@
+# -------------------------------------------------------------
+# app/services/dashboard_service.py
+# -------------------------------------------------------------
+# Tableau de bord de triage d'un médecin (GET /v1/medecins/<id>/dashboard),
+# en quatre requêtes ensemblistes, sans objets ORM :
+# - alertes non traitées du médecin, comptées par patient et urgence
+#   (index partiel ix_alerte_medecin_non_traitees)
+# - les N dernières alertes du médecin (index ix_alerte_medecin_date)
+# - ses LIMITE_MAX patients les plus à risque, lus dans scores_risque
+#   par l'index (medecin_id, score) ; le médecin d'un patient est celui
+#   de sa dernière mesure ou alerte (voir risque_service)
+# - dernières constantes de ces patients, lues dans etats_mesures
+# Résultat gardé DASHBOARD_CACHE_TTL_S secondes par médecin (avec les
+# LIMITE_MAX dernières alertes, tronquées à la demande), invalidé quand
+# une alerte du médecin change d'état.
+# -------------------------------------------------------------
+
+from collections import defaultdict
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import select, func
+
+from app.extension import db
+from app.models import Alerte, Capteur, EtatMesure, Patient, ScoreRisque, UrgenceEnum
+from app.services.analyse_service import evaluer_valeur
+from app.services.risque_service import score_courant
+from app.utils.cache import CacheTTL, ABSENT
+from app.utils.replicas import lecture_replica
+from app.utils.serialiseurs_lignes import PLAN_ALERTE
+
+cache_tableaux = CacheTTL(taille_max=1000)
+
+LIMITE_MAX = 100
+
+
+# -------------------------------------------------------------
+# Fonction tableau_de_bord : compteurs, dernières alertes, patients à risque
+# -------------------------------------------------------------
+@lecture_replica
+def tableau_de_bord(medecin_id, limite=10):
+    tableau = cache_tableaux.get(medecin_id)
+    if tableau is ABSENT:
+        tableau = _calculer(medecin_id)
+        cache_tableaux.set(medecin_id, tableau, current_app.config.get("DASHBOARD_CACHE_TTL_S", 0))
+    return {**tableau, "dernieres_alertes": tableau["dernieres_alertes"][:limite]}
+
+
+def _calculer(medecin_id):
+    maintenant = datetime.utcnow()
+    patients = {
+        ligne.patient_id: {
+            "id": ligne.patient_id,
+            "nom": ligne.nom,
+            "prenom": ligne.prenom,
+            "score_risque": round(score_courant(ligne.score_alertes, ligne.score_ecarts,
+                                                ligne.date_reference, maintenant), 3),
+            "alertes_non_traitees": {u.value: 0 for u in UrgenceEnum},
+            "constantes": [],
+        }
+        for ligne in db.session.execute(
+            select(ScoreRisque.patient_id, ScoreRisque.score_alertes, ScoreRisque.score_ecarts,
+                   ScoreRisque.date_reference, Patient.nom, Patient.prenom)
+            .join(Patient, Patient.id == ScoreRisque.patient_id)
+            .where(ScoreRisque.medecin_id == medecin_id)
+            .order_by(ScoreRisque.score.desc(), ScoreRisque.patient_id)
+            .limit(LIMITE_MAX)
+        )
+    }
+
+    compteurs = defaultdict(int)
+    non_traitees = db.session.execute(
+        select(Alerte.patient_id, Alerte.niveau_urgence, func.count().label("nombre"))
+        .where(Alerte.medecin_id == medecin_id, Alerte.etat_traitement.is_(False))
+        .group_by(Alerte.patient_id, Alerte.niveau_urgence)
+    )
+    for ligne in non_traitees:
+        compteurs[ligne.niveau_urgence.value] += ligne.nombre
+        if ligne.patient_id in patients:
+            patients[ligne.patient_id]["alertes_non_traitees"][ligne.niveau_urgence.value] += ligne.nombre
+
+    dernieres = db.session.execute(
+        select(*PLAN_ALERTE.colonnes)
+        .where(Alerte.medecin_id == medecin_id)
+        .order_by(Alerte.date_heure_alerte.desc(), Alerte.id.desc())
+        .limit(LIMITE_MAX)
+    )
+
+    constantes = db.session.execute(
+        select(EtatMesure.patient_id, EtatMesure.capteur_id, EtatMesure.derniere_valeur,
+               EtatMesure.date_derniere_mesure, Capteur.type)
+        .join(Capteur, Capteur.id == EtatMesure.capteur_id)
+        .where(EtatMesure.patient_id.in_(list(patients)))
+        .order_by(EtatMesure.patient_id, EtatMesure.capteur_id)
+    ) if patients else ()
+    for ligne in constantes:
+        patients[ligne.patient_id]["constantes"].append({
+            "capteur_id": ligne.capteur_id,
+            "type": ligne.type.value if ligne.type else None,
+            "valeur": ligne.derniere_valeur,
+            "date_heure_mesure": ligne.date_derniere_mesure.isoformat() if ligne.date_derniere_mesure else None,
+            "anomalie": evaluer_valeur(ligne.type, ligne.derniere_valeur)[2],
+        })
+
+    return {
+        "medecin_id": medecin_id,
+        "alertes_non_traitees": {
+            **{u.value: compteurs[u.value] for u in UrgenceEnum},
+            "total": sum(compteurs.values()),
+        },
+        "dernieres_alertes": PLAN_ALERTE.serialiser(dernieres),
+        "patients": list(patients.values()),
+    }
+
+
+# -------------------------------------------------------------
+# Fonction invalider_tableau_de_bord : après un changement d'alerte
+# -------------------------------------------------------------
+# - Les nouvelles alertes apparaissent au plus tard après le TTL
+def invalider_tableau_de_bord(medecin_id):
+    cache_tableaux.invalider(medecin_id)
@@ -2,60 +2,92 @@
 # app/services/donnee_medical_service.py
 # -------------------------------------------------------------
 # Gère la logique métier liée aux données médicales :
-# - Création de mesure
+# - Création de mesure (horodatage de l'appareil, renvois idempotents,
+#   état courant du couple patient/capteur)
 # - Suppression
 # - Statistiques
 # - Récupération par patient
+# Les mesures anciennes peuvent être servies par l'archive
+# colonnaire (archive_service) : PostgreSQL ne fournit alors que la
+# partie chaude, fusionnée avec la partie froide.
 # -------------------------------------------------------------
 
 from app import db
-from app.models import Patient, Medecin, Capteur, DonneesMedicale
-from datetime import datetime
+from app.models import Patient, Medecin, DonneesMedicale, ScoreRisque, CleIngestion
 from sqlalchemy import func
-from app.services.analyse_service import create_analyse
+from app.services.affectation_service import capteurs_du_patient
+from app.services.analyse_service import create_analyse, evaluer_valeur
+from app.services.reference_service import type_capteur
+from app.services.ingestion_service import champs_appareil, reserver_cles, lier_cles, \
+    relier_cles, mettre_a_jour_etats, recalculer_etats
+from app.services.risque_service import mettre_a_jour_scores
+from app.services.archive_service import lire_manifeste, filtrer_chaudes, \
+    mesures_archivees, statistiques_archivees, oublier_mesures
+from app.utils.replicas import lecture_replica
+from app.utils.serialiseurs_lignes import PLAN_DONNEE, CapteurMesure
+from sqlalchemy import select, delete
 
 # -------------------------------------------------------------
 # SERVICE : Données Médicales
 # -------------------------------------------------------------
 
-def create_donnee_medicale(data):
+def create_donnee_medicale(data, appareil=None):
     """
-    Création d'une donnée médicale AVEC analyse automatique obligatoire
+    Création d'une donnée médicale AVEC analyse automatique obligatoire.
+    appareil : identité résolue par le registre (appareil_service) ;
+    patient, capteur et médecin en viennent, sans lecture en base.
     """
 
-    required_fields = [
-        "patient_id",
-        "capteur_id",
-        "valeur_mesuree",
-        "medecin_id"
-    ]
-
-    if not all(field in data for field in required_fields):
+    if appareil is None:
+        appareil = _source_du_corps(data)
+    elif "valeur_mesuree" not in data:
         raise ValueError("Champs obligatoires manquants")
 
-    patient = Patient.query.get(data["patient_id"])
-    capteur = Capteur.query.get(data["capteur_id"])
-    medecin = Medecin.query.get(data["medecin_id"])
-
-    if not patient or not capteur or not medecin:
-        raise ValueError("Patient, capteur ou médecin introuvable")
+    if appareil["patient_id"] is None:
+        raise ValueError("Capteur de l'appareil affecté à aucun patient")
+    if appareil["medecin_id"] is None:
+        raise ValueError("Appareil sans médecin référent")
+    patient_id, capteur_id, medecin_id = appareil["patient_id"], appareil["capteur_id"], appareil["medecin_id"]
+
+    # Horodatage de l'appareil et clés d'idempotence (facultatifs)
+    champs = champs_appareil(data)
+    reservees, doublons = reserver_cles(db.session.connection(), [{"capteur_id": capteur_id, **champs}])
+    if doublons:
+        # Renvoi d'une lecture déjà reçue : la mesure existante est retournée
+        existante = DonneesMedicale.query.filter_by(id=doublons[0][1]).first()
+        if existante is not None:
+            existante.doublon = True
+            return existante
 
     # Création de la donnée
     donnee = DonneesMedicale(
-        patient_id=patient.id,
-        capteur_id=capteur.id,
+        patient_id=patient_id,
+        capteur_id=capteur_id,
         valeur_mesuree=data["valeur_mesuree"],
-        date_heure_mesure=datetime.utcnow()
+        date_heure_mesure=champs["date_heure_mesure"]
     )
 
     db.session.add(donnee)
     db.session.flush()  # Génère donnee.id
-
-    # Analyse automatique
+    lier_cles(db.session.connection(), {cle_id: donnee.id for cle_id in reservees.values()})
+    if doublons:
+        # Clé d'une mesure qui n'existe plus : reliée à celle-ci, un renvoi suivant est un doublon
+        relier_cles(db.session.connection(), {"capteur_id": capteur_id, **champs}, donnee.id)
+
+    # Dernière mesure et agrégats du couple (patient, capteur)
+    valeur = float(donnee.valeur_mesuree)
+    mettre_a_jour_etats(db.session.connection(), [{
+        "patient_id": patient_id, "capteur_id": capteur_id, "medecin_id": medecin_id, "donnee_id": donnee.id,
+        "valeur_mesuree": valeur, "date_heure_mesure": donnee.date_heure_mesure,
+        "anomalie": evaluer_valeur(appareil["type"], valeur)[2],
+    }])
+
+    # Analyse automatique (et score de risque, d'après l'état à jour)
     create_analyse(
-        patient=patient,
-        medecin=medecin,
-        donnee=donnee
+        patient_id=patient_id,
+        medecin_id=medecin_id,
+        donnee=donnee,
+        type_capteur=appareil["type"]
     )
 
     # Commit global (donnée + analyse + alerte)
@@ -64,14 +96,75 @@ def create_donnee_medicale(data):
     return donnee
 
 
+# -------------------------------------------------------------
+# Fonction _source_du_corps : lecture sans appareil (patient_id,
+# capteur_id, medecin_id dans le corps, vérifiés en base)
+# -------------------------------------------------------------
+def _source_du_corps(data):
+    required_fields = [
+        "patient_id",
+        "capteur_id",
+        "valeur_mesuree",
+        "medecin_id"
+    ]
+
+    if not all(field in data for field in required_fields):
+        raise ValueError("Champs obligatoires manquants")
+
+    patient = Patient.query.get(data["patient_id"])
+    type_ = type_capteur(data["capteur_id"])
+    medecin = Medecin.query.get(data["medecin_id"])
+
+    if not patient or type_ is None or not medecin:
+        raise ValueError("Patient, capteur ou médecin introuvable")
+
+    return {"patient_id": patient.id, "capteur_id": data["capteur_id"], "medecin_id": medecin.id, "type": type_}
+
+
+@lecture_replica
 def get_all_donnees():
     """Récupère toutes les données médicales enregistrées."""
-    return DonneesMedicale.query.order_by(DonneesMedicale.date_heure_mesure.desc()).all()
+    return DonneesMedicale.query.order_by(
+        DonneesMedicale.date_heure_mesure.desc(), DonneesMedicale.id.desc()
+    ).all()
+
 
+@lecture_replica
+def lister_donnees_serialisees():
+    """Même résultat que get_all_donnees + serialize_donnee_medicale, sans objets ORM."""
+    requete = (
+        select(*PLAN_DONNEE.colonnes)
+        .select_from(DonneesMedicale)
+        .outerjoin(CapteurMesure, CapteurMesure.id == DonneesMedicale.capteur_id)
+        .order_by(DonneesMedicale.date_heure_mesure.desc(), DonneesMedicale.id.desc())
+    )
+    return PLAN_DONNEE.serialiser(db.session.execute(requete))
 
-def get_donnees_by_patient(patient_id):
-    """Retourne toutes les mesures d’un patient donné."""
-    return DonneesMedicale.query.filter_by(patient_id=patient_id).order_by(DonneesMedicale.date_heure_mesure.desc()).all()
+
+def filtrer_periode(query, depuis=None, jusqu_a=None):
+    """
+    Restreint une requête sur DonneesMedicale à [depuis, jusqu_a[.
+    Sous PostgreSQL, la borne sur date_heure_mesure limite le plan
+    aux partitions mensuelles concernées (élagage de partitions).
+    """
+    if depuis is not None:
+        query = query.filter(DonneesMedicale.date_heure_mesure >= depuis)
+    if jusqu_a is not None:
+        query = query.filter(DonneesMedicale.date_heure_mesure < jusqu_a)
+    return query
+
+
+@lecture_replica
+def get_donnees_by_patient(patient_id, depuis=None, jusqu_a=None):
+    """Retourne les mesures d’un patient, éventuellement sur une période."""
+    query = filtrer_periode(DonneesMedicale.query.filter_by(patient_id=patient_id), depuis, jusqu_a)
+    query = filtrer_chaudes(query, lire_manifeste())
+    chaudes = query.order_by(DonneesMedicale.date_heure_mesure.desc()).all()
+    froides = mesures_archivees(patient_id, depuis, jusqu_a)
+    if not froides:
+        return chaudes
+    # Les retardataires non encore archivés peuvent précéder l'horizon
+    return sorted(chaudes + froides, key=lambda d: d.date_heure_mesure, reverse=True)
 
 
 def get_donnee_by_id(donnee_id):
@@ -80,47 +173,70 @@ def get_donnee_by_id(donnee_id):
 
 
 def delete_donnee(donnee_id):
-    """Supprime une donnée médicale spécifique."""
+    """Supprime une donnée médicale et ses clés d'ingestion ; état du couple et score du patient recalculés."""
     donnee = DonneesMedicale.query.get(donnee_id)
     if not donnee:
         return False
+    patient_id, capteur_id, date_heure = donnee.patient_id, donnee.capteur_id, donnee.date_heure_mesure
     db.session.delete(donnee)
+    db.session.execute(delete(CleIngestion).where(CleIngestion.donnee_medicale_id == donnee_id))
+    db.session.flush()
+
+    connexion = db.session.connection()
+    recalculer_etats(connexion, [(patient_id, capteur_id)])
+    medecin_id = db.session.scalar(select(ScoreRisque.medecin_id).where(ScoreRisque.patient_id == patient_id))
+    mettre_a_jour_scores(connexion, mesures={patient_id: medecin_id})
     db.session.commit()
+    # Mesure déjà archivée : écartée des lectures de l'archive froide
+    oublier_mesures([(donnee_id, patient_id, capteur_id, date_heure)])
     return True
 
 
-def get_stats_by_patient(patient_id):
+@lecture_replica
+def get_stats_by_patient(patient_id, depuis=None, jusqu_a=None):
     """Retourne les statistiques (min, max, moyenne) par capteur pour un patient donné."""
-    resultats = db.session.query(
+    query = db.session.query(
         DonneesMedicale.capteur_id,
         func.min(DonneesMedicale.valeur_mesuree).label("min"),
         func.max(DonneesMedicale.valeur_mesuree).label("max"),
-        func.avg(DonneesMedicale.valeur_mesuree).label("avg")
+        func.count(DonneesMedicale.valeur_mesuree).label("nombre"),
+        func.sum(DonneesMedicale.valeur_mesuree).label("somme")
     ).filter(
         DonneesMedicale.patient_id == patient_id
-    ).group_by(
-        DonneesMedicale.capteur_id
-    ).all()
+    )
+    query = filtrer_chaudes(filtrer_periode(query, depuis, jusqu_a), lire_manifeste())
+    resultats = query.group_by(DonneesMedicale.capteur_id).all()
+
+    # Agrégats partiels (base + archive) combinés par capteur
+    agregats = {
+        r.capteur_id: {"nombre": r.nombre, "min": r.min, "max": r.max, "somme": r.somme}
+        for r in resultats
+    }
+    for capteur_id, froid in statistiques_archivees(patient_id, depuis, jusqu_a).items():
+        chaud = agregats.get(capteur_id)
+        if chaud is None or not chaud["nombre"]:
+            agregats[capteur_id] = froid
+            continue
+        chaud["nombre"] += froid["nombre"]
+        chaud["somme"] += froid["somme"]
+        chaud["min"] = min(chaud["min"], froid["min"])
+        chaud["max"] = max(chaud["max"], froid["max"])
 
     # Structuration propre des résultats
     stats = []
-    for r in resultats:
-        capteur = Capteur.query.get(r.capteur_id)
+    for capteur_id, a in agregats.items():
+        type_ = type_capteur(capteur_id)
+        moyenne = a["somme"] / a["nombre"] if a["nombre"] else None
         stats.append({
-            "capteur": capteur.type.value if capteur and capteur.type else "Inconnu",
-            "min": round(r.min, 2) if r.min is not None else None,
-            "max": round(r.max, 2) if r.max is not None else None,
-            "moyenne": round(r.avg, 2) if r.avg is not None else None
+            "capteur": type_.value if type_ else "Inconnu",
+            "min": round(a["min"], 2) if a["min"] is not None else None,
+            "max": round(a["max"], 2) if a["max"] is not None else None,
+            "moyenne": round(moyenne, 2) if moyenne is not None else None
         })
     return stats
 
 
+@lecture_replica
 def get_capteurs_by_patient(patient_id):
-    """Retourne les capteurs ayant enregistré des données pour un patient."""
-    return (
-        db.session.query(Capteur)
-        .join(DonneesMedicale)
-        .filter(DonneesMedicale.patient_id == patient_id)
-        .distinct()
-        .all()
-    )
+    """Retourne les capteurs affectés (affectation active) à un patient."""
+    return capteurs_du_patient(patient_id)
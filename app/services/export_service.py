@@ -0,0 +1,249 @@
+# -------------------------------------------------------------
+# app/services/export_service.py
+# -------------------------------------------------------------
+# Export en flux de l'historique d'un patient :
+# - une seule requête SQL (mesures + capteur, analyses et alertes
+#   en jointures optionnelles) lue par lots via un curseur serveur
+#   (yield_per → stream_results sous PostgreSQL)
+# - chaque lot est converti puis envoyé aussitôt : la mémoire reste
+#   bornée par TAILLE_LOT_EXPORT quelle que soit la profondeur
+# - mesures archivées (archive froide) : lues en flux depuis les
+#   fichiers et envoyées avant les lignes de la base, écartées de la
+#   requête par le même découpage horizon / id_max que les lectures
+#   (filtrer_chaudes) ; les retardataires non encore archivés suivent
+#   donc l'archive au lieu d'y être intercalés
+# - formats : NDJSON, CSV, Parquet (pyarrow, optionnel)
+# - compression à la volée par app/utils/compression.py (hors Parquet)
+# -------------------------------------------------------------
+
+import csv
+import io
+import json
+from datetime import datetime
+from itertools import islice
+from enum import Enum
+
+from sqlalchemy import select
+
+from app.extension import db
+from app.models import DonneesMedicale, Capteur, Analyseur, Alerte
+from app.services.archive_service import lire_manifeste, filtrer_chaudes, lignes_archivees
+from app.services.donnee_medical_service import filtrer_periode
+from app.utils.replicas import lecture_replica
+
+TAILLE_LOT_EXPORT = 2000
+FORMATS_EXPORT = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+# -------------------------------------------------------------
+# Fonction requete_export : colonnes et SELECT de l'export
+# -------------------------------------------------------------
+def requete_export(patient_id, depuis=None, jusqu_a=None, analyses=False, alertes=False):
+    colonnes = [
+        DonneesMedicale.id.label("id"),
+        DonneesMedicale.patient_id.label("patient_id"),
+        DonneesMedicale.capteur_id.label("capteur_id"),
+        Capteur.type.label("type_capteur"),
+        DonneesMedicale.valeur_mesuree.label("valeur_mesuree"),
+        DonneesMedicale.date_heure_mesure.label("date_heure_mesure"),
+    ]
+    if analyses:
+        colonnes += [
+            Analyseur.id.label("analyse_id"),
+            Analyseur.medecin_id.label("medecin_id"),
+            Analyseur.resultat.label("resultat"),
+            Analyseur.date_analyse.label("date_analyse"),
+        ]
+    if alertes:
+        colonnes += [
+            Alerte.id.label("alerte_id"),
+            Alerte.niveau_urgence.label("niveau_urgence"),
+            Alerte.type_alerte.label("type_alerte"),
+            Alerte.etat_traitement.label("etat_traitement"),
+            Alerte.date_heure_alerte.label("date_heure_alerte"),
+        ]
+
+    requete = (
+        select(*colonnes)
+        .join(Capteur, Capteur.id == DonneesMedicale.capteur_id)
+        .where(DonneesMedicale.patient_id == patient_id)
+    )
+    if analyses:
+        requete = requete.outerjoin(Analyseur, Analyseur.donnee_medicale_id == DonneesMedicale.id)
+    if alertes:
+        requete = requete.outerjoin(Alerte, Alerte.donnee_medicale_id == DonneesMedicale.id)
+
+    requete = filtrer_periode(requete, depuis, jusqu_a)
+    return requete.order_by(DonneesMedicale.date_heure_mesure, DonneesMedicale.id)
+
+
+# -------------------------------------------------------------
+# Fonction lots_archives : lignes de l'archive froide, par lots
+# -------------------------------------------------------------
+# - Mêmes colonnes que requete_export ; les analyses et alertes encore
+#   en base sont rattachées par lot d'ids (comme les jointures externes :
+#   une ligne par combinaison, colonnes vides si aucune)
+def lots_archives(patient_id, depuis=None, jusqu_a=None, analyses=False, alertes=False,
+                  taille_lot=TAILLE_LOT_EXPORT):
+    types = {}
+    lignes = lignes_archivees(patient_id, depuis, jusqu_a)
+    while lot := list(islice(lignes, taille_lot)):
+        ids = [ligne[1] for ligne in lot]
+        jointures = []
+        if analyses:
+            jointures.append(_par_mesure(select(
+                Analyseur.donnee_medicale_id, Analyseur.id, Analyseur.medecin_id,
+                Analyseur.resultat, Analyseur.date_analyse,
+            ).where(Analyseur.donnee_medicale_id.in_(ids)), 4))
+        if alertes:
+            jointures.append(_par_mesure(select(
+                Alerte.donnee_medicale_id, Alerte.id, Alerte.niveau_urgence, Alerte.type_alerte,
+                Alerte.etat_traitement, Alerte.date_heure_alerte,
+            ).where(Alerte.donnee_medicale_id.in_(ids)), 5))
+
+        sortie = []
+        for capteur_id, id_, date_heure, valeur in lot:
+            if capteur_id not in types:
+                types[capteur_id] = db.session.scalar(select(Capteur.type).where(Capteur.id == capteur_id))
+            combinaisons = [(id_, patient_id, capteur_id, types[capteur_id], valeur, date_heure)]
+            for par_mesure, vide in jointures:
+                combinaisons = [c + j for c in combinaisons for j in par_mesure.get(id_, [vide])]
+            sortie.extend(combinaisons)
+        yield sortie
+
+
+def _par_mesure(requete, nb_colonnes):
+    par_mesure = {}
+    for donnee_id, *colonnes in db.session.execute(requete):
+        par_mesure.setdefault(donnee_id, []).append(tuple(colonnes))
+    return par_mesure, (None,) * nb_colonnes
+
+
+class _ExportAvecArchive:
+    """Résultat d'export : lots de l'archive froide puis lots de la base."""
+
+    def __init__(self, froides, resultat):
+        self.froides = froides
+        self.resultat = resultat
+
+    def keys(self):
+        return self.resultat.keys()
+
+    def partitions(self):
+        yield from self.froides
+        yield from self.resultat.partitions()
+
+
+# -------------------------------------------------------------
+# Fonction ouvrir_export : exécute la requête (curseur serveur)
+# -------------------------------------------------------------
+# - Exécutée immédiatement (et non dans le générateur) pour que le
+#   routage vers un réplica s'applique
+# - Avec une archive froide, la requête ne lit que les mesures chaudes
+#   et l'archive est lue en flux avant elles
+@lecture_replica
+def ouvrir_export(patient_id, depuis=None, jusqu_a=None, analyses=False, alertes=False,
+                  taille_lot=TAILLE_LOT_EXPORT):
+    manifeste = lire_manifeste()
+    requete = filtrer_chaudes(requete_export(patient_id, depuis, jusqu_a, analyses, alertes), manifeste)
+    resultat = db.session.execute(requete.execution_options(yield_per=taille_lot))
+    if manifeste is None:
+        return resultat
+    froides = lots_archives(patient_id, depuis, jusqu_a, analyses, alertes, taille_lot)
+    return _ExportAvecArchive(froides, resultat)
+
+
+def _valeur(v):
+    if isinstance(v, datetime):
+        return v.isoformat()
+    if isinstance(v, Enum):
+        return v.value
+    return v
+
+
+# -------------------------------------------------------------
+# Générateurs par format : un morceau de sortie par lot de lignes
+# -------------------------------------------------------------
+def generer_ndjson(resultat):
+    colonnes = list(resultat.keys())
+    for lot in resultat.partitions():
+        yield "".join(
+            json.dumps(dict(zip(colonnes, map(_valeur, ligne))), ensure_ascii=False) + "\n"
+            for ligne in lot
+        ).encode("utf-8")
+
+
+def generer_csv(resultat):
+    colonnes = list(resultat.keys())
+    tampon = io.StringIO()
+    writer = csv.writer(tampon)
+    writer.writerow(colonnes)
+    for lot in resultat.partitions():
+        writer.writerows([_valeur(v) for v in ligne] for ligne in lot)
+        yield tampon.getvalue().encode("utf-8")
+        tampon.seek(0)
+        tampon.truncate()
+    if tampon.tell():  # export vide : en-tête seul
+        yield tampon.getvalue().encode("utf-8")
+
+
+class _FluxSortie(io.RawIOBase):
+    """Fichier en écriture seule dont le contenu est vidé après chaque lot."""
+
+    def __init__(self):
+        self.morceaux = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, donnees):
+        self.morceaux.append(bytes(donnees))
+        self.position += len(donnees)
+        return len(donnees)
+
+    def tell(self):
+        return self.position
+
+    def vider(self):
+        contenu, self.morceaux = b"".join(self.morceaux), []
+        return contenu
+
+
+def parquet_disponible():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def generer_parquet(resultat):
+    # Dépendance optionnelle : vérifier parquet_disponible() avant l'appel
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    colonnes = list(resultat.keys())
+    sortie = _FluxSortie()
+    writer = None
+    for lot in resultat.partitions():
+        table = pa.Table.from_pylist(
+            [dict(zip(colonnes, (v.value if isinstance(v, Enum) else v for v in ligne)))
+             for ligne in lot]
+        )
+        if writer is None:
+            writer = pq.ParquetWriter(sortie, table.schema, compression="zstd")
+        writer.write_table(table)  # un groupe de lignes par lot
+        yield sortie.vider()
+    if writer is not None:
+        writer.close()
+        yield sortie.vider()
+
+
+GENERATEURS = {"ndjson": generer_ndjson, "csv": generer_csv, "parquet": generer_parquet}
+
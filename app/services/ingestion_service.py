@@ -0,0 +1,588 @@
+# -------------------------------------------------------------
+# app/services/ingestion_service.py
+# -------------------------------------------------------------
+# Ingestion par lots des lectures envoyées par les passerelles :
+# - valider_lecture : mêmes champs obligatoires que create_donnee_medicale
+# - enregistrer_lot : un lot = une transaction ; patients, capteurs et
+#   médecins vérifiés par requêtes ensemblistes, mesures insérées en
+#   une seule instruction (RETURNING id), analyses et alertes produites
+#   par analyse_service.evaluer_valeur puis insérées en masse ; les
+#   notifications des alertes sont mises en file dans la même transaction
+# - idempotence : (capteur_id, sequence_appareil) ou id_lecture réservés
+#   dans cles_ingestion (INSERT ... ON CONFLICT DO NOTHING) ; un renvoi
+#   est rapporté comme doublon sans rien réécrire
+# - ingerer_flux : corps de requête décodé en flux (POST /v1/donnees/flux),
+#   enregistré par morceaux de taille fixe
+# - ordre des mesures : les lectures horodatées passent par une fenêtre
+#   de réordonnancement (INGESTION_RETARD_MAX_S) ; mettre_a_jour_etats
+#   tient la dernière mesure et les agrégats par (patient, capteur), et
+#   une lecture arrivée après une plus récente ne corrige que les agrégats
+# enregistrer_lot reçoit une Connection synchrone : elle est appelée
+# telle quelle (thread) ou via AsyncConnection.run_sync (asyncpg).
+# -------------------------------------------------------------
+
+import math
+import uuid
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert, select, update, delete, bindparam, tuple_, or_, func, case, exists
+
+from app.extension import db
+from app.models import Patient, Medecin, Capteur, DonneesMedicale, Analyseur, Alerte, CleIngestion, \
+    EtatMesure
+from app.services.affectation_service import ouvrir_affectations
+from app.services.analyse_service import evaluer_valeur
+from app.services.appareil_service import completer_lecture
+from app.services.notification_service import mettre_en_file
+from app.services.risque_service import mettre_a_jour_scores
+from app.utils.reordonnancement import FenetreReordonnancement
+from app.utils.validation import parse_horodatage
+
+CHAMPS_OBLIGATOIRES = ("patient_id", "capteur_id", "valeur_mesuree", "medecin_id")
+AVANCE_HORLOGE_MAX = timedelta(minutes=5)   # horloge d'appareil en avance tolérée
+
+
+def _entier(valeur, champ):
+    if isinstance(valeur, bool) or not isinstance(valeur, int):
+        raise ValueError(f"{champ} doit être un entier")
+    return valeur
+
+
+# -------------------------------------------------------------
+# Fonction champs_appareil : horodatage et clés fournis par l'appareil
+# -------------------------------------------------------------
+# - date_heure_mesure : horodatage de l'appareil (ISO 8601 ou secondes
+#   Unix), sinon l'heure de réception ; un arriéré garde ses dates
+# - sequence_appareil : numéro croissant par capteur, id_lecture : UUID ;
+#   l'un ou l'autre rend la lecture idempotente (voir reserver_cles)
+def champs_appareil(data, maintenant=None):
+    maintenant = maintenant or datetime.utcnow()
+    champs = {"date_heure_mesure": maintenant, "sequence_appareil": None, "id_lecture": None}
+
+    if data.get("date_heure_mesure") is not None:
+        moment = parse_horodatage(data["date_heure_mesure"])
+        if moment > maintenant + AVANCE_HORLOGE_MAX:
+            raise ValueError("date_heure_mesure dans le futur")
+        champs["date_heure_mesure"] = moment
+
+    if data.get("sequence_appareil") is not None:
+        sequence = _entier(data["sequence_appareil"], "sequence_appareil")
+        if not 0 <= sequence < 2 ** 63:
+            raise ValueError("sequence_appareil hors limites")
+        champs["sequence_appareil"] = sequence
+
+    if data.get("id_lecture") is not None:
+        try:
+            champs["id_lecture"] = str(uuid.UUID(str(data["id_lecture"])))
+        except ValueError:
+            raise ValueError("id_lecture doit être un UUID")
+    return champs
+
+
+# -------------------------------------------------------------
+# Fonction valider_lecture : dict brut → lecture normalisée
+# -------------------------------------------------------------
+def valider_lecture(data, maintenant=None):
+    if not isinstance(data, dict):
+        raise ValueError("Objet JSON attendu")
+    if not all(champ in data for champ in CHAMPS_OBLIGATOIRES):
+        raise ValueError("Champs obligatoires manquants")
+
+    valeur = data["valeur_mesuree"]
+    if isinstance(valeur, bool) or not isinstance(valeur, (int, float)) or not math.isfinite(valeur):
+        raise ValueError("valeur_mesuree doit être un nombre")
+
+    return {
+        "patient_id": _entier(data["patient_id"], "patient_id"),
+        "capteur_id": _entier(data["capteur_id"], "capteur_id"),
+        "medecin_id": _entier(data["medecin_id"], "medecin_id"),
+        "valeur_mesuree": float(valeur),
+        **champs_appareil(data, maintenant),
+    }
+
+
+# -------------------------------------------------------------
+# Idempotence : réservation des clés avant insertion
+# -------------------------------------------------------------
+def _cles(lecture):
+    cles = []
+    if lecture.get("sequence_appareil") is not None:
+        cles.append(("sequence", lecture["capteur_id"], lecture["sequence_appareil"]))
+    if lecture.get("id_lecture") is not None:
+        cles.append(("id", lecture["id_lecture"]))
+    return cles
+
+
+def _insert_sans_conflit(connexion, table):
+    """INSERT ... ON CONFLICT DO NOTHING du dialecte de la connexion."""
+    dialecte = connexion.dialect.name
+    if dialecte == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as insert_dialecte
+    elif dialecte == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as insert_dialecte
+    else:
+        raise NotImplementedError(f"ON CONFLICT non disponible pour {dialecte}")
+    return insert_dialecte(table).on_conflict_do_nothing()
+
+
+def _inserer_sans_conflit(connexion, lignes):
+    """Clés réellement insérées (RETURNING)."""
+    table = CleIngestion.__table__
+    requete = _insert_sans_conflit(connexion, table).returning(
+        table.c.id, table.c.capteur_id, table.c.sequence_appareil, table.c.id_lecture
+    )
+    return connexion.execute(requete, lignes).all()
+
+
+def _mesures_existantes(connexion, cles):
+    """{clé: donnee_medicale_id} des clés déjà enregistrées."""
+    table = CleIngestion.__table__
+    sequences = [(c[1], c[2]) for c in cles if c[0] == "sequence"]
+    ids = [c[1] for c in cles if c[0] == "id"]
+    conditions = []
+    if sequences:
+        conditions.append(tuple_(table.c.capteur_id, table.c.sequence_appareil).in_(sequences))
+    if ids:
+        conditions.append(table.c.id_lecture.in_(ids))
+    existantes = {}
+    lignes = connexion.execute(select(
+        table.c.capteur_id, table.c.sequence_appareil, table.c.id_lecture, table.c.donnee_medicale_id
+    ).where(or_(*conditions)))
+    for capteur_id, sequence, id_lecture, donnee_id in lignes:
+        if sequence is not None:
+            existantes[("sequence", capteur_id, sequence)] = donnee_id
+        if id_lecture is not None:
+            existantes[("id", id_lecture)] = donnee_id
+    return existantes
+
+
+# -------------------------------------------------------------
+# Fonction reserver_cles : revendique les clés d'un lot de lectures
+# -------------------------------------------------------------
+# - Retourne (reservees, doublons) :
+#   reservees = {indice: id de la clé}, à lier ensuite à la mesure
+#   doublons  = {indice: ("base", donnee_id) | ("lot", indice d'origine)}
+# - La réservation a lieu dans la transaction de l'insertion : un renvoi
+#   concurrent attend la fin de la transaction puis est ignoré
+def reserver_cles(connexion, lectures):
+    reservees, doublons = {}, {}
+    vues, candidates = {}, {}
+    for i, lecture in enumerate(lectures):
+        cles = _cles(lecture)
+        if not cles:
+            continue
+        origine = next((vues[c] for c in cles if c in vues), None)
+        if origine is not None:  # même clé deux fois dans le lot
+            doublons[i] = ("lot", origine)
+            continue
+        for c in cles:
+            vues[c] = i
+        candidates[(lecture["capteur_id"], lecture.get("sequence_appareil"), lecture.get("id_lecture"))] = i
+    if not candidates:
+        return reservees, doublons
+
+    inserees = _inserer_sans_conflit(connexion, [
+        {"capteur_id": capteur_id, "sequence_appareil": sequence, "id_lecture": id_lecture,
+         "date_heure_mesure": lectures[i]["date_heure_mesure"]}
+        for (capteur_id, sequence, id_lecture), i in candidates.items()
+    ])
+    for cle_id, capteur_id, sequence, id_lecture in inserees:
+        reservees[candidates.pop((capteur_id, sequence, id_lecture))] = cle_id
+
+    if candidates:  # clés déjà présentes en base : renvois
+        existantes = _mesures_existantes(connexion, [c for i in candidates.values() for c in _cles(lectures[i])])
+        for i in candidates.values():
+            donnee_id = next((existantes[c] for c in _cles(lectures[i]) if c in existantes), None)
+            doublons[i] = ("base", donnee_id)
+    return reservees, doublons
+
+
+def lier_cles(connexion, liens):
+    """liens : {id de la clé: donnee_medicale_id}."""
+    if not liens:
+        return
+    table = CleIngestion.__table__
+    connexion.execute(
+        update(table).where(table.c.id == bindparam("b_cle")).values(donnee_medicale_id=bindparam("b_donnee")),
+        [{"b_cle": cle_id, "b_donnee": donnee_id} for cle_id, donnee_id in liens.items()],
+    )
+
+
+def relier_cles(connexion, lecture, donnee_id):
+    """Clés déjà présentes d'une lecture dont la mesure n'existe plus : reliées à la nouvelle mesure."""
+    table = CleIngestion.__table__
+    conditions = [
+        (table.c.capteur_id == c[1]) & (table.c.sequence_appareil == c[2]) if c[0] == "sequence"
+        else table.c.id_lecture == c[1]
+        for c in _cles(lecture)
+    ]
+    if conditions:
+        connexion.execute(update(table).where(or_(*conditions)).values(
+            donnee_medicale_id=donnee_id, date_heure_mesure=lecture["date_heure_mesure"]))
+
+
+# -------------------------------------------------------------
+# Fonction mettre_a_jour_etats : dernière mesure et agrégats
+# -------------------------------------------------------------
+# - mesures : dicts {patient_id, capteur_id, medecin_id, donnee_id,
+#   valeur_mesuree, date_heure_mesure, anomalie}, dans n'importe quel ordre
+# - les états concernés sont verrouillés (FOR UPDATE, dans l'ordre des
+#   clés) puis les mesures appliquées dans l'ordre des dates
+# - une mesure plus ancienne que la dernière mesure connue est tardive :
+#   elle s'ajoute aux agrégats sans déplacer la dernière mesure ni
+#   relancer l'analyse des autres mesures (voie de correction)
+# - la première mesure d'un couple ouvre son affectation (patient_capteur)
+#   s'il n'en a pas d'active
+# - retourne les positions des mesures tardives
+def mettre_a_jour_etats(connexion, mesures, maintenant=None):
+    if not mesures:
+        return set()
+    maintenant = maintenant or datetime.utcnow()
+    table = EtatMesure.__table__
+    couples = sorted({(m["patient_id"], m["capteur_id"]) for m in mesures})
+
+    connexion.execute(_insert_sans_conflit(connexion, table), [
+        {"patient_id": p, "capteur_id": c, "nb_mesures": 0, "somme_valeurs": 0.0,
+         "nb_anomalies": 0, "nb_tardives": 0, "date_maj": maintenant}
+        for p, c in couples
+    ])
+    etats = {
+        (ligne.patient_id, ligne.capteur_id): dict(ligne._mapping)
+        for ligne in connexion.execute(
+            select(table)
+            .where(tuple_(table.c.patient_id, table.c.capteur_id).in_(couples))
+            .order_by(table.c.patient_id, table.c.capteur_id)
+            .with_for_update()
+        )
+    }
+
+    # Couple sans aucune mesure : affectation ouverte à sa première mesure
+    nouveaux = {}
+    for m in mesures:
+        couple = (m["patient_id"], m["capteur_id"])
+        if etats[couple]["nb_mesures"] == 0:
+            nouveaux[couple] = min(nouveaux.get(couple, m["date_heure_mesure"]), m["date_heure_mesure"])
+    ouvrir_affectations(connexion, nouveaux)
+
+    tardives = set()
+    ordre = sorted(range(len(mesures)), key=lambda i: (mesures[i]["date_heure_mesure"], mesures[i]["donnee_id"]))
+    for i in ordre:
+        m = mesures[i]
+        etat = etats[(m["patient_id"], m["capteur_id"])]
+        valeur = m["valeur_mesuree"]
+        etat["nb_mesures"] += 1
+        etat["somme_valeurs"] += valeur
+        etat["valeur_min"] = valeur if etat["valeur_min"] is None else min(etat["valeur_min"], valeur)
+        etat["valeur_max"] = valeur if etat["valeur_max"] is None else max(etat["valeur_max"], valeur)
+        etat["nb_anomalies"] += 1 if m["anomalie"] else 0
+        if etat["date_derniere_mesure"] is not None and m["date_heure_mesure"] < etat["date_derniere_mesure"]:
+            etat["nb_tardives"] += 1
+            tardives.add(i)
+        else:
+            etat["medecin_id"] = m["medecin_id"]
+            etat["derniere_donnee_id"] = m["donnee_id"]
+            etat["derniere_valeur"] = valeur
+            etat["date_derniere_mesure"] = m["date_heure_mesure"]
+
+    colonnes = ("medecin_id", "derniere_donnee_id", "derniere_valeur", "date_derniere_mesure", "nb_mesures",
+                "somme_valeurs", "valeur_min", "valeur_max", "nb_anomalies", "nb_tardives")
+    connexion.execute(
+        update(table)
+        .where(table.c.patient_id == bindparam("b_patient"), table.c.capteur_id == bindparam("b_capteur"))
+        .values(date_maj=maintenant, **{c: bindparam(f"b_{c}") for c in colonnes}),
+        [
+            {"b_patient": p, "b_capteur": c, **{f"b_{col}": etats[(p, c)][col] for col in colonnes}}
+            for p, c in couples
+        ],
+    )
+    return tardives
+
+
+# -------------------------------------------------------------
+# Fonction recalculer_etats : états reconstruits depuis les mesures
+# -------------------------------------------------------------
+# - couples : (patient_id, capteur_id) dont des mesures ont été
+#   supprimées ou écrites hors ingestion (seed-load) ; dernière mesure et
+#   agrégats relus dans donnees_medicales, nb_anomalies = mesures ayant
+#   une alerte (comme la migration initiale)
+# - un couple sans mesure perd son état ; medecin_id et nb_tardives sont
+#   conservés. Un couple sans état en reçoit un, medecin_id repris de
+#   l'analyse de sa dernière mesure
+# - le score de risque (écarts) reste à mettre à jour par l'appelant
+def recalculer_etats(connexion, couples, maintenant=None):
+    couples = sorted(set(couples))
+    if not couples:
+        return
+    maintenant = maintenant or datetime.utcnow()
+    table, mesures, alertes = EtatMesure.__table__, DonneesMedicale.__table__, Alerte.__table__
+    filtre = tuple_(mesures.c.patient_id, mesures.c.capteur_id).in_(couples)
+
+    agregats = {
+        (ligne.patient_id, ligne.capteur_id): dict(ligne._mapping)
+        for ligne in connexion.execute(
+            select(mesures.c.patient_id, mesures.c.capteur_id,
+                   func.count().label("nb_mesures"),
+                   func.sum(mesures.c.valeur_mesuree).label("somme_valeurs"),
+                   func.min(mesures.c.valeur_mesuree).label("valeur_min"),
+                   func.max(mesures.c.valeur_mesuree).label("valeur_max"),
+                   func.sum(case((exists().where(alertes.c.donnee_medicale_id == mesures.c.id), 1),
+                                 else_=0)).label("nb_anomalies"))
+            .where(filtre)
+            .group_by(mesures.c.patient_id, mesures.c.capteur_id)
+        )
+    }
+    rang = func.row_number().over(
+        partition_by=(mesures.c.patient_id, mesures.c.capteur_id),
+        order_by=(mesures.c.date_heure_mesure.desc(), mesures.c.id.desc()),
+    ).label("rang")
+    dernieres = select(mesures.c.patient_id, mesures.c.capteur_id, mesures.c.id, mesures.c.valeur_mesuree,
+                       mesures.c.date_heure_mesure, rang).where(filtre).subquery()
+    for ligne in connexion.execute(select(dernieres).where(dernieres.c.rang == 1)):
+        agregats[(ligne.patient_id, ligne.capteur_id)].update(
+            derniere_donnee_id=ligne.id, derniere_valeur=ligne.valeur_mesuree,
+            date_derniere_mesure=ligne.date_heure_mesure)
+
+    vides = [couple for couple in couples if couple not in agregats]
+    if vides:
+        connexion.execute(delete(table).where(tuple_(table.c.patient_id, table.c.capteur_id).in_(vides)))
+    existants = set(connexion.execute(
+        select(table.c.patient_id, table.c.capteur_id)
+        .where(tuple_(table.c.patient_id, table.c.capteur_id).in_(list(agregats)))
+    ).all()) if agregats else set()
+    colonnes = ("derniere_donnee_id", "derniere_valeur", "date_derniere_mesure", "nb_mesures",
+                "somme_valeurs", "valeur_min", "valeur_max", "nb_anomalies")
+    if existants:
+        connexion.execute(
+            update(table)
+            .where(table.c.patient_id == bindparam("b_patient"), table.c.capteur_id == bindparam("b_capteur"))
+            .values(date_maj=maintenant, **{c: bindparam(f"b_{c}") for c in colonnes}),
+            [
+                {"b_patient": p, "b_capteur": c, **{f"b_{col}": agregats[(p, c)][col] for col in colonnes}}
+                for p, c in existants
+            ],
+        )
+    nouveaux = [agregats[couple] for couple in agregats if couple not in existants]
+    if nouveaux:
+        analyses = Analyseur.__table__
+        medecins = dict(connexion.execute(
+            select(analyses.c.donnee_medicale_id, analyses.c.medecin_id)
+            .where(tuple_(analyses.c.donnee_medicale_id, analyses.c.date_heure_mesure).in_(
+                [(etat["derniere_donnee_id"], etat["date_derniere_mesure"]) for etat in nouveaux]))
+        ).all())
+        connexion.execute(insert(table), [
+            {"patient_id": etat["patient_id"], "capteur_id": etat["capteur_id"],
+             "medecin_id": medecins.get(etat["derniere_donnee_id"]), "nb_tardives": 0, "date_maj": maintenant,
+             **{col: etat[col] for col in colonnes}}
+            for etat in nouveaux
+        ])
+
+
+def _existants(connexion, colonne, ids):
+    return set(connexion.scalars(select(colonne).where(colonne.in_(ids))))
+
+
+# -------------------------------------------------------------
+# Fonction enregistrer_lot : insère un lot de lectures validées
+# -------------------------------------------------------------
+# - Retourne {enregistrees, alertes, rejets, doublons, tardives} :
+#   rejets   = [(indice, erreur)] : une référence n'existe pas
+#   doublons = [(indice, donnee_id)] : clé d'idempotence déjà reçue,
+#              rien n'est réécrit (ni mesure, ni analyse, ni alerte)
+#   tardives = [indice] : enregistrées, mais plus anciennes que la
+#              dernière mesure de leur couple (voir mettre_a_jour_etats)
+# - Scores de risque des patients du lot mis à jour dans la transaction
+#   (demi_vie : RISQUE_DEMI_VIE_H, hors contexte d'application)
+def enregistrer_lot(connexion, lectures, demi_vie=None):
+    if not lectures:
+        return {"enregistrees": 0, "alertes": 0, "rejets": [], "doublons": [], "tardives": []}
+
+    patients = _existants(connexion, Patient.id, {l["patient_id"] for l in lectures})
+    medecins = _existants(connexion, Medecin.id, {l["medecin_id"] for l in lectures})
+    types_capteurs = dict(connexion.execute(
+        select(Capteur.id, Capteur.type).where(Capteur.id.in_({l["capteur_id"] for l in lectures}))
+    ).all())
+
+    valides, rejets = [], []
+    for i, l in enumerate(lectures):
+        if (l["patient_id"] not in patients or l["capteur_id"] not in types_capteurs
+                or l["medecin_id"] not in medecins):
+            rejets.append((i, "Patient, capteur ou médecin introuvable"))
+        else:
+            valides.append(i)
+
+    reservees, doublons = reserver_cles(connexion, [lectures[i] for i in valides])
+    a_inserer = [i for j, i in enumerate(valides) if j not in doublons]
+    ids = {}
+    if a_inserer:
+        ids = dict(zip(a_inserer, connexion.scalars(
+            insert(DonneesMedicale).returning(DonneesMedicale.id, sort_by_parameter_order=True),
+            [
+                {"patient_id": lectures[i]["patient_id"], "capteur_id": lectures[i]["capteur_id"],
+                 "valeur_mesuree": lectures[i]["valeur_mesuree"],
+                 "date_heure_mesure": lectures[i]["date_heure_mesure"]}
+                for i in a_inserer
+            ],
+        ).all()))
+        lier_cles(connexion, {cle_id: ids[valides[j]] for j, cle_id in reservees.items()})
+
+    maintenant = datetime.utcnow()
+    analyses, alertes, mesures = [], [], []
+    for i in a_inserer:
+        l = lectures[i]
+        resultat, seuil, anomalie = evaluer_valeur(types_capteurs[l["capteur_id"]], l["valeur_mesuree"])
+        mesures.append({**l, "donnee_id": ids[i], "anomalie": anomalie})
+        analyses.append({
+            "patient_id": l["patient_id"], "medecin_id": l["medecin_id"],
+            "donnee_medicale_id": ids[i], "date_heure_mesure": l["date_heure_mesure"],
+            "resultat": resultat,
+        })
+        if anomalie:
+            alertes.append({
+                "patient_id": l["patient_id"], "medecin_id": l["medecin_id"],
+                "donnee_medicale_id": ids[i],
+                "niveau_urgence": seuil["niveau_urgence"], "type_alerte": seuil["type_alerte"],
+                "description": resultat, "etat_traitement": False, "date_heure_alerte": maintenant,
+            })
+
+    if analyses:
+        connexion.execute(insert(Analyseur), analyses)
+    if alertes:
+        mettre_en_file(connexion, connexion.scalars(insert(Alerte).returning(Alerte.id), alertes).all())
+    tardives = mettre_a_jour_etats(connexion, mesures, maintenant)
+    mettre_a_jour_scores(
+        connexion,
+        alertes=[{**a, "signe": 1} for a in alertes],
+        mesures={m["patient_id"]: m["medecin_id"]
+                 for m in sorted(mesures, key=lambda m: m["date_heure_mesure"])},
+        maintenant=maintenant, demi_vie=demi_vie,
+    )
+
+    rapport_doublons = []
+    for j, (source, valeur) in sorted(doublons.items()):
+        donnee_id = ids.get(valides[valeur]) if source == "lot" else valeur
+        rapport_doublons.append((valides[j], donnee_id))
+    return {"enregistrees": len(a_inserer), "alertes": len(alertes), "rejets": rejets,
+            "doublons": rapport_doublons, "tardives": [a_inserer[j] for j in sorted(tardives)]}
+
+
+def fenetre_depuis_config(config):
+    """Fenêtre de réordonnancement d'une requête d'ingestion."""
+    return FenetreReordonnancement(
+        retard_max_s=config.get("INGESTION_RETARD_MAX_S", 30),
+        capacite=config.get("INGESTION_FENETRE_MAX", 10000),
+    )
+
+
+def _nouveau_morceau():
+    return {"lectures": [], "numeros": [], "erreurs": [], "rejetees": 0,
+            "premier": None, "dernier": None}
+
+
+def _rejeter(morceau, numero, erreur, erreurs_max):
+    morceau["rejetees"] += 1
+    if len(morceau["erreurs"]) < erreurs_max:
+        morceau["erreurs"].append({"ligne": numero, "erreur": erreur})
+
+
+def _enregistrer_morceau(morceau, total, erreurs_max):
+    """Une transaction par morceau ; retourne le bilan du morceau."""
+    rapport = enregistrer_lot(db.session.connection(), morceau["lectures"])
+    db.session.commit()
+    for indice, erreur in rapport["rejets"]:
+        _rejeter(morceau, morceau["numeros"][indice], erreur, erreurs_max)
+    doublons = [
+        {"ligne": morceau["numeros"][indice], "donnee_id": donnee_id}
+        for indice, donnee_id in rapport["doublons"]
+    ]
+
+    # Un morceau peut ne contenir que des lectures libérées par la fenêtre
+    recues = morceau["dernier"] - morceau["premier"] + 1 if morceau["premier"] is not None else 0
+    total["morceaux"] += 1
+    total["enregistrees"] += rapport["enregistrees"]
+    total["alertes"] += rapport["alertes"]
+    total["rejetees"] += morceau["rejetees"]
+    total["doublons"] += len(doublons)
+    total["tardives"] += len(rapport["tardives"])
+    return {
+        "morceau": total["morceaux"],
+        "lignes": [morceau["premier"], morceau["dernier"]] if recues else None,
+        "recues": recues,
+        "enregistrees": rapport["enregistrees"],
+        "alertes": rapport["alertes"],
+        "rejetees": morceau["rejetees"],
+        "doublons": len(doublons),
+        "tardives": len(rapport["tardives"]),
+        "erreurs": morceau["erreurs"],
+        "doublons_detail": doublons[:erreurs_max],
+    }
+
+
+# -------------------------------------------------------------
+# Fonction ingerer_flux : corps de requête décodé → bilans par morceau
+# -------------------------------------------------------------
+# - enregistrements : (numero, objet, erreur) produits au fil de l'eau
+#   par app/utils/flux_lectures.py
+# - un morceau de taille_morceau enregistrements = une transaction ;
+#   seul le morceau courant (et la fenêtre de réordonnancement) est
+#   gardé en mémoire
+# - les lectures portant date_heure_mesure passent par la fenêtre et
+#   sont enregistrées dans l'ordre des mesures ; confirmees_jusqu_a
+#   s'arrête avant la première lecture encore en attente
+# - produit un bilan par morceau puis un bilan final ; une erreur de
+#   flux ou de base arrête l'ingestion (les morceaux précédents restent
+#   enregistrés, jusqu'à confirmees_jusqu_a)
+# - source : source authentifiée (voir autorisation.source_ingestion) ;
+#   appareil ou passerelle : patient, capteur et médecin résolus par le
+#   registre (completer_lecture), lecture refusée sinon
+def ingerer_flux(enregistrements, taille_morceau=500, erreurs_max=20, fenetre=None, source=None):
+    fenetre = fenetre or fenetre_depuis_config(current_app.config)
+    total = {"recues": 0, "enregistrees": 0, "alertes": 0, "rejetees": 0, "doublons": 0,
+             "tardives": 0, "reordonnees": 0, "morceaux": 0}
+    confirmees = 0
+    morceau = _nouveau_morceau()
+
+    def ajouter(liberees):
+        for numero, lecture in liberees:
+            morceau["lectures"].append(lecture)
+            morceau["numeros"].append(numero)
+
+    try:
+        for numero, objet, erreur in enregistrements:
+            total["recues"] += 1
+            if morceau["premier"] is None:
+                morceau["premier"] = numero
+            morceau["dernier"] = numero
+            if erreur is None:
+                try:
+                    lecture = valider_lecture(completer_lecture(objet, source))
+                    if objet.get("date_heure_mesure") is not None:
+                        ajouter(fenetre.ajouter(numero, lecture))
+                    else:  # horodatée à la réception : déjà dans l'ordre
+                        ajouter([(numero, lecture)])
+                except (ValueError, PermissionError) as e:
+                    erreur = str(e)
+            if erreur is not None:
+                _rejeter(morceau, numero, erreur, erreurs_max)
+            total["reordonnees"] = fenetre.reordonnees
+
+            if numero - morceau["premier"] + 1 >= taille_morceau:
+                yield _enregistrer_morceau(morceau, total, erreurs_max)
+                en_attente = fenetre.premier_en_attente()
+                confirmees = numero if en_attente is None else en_attente - 1
+                morceau = _nouveau_morceau()
+
+        ajouter(fenetre.vider())
+        if morceau["premier"] is not None or morceau["lectures"]:
+            yield _enregistrer_morceau(morceau, total, erreurs_max)
+        confirmees = total["recues"]
+    except ValueError as e:  # flux illisible (ErreurFlux) : arrêt
+        db.session.rollback()
+        yield {"error": str(e), "confirmees_jusqu_a": confirmees, "total": total}
+        return
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Échec de l'ingestion en flux : %s", e)
+        yield {"error": "Enregistrement impossible", "confirmees_jusqu_a": confirmees, "total": total}
+        return
+    yield {"termine": True, "confirmees_jusqu_a": confirmees, "total": total}
@@ -1,5 +1,8 @@
 from app import db
 from app.models.medecin import Medecin
+from app.services.auth_service import invalider_profil
+from app.services.suppression_service import supprimer_medecin
+from app.utils.replicas import lecture_replica
 
 # -------------------------------------------------------------
 # Fonction create_medecin : crée un nouveau médecin
@@ -25,16 +28,17 @@ def create_medecin(data):
 # -------------------------------------------------------------
 # Fonction get_all_medecins : liste tous les médecins
 # -------------------------------------------------------------
-# - Retourne tous les objets Medecin présents en base
+# - Retourne tous les objets Medecin présents en base, hors médecins archivés
+@lecture_replica
 def get_all_medecins():
-    return Medecin.query.all()
+    return Medecin.query.filter(Medecin.date_suppression.is_(None)).all()
 
 # -------------------------------------------------------------
 # Fonction get_medecin_by_id : récupère un médecin par ID
 # -------------------------------------------------------------
-# - Retourne l’objet Medecin correspondant à l’ID donné
+# - Retourne l’objet Medecin correspondant à l’ID donné (None si archivé)
 def get_medecin_by_id(id):
-    return Medecin.query.get(id)
+    return Medecin.query.filter_by(id=id, date_suppression=None).first()
 
 # -------------------------------------------------------------
 # Fonction get_medecin_by_email : récupère un médecin par son Email
@@ -55,15 +59,16 @@ def update_medecin(medecin, data):
     medecin.adresse = data.get("adresse", medecin.adresse)
     medecin.specialite = data.get("specialite", medecin.specialite)
     db.session.commit()
+    invalider_profil(medecin.id)
     return medecin
 
 # -------------------------------------------------------------
 # Fonction delete_medecin : supprime un médecin
 # -------------------------------------------------------------
-# - Supprime l’objet Medecin de la base
-def delete_medecin(medecin):
-    db.session.delete(medecin)
-    db.session.commit()
+# - Archivage seulement si le médecin a un historique clinique
+#   (ValueError sinon, voir suppression_service)
+def delete_medecin(medecin, douce=False):
+    return supprimer_medecin(medecin.id, douce=douce)
 
 # -------------------------------------------------------------
 # medecin_service.py : logique métier liée aux médecins
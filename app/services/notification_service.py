@@ -0,0 +1,218 @@
+# -------------------------------------------------------------
+# app/services/notification_service.py
+# -------------------------------------------------------------
+# Notification des alertes par e-mail, via une file transactionnelle
+# (table notifications) :
+# - mettre_en_file : appelée dans la transaction qui crée les alertes ;
+#   une ligne par destinataire (médecin de l'alerte, proches du
+#   patient), insérée par un seul INSERT ... SELECT. Aucun envoi SMTP
+#   pendant l'ingestion.
+# - traiter_lot : appelé en boucle par `flask notify-worker` ; réclame
+#   les notifications dues (FOR UPDATE SKIP LOCKED sous PostgreSQL :
+#   plusieurs workers possibles), les regroupe par destinataire en un
+#   seul e-mail et les envoie sur une seule connexion SMTP
+# - une alerte critique est due aussitôt ; les autres attendent
+#   NOTIFICATIONS_DELAI_RESUME_S pour être regroupées. Un envoi emporte
+#   toutes les notifications en attente du destinataire.
+# - échec : nouvel essai après NOTIFICATIONS_ATTENTE_S * 2^(n-1)
+#   secondes (plafonnée à NOTIFICATIONS_ATTENTE_MAX_S), abandon (état
+#   echec) après NOTIFICATIONS_ESSAIS_MAX tentatives
+# - alerte acquittée avant l'envoi : notification close (état annulee)
+#   sans e-mail
+# -------------------------------------------------------------
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import select, insert, update, delete, literal, union_all, or_, and_, bindparam, \
+    String, Integer, DateTime
+
+from app.extension import db, mail
+from app.models import Alerte, Notification, Patient, Personne, Proche, UrgenceEnum
+
+ETATS_FINAUX = ("envoyee", "echec", "annulee")
+
+
+# -------------------------------------------------------------
+# Fonction mettre_en_file : notifications des alertes créées
+# -------------------------------------------------------------
+# - connexion : celle de la transaction qui insère les alertes
+#   (Connection synchrone, comme ingestion_service.enregistrer_lot)
+def mettre_en_file(connexion, alerte_ids, maintenant=None):
+    if not alerte_ids:
+        return
+    maintenant = maintenant or datetime.utcnow()
+    communs = (
+        (Alerte.niveau_urgence == UrgenceEnum.critique).label("critique"),
+        literal("en_attente", String).label("etat"),
+        literal(0, Integer).label("tentatives"),
+        literal(maintenant, DateTime).label("prochain_essai"),
+        literal(maintenant, DateTime).label("date_creation"),
+    )
+    medecins = (
+        select(Alerte.id, Personne.id, Personne.email, *communs)
+        .join(Personne, Personne.id == Alerte.medecin_id)
+        .where(Alerte.id.in_(alerte_ids))
+    )
+    proches = (
+        select(Alerte.id, Proche.id, Proche.email, *communs)
+        .join(Proche, Proche.patient_id == Alerte.patient_id)
+        .where(Alerte.id.in_(alerte_ids))
+    )
+    connexion.execute(insert(Notification).from_select(
+        ["alerte_id", "destinataire_id", "email", "critique", "etat", "tentatives",
+         "prochain_essai", "date_creation"],
+        union_all(medecins, proches),
+    ))
+
+
+# -------------------------------------------------------------
+# Composition des e-mails
+# -------------------------------------------------------------
+def _details_alertes(alerte_ids):
+    lignes = db.session.execute(
+        select(Alerte.id, Alerte.niveau_urgence, Alerte.type_alerte, Alerte.description,
+               Alerte.date_heure_alerte, Patient.prenom, Patient.nom)
+        .join(Patient, Patient.id == Alerte.patient_id)
+        .where(Alerte.id.in_(alerte_ids), Alerte.etat_traitement.is_not(True))
+    )
+    return {ligne.id: ligne for ligne in lignes}
+
+
+def composer_message(alertes):
+    """Un e-mail pour les alertes d'un destinataire, critiques d'abord."""
+    alertes = sorted(alertes, key=lambda a: (a.niveau_urgence != UrgenceEnum.critique,
+                                             a.date_heure_alerte or datetime.min))
+    critiques = sum(a.niveau_urgence == UrgenceEnum.critique for a in alertes)
+    if len(alertes) == 1:
+        a = alertes[0]
+        sujet = f"[e-Santé] Alerte {a.niveau_urgence.value} - {a.prenom} {a.nom}"
+    else:
+        sujet = f"[e-Santé] {len(alertes)} alertes, dont {critiques} critique(s)"
+    corps = ["Alertes en attente de traitement :", ""]
+    for a in alertes:
+        date = f"{a.date_heure_alerte:%d/%m/%Y %H:%M}" if a.date_heure_alerte else "-"
+        corps.append(f"- {date} [{a.niveau_urgence.value} / {a.type_alerte.value}] "
+                     f"{a.prenom} {a.nom} : {a.description or ''}")
+    return sujet, "\n".join(corps)
+
+
+def _attente(config, tentatives):
+    attente = config.get("NOTIFICATIONS_ATTENTE_S", 30) * 2 ** (tentatives - 1)
+    return timedelta(seconds=min(attente, config.get("NOTIFICATIONS_ATTENTE_MAX_S", 3600)))
+
+
+# -------------------------------------------------------------
+# Fonction traiter_lot : un passage du notify-worker
+# -------------------------------------------------------------
+# - Retourne {dues, emails, notifications, echecs, abandons} ; dues vaut
+#   taille_lot quand d'autres notifications attendent probablement
+# - Les verrous des lignes réclamées sont gardés jusqu'au commit final :
+#   un autre worker passe aux destinataires suivants
+def traiter_lot(taille_lot=None, maintenant=None):
+    config = current_app.config
+    taille_lot = taille_lot or config.get("NOTIFICATIONS_TAILLE_LOT", 100)
+    maintenant = maintenant or datetime.utcnow()
+    bilan = {"dues": 0, "emails": 0, "notifications": 0, "echecs": 0, "abandons": 0}
+
+    delai_resume = timedelta(seconds=config.get("NOTIFICATIONS_DELAI_RESUME_S", 60))
+    dues = db.session.execute(
+        select(Notification.email)
+        .where(
+            Notification.etat == "en_attente",
+            or_(
+                Notification.prochain_essai <= maintenant - delai_resume,
+                and_(or_(Notification.critique, Notification.tentatives > 0),
+                     Notification.prochain_essai <= maintenant),
+            ),
+        )
+        .order_by(Notification.prochain_essai)
+        .limit(taille_lot)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    bilan["dues"] = len(dues)
+    if not dues:
+        db.session.rollback()
+        return bilan
+
+    # Toutes les notifications en attente de ces destinataires : un résumé
+    # chacun ; celles d'alertes déjà acquittées sont closes sans envoi
+    reclamees = db.session.execute(
+        select(Notification.id, Notification.alerte_id, Notification.email, Notification.tentatives,
+               Alerte.etat_traitement.is_(True).label("acquittee"))
+        .join(Alerte, Alerte.id == Notification.alerte_id)
+        .where(Notification.etat == "en_attente", Notification.email.in_(set(dues)))
+        .with_for_update(skip_locked=True, of=Notification)
+    ).all()
+    annulees = [n.id for n in reclamees if n.acquittee]
+    alertes = _details_alertes({n.alerte_id for n in reclamees if not n.acquittee})
+    # Alerte acquittée entre les deux lectures : close elle aussi
+    annulees += [n.id for n in reclamees if not n.acquittee and n.alerte_id not in alertes]
+    notifications = [n for n in reclamees if n.alerte_id in alertes]
+    par_destinataire = defaultdict(list)
+    for n in notifications:
+        par_destinataire[n.email].append(n)
+
+    envoyees, echecs = [], {}
+    try:
+        with mail.connect() as smtp:   # une connexion SMTP pour tout le lot
+            for email, groupe in par_destinataire.items():
+                sujet, corps = composer_message([alertes[n.alerte_id] for n in groupe])
+                try:
+                    smtp.send(Message(sujet, recipients=[email], body=corps))
+                    envoyees += [n.id for n in groupe]
+                    bilan["emails"] += 1
+                except Exception as e:
+                    echecs.update((n.id, (n.tentatives, str(e))) for n in groupe)
+    except Exception as e:   # connexion SMTP perdue : le reste du lot est à refaire
+        current_app.logger.warning("Serveur SMTP indisponible : %s", e)
+        traitees = set(envoyees) | set(echecs)
+        echecs.update((n.id, (n.tentatives, str(e))) for n in notifications if n.id not in traitees)
+
+    if annulees:
+        db.session.execute(
+            update(Notification).where(Notification.id.in_(annulees)).values(etat="annulee")
+        )
+    if envoyees:
+        db.session.execute(
+            update(Notification).where(Notification.id.in_(envoyees))
+            .values(etat="envoyee", date_envoi=maintenant, tentatives=Notification.tentatives + 1)
+        )
+    if echecs:
+        essais_max = config.get("NOTIFICATIONS_ESSAIS_MAX", 8)
+        lignes = []
+        for notification_id, (tentatives, erreur) in echecs.items():
+            tentatives += 1
+            abandon = tentatives >= essais_max
+            if abandon:
+                bilan["abandons"] += 1
+            lignes.append({
+                "b_id": notification_id, "b_tentatives": tentatives,
+                "b_etat": "echec" if abandon else "en_attente",
+                "b_prochain": maintenant + _attente(config, tentatives), "b_erreur": erreur[:255],
+            })
+        table = Notification.__table__
+        db.session.connection().execute(
+            update(table).where(table.c.id == bindparam("b_id")).values(
+                tentatives=bindparam("b_tentatives"), etat=bindparam("b_etat"),
+                prochain_essai=bindparam("b_prochain"), derniere_erreur=bindparam("b_erreur"),
+            ),
+            lignes,
+        )
+    db.session.commit()
+    bilan["notifications"] = len(envoyees)
+    bilan["echecs"] = len(echecs)
+    return bilan
+
+
+# -------------------------------------------------------------
+# Fonction purger_notifications : supprime l'historique ancien
+# -------------------------------------------------------------
+def purger_notifications(avant):
+    resultat = db.session.execute(
+        delete(Notification).where(Notification.etat.in_(ETATS_FINAUX), Notification.date_creation < avant)
+    )
+    db.session.commit()
+    return resultat.rowcount
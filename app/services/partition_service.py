@@ -0,0 +1,194 @@
+# -------------------------------------------------------------
+# app/services/partition_service.py
+# -------------------------------------------------------------
+# Partitionnement mensuel (PostgreSQL, RANGE sur date_heure_mesure)
+# de donnees_medicales et analyseur :
+# - une partition par mois et par table : <table>_pAAAA_MM
+# - une partition par défaut (<table>_defaut) recueille les mesures
+#   hors des mois créés (horloge d'un capteur déréglée, ...)
+# - maintenir_partitions : crée les mois à venir et, selon la
+#   politique de rétention, détache les mois trop anciens puis les
+#   archive en CSV gzip avant de les supprimer
+# analyseur porte la date de la mesure analysée : les deux tables
+# ont exactement les mêmes bornes mensuelles, ce qui permet de
+# créer ou détacher un mois sans violer la clé étrangère composite.
+# Sur un autre SGBD (SQLite en développement) tout est sans effet.
+# -------------------------------------------------------------
+
+import gzip
+import os
+import re
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+from app.extension import db
+
+# Ordre de création ; la rétention détache dans l'ordre inverse
+# (analyseur référence donnees_medicales)
+TABLES_PARTITIONNEES = ("donnees_medicales", "analyseur")
+COLONNE_PARTITION = "date_heure_mesure"
+_SUFFIXE = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def debut_mois(d):
+    return date(d.year, d.month, 1)
+
+
+def decaler_mois(mois, n):
+    index = mois.year * 12 + mois.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def nom_partition(table, mois):
+    return f"{table}_p{mois:%Y_%m}"
+
+
+def mois_entre(debut, fin):
+    """Premiers jours des mois de debut à fin inclus."""
+    mois, dernier = debut_mois(debut), debut_mois(fin)
+    while mois <= dernier:
+        yield mois
+        mois = decaler_mois(mois, 1)
+
+
+# -------------------------------------------------------------
+# Fonction est_partitionnee : table parent partitionnée ?
+# -------------------------------------------------------------
+def est_partitionnee(table):
+    if db.engine.dialect.name != "postgresql":
+        return False
+    return bool(db.session.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+    ), {"table": table}).scalar())
+
+
+# -------------------------------------------------------------
+# Fonction partitions_mensuelles : {mois: nom} des partitions attachées
+# -------------------------------------------------------------
+def partitions_mensuelles(table):
+    noms = db.session.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table AND pg_table_is_visible(p.oid)"
+    ), {"table": table}).scalars()
+
+    partitions = {}
+    for nom in noms:
+        trouve = _SUFFIXE.search(nom)
+        if trouve:
+            partitions[date(int(trouve.group(1)), int(trouve.group(2)), 1)] = nom
+    return partitions
+
+
+# -------------------------------------------------------------
+# Fonction creer_mois : crée et attache le mois des tables données
+# -------------------------------------------------------------
+# - Les lignes du mois déjà tombées dans les partitions par défaut y
+#   sont déplacées avant l'attachement (sinon ATTACH échoue) : les
+#   analyses d'abord, pour que la suppression des mesures ne viole pas
+#   la clé étrangère, puis l'attachement valide la clé sur le parent
+# - ATTACH ne verrouille le parent qu'en SHARE UPDATE EXCLUSIVE :
+#   les insertions continuent pendant l'opération
+def creer_mois(mois, tables=TABLES_PARTITIONNEES):
+    debut, fin = mois.isoformat(), decaler_mois(mois, 1).isoformat()
+    bornes = {"debut": debut, "fin": fin}
+
+    for table in reversed(tables):
+        enfant = nom_partition(table, mois)
+        db.session.execute(text(
+            f"CREATE TABLE {enfant} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ))
+        db.session.execute(text(
+            f"WITH deplacees AS ("
+            f"  DELETE FROM {table}_defaut "
+            f"  WHERE {COLONNE_PARTITION} >= :debut AND {COLONNE_PARTITION} < :fin "
+            f"  RETURNING *) "
+            f"INSERT INTO {enfant} SELECT * FROM deplacees"
+        ), bornes)
+
+    for table in tables:
+        db.session.execute(text(
+            f"ALTER TABLE {table} ATTACH PARTITION {nom_partition(table, mois)} "
+            f"FOR VALUES FROM ('{debut}') TO ('{fin}')"
+        ))
+    return [nom_partition(table, mois) for table in tables]
+
+
+# -------------------------------------------------------------
+# Fonction assurer_partitions : tous les mois de debut à fin existent
+# -------------------------------------------------------------
+def assurer_partitions(debut, fin):
+    if not est_partitionnee(TABLES_PARTITIONNEES[0]):
+        return []
+
+    creees = []
+    existantes = {table: partitions_mensuelles(table) for table in TABLES_PARTITIONNEES}
+    for mois in mois_entre(debut, fin):
+        manquantes = tuple(t for t in TABLES_PARTITIONNEES if mois not in existantes[t])
+        if manquantes:
+            creees.extend(creer_mois(mois, manquantes))
+            db.session.commit()
+    return creees
+
+
+# -------------------------------------------------------------
+# Fonction archiver_partition : COPY ... TO STDOUT vers un CSV gzip
+# -------------------------------------------------------------
+def archiver_partition(nom, dossier):
+    os.makedirs(dossier, exist_ok=True)
+    chemin = os.path.join(dossier, f"{nom}.csv.gz")
+    curseur = db.session.connection().connection.cursor()
+    with gzip.open(chemin, "wb") as fichier:
+        curseur.copy_expert(f"COPY {nom} TO STDOUT WITH (FORMAT csv, HEADER)", fichier)
+    curseur.close()
+    return chemin
+
+
+# -------------------------------------------------------------
+# Fonction appliquer_retention : détache (et archive) les vieux mois
+# -------------------------------------------------------------
+# - retention_mois : nombre de mois conservés, mois courant compris
+# - dossier_archive : sans dossier, les tables détachées sont gardées
+#   telles quelles (hors des requêtes applicatives)
+def appliquer_retention(retention_mois, dossier_archive=None, aujourd_hui=None):
+    if not retention_mois or not est_partitionnee(TABLES_PARTITIONNEES[0]):
+        return []
+
+    limite = decaler_mois(debut_mois(aujourd_hui or datetime.utcnow()), -(retention_mois - 1))
+    detachees = []
+    for table in reversed(TABLES_PARTITIONNEES):
+        for mois, nom in sorted(partitions_mensuelles(table).items()):
+            if mois >= limite:
+                continue
+            db.session.execute(text(f"ALTER TABLE {table} DETACH PARTITION {nom}"))
+            archive = None
+            if dossier_archive:
+                archive = archiver_partition(nom, dossier_archive)
+                db.session.execute(text(f"DROP TABLE {nom}"))
+            db.session.commit()
+            detachees.append({"partition": nom, "archive": archive})
+
+    if detachees:
+        # Clés d'idempotence des mesures sorties de la rétention
+        db.session.execute(
+            text("DELETE FROM cles_ingestion WHERE date_heure_mesure < :limite"),
+            {"limite": datetime(limite.year, limite.month, 1)},
+        )
+        db.session.commit()
+    return detachees
+
+
+# -------------------------------------------------------------
+# Fonction maintenir_partitions : point d'entrée de `flask partitions maintain`
+# -------------------------------------------------------------
+def maintenir_partitions(mois_avance=3, retention_mois=0, dossier_archive=None,
+                         aujourd_hui=None):
+    mois_courant = debut_mois(aujourd_hui or datetime.utcnow())
+    return {
+        "partitionnee": est_partitionnee(TABLES_PARTITIONNEES[0]),
+        "creees": assurer_partitions(mois_courant, decaler_mois(mois_courant, mois_avance)),
+        "detachees": appliquer_retention(retention_mois, dossier_archive, mois_courant),
+    }
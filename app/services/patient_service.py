@@ -1,9 +1,12 @@
 from app import db
 from app.models import Patient, Proche, Personne
+from app.services.auth_service import invalider_profil
+from app.services.suppression_service import supprimer_patient
 from sqlalchemy.exc import IntegrityError
 import logging
 
 from app.utils.validation import validate_fields
+from app.utils.replicas import lecture_replica
 
 logger = logging.getLogger(__name__)
 
@@ -83,16 +86,17 @@ def create_proche(data, patient_id):
 # -------------------------------------------------------------
 # Fonction get_all_patients : liste tous les patients
 # -------------------------------------------------------------
-# - Retourne tous les objets Patient présents en base
+# - Retourne tous les objets Patient présents en base, hors patients archivés
+@lecture_replica
 def get_all_patients():
-    return Patient.query.all()
+    return Patient.query.filter(Patient.date_suppression.is_(None)).all()
 
 # -------------------------------------------------------------
 # Fonction get_patient_by_id : récupère un patient par ID
 # -------------------------------------------------------------
-# - Retourne l’objet Patient correspondant à l’ID donné
+# - Retourne l’objet Patient correspondant à l’ID donné (None si archivé)
 def get_patient_by_id(id):
-    return Patient.query.get(id)
+    return Patient.query.filter_by(id=id, date_suppression=None).first()
 
 # -------------------------------------------------------------
 # Fonction get_patient_by_email : vérifie si un email est déjà utilisé
@@ -113,15 +117,15 @@ def update_patient(patient, data):
     patient.email = data.get("email", patient.email)
     patient.adresse = data.get("adresse", patient.adresse)
     db.session.commit()
+    invalider_profil(patient.id)
     return patient
 
 # -------------------------------------------------------------
 # Fonction delete_patient : supprime un patient
 # -------------------------------------------------------------
-# - Supprime l’objet Patient de la base
-def delete_patient(patient):
-    db.session.delete(patient)
-    db.session.commit()
+# - Suppression ensembliste, différée ou douce (voir suppression_service)
+def delete_patient(patient, douce=False):
+    return supprimer_patient(patient.id, douce=douce)
 
 # -------------------------------------------------------------
 # patient_service.py : logique métier liée aux patients
@@ -1,5 +1,7 @@
 from app import db
 from app.models.proche import Proche
+from app.services.auth_service import invalider_profil
+from app.utils.replicas import lecture_replica
 
 # -------------------------------------------------------------
 # Fonction create_proche : crée un nouveau proche
@@ -16,6 +18,7 @@ def create_proche(data):
 # -------------------------------------------------------------
 # Fonction get_all_proches : liste tous les proches
 # -------------------------------------------------------------
+@lecture_replica
 def get_all_proches():
     return Proche.query.all()
 
@@ -32,6 +35,7 @@ def update_proche(proche, data):
     proche.lien_parente = data.get("lien_parente", proche.lien_parente)
     proche.patient_id = data.get("patient_id", proche.patient_id)
     db.session.commit()
+    invalider_profil(proche.id)
     return proche
 
 # -------------------------------------------------------------
@@ -40,6 +44,7 @@ def update_proche(proche, data):
 def delete_proche(proche):
     db.session.delete(proche)
     db.session.commit()
+    invalider_profil(proche.id)
 
 # -------------------------------------------------------------
 # proche_service.py : logique métier liée aux proches
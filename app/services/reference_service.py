@@ -0,0 +1,100 @@
+# -------------------------------------------------------------
+# app/services/reference_service.py
+# -------------------------------------------------------------
+# Référence des capteurs en mémoire (identifiant → TypeCapteur) :
+# - une copie par processus et par base : les chemins chauds
+#   (création de mesure, statistiques, sérialiseurs) résolvent le type
+#   sans requête ni chargement d'objet Capteur dans la session
+# - versions_references.version ('capteur') est incrémentée dans la
+#   transaction qui crée, modifie ou supprime un capteur
+#   (marquer_capteurs_modifies) ; chaque worker la relit au plus toutes
+#   les REFERENCES_VERIFICATION_S secondes et recharge sa copie quand
+#   elle a changé. Le processus qui modifie la revérifie dès le commit.
+# - un capteur absent de la copie (créé hors capteur_service) est lu
+#   seul puis ajouté
+# - lectures sur le primaire, même dans une fonction @lecture_replica
+# -------------------------------------------------------------
+
+import threading
+import time
+import weakref
+
+from flask import current_app
+from sqlalchemy import select, update, insert, event
+
+from app.extension import db
+from app.models import Capteur, VersionReference
+
+CAPTEURS = "capteur"
+
+capteur, versions = Capteur.__table__, VersionReference.__table__
+
+# moteur → {"version", "types", "verifie_a"}
+_etats = weakref.WeakKeyDictionary()
+_verrou = threading.Lock()
+
+
+def _primaire(instruction):
+    return db.session.execute(instruction, bind_arguments={"bind": db.engine})
+
+
+def _etat():
+    moteur = db.engine
+    with _verrou:
+        etat = _etats.get(moteur)
+        if etat is None:
+            etat = _etats[moteur] = {"version": None, "types": {}, "verifie_a": float("-inf")}
+    return etat
+
+
+def _a_jour():
+    etat = _etat()
+    maintenant = time.monotonic()
+    if maintenant - etat["verifie_a"] < current_app.config.get("REFERENCES_VERIFICATION_S", 5):
+        return etat
+
+    version = _primaire(select(versions.c.version).where(versions.c.nom == CAPTEURS)).scalar() or 0
+    if version != etat["version"]:
+        etat["types"] = dict(_primaire(select(capteur.c.id, capteur.c.type)).all())
+        etat["version"] = version
+    etat["verifie_a"] = maintenant
+    return etat
+
+
+# -------------------------------------------------------------
+# Fonction type_capteur : TypeCapteur d'un capteur, None si inconnu
+# -------------------------------------------------------------
+def type_capteur(capteur_id):
+    if capteur_id is None:
+        return None
+    types = _a_jour()["types"]
+    type_ = types.get(capteur_id)
+    if type_ is None:
+        type_ = _primaire(select(capteur.c.type).where(capteur.c.id == capteur_id)).scalar()
+        if type_ is not None:
+            types[capteur_id] = type_
+    return type_
+
+
+# -------------------------------------------------------------
+# Fonction marquer_capteurs_modifies : avant le commit d'une écriture
+# -------------------------------------------------------------
+# - Incrémente la version partagée dans la transaction en cours ; la
+#   copie de ce processus est revérifiée après le commit
+def marquer_capteurs_modifies():
+    resultat = db.session.execute(
+        update(versions).where(versions.c.nom == CAPTEURS).values(version=versions.c.version + 1))
+    if resultat.rowcount == 0:
+        db.session.execute(insert(versions).values(nom=CAPTEURS, version=1))
+    db.session.info[CAPTEURS] = True
+
+
+@event.listens_for(db.session, "after_commit")
+def _apres_commit(session):
+    if session.info.pop(CAPTEURS, False):
+        _etat()["verifie_a"] = float("-inf")
+
+
+@event.listens_for(db.session, "after_rollback")
+def _apres_rollback(session):
+    session.info.pop(CAPTEURS, None)
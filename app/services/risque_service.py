@@ -0,0 +1,249 @@
+# -------------------------------------------------------------
+# app/services/risque_service.py
+# -------------------------------------------------------------
+# Score de risque matérialisé par patient (table scores_risque) :
+#   score = score_alertes + score_ecarts
+# - score_alertes : alertes non traitées pondérées par urgence
+#   (POIDS_URGENCE), chaque poids décroissant de moitié toutes les
+#   RISQUE_DEMI_VIE_H heures depuis la date de l'alerte
+# - score_ecarts : écart relatif des dernières mesures (etats_mesures)
+#   aux seuils de leur capteur, pondéré par l'urgence du seuil
+# Mises à jour incrémentales (mettre_a_jour_scores), dans la transaction
+# qui crée l'analyse ou change l'état d'une alerte : la décroissance
+# étant exponentielle, décroître le score stocké jusqu'à maintenant puis
+# ajouter (ou retirer) le poids décru d'une alerte donne le même
+# résultat qu'un recalcul complet.
+# `flask risk-decay` décroît périodiquement les scores stockés pour que
+# l'index (medecin_id, score) reste trié selon le risque courant.
+# -------------------------------------------------------------
+
+from collections import defaultdict
+from datetime import datetime
+
+from flask import current_app, has_app_context
+from sqlalchemy import select, update, delete, insert, bindparam
+
+from app.models import Alerte, Capteur, EtatMesure, ScoreRisque, UrgenceEnum
+from app.utils.seuils import SEUILS_CAPTEURS
+
+POIDS_URGENCE = {UrgenceEnum.critique: 5.0, UrgenceEnum.moyenne: 2.0, UrgenceEnum.faible: 1.0}
+DEMI_VIE_H = 24
+NEGLIGEABLE = 1e-3   # en dessous, score_alertes est ramené à 0
+
+
+def demi_vie_h(config=None):
+    if config is None:
+        config = current_app.config if has_app_context() else {}
+    return config.get("RISQUE_DEMI_VIE_H", DEMI_VIE_H)
+
+
+def _facteur(duree, demi_vie):
+    """Décroissance sur duree (timedelta) : 2^(-duree / demi-vie)."""
+    return 0.5 ** (max(duree.total_seconds(), 0.0) / (demi_vie * 3600))
+
+
+def score_courant(score_alertes, score_ecarts, date_reference, maintenant=None, demi_vie=None):
+    """Score à maintenant d'une ligne de scores_risque."""
+    maintenant = maintenant or datetime.utcnow()
+    return score_alertes * _facteur(maintenant - date_reference, demi_vie or demi_vie_h()) + score_ecarts
+
+
+def ecart_seuil(type_capteur, valeur):
+    """Écart d'une valeur à ses seuils, en largeurs de plage, pondéré par urgence."""
+    seuil = SEUILS_CAPTEURS.get(type_capteur)
+    if not seuil or valeur is None:
+        return 0.0
+    ecart = max(seuil["min"] - valeur, valeur - seuil["max"], 0) / (seuil["max"] - seuil["min"])
+    return POIDS_URGENCE[seuil["niveau_urgence"]] * ecart
+
+
+def _ecarts(connexion, patient_ids):
+    ecarts = dict.fromkeys(patient_ids, 0.0)
+    for ligne in connexion.execute(
+        select(EtatMesure.patient_id, EtatMesure.derniere_valeur, Capteur.type)
+        .join(Capteur, Capteur.id == EtatMesure.capteur_id)
+        .where(EtatMesure.patient_id.in_(patient_ids))
+    ):
+        ecarts[ligne.patient_id] += ecart_seuil(ligne.type, ligne.derniere_valeur)
+    return ecarts
+
+
+def _dernieres_alertes(connexion, patient_ids):
+    """(urgence, date) de la dernière alerte de chaque patient."""
+    lignes = connexion.execute(
+        select(Alerte.patient_id, Alerte.niveau_urgence, Alerte.date_heure_alerte)
+        .where(Alerte.patient_id.in_(patient_ids))
+        .order_by(Alerte.patient_id, Alerte.date_heure_alerte, Alerte.id)
+    )
+    return {ligne.patient_id: (ligne.niveau_urgence, ligne.date_heure_alerte) for ligne in lignes}
+
+
+# -------------------------------------------------------------
+# Fonction mettre_a_jour_scores : mise à jour incrémentale
+# -------------------------------------------------------------
+# - alertes : dicts {patient_id, medecin_id, niveau_urgence,
+#   date_heure_alerte, signe} ; signe +1 : alerte non traitée créée ou
+#   rouverte, -1 : alerte traitée ou supprimée, 0 : alerte créée déjà
+#   traitée ; supprimee=True fait relire la dernière alerte du patient
+# - mesures : {patient_id: medecin_id} des patients dont les dernières
+#   mesures ont changé (score_ecarts relu dans etats_mesures)
+# - les lignes sont verrouillées dans l'ordre des patients (FOR UPDATE)
+def mettre_a_jour_scores(connexion, alertes=(), mesures=None, maintenant=None, demi_vie=None):
+    mesures = mesures or {}
+    patient_ids = sorted({a["patient_id"] for a in alertes} | set(mesures))
+    if not patient_ids:
+        return
+    maintenant = maintenant or datetime.utcnow()
+    demi_vie = demi_vie or demi_vie_h()
+    table = ScoreRisque.__table__
+
+    from app.services.ingestion_service import _insert_sans_conflit  # import circulaire via analyse_service
+    connexion.execute(_insert_sans_conflit(connexion, table), [
+        {"patient_id": p, "score": 0.0, "score_alertes": 0.0, "score_ecarts": 0.0,
+         "nb_alertes_non_traitees": 0, "date_reference": maintenant}
+        for p in patient_ids
+    ])
+    scores = {
+        ligne.patient_id: dict(ligne._mapping)
+        for ligne in connexion.execute(
+            select(table).where(table.c.patient_id.in_(patient_ids))
+            .order_by(table.c.patient_id).with_for_update()
+        )
+    }
+
+    for s in scores.values():
+        s["score_alertes"] *= _facteur(maintenant - s["date_reference"], demi_vie)
+    for a in sorted(alertes, key=lambda a: a["date_heure_alerte"] or maintenant):
+        s = scores[a["patient_id"]]
+        date_alerte = a["date_heure_alerte"] or maintenant
+        s["score_alertes"] += a["signe"] * POIDS_URGENCE[a["niveau_urgence"]] \
+            * _facteur(maintenant - date_alerte, demi_vie)
+        s["nb_alertes_non_traitees"] = max(s["nb_alertes_non_traitees"] + a["signe"], 0)
+        if a["signe"] >= 0 and (s["date_derniere_alerte"] is None or date_alerte >= s["date_derniere_alerte"]):
+            s["derniere_urgence"] = a["niveau_urgence"]
+            s["date_derniere_alerte"] = date_alerte
+            s["medecin_id"] = a["medecin_id"]
+
+    supprimees = sorted({a["patient_id"] for a in alertes if a.get("supprimee")})
+    if supprimees:
+        dernieres = _dernieres_alertes(connexion, supprimees)
+        for p in supprimees:
+            scores[p]["derniere_urgence"], scores[p]["date_derniere_alerte"] = dernieres.get(p, (None, None))
+    if mesures:
+        for p, ecart in _ecarts(connexion, list(mesures)).items():
+            scores[p]["score_ecarts"] = ecart
+            scores[p]["medecin_id"] = mesures[p]
+
+    for s in scores.values():
+        if s["score_alertes"] < NEGLIGEABLE or s["nb_alertes_non_traitees"] == 0:
+            s["score_alertes"] = 0.0
+        s["score"] = s["score_alertes"] + s["score_ecarts"]
+
+    colonnes = ("medecin_id", "score", "score_alertes", "score_ecarts", "nb_alertes_non_traitees",
+                "derniere_urgence", "date_derniere_alerte")
+    connexion.execute(
+        update(table)
+        .where(table.c.patient_id == bindparam("b_patient"))
+        .values(date_reference=maintenant, **{c: bindparam(f"b_{c}") for c in colonnes}),
+        [{"b_patient": p, **{f"b_{c}": scores[p][c] for c in colonnes}} for p in patient_ids],
+    )
+
+
+def alerte_evenement(alerte, signe, **options):
+    """Événement de mettre_a_jour_scores pour une alerte ORM."""
+    return {"patient_id": alerte.patient_id, "medecin_id": alerte.medecin_id,
+            "niveau_urgence": alerte.niveau_urgence, "date_heure_alerte": alerte.date_heure_alerte,
+            "signe": signe, **options}
+
+
+# -------------------------------------------------------------
+# Fonction decroitre_scores : passage périodique (flask risk-decay)
+# -------------------------------------------------------------
+# - Par lots de patient_id croissants, une transaction par lot : seules
+#   les lignes dont score_alertes n'est pas nul sont réécrites
+# - Retourne le nombre de scores réécrits
+def decroitre_scores(session, maintenant=None, taille_lot=1000, demi_vie=None):
+    maintenant = maintenant or datetime.utcnow()
+    demi_vie = demi_vie or demi_vie_h()
+    table = ScoreRisque.__table__
+    dernier, total = None, 0
+    while True:
+        requete = (
+            select(table.c.patient_id, table.c.score_alertes, table.c.score_ecarts, table.c.date_reference)
+            .where(table.c.score_alertes > 0)
+            .order_by(table.c.patient_id).limit(taille_lot).with_for_update(skip_locked=True)
+        )
+        if dernier is not None:
+            requete = requete.where(table.c.patient_id > dernier)
+        lignes = session.execute(requete).all()
+        if not lignes:
+            session.rollback()
+            return total
+        valeurs = []
+        for ligne in lignes:
+            alertes = ligne.score_alertes * _facteur(maintenant - ligne.date_reference, demi_vie)
+            alertes = alertes if alertes >= NEGLIGEABLE else 0.0
+            valeurs.append({"b_patient": ligne.patient_id, "b_alertes": alertes,
+                            "b_score": alertes + ligne.score_ecarts})
+        session.connection().execute(
+            update(table).where(table.c.patient_id == bindparam("b_patient")).values(
+                score_alertes=bindparam("b_alertes"), score=bindparam("b_score"), date_reference=maintenant),
+            valeurs,
+        )
+        session.commit()
+        total += len(lignes)
+        dernier = lignes[-1].patient_id
+
+
+# -------------------------------------------------------------
+# Fonction recalculer_scores : reconstruction complète
+# -------------------------------------------------------------
+# - Après la migration, ou pour corriger une dérive : un parcours des
+#   alertes et des états de mesures, puis réécriture de la table
+def recalculer_scores(connexion, maintenant=None, demi_vie=None):
+    maintenant = maintenant or datetime.utcnow()
+    demi_vie = demi_vie or demi_vie_h()
+    scores = defaultdict(lambda: {"medecin_id": None, "score_alertes": 0.0, "score_ecarts": 0.0,
+                                  "nb_alertes_non_traitees": 0, "derniere_urgence": None,
+                                  "date_derniere_alerte": None})
+    activites = {}   # patient → date de la dernière mesure ou alerte (médecin retenu)
+
+    def activite(patient_id, medecin_id, date):
+        if medecin_id is not None and (patient_id not in activites or date >= activites[patient_id]):
+            activites[patient_id] = date
+            scores[patient_id]["medecin_id"] = medecin_id
+
+    for ligne in connexion.execute(
+        select(EtatMesure.patient_id, EtatMesure.medecin_id, EtatMesure.derniere_valeur,
+               EtatMesure.date_derniere_mesure, Capteur.type)
+        .join(Capteur, Capteur.id == EtatMesure.capteur_id)
+    ):
+        s = scores[ligne.patient_id]
+        s["score_ecarts"] += ecart_seuil(ligne.type, ligne.derniere_valeur)
+        activite(ligne.patient_id, ligne.medecin_id, ligne.date_derniere_mesure or datetime.min)
+
+    for ligne in connexion.execute(
+        select(Alerte.patient_id, Alerte.medecin_id, Alerte.niveau_urgence, Alerte.date_heure_alerte,
+               Alerte.etat_traitement)
+        .order_by(Alerte.patient_id, Alerte.date_heure_alerte, Alerte.id)
+        .execution_options(yield_per=5000)
+    ):
+        s = scores[ligne.patient_id]
+        date_alerte = ligne.date_heure_alerte or maintenant
+        if not ligne.etat_traitement:
+            s["score_alertes"] += POIDS_URGENCE[ligne.niveau_urgence] * _facteur(maintenant - date_alerte, demi_vie)
+            s["nb_alertes_non_traitees"] += 1
+        s["derniere_urgence"], s["date_derniere_alerte"] = ligne.niveau_urgence, ligne.date_heure_alerte
+        activite(ligne.patient_id, ligne.medecin_id, date_alerte)
+
+    for s in scores.values():
+        if s["score_alertes"] < NEGLIGEABLE:
+            s["score_alertes"] = 0.0
+        s["score"] = s["score_alertes"] + s["score_ecarts"]
+
+    connexion.execute(delete(ScoreRisque))
+    if scores:
+        connexion.execute(insert(ScoreRisque), [
+            {**s, "patient_id": p, "date_reference": maintenant} for p, s in scores.items()
+        ])
+    return len(scores)
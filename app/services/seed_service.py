@@ -0,0 +1,278 @@
+# -------------------------------------------------------------
+# app/services/seed_service.py
+# -------------------------------------------------------------
+# Chargement de jeux de données volumineux (taille production) :
+# - médecins, patients, proches, capteurs (3 par patient)
+# - mesures à courbe circadienne + analyses + alertes cohérentes
+# - affectations des capteurs (patient_capteur), états des mesures
+#   (etats_mesures) et scores de risque (scores_risque)
+# Les écritures contournent l'ORM :
+# - PostgreSQL : COPY ... FROM STDIN (format CSV)
+# - autres SGBD : INSERT groupés via SQLAlchemy Core
+# Les identifiants sont alloués côté client pour relier mesures,
+# analyses et alertes sans aller-retour ; les séquences PostgreSQL
+# sont recalées à la fin du chargement.
+# -------------------------------------------------------------
+
+import csv
+import io
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+
+from app.extension import db, bcrypt
+from app.models import (
+    Personne, Medecin, Patient, Proche, Capteur, DonneesMedicale, Analyseur, Alerte
+)
+from app.models.enums import TypeCapteur
+from app.services.analyse_service import evaluer_valeur
+from app.services.ingestion_service import recalculer_etats
+from app.services.partition_service import assurer_partitions
+from app.services.reference_service import marquer_capteurs_modifies
+from app.services.risque_service import recalculer_scores
+from app.utils.generateur import generer_mesure, decalage_patient
+
+TAILLE_LOT = 50_000
+TAILLE_LOT_ETATS = 5_000   # couples (patient, capteur) par recalcul d'états
+MOT_DE_PASSE_SEED = "Passer123"
+TYPES_CAPTEUR = list(TypeCapteur)
+
+
+# -------------------------------------------------------------
+# Fonction _prochain_id : premier identifiant libre d'une table
+# -------------------------------------------------------------
+def _prochain_id(modele):
+    return (db.session.execute(select(func.max(modele.id))).scalar() or 0) + 1
+
+
+# -------------------------------------------------------------
+# Fonction _valeur_copy : conversion d'une valeur Python pour COPY CSV
+# -------------------------------------------------------------
+def _valeur_copy(valeur):
+    if valeur is None:
+        return None
+    if isinstance(valeur, bool):
+        return "t" if valeur else "f"
+    if isinstance(valeur, datetime):
+        return valeur.isoformat(sep=" ")
+    if hasattr(valeur, "name") and hasattr(valeur, "value"):  # Enum stocké par nom
+        return valeur.name
+    return valeur
+
+
+# -------------------------------------------------------------
+# Fonction ecrire_lignes : écriture groupée d'un lot de tuples
+# -------------------------------------------------------------
+def ecrire_lignes(modele, colonnes, lignes, methode):
+    if not lignes:
+        return
+
+    table = modele.__table__
+    if methode == "copy":
+        tampon = io.StringIO()
+        writer = csv.writer(tampon)
+        for ligne in lignes:
+            writer.writerow([_valeur_copy(v) for v in ligne])
+        tampon.seek(0)
+
+        curseur = db.session.connection().connection.cursor()
+        curseur.copy_expert(
+            f"COPY {table.name} ({', '.join(colonnes)}) FROM STDIN WITH (FORMAT csv)",
+            tampon
+        )
+        curseur.close()
+    else:
+        db.session.execute(table.insert(), [dict(zip(colonnes, ligne)) for ligne in lignes])
+
+
+# -------------------------------------------------------------
+# Fonction recaler_sequences : aligne les séquences sur MAX(id)
+# -------------------------------------------------------------
+def recaler_sequences():
+    if db.engine.dialect.name != "postgresql":
+        return
+    for modele in (Personne, Capteur, DonneesMedicale, Analyseur, Alerte):
+        table = modele.__table__.name
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+        ))
+
+
+# -------------------------------------------------------------
+# Fonction _ecrire_personnes : lignes personne + table fille
+# -------------------------------------------------------------
+def _ecrire_personnes(modele, role, ids, hash_mdp, extra, methode):
+    colonnes_base = ["id", "prenom", "nom", "email", "phone", "adresse",
+                     "mot_de_passe", "role", "type"]
+    colonnes_fille = ["id"] + list(extra(ids[0]).keys()) if ids else ["id"]
+
+    for i in range(0, len(ids), TAILLE_LOT):
+        lot = ids[i:i + TAILLE_LOT]
+        ecrire_lignes(Personne, colonnes_base, [
+            (pid, "Seed", f"{role.capitalize()}{pid}", f"{role}{pid}@seed.s3dpa",
+             f"+221{pid:09d}", "Dakar", hash_mdp, role, role)
+            for pid in lot
+        ], methode)
+        ecrire_lignes(modele, colonnes_fille, [
+            (pid, *extra(pid).values()) for pid in lot
+        ], methode)
+
+
+# -------------------------------------------------------------
+# Fonction charger_volumes : point d'entrée du chargement massif
+# -------------------------------------------------------------
+def charger_volumes(medecins, patients, proches_par_patient=1, jours=7,
+                    intervalle_minutes=15, taux_anomalie=0.02, analyses=True,
+                    graine=42, methode="auto", progression=None):
+    """
+    Génère et écrit le jeu de données ; retourne un manifeste
+    (plages d'identifiants, identifiants de connexion, volumes).
+    """
+    rng = random.Random(graine)
+    if methode == "auto":
+        methode = "copy" if db.engine.dialect.name == "postgresql" else "insert"
+
+    def signaler(message):
+        if progression:
+            progression(message)
+
+    hash_mdp = bcrypt.generate_password_hash(MOT_DE_PASSE_SEED).decode("utf-8")
+
+    try:
+        # --- Utilisateurs ------------------------------------------------
+        debut = _prochain_id(Personne)
+        medecin_ids = list(range(debut, debut + medecins))
+        debut_patients = debut + medecins
+        patient_ids = list(range(debut_patients, debut_patients + patients))
+        debut_proches = debut_patients + patients
+        proche_ids = list(range(debut_proches, debut_proches + patients * proches_par_patient))
+
+        _ecrire_personnes(Medecin, "medecin", medecin_ids, hash_mdp,
+                          lambda pid: {"specialite": "Cardiologie"}, methode)
+        _ecrire_personnes(Patient, "patient", patient_ids, hash_mdp,
+                          lambda pid: {}, methode)
+        _ecrire_personnes(Proche, "proche", proche_ids, hash_mdp,
+                          lambda pid: {
+                              "lien_parente": "Famille",
+                              "patient_id": patient_ids[(pid - debut_proches) // proches_par_patient],
+                          }, methode)
+        db.session.commit()
+        signaler(f"{len(medecin_ids)} médecins, {len(patient_ids)} patients, "
+                 f"{len(proche_ids)} proches écrits")
+
+        # --- Capteurs : un par type et par patient -----------------------
+        capteur_debut = _prochain_id(Capteur)
+        ecrire_lignes(Capteur, ["id", "type"], [
+            (capteur_debut + i * len(TYPES_CAPTEUR) + t, type_capteur)
+            for i in range(len(patient_ids))
+            for t, type_capteur in enumerate(TYPES_CAPTEUR)
+        ], methode)
+        marquer_capteurs_modifies()
+        db.session.commit()
+
+        # --- Mesures, analyses et alertes --------------------------------
+        prochaine_mesure = _prochain_id(DonneesMedicale)
+        prochaine_analyse = _prochain_id(Analyseur)
+        fin = datetime.utcnow().replace(second=0, microsecond=0)
+        pas = timedelta(minutes=intervalle_minutes)
+        nb_pas = int(jours * 24 * 60 / intervalle_minutes)
+        assurer_partitions(fin - pas * nb_pas, fin)
+
+        col_mesures = ["id", "patient_id", "capteur_id", "valeur_mesuree", "date_heure_mesure"]
+        col_analyses = ["id", "patient_id", "medecin_id", "donnee_medicale_id",
+                        "date_heure_mesure", "resultat", "date_analyse"]
+        col_alertes = ["patient_id", "medecin_id", "donnee_medicale_id", "date_heure_alerte", "niveau_urgence",
+                       "type_alerte", "description", "etat_traitement"]
+
+        mesures, lignes_analyses, lignes_alertes = [], [], []
+        total_mesures = total_alertes = 0
+
+        def vider():
+            nonlocal mesures, lignes_analyses, lignes_alertes
+            ecrire_lignes(DonneesMedicale, col_mesures, mesures, methode)
+            ecrire_lignes(Analyseur, col_analyses, lignes_analyses, methode)
+            ecrire_lignes(Alerte, col_alertes, lignes_alertes, methode)
+            db.session.commit()
+            mesures, lignes_analyses, lignes_alertes = [], [], []
+
+        for index, patient_id in enumerate(patient_ids):
+            medecin_id = medecin_ids[index % len(medecin_ids)] if medecin_ids else None
+            for t, type_capteur in enumerate(TYPES_CAPTEUR):
+                capteur_id = capteur_debut + index * len(TYPES_CAPTEUR) + t
+                decalage = decalage_patient(type_capteur, rng)
+
+                for n in range(nb_pas):
+                    date_mesure = fin - pas * (nb_pas - n) + timedelta(
+                        seconds=rng.randint(0, max(1, intervalle_minutes * 15))
+                    )
+                    valeur, _ = generer_mesure(type_capteur, date_mesure, decalage,
+                                               taux_anomalie, rng)
+                    mesure_id = prochaine_mesure
+                    prochaine_mesure += 1
+                    mesures.append((mesure_id, patient_id, capteur_id, valeur, date_mesure))
+
+                    if analyses and medecin_id is not None:
+                        resultat, seuil, anomalie = evaluer_valeur(type_capteur, valeur)
+                        lignes_analyses.append((prochaine_analyse, patient_id, medecin_id,
+                                                mesure_id, date_mesure, resultat, date_mesure))
+                        prochaine_analyse += 1
+                        if anomalie:
+                            lignes_alertes.append((patient_id, medecin_id, mesure_id, date_mesure,
+                                                   seuil["niveau_urgence"], seuil["type_alerte"],
+                                                   resultat, False))
+                            total_alertes += 1
+
+                    if len(mesures) >= TAILLE_LOT:
+                        total_mesures += len(mesures)
+                        vider()
+                        signaler(f"{total_mesures} mesures écrites")
+
+        total_mesures += len(mesures)
+        vider()
+        signaler(f"{total_mesures} mesures écrites")
+
+        # --- Affectations : chaque capteur à son patient, depuis sa première mesure
+        if patient_ids:
+            db.session.execute(text("""
+                INSERT INTO patient_capteur (patient_id, capteur_id, date_debut)
+                SELECT patient_id, capteur_id, MIN(date_heure_mesure)
+                FROM donnees_medicales
+                WHERE patient_id BETWEEN :premier AND :dernier
+                GROUP BY patient_id, capteur_id
+            """), {"premier": patient_ids[0], "dernier": patient_ids[-1]})
+            db.session.commit()
+
+        # --- États des couples et scores de risque (tableau de bord, tri,
+        #     recherche par urgence), écrits hors ingestion
+        couples = [(patient_id, capteur_debut + index * len(TYPES_CAPTEUR) + t)
+                   for index, patient_id in enumerate(patient_ids) for t in range(len(TYPES_CAPTEUR))]
+        for i in range(0, len(couples), TAILLE_LOT_ETATS):
+            recalculer_etats(db.session.connection(), couples[i:i + TAILLE_LOT_ETATS])
+            db.session.commit()
+        recalculer_scores(db.session.connection())
+        db.session.commit()
+        signaler("États des mesures et scores de risque recalculés")
+    finally:
+        db.session.rollback()
+        recaler_sequences()
+        db.session.commit()
+
+    return {
+        "medecin_ids": [medecin_ids[0], medecin_ids[-1]] if medecin_ids else [],
+        "patient_ids": [patient_ids[0], patient_ids[-1]] if patient_ids else [],
+        "capteur_debut": capteur_debut,
+        "types_capteur": [t.name for t in TYPES_CAPTEUR],
+        "email_medecin": f"medecin{medecin_ids[0]}@seed.s3dpa" if medecin_ids else None,
+        "mot_de_passe": MOT_DE_PASSE_SEED,
+        "methode": methode,
+        "volumes": {
+            "medecins": len(medecin_ids),
+            "patients": len(patient_ids),
+            "proches": len(proche_ids),
+            "capteurs": len(patient_ids) * len(TYPES_CAPTEUR),
+            "mesures": total_mesures,
+            "alertes": total_alertes,
+        },
+    }
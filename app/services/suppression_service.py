@@ -0,0 +1,325 @@
+# -------------------------------------------------------------
+# app/services/suppression_service.py
+# -------------------------------------------------------------
+# Suppression ensembliste des patients, médecins et capteurs :
+# - une instruction DELETE par table, sans charger d'objets ORM ; les
+#   clés étrangères ON DELETE (CASCADE / SET NULL) couvrent en plus les
+#   suppressions faites hors de ce module
+# - les clés d'ingestion des mesures supprimées le sont avec elles : un
+#   renvoi ultérieur de la même lecture est une nouvelle mesure
+# - au-delà de SUPPRESSION_TAILLE_LOT mesures (estimées par
+#   etats_mesures.nb_mesures), la cible est archivée tout de suite et une
+#   Suppression est mise en file : `flask purge-deletions` vide ses
+#   mesures, analyses et alertes par lots, une transaction courte par
+#   lot, puis supprime le reste en une fois
+# - suppression douce (archivage) : date_suppression renseignée, la
+#   cible disparaît de l'API et du login mais l'historique est conservé
+# - un médecin avec un historique clinique (alertes, analyses) ne peut
+#   être qu'archivé
+# - les fichiers de l'archive froide des mesures purgées sont supprimés
+#   après le commit (archive_service.oublier_archives)
+# -------------------------------------------------------------
+
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import select, update, delete, func, exists, or_
+
+from app.extension import db
+from app.models import (Personne, Patient, Medecin, Proche, Capteur, DonneesMedicale, Analyseur, Alerte,
+                        CleIngestion, EtatMesure, Notification, ScoreRisque, Suppression, PatientCapteur, Appareil)
+from app.services.appareil_service import vider_caches as vider_caches_appareils
+from app.services.archive_service import oublier_archives
+from app.services.auth_service import invalider_profil
+from app.services.reference_service import marquer_capteurs_modifies
+from app.services.dashboard_service import invalider_tableau_de_bord
+from app.services.risque_service import mettre_a_jour_scores
+
+IMMEDIATE, DIFFEREE, DOUCE = "immediate", "differee", "douce"
+
+personne, patient, medecin, proche = (Personne.__table__, Patient.__table__, Medecin.__table__,
+                                      Proche.__table__)
+capteur, mesures, analyses, alertes = (Capteur.__table__, DonneesMedicale.__table__, Analyseur.__table__,
+                                       Alerte.__table__)
+cles, etats, notifications, scores = (CleIngestion.__table__, EtatMesure.__table__, Notification.__table__,
+                                      ScoreRisque.__table__)
+affectations, appareils = PatientCapteur.__table__, Appareil.__table__
+
+
+def taille_lot(config=None):
+    return (config or current_app.config).get("SUPPRESSION_TAILLE_LOT", 5000)
+
+
+# -------------------------------------------------------------
+# Fonction suppression_douce : paramètre ?douce= d'une route DELETE
+# -------------------------------------------------------------
+# - Absent : SUPPRESSION_DOUCE de la configuration
+def suppression_douce(valeur):
+    if valeur is None:
+        return bool(current_app.config.get("SUPPRESSION_DOUCE", False))
+    return valeur.strip().lower() in ("1", "true", "oui", "yes")
+
+
+# -------------------------------------------------------------
+# Fonction reponse_suppression : corps et code HTTP d'une route DELETE
+# -------------------------------------------------------------
+# - 202 quand la suppression est différée (cible déjà archivée)
+def reponse_suppression(resultat, sujet):
+    messages = {IMMEDIATE: f"{sujet} supprimé", DOUCE: f"{sujet} archivé",
+                DIFFEREE: f"{sujet} archivé, suppression des mesures programmée"}
+    return {"message": messages[resultat["mode"]], **resultat}, 202 if resultat["mode"] == DIFFEREE else 200
+
+
+# -------------------------------------------------------------
+# Fonction supprimer_patient : patient, proches, mesures, alertes, scores
+# -------------------------------------------------------------
+# - Retourne {"mode": immediate | differee | douce[, "suppression_id"]}
+def supprimer_patient(patient_id, douce=False):
+    if not douce and _nb_mesures(etats.c.patient_id == patient_id) <= taille_lot():
+        _supprimer_patient(patient_id)
+        return {"mode": IMMEDIATE}
+    personnes = [patient_id, *_proches(patient_id)]
+    _archiver(personne, personnes)
+    resultat = {"mode": DOUCE} if douce else _mettre_en_file("patient", patient_id=patient_id)
+    db.session.commit()
+    for personne_id in personnes:
+        invalider_profil(personne_id)
+    vider_caches_appareils()
+    return resultat
+
+
+def _supprimer_patient(patient_id):
+    proches = _proches(patient_id)
+    medecin_id = db.session.scalar(select(scores.c.medecin_id).where(scores.c.patient_id == patient_id))
+    db.session.execute(delete(analyses).where(analyses.c.patient_id == patient_id))
+    db.session.execute(delete(cles).where(cles.c.donnee_medicale_id.in_(
+        select(mesures.c.id).where(mesures.c.patient_id == patient_id))))
+    db.session.execute(delete(mesures).where(mesures.c.patient_id == patient_id))
+    db.session.execute(delete(notifications).where(
+        notifications.c.alerte_id.in_(select(alertes.c.id).where(alertes.c.patient_id == patient_id))))
+    db.session.execute(delete(alertes).where(alertes.c.patient_id == patient_id))
+    db.session.execute(delete(etats).where(etats.c.patient_id == patient_id))
+    db.session.execute(delete(scores).where(scores.c.patient_id == patient_id))
+    db.session.execute(delete(affectations).where(affectations.c.patient_id == patient_id))
+    if proches:
+        db.session.execute(delete(notifications).where(notifications.c.destinataire_id.in_(proches)))
+        db.session.execute(delete(proche).where(proche.c.id.in_(proches)))
+    db.session.execute(delete(patient).where(patient.c.id == patient_id))
+    db.session.execute(delete(personne).where(personne.c.id.in_([patient_id, *proches])))
+    db.session.commit()
+    oublier_archives(patient_id=patient_id)
+    for personne_id in (patient_id, *proches):
+        invalider_profil(personne_id)
+    vider_caches_appareils()
+    if medecin_id:
+        invalider_tableau_de_bord(medecin_id)
+
+
+# -------------------------------------------------------------
+# Fonction supprimer_medecin : compte d'un médecin sans historique
+# -------------------------------------------------------------
+# - ValueError si le médecin a des alertes ou des analyses : seul
+#   l'archivage est possible (l'historique clinique est conservé)
+def supprimer_medecin(medecin_id, douce=False):
+    if douce:
+        _archiver(personne, [medecin_id])
+        db.session.commit()
+        invalider_profil(medecin_id)
+        vider_caches_appareils()
+        return {"mode": DOUCE}
+    historique = db.session.scalar(select(or_(
+        exists().where(alertes.c.medecin_id == medecin_id),
+        exists().where(analyses.c.medecin_id == medecin_id),
+    )))
+    if historique:
+        raise ValueError("Le médecin a un historique clinique : utiliser la suppression douce (?douce=true)")
+
+    db.session.execute(update(etats).where(etats.c.medecin_id == medecin_id).values(medecin_id=None))
+    db.session.execute(update(scores).where(scores.c.medecin_id == medecin_id).values(medecin_id=None))
+    db.session.execute(update(appareils).where(appareils.c.medecin_id == medecin_id).values(medecin_id=None))
+    db.session.execute(update(alertes).where(alertes.c.acquittee_par == medecin_id).values(acquittee_par=None))
+    db.session.execute(delete(notifications).where(notifications.c.destinataire_id == medecin_id))
+    db.session.execute(delete(medecin).where(medecin.c.id == medecin_id))
+    db.session.execute(delete(personne).where(personne.c.id == medecin_id))
+    db.session.commit()
+    invalider_profil(medecin_id)
+    invalider_tableau_de_bord(medecin_id)
+    vider_caches_appareils()
+    return {"mode": IMMEDIATE}
+
+
+# -------------------------------------------------------------
+# Fonction supprimer_capteur : capteur, ses mesures et ses clés d'ingestion
+# -------------------------------------------------------------
+def supprimer_capteur(capteur_id, douce=False):
+    if not douce and _nb_mesures(etats.c.capteur_id == capteur_id) <= taille_lot():
+        _supprimer_capteur(capteur_id)
+        return {"mode": IMMEDIATE}
+    _archiver(capteur, [capteur_id])
+    resultat = {"mode": DOUCE} if douce else _mettre_en_file("capteur", capteur_id=capteur_id)
+    db.session.commit()
+    vider_caches_appareils()
+    return resultat
+
+
+def _supprimer_capteur(capteur_id):
+    patients = db.session.execute(
+        select(etats.c.patient_id).where(etats.c.capteur_id == capteur_id)).scalars().all()
+    db.session.execute(delete(analyses).where(analyses.c.donnee_medicale_id.in_(
+        select(mesures.c.id).where(mesures.c.capteur_id == capteur_id))))
+    db.session.execute(delete(mesures).where(mesures.c.capteur_id == capteur_id))
+    db.session.execute(delete(cles).where(cles.c.capteur_id == capteur_id))
+    db.session.execute(delete(etats).where(etats.c.capteur_id == capteur_id))
+    db.session.execute(delete(affectations).where(affectations.c.capteur_id == capteur_id))
+    db.session.execute(delete(appareils).where(appareils.c.capteur_id == capteur_id))
+    db.session.execute(delete(capteur).where(capteur.c.id == capteur_id))
+    marquer_capteurs_modifies()
+    _recalculer_ecarts(patients)
+    db.session.commit()
+    oublier_archives(capteur_id=capteur_id)
+    vider_caches_appareils()
+
+
+# -------------------------------------------------------------
+# Fonction dissocier_capteur : mesures d'un capteur pour un patient
+# -------------------------------------------------------------
+# - Les alertes du patient sont conservées (historique clinique)
+def dissocier_capteur(patient_id, capteur_id):
+    couple = (etats.c.patient_id == patient_id, etats.c.capteur_id == capteur_id)
+    if _nb_mesures(*couple) > taille_lot():
+        # Le couple disparaît tout de suite des états ; les mesures suivent par lots
+        db.session.execute(delete(etats).where(*couple))
+        _recalculer_ecarts([patient_id])
+        resultat = _mettre_en_file("patient_capteur", patient_id=patient_id, capteur_id=capteur_id)
+        db.session.commit()
+        return resultat
+    _supprimer_dissociation(patient_id, capteur_id)
+    return {"mode": IMMEDIATE}
+
+
+def _supprimer_dissociation(patient_id, capteur_id):
+    filtres = (mesures.c.patient_id == patient_id, mesures.c.capteur_id == capteur_id)
+    db.session.execute(delete(analyses).where(analyses.c.donnee_medicale_id.in_(
+        select(mesures.c.id).where(*filtres))))
+    db.session.execute(delete(cles).where(cles.c.donnee_medicale_id.in_(select(mesures.c.id).where(*filtres))))
+    db.session.execute(delete(mesures).where(*filtres))
+    db.session.execute(delete(etats).where(etats.c.patient_id == patient_id, etats.c.capteur_id == capteur_id))
+    _recalculer_ecarts([patient_id])
+    db.session.commit()
+    oublier_archives(patient_id=patient_id, capteur_id=capteur_id)
+
+
+# -------------------------------------------------------------
+# Fonction traiter_suppressions : passage de `flask purge-deletions`
+# -------------------------------------------------------------
+# - Vide par lots les mesures (et analyses), puis les alertes et clés
+#   d'ingestion de chaque suppression en attente, une transaction par
+#   lot, puis supprime la cible en une fois
+# - En cas d'erreur, la suppression reste en attente (reprise au
+#   passage suivant, les lots déjà supprimés restent supprimés)
+# - Retourne le bilan du passage
+def traiter_suppressions(lot=None):
+    lot = lot or taille_lot()
+    bilan = {"terminees": 0, "mesures": 0, "echecs": 0}
+    en_attente = db.session.execute(
+        select(Suppression.id).where(Suppression.etat == "en_attente").order_by(Suppression.id)
+    ).scalars().all()
+    for suppression_id in en_attente:
+        suppression = db.session.get(Suppression, suppression_id)
+        cible, patient_id, capteur_id = suppression.cible, suppression.patient_id, suppression.capteur_id
+        try:
+            if cible == "patient":
+                nombre = _par_lots(select(mesures.c.id).where(mesures.c.patient_id == patient_id), _mesures, lot)
+                _par_lots(select(alertes.c.id).where(alertes.c.patient_id == patient_id), _alertes, lot)
+                _supprimer_patient(patient_id)
+            elif cible == "capteur":
+                nombre = _par_lots(select(mesures.c.id).where(mesures.c.capteur_id == capteur_id), _mesures, lot)
+                _par_lots(select(cles.c.id).where(cles.c.capteur_id == capteur_id),
+                          lambda ids: [delete(cles).where(cles.c.id.in_(ids))], lot)
+                _supprimer_capteur(capteur_id)
+            else:
+                nombre = _par_lots(select(mesures.c.id).where(mesures.c.patient_id == patient_id,
+                                                              mesures.c.capteur_id == capteur_id), _mesures, lot)
+                _supprimer_dissociation(patient_id, capteur_id)
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception("Suppression %s : échec, nouvel essai au prochain passage", suppression_id)
+            db.session.execute(
+                update(Suppression).where(Suppression.id == suppression_id)
+                .values(derniere_erreur=str(e)[:255])
+            )
+            db.session.commit()
+            bilan["echecs"] += 1
+            continue
+
+        db.session.execute(
+            update(Suppression).where(Suppression.id == suppression_id)
+            .values(etat="terminee", date_fin=datetime.utcnow(), derniere_erreur=None,
+                    lignes_supprimees=Suppression.lignes_supprimees + nombre)
+        )
+        db.session.commit()
+        bilan["terminees"] += 1
+        bilan["mesures"] += nombre
+    return bilan
+
+
+# -------------------------------------------------------------
+# Outils internes
+# -------------------------------------------------------------
+def _par_lots(requete_ids, instructions, lot):
+    """Supprime par lots de `lot` identifiants, une transaction par lot."""
+    total = 0
+    while True:
+        ids = db.session.execute(requete_ids.limit(lot)).scalars().all()
+        for instruction in instructions(ids) if ids else ():
+            db.session.execute(instruction)
+        db.session.commit()
+        total += len(ids)
+        if len(ids) < lot:
+            return total
+
+
+def _mesures(ids):
+    return [delete(analyses).where(analyses.c.donnee_medicale_id.in_(ids)),
+            delete(cles).where(cles.c.donnee_medicale_id.in_(ids)),
+            delete(mesures).where(mesures.c.id.in_(ids))]
+
+
+def _alertes(ids):
+    return [delete(notifications).where(notifications.c.alerte_id.in_(ids)),
+            delete(alertes).where(alertes.c.id.in_(ids))]
+
+
+def _nb_mesures(*filtres):
+    return db.session.scalar(select(func.coalesce(func.sum(etats.c.nb_mesures), 0)).where(*filtres))
+
+
+def _proches(patient_id):
+    return db.session.execute(select(proche.c.id).where(proche.c.patient_id == patient_id)).scalars().all()
+
+
+def _archiver(table, ids):
+    db.session.execute(
+        update(table).where(table.c.id.in_(ids), table.c.date_suppression.is_(None))
+        .values(date_suppression=datetime.utcnow())
+    )
+
+
+def _mettre_en_file(cible, patient_id=None, capteur_id=None):
+    suppression = Suppression.query.filter_by(cible=cible, patient_id=patient_id, capteur_id=capteur_id,
+                                              etat="en_attente").first()
+    if suppression is None:
+        suppression = Suppression(cible=cible, patient_id=patient_id, capteur_id=capteur_id)
+        db.session.add(suppression)
+        db.session.flush()
+    return {"mode": DIFFEREE, "suppression_id": suppression.id}
+
+
+def _recalculer_ecarts(patient_ids):
+    """Écarts aux seuils des patients dont un couple (patient, capteur) a disparu."""
+    if not patient_ids:
+        return
+    medecins = dict(db.session.execute(
+        select(scores.c.patient_id, scores.c.medecin_id).where(scores.c.patient_id.in_(patient_ids))
+    ).all())
+    mettre_a_jour_scores(db.session.connection(), mesures={p: medecins.get(p) for p in patient_ids})
@@ -0,0 +1,245 @@
+# -------------------------------------------------------------
+# app/utils/archive_colonnes.py
+# -------------------------------------------------------------
+# Format d'archive colonnaire des mesures (un fichier par patient
+# et par capteur) :
+#
+#   [bloc 0][bloc 1]...[bloc n][index][pied]
+#
+# - bloc  : zlib( ids int64 en deltas | horodatages int64 en deltas
+#           (microsecondes) | valeurs float32 ), TAILLE_BLOC lignes max
+# - index : une entrée par bloc (bornes temporelles, nombre de lignes,
+#           position, taille, min / max / somme des valeurs)
+# - pied  : position de l'index, nombre de blocs, signature
+#
+# La lecture projette le fichier en mémoire (mmap) et ne décompresse
+# que les blocs qui chevauchent la période demandée ; les statistiques
+# d'un bloc entièrement inclus sont lues dans l'index, sans
+# décompression. L'ajout réécrit seulement l'index en fin de fichier ;
+# des lignes plus anciennes que le contenu (arrivées tardives) forment
+# de nouveaux blocs, réordonnés à la lecture. Les lignes supprimées
+# depuis l'archivage sont écartées à la lecture (paramètre exclus) :
+# les blocs qui les portent sont alors décompressés.
+# Les décodages passent par le module array (NumPy n'est pas requis).
+# -------------------------------------------------------------
+
+import bisect
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta
+
+SIGNATURE = b"S3DC"
+VERSION = 1
+TAILLE_BLOC = 4096
+
+_ENTREE = struct.Struct("<qqIQIddd")   # debut, fin, n, position, taille, min, max, somme
+_PIED = struct.Struct("<QI4sH")        # position index, nb blocs, signature, version
+_EPOQUE = datetime(1970, 1, 1)
+_GROS_BOUTISTE = sys.byteorder == "big"
+
+
+def en_microsecondes(dt):
+    return (dt - _EPOQUE) // timedelta(microseconds=1)
+
+
+def depuis_microsecondes(us):
+    return _EPOQUE + timedelta(microseconds=us)
+
+
+def _octets(tableau):
+    if _GROS_BOUTISTE:  # le fichier est toujours petit-boutiste
+        tableau = array(tableau.typecode, tableau)
+        tableau.byteswap()
+    return tableau.tobytes()
+
+
+def _tableau(typecode, octets):
+    tableau = array(typecode)
+    tableau.frombytes(octets)
+    if _GROS_BOUTISTE:
+        tableau.byteswap()
+    return tableau
+
+
+def _deltas(valeurs):
+    precedent, sortie = 0, array("q")
+    for v in valeurs:
+        sortie.append(v - precedent)
+        precedent = v
+    return sortie
+
+
+def _cumuls(deltas):
+    total, sortie = 0, array("q")
+    for d in deltas:
+        total += d
+        sortie.append(total)
+    return sortie
+
+
+def _valeur(v):
+    # float32 → plus courte écriture décimale (36.7 et non 36.70000076)
+    return float(f"{v:.7g}")
+
+
+# -------------------------------------------------------------
+# Écriture
+# -------------------------------------------------------------
+def _encoder_bloc(lignes):
+    ids = _deltas(l[0] for l in lignes)
+    horodatages = _deltas(en_microsecondes(l[1]) for l in lignes)
+    valeurs = array("f", (l[2] for l in lignes))
+    brut = _octets(ids) + _octets(horodatages) + _octets(valeurs)
+    return zlib.compress(brut, 6)
+
+
+def _lire_index(fichier, taille_fichier):
+    if taille_fichier < _PIED.size:
+        return [], 0
+    fichier.seek(taille_fichier - _PIED.size)
+    position, nb_blocs, signature, version = _PIED.unpack(fichier.read(_PIED.size))
+    if signature != SIGNATURE or version != VERSION:
+        raise ValueError("Fichier d'archive invalide")
+    fichier.seek(position)
+    brut = fichier.read(nb_blocs * _ENTREE.size)
+    return [_ENTREE.unpack_from(brut, i * _ENTREE.size) for i in range(nb_blocs)], position
+
+
+def ajouter_lignes(chemin, lignes):
+    """
+    Ajoute des lignes (id, date_heure, valeur) triées par date en fin
+    de fichier.
+    """
+    if not lignes:
+        return 0
+    os.makedirs(os.path.dirname(chemin) or ".", exist_ok=True)
+    mode = "r+b" if os.path.exists(chemin) else "w+b"
+
+    with open(chemin, mode) as fichier:
+        taille = fichier.seek(0, os.SEEK_END)
+        index, position = _lire_index(fichier, taille)
+
+        fichier.seek(position)
+        fichier.truncate()
+        for i in range(0, len(lignes), TAILLE_BLOC):
+            bloc = lignes[i:i + TAILLE_BLOC]
+            contenu = _encoder_bloc(bloc)
+            valeurs = [l[2] for l in bloc]
+            index.append((
+                en_microsecondes(bloc[0][1]), en_microsecondes(bloc[-1][1]), len(bloc),
+                position, len(contenu), min(valeurs), max(valeurs), sum(valeurs),
+            ))
+            fichier.write(contenu)
+            position += len(contenu)
+
+        fichier.write(b"".join(_ENTREE.pack(*e) for e in index))
+        fichier.write(_PIED.pack(position, len(index), SIGNATURE, VERSION))
+    return len(lignes)
+
+
+# -------------------------------------------------------------
+# Lecture
+# -------------------------------------------------------------
+class LecteurArchive:
+    """Lecture d'un fichier d'archive projeté en mémoire."""
+
+    def __init__(self, chemin):
+        self._fichier = open(chemin, "rb")
+        taille = os.fstat(self._fichier.fileno()).st_size
+        self.index, _ = _lire_index(self._fichier, taille)
+        self._carte = mmap.mmap(self._fichier.fileno(), 0, access=mmap.ACCESS_READ) if taille else None
+        self._fins = [e[1] for e in self.index]
+        # Blocs disjoints et croissants, sauf après un ajout de lignes tardives
+        self._ordonne = all(a[1] < b[0] for a, b in zip(self.index, self.index[1:]))
+
+    def fermer(self):
+        if self._carte is not None:
+            self._carte.close()
+        self._fichier.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fermer()
+
+    def __len__(self):
+        return sum(e[2] for e in self.index)
+
+    def _blocs(self, debut_us, fin_us):
+        if not self._ordonne:
+            for entree in self.index:
+                if ((debut_us is None or entree[1] >= debut_us)
+                        and (fin_us is None or entree[0] < fin_us)):
+                    yield entree
+            return
+        # Premier bloc dont la fin atteint debut_us (fins croissantes)
+        i = bisect.bisect_left(self._fins, debut_us) if debut_us is not None else 0
+        while i < len(self.index):
+            entree = self.index[i]
+            if fin_us is not None and entree[0] >= fin_us:
+                break
+            yield entree
+            i += 1
+
+    def _decoder(self, entree):
+        _, _, n, position, taille = entree[:5]
+        brut = zlib.decompress(self._carte[position:position + taille])
+        ids = _cumuls(_tableau("q", brut[:8 * n]))
+        horodatages = _cumuls(_tableau("q", brut[8 * n:16 * n]))
+        valeurs = _tableau("f", brut[16 * n:])
+        return ids, horodatages, valeurs
+
+    def lignes(self, depuis=None, jusqu_a=None, exclus=()):
+        """(id, date_heure, valeur) de [depuis, jusqu_a[ par date croissante, hors ids exclus."""
+        debut_us = en_microsecondes(depuis) if depuis else None
+        fin_us = en_microsecondes(jusqu_a) if jusqu_a else None
+        if not self._ordonne:
+            yield from sorted(self._lignes_blocs(debut_us, fin_us, exclus), key=lambda l: (l[1], l[0]))
+        else:
+            yield from self._lignes_blocs(debut_us, fin_us, exclus)
+
+    def _lignes_blocs(self, debut_us, fin_us, exclus=()):
+        for entree in self._blocs(debut_us, fin_us):
+            ids, horodatages, valeurs = self._decoder(entree)
+            i = bisect.bisect_left(horodatages, debut_us) if debut_us is not None else 0
+            j = bisect.bisect_left(horodatages, fin_us) if fin_us is not None else len(horodatages)
+            for k in range(i, j):
+                if ids[k] not in exclus:
+                    yield ids[k], depuis_microsecondes(horodatages[k]), _valeur(valeurs[k])
+
+    def statistiques(self, depuis=None, jusqu_a=None, exclus=()):
+        """{nombre, min, max, somme} sur [depuis, jusqu_a[, hors ids exclus."""
+        debut_us = en_microsecondes(depuis) if depuis else None
+        fin_us = en_microsecondes(jusqu_a) if jusqu_a else None
+        nombre, minimum, maximum, somme = 0, None, None, 0.0
+
+        for entree in self._blocs(debut_us, fin_us):
+            bloc_debut, bloc_fin, n, _, _, bmin, bmax, bsomme = entree
+            inclus = ((debut_us is None or bloc_debut >= debut_us)
+                      and (fin_us is None or bloc_fin < fin_us))
+            if not inclus or exclus:
+                ids, horodatages, valeurs_bloc = self._decoder(entree)
+                valeurs = [
+                    v for i, t, v in zip(ids, horodatages, valeurs_bloc)
+                    if (debut_us is None or t >= debut_us) and (fin_us is None or t < fin_us)
+                    and i not in exclus
+                ]
+                if not valeurs:
+                    continue
+                n, bmin, bmax, bsomme = len(valeurs), min(valeurs), max(valeurs), sum(valeurs)
+            nombre += n
+            somme += bsomme
+            minimum = bmin if minimum is None else min(minimum, bmin)
+            maximum = bmax if maximum is None else max(maximum, bmax)
+
+        return {
+            "nombre": nombre,
+            "min": _valeur(minimum) if minimum is not None else None,
+            "max": _valeur(maximum) if maximum is not None else None,
+            "somme": somme,
+        }
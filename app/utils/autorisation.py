@@ -0,0 +1,139 @@
+# -------------------------------------------------------------
+# app/utils/autorisation.py
+# -------------------------------------------------------------
+# Autorisation à partir des claims signés du JWT (sans accès base) :
+# - role       : medecin | patient | proche
+# - patient_id : patient rattaché (proches uniquement)
+# - specialite : spécialité (médecins uniquement)
+# Les claims sont posés par auth_service.generate_token.
+# Les sources d'ingestion (appareils, passerelles) s'authentifient
+# sans JWT : voir source_ingestion et appareil_service.
+# -------------------------------------------------------------
+
+import json
+from functools import wraps
+
+from flask import jsonify, request, g
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+
+
+# -------------------------------------------------------------
+# Fonction get_identite : {id, role, patient_id, specialite}
+# -------------------------------------------------------------
+# - Les jetons émis avant l'ajout des claims n'ont que l'identité
+#   JSON {id, role} : patient_id est alors résolu en base (repli)
+def get_identite():
+    claims = get_jwt()
+    try:
+        identite = json.loads(get_jwt_identity())
+    except (TypeError, ValueError):
+        identite = {}
+
+    identite = {
+        "id": identite.get("id"),
+        "role": claims.get("role", identite.get("role")),
+        "patient_id": claims.get("patient_id"),
+        "specialite": claims.get("specialite"),
+    }
+
+    if identite["role"] == "proche" and identite["patient_id"] is None and "role" not in claims:
+        from app.services.proche_service import get_proche_by_id
+        proche = get_proche_by_id(identite["id"]) if identite["id"] else None
+        identite["patient_id"] = proche.patient_id if proche else None
+
+    return identite
+
+
+def peut_acceder_patient(identite, patient_id):
+    role = identite.get("role")
+    if role == "medecin":
+        return True
+    if role == "patient":
+        return identite.get("id") == patient_id
+    if role == "proche":
+        return identite.get("patient_id") == patient_id
+    return False
+
+
+# -------------------------------------------------------------
+# Décorateur require_patient_access : patient lui-même, médecin, ou proche lié
+# -------------------------------------------------------------
+# - À placer sous @jwt_required()
+# - `parametre` : nom de l'argument de route portant l'ID du patient
+def require_patient_access(parametre="patient_id"):
+    def decorateur(vue):
+        @wraps(vue)
+        def wrapper(*args, **kwargs):
+            if not peut_acceder_patient(get_identite(), kwargs.get(parametre)):
+                return jsonify({"error": "Accès non autorisé"}), 403
+            return vue(*args, **kwargs)
+        return wrapper
+    return decorateur
+
+
+# -------------------------------------------------------------
+# Fonction source_ingestion : appareil, passerelle ou médecin
+# -------------------------------------------------------------
+# - À appeler dans le contexte de la requête ; retourne (source, None)
+#   ou (None, (message, statut)) si l'authentification est refusée
+# - X-Cle-Appareil : clé d'API d'un appareil → {"appareil": identité
+#   résolue}
+# - X-Passerelle / X-Horodatage / X-Signature : lot signé par une
+#   passerelle → {"passerelle_id": id}. Corps lu en flux
+#   (corps_entier=False) : la source porte aussi "corps_signe"
+#   (appareil_service.CorpsSigne), à vérifier avant tout traitement
+# - Sinon JWT d'un médecin (outils, saisie manuelle) → {} : patient,
+#   capteur et médecin sont alors lus dans le corps. Jeton absent ou
+#   invalide : exception de flask_jwt_extended (401)
+# - Vérifications servies par le cache du registre, sans accès base
+def source_ingestion(corps_entier=True):
+    from app.services.appareil_service import verifier_cle_appareil, verifier_signature, \
+        preparer_signature, CorpsSigne
+
+    entetes = request.headers
+    if "X-Cle-Appareil" in entetes:
+        appareil = verifier_cle_appareil(entetes["X-Cle-Appareil"])
+        if appareil is None:
+            return None, ("Clé d'appareil invalide", 401)
+        return {"appareil": appareil}, None
+    if "X-Signature" in entetes:
+        refus = None, ("Signature de passerelle invalide ou expirée", 401)
+        if corps_entier:
+            passerelle_id = verifier_signature(entetes.get("X-Passerelle"), entetes.get("X-Horodatage"),
+                                               entetes["X-Signature"], request.get_data(cache=True))
+            return ({"passerelle_id": passerelle_id}, None) if passerelle_id is not None else refus
+        preparee = preparer_signature(entetes.get("X-Passerelle"), entetes.get("X-Horodatage"))
+        if preparee is None:
+            return refus
+        passerelle_id, mac = preparee
+        return {"passerelle_id": passerelle_id, "corps_signe": CorpsSigne(mac, entetes["X-Signature"])}, None
+    verify_jwt_in_request()
+    if get_identite()["role"] != "medecin":
+        return None, ("Accès non autorisé", 403)
+    return {}, None
+
+
+# -------------------------------------------------------------
+# Décorateurs require_source_ingestion / require_source_flux
+# -------------------------------------------------------------
+# - g.source_ingestion = source (voir source_ingestion)
+# - require_source_flux : corps lu en flux par la vue, qui vérifie la
+#   signature d'une passerelle (g.source_ingestion["corps_signe"])
+def require_source_ingestion(vue):
+    return _require_source(vue, corps_entier=True)
+
+
+def require_source_flux(vue):
+    return _require_source(vue, corps_entier=False)
+
+
+def _require_source(vue, corps_entier):
+    @wraps(vue)
+    def wrapper(*args, **kwargs):
+        source, refus = source_ingestion(corps_entier)
+        if refus is not None:
+            message, statut = refus
+            return jsonify({"error": message}), statut
+        g.source_ingestion = source
+        return vue(*args, **kwargs)
+    return wrapper
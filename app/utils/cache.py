@@ -0,0 +1,50 @@
+# -------------------------------------------------------------
+# app/utils/cache.py
+# -------------------------------------------------------------
+# Cache mémoire à durée de vie (TTL), local au processus :
+# - entrées expirées ignorées à la lecture
+# - taille bornée : les entrées les plus anciennes sont évincées
+# - sûr en multi-thread (verrou)
+# -------------------------------------------------------------
+
+import threading
+import time
+from collections import OrderedDict
+
+ABSENT = object()
+
+
+class CacheTTL:
+    def __init__(self, taille_max=10_000, horloge=time.monotonic):
+        self._entrees = OrderedDict()   # clé → (expiration, valeur)
+        self._verrou = threading.Lock()
+        self._taille_max = taille_max
+        self._horloge = horloge
+
+    def get(self, cle, defaut=ABSENT):
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is None:
+                return defaut
+            expiration, valeur = entree
+            if expiration <= self._horloge():
+                del self._entrees[cle]
+                return defaut
+            return valeur
+
+    def set(self, cle, valeur, ttl):
+        if ttl <= 0:
+            return
+        with self._verrou:
+            self._entrees[cle] = (self._horloge() + ttl, valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self._taille_max:
+                self._entrees.popitem(last=False)
+
+    def invalider(self, cle):
+        with self._verrou:
+            self._entrees.pop(cle, None)
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
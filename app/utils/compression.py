@@ -0,0 +1,211 @@
+# -------------------------------------------------------------
+# app/utils/compression.py
+# -------------------------------------------------------------
+# Compression des réponses HTTP (hook after_request installé par
+# create_app) :
+# - négociation Accept-Encoding : brotli (module optionnel) ou gzip
+# - corps bufferisés : compressés au-delà de COMPRESSION_TAILLE_MIN
+#   octets, et seulement si le résultat est plus petit
+# - réponses en flux (exports, stream_with_context) : compressées
+#   morceau par morceau, avec un flush par morceau pour que le client
+#   reçoive les données au fil de l'eau
+# - fichiers statiques (Swagger UI) : compressés une fois au niveau
+#   maximal puis servis depuis un cache mémoire
+# Les types déjà compressés (Parquet, images) et les réponses portant
+# déjà un Content-Encoding ne sont pas touchés.
+# -------------------------------------------------------------
+
+import gzip
+import os
+import threading
+import zlib
+
+from flask import current_app, request
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+TYPES_COMPRESSIBLES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+_statiques = {}   # (chemin, mtime, encodage) → octets compressés
+_verrou_statiques = threading.Lock()
+
+
+def encodages_disponibles():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+# -------------------------------------------------------------
+# Fonction choisir_encodage : meilleur encodage accepté par le client
+# -------------------------------------------------------------
+# - Respecte les poids q (q=0 : refusé) ; à poids égal, l'ordre de
+#   `disponibles` décide (brotli d'abord)
+def choisir_encodage(accept_encoding, disponibles=None):
+    disponibles = disponibles or encodages_disponibles()
+    poids = {}
+    for element in (accept_encoding or "").split(","):
+        nom, _, parametres = element.strip().partition(";")
+        nom = nom.strip().lower()
+        if not nom:
+            continue
+        q = 1.0
+        parametres = parametres.strip()
+        if parametres.startswith("q="):
+            try:
+                q = float(parametres[2:])
+            except ValueError:
+                q = 0.0
+        poids[nom] = q
+
+    candidats = [
+        (poids.get(e, poids.get("*", 0.0)), -i, e) for i, e in enumerate(disponibles)
+    ]
+    meilleur = max(candidats, default=None)
+    return meilleur[2] if meilleur and meilleur[0] > 0 else None
+
+
+def compresser(donnees, encodage, niveau):
+    if encodage == "br":
+        return brotli.compress(donnees, quality=niveau)
+    return gzip.compress(donnees, compresslevel=niveau, mtime=0)
+
+
+# -------------------------------------------------------------
+# Fonction compresser_flux : compression en flux d'un itérable d'octets
+# -------------------------------------------------------------
+def compresser_flux(morceaux, encodage, niveau):
+    if encodage == "br":
+        compresseur = brotli.Compressor(quality=niveau)
+        compresser_morceau = compresseur.process
+        vider = compresseur.flush
+        terminer = compresseur.finish
+    else:
+        compresseur = zlib.compressobj(niveau, zlib.DEFLATED, 31)  # 31 = en-tête gzip
+        compresser_morceau = compresseur.compress
+        vider = lambda: compresseur.flush(zlib.Z_SYNC_FLUSH)  # noqa: E731
+        terminer = compresseur.flush
+
+    try:
+        for morceau in morceaux:
+            if isinstance(morceau, str):
+                morceau = morceau.encode("utf-8")
+            if not morceau:
+                continue
+            sortie = compresser_morceau(morceau) + vider()
+            if sortie:
+                yield sortie
+        yield terminer()
+    finally:
+        if hasattr(morceaux, "close"):
+            morceaux.close()
+
+
+def _niveau(config, encodage, statique=False):
+    if statique:
+        return 11 if encodage == "br" else 9
+    if encodage == "br":
+        return config.get("COMPRESSION_NIVEAU_BROTLI", 4)
+    return config.get("COMPRESSION_NIVEAU_GZIP", 6)
+
+
+def _compressible(reponse):
+    mimetype = reponse.mimetype or ""
+    return any(mimetype.startswith(t) for t in TYPES_COMPRESSIBLES)
+
+
+def _ajouter_vary(reponse):
+    vary = reponse.headers.get("Vary", "")
+    if "accept-encoding" not in vary.lower():
+        reponse.headers["Vary"] = f"{vary}, Accept-Encoding" if vary else "Accept-Encoding"
+
+
+# -------------------------------------------------------------
+# Fichiers statiques : compressés une seule fois
+# -------------------------------------------------------------
+def _fichier_statique():
+    endpoint = request.endpoint or ""
+    if endpoint == "static":
+        dossier = current_app.static_folder
+    elif endpoint.endswith(".static"):
+        blueprint = current_app.blueprints.get(endpoint.rsplit(".", 1)[0])
+        dossier = blueprint.static_folder if blueprint else None
+    else:
+        return None
+    nom = (request.view_args or {}).get("filename")
+    chemin = safe_join(dossier, nom) if dossier and nom else None
+    return chemin if chemin and os.path.isfile(chemin) else None
+
+
+def _statique_compresse(chemin, encodage):
+    cle = (chemin, os.stat(chemin).st_mtime_ns, encodage)
+    contenu = _statiques.get(cle)
+    if contenu is None:
+        with open(chemin, "rb") as fichier:
+            contenu = compresser(fichier.read(), encodage, _niveau({}, encodage, statique=True))
+        with _verrou_statiques:
+            _statiques[cle] = contenu
+    return contenu
+
+
+def _remplacer_corps(reponse, contenu):
+    original = reponse.response
+    reponse.direct_passthrough = False
+    reponse.set_data(contenu)
+    if hasattr(original, "close"):
+        original.close()
+
+
+# -------------------------------------------------------------
+# Hook after_request : compresse la réponse si c'est utile
+# -------------------------------------------------------------
+def compresser_reponse(reponse):
+    config = current_app.config
+    if (not config.get("COMPRESSION_ACTIVE", True)
+            or request.method == "HEAD"
+            or reponse.status_code < 200 or reponse.status_code in (204, 206, 304)
+            or "Content-Encoding" in reponse.headers
+            or "no-transform" in reponse.headers.get("Cache-Control", "")
+            or not _compressible(reponse)):
+        return reponse
+
+    _ajouter_vary(reponse)
+    encodage = choisir_encodage(request.headers.get("Accept-Encoding"))
+    if encodage is None:
+        return reponse
+
+    if reponse.direct_passthrough:
+        chemin = _fichier_statique()
+        if chemin is None:
+            return reponse
+        _remplacer_corps(reponse, _statique_compresse(chemin, encodage))
+    elif reponse.is_streamed:
+        reponse.response = compresser_flux(reponse.response, encodage, _niveau(config, encodage))
+        reponse.headers.pop("Content-Length", None)
+    else:
+        donnees = reponse.get_data()
+        if len(donnees) < config.get("COMPRESSION_TAILLE_MIN", 1024):
+            return reponse
+        compresse = compresser(donnees, encodage, _niveau(config, encodage))
+        if len(compresse) >= len(donnees):
+            return reponse
+        reponse.set_data(compresse)
+
+    reponse.headers["Content-Encoding"] = encodage
+    etag, faible = reponse.get_etag()
+    if etag and not faible:  # le corps diffère de l'original : ETag faible
+        reponse.set_etag(etag, weak=True)
+    return reponse
+
+
+def installer_compression(app):
+    app.after_request(compresser_reponse)
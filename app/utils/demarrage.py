@@ -0,0 +1,92 @@
+# -------------------------------------------------------------
+# app/utils/demarrage.py
+# -------------------------------------------------------------
+# Mesure du démarrage d'un worker :
+# - ChronoDemarrage : durée de chaque phase de create_app, exposée
+#   dans app.extensions["demarrage"]
+# - profil_imports / profil_init : exécutés dans un processus neuf
+#   (les modules du processus courant sont déjà importés) par
+#   `flask startup-profile`
+# -------------------------------------------------------------
+
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+RACINE = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class ChronoDemarrage:
+    def __init__(self):
+        self.durees = {}
+
+    @contextmanager
+    def phase(self, nom):
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.durees[nom] = round((time.perf_counter() - debut) * 1000, 2)
+
+
+def _executer(arguments, env=None):
+    resultat = subprocess.run(
+        [sys.executable, *arguments], cwd=RACINE, capture_output=True, text=True,
+        env={**os.environ, **(env or {})},
+    )
+    if resultat.returncode != 0:
+        raise RuntimeError(resultat.stderr.strip().splitlines()[-1] if resultat.stderr else "échec")
+    return resultat
+
+
+# -------------------------------------------------------------
+# Fonction profil_imports : -X importtime sur `from app import create_app`
+# -------------------------------------------------------------
+# - Retourne (total_ms, paquets, modules) : paquets = temps cumulé par
+#   paquet racine (sqlalchemy, flask, ...), modules = temps propre
+def profil_imports(module="app", env=None):
+    resultat = _executer(["-X", "importtime", "-c", f"import {module}"], env)
+    propres, paquets, total = {}, {}, 0
+    for ligne in resultat.stderr.splitlines():
+        if not ligne.startswith("import time:") or "self [us]" in ligne:
+            continue
+        propre, cumule, nom_brut = ligne[len("import time:"):].split("|")
+        nom = nom_brut.strip()
+        propre_ms = int(propre) / 1000
+        propres[nom] = propre_ms
+        racine = nom.split(".")[0]
+        paquets[racine] = paquets.get(racine, 0) + propre_ms
+        if len(nom_brut) - len(nom_brut.lstrip()) <= 1:  # module de premier niveau
+            total += int(cumule) / 1000
+    return round(total, 1), paquets, propres
+
+
+_SCRIPT_INIT = """
+import cProfile, json, pstats, time
+debut = time.perf_counter()
+from app import create_app
+import_ms = (time.perf_counter() - debut) * 1000
+profil = cProfile.Profile()
+debut = time.perf_counter()
+profil.enable()
+app = create_app()
+profil.disable()
+init_ms = (time.perf_counter() - debut) * 1000
+fonctions = [
+    ("%s:%d(%s)" % cle, round(v[3] * 1000, 2), round(v[2] * 1000, 2))
+    for cle, v in pstats.Stats(profil).stats.items()
+    if not cle[0].startswith(("<", "~"))
+]
+print(json.dumps({"import_ms": import_ms, "init_ms": init_ms,
+                  "phases": app.extensions.get("demarrage", {}), "fonctions": fonctions}))
+"""
+
+
+# -------------------------------------------------------------
+# Fonction profil_init : durée et points chauds de create_app()
+# -------------------------------------------------------------
+def profil_init(env=None):
+    return json.loads(_executer(["-c", _SCRIPT_INIT], env).stdout.strip().splitlines()[-1])
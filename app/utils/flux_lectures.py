@@ -0,0 +1,264 @@
+# -------------------------------------------------------------
+# app/utils/flux_lectures.py
+# -------------------------------------------------------------
+# Décodage incrémental d'un corps de requête en enregistrements :
+# - NDJSON : un objet JSON par ligne
+# - CBOR (RFC 8949) en séquence (RFC 8742) : objets concaténés
+# - MessagePack : objets concaténés
+# Le flux est lu par blocs de TAILLE_LECTURE octets : la mémoire
+# utilisée ne dépend pas de la taille du corps. Seul le sous-ensemble
+# utile aux lectures de capteurs est pris en charge (entiers, flottants,
+# chaînes, booléens, null, tableaux et dicts de longueur définie).
+#
+# Chaque décodeur produit (numero, objet, erreur) : erreur vaut None
+# ou un message. Une ligne NDJSON invalide est simplement signalée ;
+# une erreur de décodage binaire (pas de resynchronisation possible)
+# ou une ligne trop longue lève ErreurFlux et arrête le flux.
+# -------------------------------------------------------------
+
+import json
+import struct
+
+TAILLE_LECTURE = 64 * 1024
+TAILLE_MAX = 64 * 1024      # octets par ligne / chaîne
+ELEMENTS_MAX = 1024         # éléments par tableau ou dict
+PROFONDEUR_MAX = 8
+
+
+class ErreurFlux(ValueError):
+    """Flux illisible au-delà de ce point."""
+
+
+class Tampon:
+    """Lecture exacte de n octets au-dessus d'un flux, par blocs."""
+
+    def __init__(self, flux, taille_lecture=TAILLE_LECTURE):
+        self.flux = flux
+        self.taille_lecture = taille_lecture
+        self.donnees = b""
+        self.pos = 0
+
+    def _remplir(self):
+        morceau = self.flux.read(self.taille_lecture)
+        if not morceau:
+            return False
+        self.donnees = self.donnees[self.pos:] + morceau
+        self.pos = 0
+        return True
+
+    def fini(self):
+        return self.pos >= len(self.donnees) and not self._remplir()
+
+    def lire(self, n):
+        while len(self.donnees) - self.pos < n:
+            if not self._remplir():
+                raise ErreurFlux("Flux tronqué")
+        debut = self.pos
+        self.pos += n
+        return self.donnees[debut:self.pos]
+
+    def ligne(self, taille_max):
+        """Prochaine ligne sans le saut de ligne, ou None en fin de flux."""
+        while True:
+            fin = self.donnees.find(b"\n", self.pos)
+            if fin >= 0:
+                ligne = self.donnees[self.pos:fin]
+                self.pos = fin + 1
+                return ligne
+            if len(self.donnees) - self.pos > taille_max:
+                raise ErreurFlux(f"Ligne de plus de {taille_max} octets")
+            if not self._remplir():
+                ligne = self.donnees[self.pos:]
+                self.pos = len(self.donnees)
+                return ligne if ligne else None
+
+
+# -------------------------------------------------------------
+# NDJSON
+# -------------------------------------------------------------
+def enregistrements_ndjson(flux, charger=json.loads, taille_max=TAILLE_MAX):
+    tampon = Tampon(flux)
+    numero = 0
+    while True:
+        ligne = tampon.ligne(taille_max)
+        if ligne is None:
+            return
+        if not ligne.strip():
+            continue
+        numero += 1
+        try:
+            yield numero, charger(ligne), None
+        except ValueError:
+            yield numero, None, "JSON invalide"
+
+
+# -------------------------------------------------------------
+# Décodage binaire commun (CBOR, MessagePack)
+# -------------------------------------------------------------
+def _controler_taille(n, limite, quoi):
+    if n > limite:
+        raise ErreurFlux(f"{quoi} trop long ({n})")
+    return n
+
+
+def _texte(octets):
+    try:
+        return octets.decode("utf-8")
+    except UnicodeDecodeError:
+        raise ErreurFlux("Chaîne UTF-8 invalide")
+
+
+def _enregistrements_binaires(flux, decoder):
+    tampon = Tampon(flux)
+    numero = 0
+    while not tampon.fini():
+        numero += 1
+        yield numero, decoder(tampon, 0), None
+
+
+# -------------------------------------------------------------
+# CBOR
+# -------------------------------------------------------------
+_CBOR_LONGUEURS = {24: ">B", 25: ">H", 26: ">I", 27: ">Q"}
+
+
+def _cbor_argument(tampon, info):
+    if info < 24:
+        return info
+    format_ = _CBOR_LONGUEURS.get(info)
+    if format_ is None:
+        raise ErreurFlux("Longueur CBOR indéfinie ou réservée non prise en charge")
+    return struct.unpack(format_, tampon.lire(struct.calcsize(format_)))[0]
+
+
+def _cbor(tampon, profondeur):
+    if profondeur > PROFONDEUR_MAX:
+        raise ErreurFlux("Imbrication trop profonde")
+    initial = tampon.lire(1)[0]
+    majeur, info = initial >> 5, initial & 0x1F
+
+    if majeur == 7:
+        if info == 20:
+            return False
+        if info == 21:
+            return True
+        if info in (22, 23):
+            return None
+        if info == 25:
+            return struct.unpack(">e", tampon.lire(2))[0]
+        if info == 26:
+            return struct.unpack(">f", tampon.lire(4))[0]
+        if info == 27:
+            return struct.unpack(">d", tampon.lire(8))[0]
+        raise ErreurFlux(f"Valeur CBOR simple non prise en charge ({info})")
+
+    argument = _cbor_argument(tampon, info)
+    if majeur == 0:
+        return argument
+    if majeur == 1:
+        return -1 - argument
+    if majeur == 2:
+        return tampon.lire(_controler_taille(argument, TAILLE_MAX, "Chaîne"))
+    if majeur == 3:
+        return _texte(tampon.lire(_controler_taille(argument, TAILLE_MAX, "Chaîne")))
+    if majeur == 4:
+        n = _controler_taille(argument, ELEMENTS_MAX, "Tableau")
+        return [_cbor(tampon, profondeur + 1) for _ in range(n)]
+    if majeur == 5:
+        n = _controler_taille(argument, ELEMENTS_MAX, "Dict")
+        return {_cle(_cbor(tampon, profondeur + 1)): _cbor(tampon, profondeur + 1) for _ in range(n)}
+    return _cbor(tampon, profondeur + 1)  # majeur 6 : étiquette ignorée
+
+
+def enregistrements_cbor(flux):
+    return _enregistrements_binaires(flux, _cbor)
+
+
+# -------------------------------------------------------------
+# MessagePack
+# -------------------------------------------------------------
+_MSGPACK_FIXES = {
+    0xCA: ">f", 0xCB: ">d",
+    0xCC: ">B", 0xCD: ">H", 0xCE: ">I", 0xCF: ">Q",
+    0xD0: ">b", 0xD1: ">h", 0xD2: ">i", 0xD3: ">q",
+}
+_MSGPACK_LONGUEURS = {
+    0xC4: ">B", 0xC5: ">H", 0xC6: ">I",      # bin
+    0xD9: ">B", 0xDA: ">H", 0xDB: ">I",      # str
+    0xDC: ">H", 0xDD: ">I",                  # array
+    0xDE: ">H", 0xDF: ">I",                  # map
+}
+
+
+def _msgpack_dict(tampon, n, profondeur):
+    n = _controler_taille(n, ELEMENTS_MAX, "Dict")
+    return {_cle(_msgpack(tampon, profondeur + 1)): _msgpack(tampon, profondeur + 1) for _ in range(n)}
+
+
+def _msgpack_tableau(tampon, n, profondeur):
+    n = _controler_taille(n, ELEMENTS_MAX, "Tableau")
+    return [_msgpack(tampon, profondeur + 1) for _ in range(n)]
+
+
+def _msgpack(tampon, profondeur):
+    if profondeur > PROFONDEUR_MAX:
+        raise ErreurFlux("Imbrication trop profonde")
+    octet = tampon.lire(1)[0]
+
+    if octet <= 0x7F:
+        return octet
+    if octet >= 0xE0:
+        return octet - 0x100
+    if 0x80 <= octet <= 0x8F:
+        return _msgpack_dict(tampon, octet & 0x0F, profondeur)
+    if 0x90 <= octet <= 0x9F:
+        return _msgpack_tableau(tampon, octet & 0x0F, profondeur)
+    if 0xA0 <= octet <= 0xBF:
+        return _texte(tampon.lire(octet & 0x1F))
+    if octet == 0xC0:
+        return None
+    if octet in (0xC2, 0xC3):
+        return octet == 0xC3
+
+    format_ = _MSGPACK_FIXES.get(octet)
+    if format_ is not None:
+        return struct.unpack(format_, tampon.lire(struct.calcsize(format_)))[0]
+
+    format_ = _MSGPACK_LONGUEURS.get(octet)
+    if format_ is None:
+        raise ErreurFlux(f"Type MessagePack non pris en charge (0x{octet:02x})")
+    n = struct.unpack(format_, tampon.lire(struct.calcsize(format_)))[0]
+    if octet in (0xDC, 0xDD):
+        return _msgpack_tableau(tampon, n, profondeur)
+    if octet in (0xDE, 0xDF):
+        return _msgpack_dict(tampon, n, profondeur)
+    contenu = tampon.lire(_controler_taille(n, TAILLE_MAX, "Chaîne"))
+    return contenu if octet <= 0xC6 else _texte(contenu)
+
+
+def enregistrements_msgpack(flux):
+    return _enregistrements_binaires(flux, _msgpack)
+
+
+def _cle(cle):
+    if isinstance(cle, (list, dict)):
+        raise ErreurFlux("Clé de dict non scalaire")
+    return cle
+
+
+# -------------------------------------------------------------
+# Fonction decodeur_pour : décodeur associé au Content-Type
+# -------------------------------------------------------------
+DECODEURS = {
+    "application/x-ndjson": enregistrements_ndjson,
+    "application/jsonl": enregistrements_ndjson,
+    "application/cbor": enregistrements_cbor,
+    "application/cbor-seq": enregistrements_cbor,
+    "application/msgpack": enregistrements_msgpack,
+    "application/x-msgpack": enregistrements_msgpack,
+    "application/vnd.msgpack": enregistrements_msgpack,
+}
+
+
+def decodeur_pour(mimetype):
+    return DECODEURS.get((mimetype or "").lower())
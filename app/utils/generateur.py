@@ -0,0 +1,68 @@
+# -------------------------------------------------------------
+# app/utils/generateur.py
+# -------------------------------------------------------------
+# Génération de signes vitaux synthétiques réalistes :
+# - courbe circadienne (sinusoïde sur 24 h) propre à chaque capteur
+# - décalage individuel par patient + bruit de mesure
+# - injection d'anomalies hors seuils selon un taux configurable
+# Utilisé par la commande `flask seed-load` et les outils de charge.
+# -------------------------------------------------------------
+
+import math
+
+from app.models.enums import TypeCapteur
+from app.utils.seuils import SEUILS_CAPTEURS
+
+# Paramètres de la courbe : valeur moyenne, amplitude, heure du pic, bruit
+PROFILS_CIRCADIENS = {
+    TypeCapteur.temperature: {"base": 36.8, "amplitude": 0.3, "pic": 18, "bruit": 0.1},
+    TypeCapteur.pression: {"base": 118.0, "amplitude": 8.0, "pic": 10, "bruit": 3.0},
+    TypeCapteur.rythme: {"base": 72.0, "amplitude": 8.0, "pic": 14, "bruit": 2.5},
+}
+
+
+# -------------------------------------------------------------
+# Fonction valeur_circadienne : valeur attendue à une heure donnée
+# -------------------------------------------------------------
+def valeur_circadienne(type_capteur, heure, decalage=0.0):
+    """Retourne la valeur moyenne du capteur à l'heure (float, 0-24) indiquée."""
+    profil = PROFILS_CIRCADIENS[type_capteur]
+    phase = 2 * math.pi * (heure - profil["pic"]) / 24
+    return profil["base"] + decalage + profil["amplitude"] * math.cos(phase)
+
+
+# -------------------------------------------------------------
+# Fonction valeur_anormale : valeur franchement hors seuils
+# -------------------------------------------------------------
+def valeur_anormale(type_capteur, rng):
+    seuil = SEUILS_CAPTEURS[type_capteur]
+    ecart = (seuil["max"] - seuil["min"]) * rng.uniform(0.05, 0.4)
+    if rng.random() < 0.5:
+        return seuil["min"] - ecart
+    return seuil["max"] + ecart
+
+
+# -------------------------------------------------------------
+# Fonction generer_mesure : valeur d'une mesure + indicateur d'anomalie
+# -------------------------------------------------------------
+# - `decalage` : écart individuel du patient par rapport à la moyenne
+# - Une valeur normale est bornée aux seuils pour ne pas créer
+#   d'anomalies involontaires : seules les anomalies injectées en sont
+def generer_mesure(type_capteur, date_mesure, decalage, taux_anomalie, rng):
+    if rng.random() < taux_anomalie:
+        return round(valeur_anormale(type_capteur, rng), 2), True
+
+    heure = date_mesure.hour + date_mesure.minute / 60
+    profil = PROFILS_CIRCADIENS[type_capteur]
+    valeur = valeur_circadienne(type_capteur, heure, decalage) + rng.gauss(0, profil["bruit"])
+
+    seuil = SEUILS_CAPTEURS[type_capteur]
+    valeur = min(max(valeur, seuil["min"]), seuil["max"])
+    return round(valeur, 2), False
+
+
+# -------------------------------------------------------------
+# Fonction decalage_patient : profil individuel tiré une fois par patient
+# -------------------------------------------------------------
+def decalage_patient(type_capteur, rng):
+    return rng.gauss(0, PROFILS_CIRCADIENS[type_capteur]["amplitude"] / 2)
@@ -0,0 +1,75 @@
+# -------------------------------------------------------------
+# app/utils/hachage.py
+# -------------------------------------------------------------
+# Hachage bcrypt dans un pool de threads borné :
+# - le pool ne fait que plafonner la concurrence : le thread de la
+#   requête attend le résultat (.result()) ; bcrypt libère le GIL, les
+#   autres threads du worker continuent de servir pendant ce temps
+# - le nombre de hachages simultanés est plafonné (BCRYPT_POOL_WORKERS)
+#   et la file d'attente bornée (BCRYPT_FILE_ATTENTE) : au-delà, la
+#   demande est refusée immédiatement (503) au lieu d'affamer le CPU
+# - le coût est configurable (BCRYPT_LOG_ROUNDS) ; un hash dont le
+#   coût diffère est signalé pour être recalculé à la connexion
+# -------------------------------------------------------------
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.extension import bcrypt
+
+_pool = None
+_admission = None
+_verrou = threading.Lock()
+
+
+def _pool_courant():
+    global _pool, _admission
+    if _pool is None:
+        with _verrou:
+            if _pool is None:
+                workers = current_app.config.get("BCRYPT_POOL_WORKERS") or os.cpu_count() or 1
+                file_attente = current_app.config.get("BCRYPT_FILE_ATTENTE", 32)
+                _admission = threading.BoundedSemaphore(workers + file_attente)
+                _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    return _pool, _admission
+
+
+# -------------------------------------------------------------
+# Fonction executer_hachage : soumet un calcul bcrypt au pool
+# -------------------------------------------------------------
+# - Lève RuntimeError si le pool et sa file sont saturés
+def executer_hachage(fonction, *args):
+    pool, admission = _pool_courant()
+    if not admission.acquire(blocking=False):
+        raise RuntimeError("Service d'authentification saturé")
+    try:
+        return pool.submit(fonction, *args).result()
+    finally:
+        admission.release()
+
+
+def verifier_mot_de_passe(mot_de_passe_hache, mot_de_passe):
+    return executer_hachage(bcrypt.check_password_hash, mot_de_passe_hache, mot_de_passe)
+
+
+def hacher_mot_de_passe(mot_de_passe):
+    rounds = current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
+    hache = executer_hachage(bcrypt.generate_password_hash, mot_de_passe, rounds)
+    return hache.decode("utf-8")
+
+
+# -------------------------------------------------------------
+# Fonction cout_hash : facteur de coût d'un hash "$2b$12$..."
+# -------------------------------------------------------------
+def cout_hash(mot_de_passe_hache):
+    try:
+        return int(mot_de_passe_hache.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def doit_rehacher(mot_de_passe_hache):
+    return cout_hash(mot_de_passe_hache) != current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
@@ -0,0 +1,102 @@
+# -------------------------------------------------------------
+# app/utils/json_rapide.py
+# -------------------------------------------------------------
+# Fournisseurs JSON de l'application (app.json, utilisé par jsonify
+# et request.get_json) :
+# - FournisseurJSON : module json standard, avec les dates en ISO 8601
+#   et les énumérations par leur valeur (au lieu des dates HTTP de Flask)
+# - FournisseurOrjson : même sortie via orjson (dépendance optionnelle),
+#   qui encode nativement datetime, date, Enum, dataclasses et tuples
+# Les sérialiseurs peuvent donc renvoyer ces types tels quels ;
+# safe_date / safe_enum ne restent utiles que pour les dicts consommés
+# hors JSON (e-mails, exports, tests).
+# -------------------------------------------------------------
+
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime, time
+from enum import Enum
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+
+def _defaut(o):
+    """Types non natifs : même conversion pour les deux fournisseurs."""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, Enum):
+        return o.value
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Objet de type {type(o).__name__} non sérialisable en JSON")
+
+
+# -------------------------------------------------------------
+# Classe FournisseurJSON : module json standard
+# -------------------------------------------------------------
+class FournisseurJSON(DefaultJSONProvider):
+    default = staticmethod(_defaut)
+
+
+# -------------------------------------------------------------
+# Classe FournisseurOrjson : encodage natif via orjson
+# -------------------------------------------------------------
+# - La réponse est construite directement en octets (pas d'aller-retour
+#   str → bytes) ; sort_keys et l'indentation en mode debug sont respectés
+# - Options inconnues d'orjson (cls, ...) : repli sur le module standard
+class FournisseurOrjson(FournisseurJSON):
+    ensure_ascii = False
+
+    def _options(self, indent=None, sort_keys=None):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _octets(self, obj, **kwargs):
+        indent = kwargs.pop("indent", None)
+        sort_keys = kwargs.pop("sort_keys", None)
+        kwargs.pop("separators", None)
+        kwargs.pop("ensure_ascii", None)
+        if kwargs:
+            return None
+        return orjson.dumps(obj, default=_defaut, option=self._options(indent, sort_keys))
+
+    def dumps(self, obj, **kwargs):
+        octets = self._octets(obj, **kwargs)
+        if octets is None:
+            return super().dumps(obj, **kwargs)
+        return octets.decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._octets(obj, indent=indent) + b"\n", mimetype=self.mimetype
+        )
+
+
+# -------------------------------------------------------------
+# Fonction installer_json : choisit le fournisseur de l'application
+# -------------------------------------------------------------
+def installer_json(app):
+    rapide = app.config.get("JSON_RAPIDE", True) and orjson is not None
+    app.json = (FournisseurOrjson if rapide else FournisseurJSON)(app)
+    return app.json
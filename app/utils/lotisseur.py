@@ -0,0 +1,100 @@
+# -------------------------------------------------------------
+# app/utils/lotisseur.py
+# -------------------------------------------------------------
+# Regroupement asynchrone des écritures (ingestion ASGI) :
+# - chaque connexion soumet un paquet et attend son résultat
+# - des tâches « écrivains » fusionnent les paquets en attente jusqu'à
+#   taille_lot éléments ou delai_s secondes, puis exécutent le lot en
+#   une seule transaction
+# - file bornée : quand la base ne suit plus, soumettre() attend, ce
+#   qui ralentit la lecture des corps de requête (contre-pression)
+# -------------------------------------------------------------
+
+import asyncio
+
+_FIN = object()
+
+
+class Lotisseur:
+    def __init__(self, executer_lot, taille_lot=500, delai_s=0.05, ecrivains=1, file_max=1000):
+        """
+        executer_lot : coroutine (paquets) → un résultat par paquet.
+        """
+        self.executer_lot = executer_lot
+        self.taille_lot = taille_lot
+        self.delai_s = delai_s
+        self.nb_ecrivains = ecrivains
+        self.file_max = file_max
+        self._file = None
+        self._taches = []
+        self.lots = 0
+        self.elements = 0
+
+    @property
+    def actif(self):
+        return bool(self._taches)
+
+    @property
+    def en_attente(self):
+        return self._file.qsize() if self._file is not None else 0
+
+    async def demarrer(self):
+        if self._taches:
+            return
+        self._file = asyncio.Queue(self.file_max)
+        self._taches = [asyncio.create_task(self._ecrivain()) for _ in range(self.nb_ecrivains)]
+
+    async def arreter(self):
+        """Vide la file puis arrête les écrivains."""
+        if not self._taches:
+            return
+        for _ in self._taches:
+            await self._file.put(_FIN)
+        await asyncio.gather(*self._taches, return_exceptions=True)
+        self._taches = []
+
+    async def soumettre(self, paquet):
+        futur = asyncio.get_running_loop().create_future()
+        await self._file.put((paquet, futur))
+        return await futur
+
+    async def _lot_suivant(self, premier):
+        lot, taille = [premier], len(premier[0])
+        echeance = asyncio.get_running_loop().time() + self.delai_s
+        while taille < self.taille_lot:
+            reste = echeance - asyncio.get_running_loop().time()
+            if reste <= 0:
+                break
+            try:
+                element = await asyncio.wait_for(self._file.get(), reste)
+            except asyncio.TimeoutError:
+                break
+            if element is _FIN:
+                return lot, True
+            lot.append(element)
+            taille += len(element[0])
+        return lot, False
+
+    async def _ecrivain(self):
+        while True:
+            premier = await self._file.get()
+            if premier is _FIN:
+                return
+            lot, fin = await self._lot_suivant(premier)
+            await self._executer(lot)
+            if fin:
+                return
+
+    async def _executer(self, lot):
+        try:
+            resultats = await self.executer_lot([paquet for paquet, _ in lot])
+        except Exception as e:  # le lot entier est annulé (une transaction)
+            for _, futur in lot:
+                if not futur.done():
+                    futur.set_exception(e)
+            return
+        self.lots += 1
+        self.elements += sum(len(paquet) for paquet, _ in lot)
+        for (_, futur), resultat in zip(lot, resultats):
+            if not futur.done():
+                futur.set_result(resultat)
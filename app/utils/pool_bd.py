@@ -0,0 +1,183 @@
+# -------------------------------------------------------------
+# app/utils/pool_bd.py
+# -------------------------------------------------------------
+# Profil du moteur SQLAlchemy (SQLALCHEMY_ENGINE_OPTIONS) :
+# - taille du pool déduite des workers / threads gunicorn : chaque
+#   worker est un processus avec son propre pool, dimensionné sur
+#   ses threads, le tout borné par DB_MAX_CONNEXIONS
+# - pool_pre_ping + pool_recycle : les connexions coupées par le
+#   Postgres managé pendant les périodes d'inactivité sont détectées
+#   et remplacées au lieu de remonter une erreur
+# - statement_timeout / idle_in_transaction_session_timeout posés
+#   à l'ouverture de la connexion (paramètres de démarrage libpq)
+# - mode « pooler externe » (PgBouncer en mode transaction) :
+#   pas de paramètres de démarrage (refusés par PgBouncer), pas de
+#   requêtes préparées côté serveur, pool local réduit
+# Les métriques de saturation sont collectées par événements de pool.
+# -------------------------------------------------------------
+
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+# -------------------------------------------------------------
+# Fonction taille_pool : (pool_size, max_overflow) pour un worker
+# -------------------------------------------------------------
+# - threads : requêtes servies en parallèle par un worker
+# - workers : processus gunicorn partageant le budget de connexions
+# - max_connexions : budget total côté serveur (0 = non borné)
+def taille_pool(workers, threads, max_connexions=0, pool_size=0, max_overflow=-1):
+    workers = max(1, workers or 1)
+    threads = max(1, threads or 1)
+
+    taille = pool_size or threads
+    # Les rafales (threads bcrypt, commandes CLI) passent par le débordement
+    debordement = max_overflow if max_overflow >= 0 else max(2, threads // 2)
+
+    if max_connexions:
+        budget = max(1, max_connexions // workers)
+        taille = min(taille, budget)
+        debordement = max(0, min(debordement, budget - taille))
+
+    return taille, debordement
+
+
+# -------------------------------------------------------------
+# Fonction options_moteur : SQLALCHEMY_ENGINE_OPTIONS selon la config
+# -------------------------------------------------------------
+# - uri : base ciblée (défaut : SQLALCHEMY_DATABASE_URI)
+# - lecture_seule : transactions en lecture seule côté serveur (réplicas)
+def options_moteur(config, uri=None, lecture_seule=False):
+    url = make_url(uri or config["SQLALCHEMY_DATABASE_URI"])
+    options = {"pool_pre_ping": config.get("DB_POOL_PRE_PING", True)}
+
+    if url.get_backend_name() != "postgresql":
+        # SQLite : Flask-SQLAlchemy choisit le pool (StaticPool en mémoire)
+        return options
+
+    taille, debordement = taille_pool(
+        config.get("GUNICORN_WORKERS", 1),
+        config.get("GUNICORN_THREADS", 1),
+        config.get("DB_MAX_CONNEXIONS", 0),
+        config.get("DB_POOL_SIZE", 0),
+        config.get("DB_MAX_OVERFLOW", -1),
+    )
+    options.update({
+        "pool_size": taille,
+        "max_overflow": debordement,
+        "pool_timeout": config.get("DB_POOL_TIMEOUT_S", 10),
+        "pool_recycle": config.get("DB_POOL_RECYCLE_S", 1800),
+        "pool_use_lifo": True,  # les connexions inutilisées vieillissent et sont recyclées
+    })
+
+    connect_args = {}
+    driver = url.get_driver_name()
+
+    if config.get("DB_POOLER") == "pgbouncer":
+        # Requêtes préparées désactivées : une connexion serveur différente
+        # peut servir chaque transaction (psycopg2 n'en prépare jamais)
+        if driver == "psycopg":
+            connect_args["prepare_threshold"] = None
+        elif driver == "asyncpg":
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+    else:
+        parametres = []
+        if config.get("DB_STATEMENT_TIMEOUT_MS"):
+            parametres.append(f"-c statement_timeout={int(config['DB_STATEMENT_TIMEOUT_MS'])}")
+        if config.get("DB_IDLE_TRANSACTION_TIMEOUT_MS"):
+            parametres.append(
+                "-c idle_in_transaction_session_timeout="
+                f"{int(config['DB_IDLE_TRANSACTION_TIMEOUT_MS'])}"
+            )
+        if lecture_seule:
+            parametres.append("-c default_transaction_read_only=on")
+        if parametres and driver == "asyncpg":
+            # asyncpg : paramètres de session passés via server_settings
+            connect_args["server_settings"] = dict(
+                p[3:].split("=", 1) for p in parametres
+            )
+        elif parametres:
+            connect_args["options"] = " ".join(parametres)
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+# -------------------------------------------------------------
+# Métriques de saturation du pool
+# -------------------------------------------------------------
+class MetriquesPool:
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self.reinitialiser()
+
+    def reinitialiser(self):
+        with self._verrou:
+            self.emprunts = 0          # checkouts
+            self.en_cours = 0
+            self.pic_en_cours = 0
+            self.connexions_ouvertes = 0
+            self.invalidations = 0     # connexions mortes détectées (pre-ping, erreurs)
+            self.delais_depasses = 0   # attentes > pool_timeout (réponses 503)
+
+    def emprunt(self):
+        with self._verrou:
+            self.emprunts += 1
+            self.en_cours += 1
+            self.pic_en_cours = max(self.pic_en_cours, self.en_cours)
+
+    def restitution(self):
+        with self._verrou:
+            self.en_cours = max(0, self.en_cours - 1)
+
+    def compter(self, attribut):
+        with self._verrou:
+            setattr(self, attribut, getattr(self, attribut) + 1)
+
+
+metriques_pool = MetriquesPool()
+
+
+def installer_metriques_pool(engine):
+    pool = engine.pool
+    if getattr(pool, "_metriques_s3dpa", False):
+        return
+    pool._metriques_s3dpa = True
+
+    event.listen(pool, "checkout", lambda *args: metriques_pool.emprunt())
+    event.listen(pool, "checkin", lambda *args: metriques_pool.restitution())
+    event.listen(pool, "connect", lambda *args: metriques_pool.compter("connexions_ouvertes"))
+    event.listen(pool, "invalidate", lambda *args: metriques_pool.compter("invalidations"))
+
+
+# -------------------------------------------------------------
+# Fonction etat_pool : instantané du pool + compteurs cumulés
+# -------------------------------------------------------------
+def etat_pool(engine):
+    pool = engine.pool
+    etat = {
+        "pool": type(pool).__name__,
+        "emprunts": metriques_pool.emprunts,
+        "en_cours": metriques_pool.en_cours,
+        "pic_en_cours": metriques_pool.pic_en_cours,
+        "connexions_ouvertes": metriques_pool.connexions_ouvertes,
+        "invalidations": metriques_pool.invalidations,
+        "delais_depasses": metriques_pool.delais_depasses,
+    }
+
+    # QueuePool : capacité et taux d'occupation
+    if hasattr(pool, "size") and hasattr(pool, "overflow"):
+        capacite = pool.size() + max(0, pool._max_overflow)
+        etat.update({
+            "taille": pool.size(),
+            "debordement_max": pool._max_overflow,
+            "disponibles": pool.checkedin(),
+            "empruntees": pool.checkedout(),
+            "debordement": max(0, pool.overflow()),
+            "saturation": round(pool.checkedout() / capacite, 3) if capacite > 0 else None,
+        })
+    return etat
@@ -0,0 +1,69 @@
+# -------------------------------------------------------------
+# app/utils/rate_limit.py
+# -------------------------------------------------------------
+# Limiteur de débit en mémoire par « seau à jetons » :
+# - un seau par clé (compte, adresse IP, ...)
+# - capacité = rafale autorisée, recharge = secondes par jeton
+# - consommation atomique (verrou) : utilisable depuis plusieurs threads
+# Le stockage est local au processus : chaque worker gunicorn a ses
+# propres seaux, ce qui suffit à borner le coût CPU des tentatives.
+# -------------------------------------------------------------
+
+import threading
+import time
+
+# Au-delà, les seaux pleins (inactifs) sont purgés
+NB_MAX_SEAUX = 100_000
+
+
+class LimiteurDebit:
+    def __init__(self, horloge=time.monotonic):
+        self._seaux = {}          # clé → (jetons, dernier_instant, délai de recharge complète)
+        self._verrou = threading.Lock()
+        self._horloge = horloge
+
+    # ---------------------------------------------------------
+    # consommer : retire un jeton ; renvoie 0 si accepté,
+    # sinon le délai (secondes) avant le prochain jeton
+    # ---------------------------------------------------------
+    def consommer(self, cle, capacite, recharge_s):
+        return self.consommer_tous([(cle, capacite, recharge_s)])
+
+    # ---------------------------------------------------------
+    # consommer_tous : un jeton dans chaque seau, ou aucun
+    # ---------------------------------------------------------
+    # - regles : [(clé, capacité, recharge_s)], ex. compte et adresse IP
+    # - Si un seau est vide, aucun jeton n'est retiré : une requête
+    #   refusée par l'IP n'entame pas le seau du compte
+    # - Renvoie 0 si accepté, sinon le plus long délai d'attente
+    def consommer_tous(self, regles):
+        maintenant = self._horloge()
+        with self._verrou:
+            niveaux, attente = [], 0
+            for cle, capacite, recharge_s in regles:
+                jetons, dernier, _ = self._seaux.get(cle, (float(capacite), maintenant, 0))
+                jetons = min(float(capacite), jetons + (maintenant - dernier) / recharge_s)
+                niveaux.append((cle, jetons, recharge_s * capacite))
+                if jetons < 1:
+                    attente = max(attente, (1 - jetons) * recharge_s)
+
+            consomme = 0 if attente else 1
+            for cle, jetons, delai_plein in niveaux:
+                self._seaux[cle] = (jetons - consomme, maintenant, delai_plein)
+            if len(self._seaux) > NB_MAX_SEAUX:
+                self._purger(maintenant)
+            return attente
+
+    def _purger(self, maintenant):
+        # Un seau rechargé au maximum équivaut à un seau absent ; chaque
+        # seau garde son propre délai (compte et IP ont des politiques
+        # différentes)
+        self._seaux = {
+            cle: seau
+            for cle, seau in self._seaux.items()
+            if maintenant - seau[1] < seau[2]
+        }
+
+    def reinitialiser(self):
+        with self._verrou:
+            self._seaux.clear()
@@ -0,0 +1,84 @@
+# -------------------------------------------------------------
+# app/utils/reordonnancement.py
+# -------------------------------------------------------------
+# Fenêtre de réordonnancement des lectures horodatées par l'appareil :
+# - une file par couple (patient_id, capteur_id), triée par
+#   date_heure_mesure (puis numéro d'arrivée, pour un ordre déterministe)
+# - une lecture est libérée quand la plus récente reçue pour son couple
+#   la dépasse de plus de retard_max_s : à l'intérieur de cette borne,
+#   les lectures sont évaluées dans l'ordre des mesures
+# - une lecture plus ancienne qu'une lecture déjà libérée arrive trop
+#   tard pour être remise en ordre : elle est libérée aussitôt et sera
+#   traitée par la voie de correction (ingestion_service.mettre_a_jour_etats)
+# - au-delà de capacite lectures en attente, la plus ancienne du couple
+#   courant est libérée : la mémoire reste bornée
+# Une fenêtre vit le temps d'une requête (flux, connexion ASGI) : vider()
+# libère le reste en fin de corps.
+# -------------------------------------------------------------
+
+import heapq
+from datetime import timedelta
+
+
+class FenetreReordonnancement:
+    def __init__(self, retard_max_s=30, capacite=10000):
+        self.retard_max = timedelta(seconds=retard_max_s)
+        self.capacite = max(1, capacite)
+        self.files = {}         # couple → [(date, numero, lecture)]
+        self.plus_recentes = {}  # couple → date la plus récente reçue
+        self.liberees = {}      # couple → date de la dernière lecture libérée
+        self.en_attente = 0
+        self.reordonnees = 0    # lectures arrivées après une plus récente
+        self.tardives = 0       # lectures arrivées après leur fenêtre
+
+    def _liberer(self, couple):
+        date, numero, lecture = heapq.heappop(self.files[couple])
+        self.en_attente -= 1
+        self.liberees[couple] = date
+        return numero, lecture
+
+    # ---------------------------------------------------------
+    # Ajout d'une lecture : retourne les lectures libérées
+    # ---------------------------------------------------------
+    def ajouter(self, numero, lecture):
+        couple = (lecture["patient_id"], lecture["capteur_id"])
+        date = lecture["date_heure_mesure"]
+
+        derniere_liberee = self.liberees.get(couple)
+        if derniere_liberee is not None and date < derniere_liberee:
+            self.tardives += 1
+            return [(numero, lecture)]
+
+        plus_recente = self.plus_recentes.get(couple)
+        if plus_recente is not None and date < plus_recente:
+            self.reordonnees += 1
+        else:
+            self.plus_recentes[couple] = plus_recente = date
+        file = self.files.setdefault(couple, [])
+        heapq.heappush(file, (date, numero, lecture))
+        self.en_attente += 1
+
+        sorties = []
+        limite = plus_recente - self.retard_max
+        while file and file[0][0] <= limite:
+            sorties.append(self._liberer(couple))
+        if self.en_attente > self.capacite and file:
+            sorties.append(self._liberer(couple))
+        return sorties
+
+    def vider(self):
+        """Toutes les lectures en attente, dans l'ordre des mesures."""
+        restantes = sorted(
+            (element for file in self.files.values() for element in file),
+            key=lambda element: (element[0], element[1]),
+        )
+        for couple, file in self.files.items():
+            if file:
+                self.liberees[couple] = max(file)[0]
+                file.clear()
+        self.en_attente = 0
+        return [(numero, lecture) for _, numero, lecture in restantes]
+
+    def premier_en_attente(self):
+        """Plus petit numéro encore en attente (None si la fenêtre est vide)."""
+        return min((numero for file in self.files.values() for _, numero, _ in file), default=None)
@@ -0,0 +1,125 @@
+# -------------------------------------------------------------
+# app/utils/replicas.py
+# -------------------------------------------------------------
+# Routage des lectures lourdes vers des réplicas en lecture seule :
+# - chaque réplica est un bind Flask-SQLAlchemy "replica_<n>"
+#   (DB_REPLICA_URIS, séparées par des virgules)
+# - seules les fonctions décorées @lecture_replica (listes,
+#   recherches, statistiques, historiques) sont routées ; tout le
+#   reste, et en particulier les écritures, reste sur le primaire
+# - lecture de ses propres écritures : après une écriture, les
+#   lectures du même utilisateur restent sur le primaire pendant
+#   REPLICA_COLLAGE_S secondes (le temps que le réplica rattrape)
+# Le collage est mémorisé par worker : avec plusieurs workers
+# gunicorn, prévoir une fenêtre couvrant le retard de réplication.
+# -------------------------------------------------------------
+
+import functools
+import random
+from contextvars import ContextVar
+
+from flask import current_app, has_app_context, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from app.utils.cache import CacheTTL
+from app.utils.pool_bd import options_moteur
+
+PREFIXE_REPLICA = "replica_"
+
+_lecture_replica = ContextVar("lecture_replica", default=False)
+
+# clé utilisateur → True tant que ses lectures doivent rester sur le primaire
+ecritures_recentes = CacheTTL()
+
+
+# -------------------------------------------------------------
+# Fonction binds_replicas : SQLALCHEMY_BINDS des réplicas configurés
+# -------------------------------------------------------------
+def binds_replicas(config):
+    uris = [u.strip() for u in (config.get("DB_REPLICA_URIS") or "").split(",") if u.strip()]
+    return {
+        f"{PREFIXE_REPLICA}{i}": {"url": uri, **options_moteur(config, uri, lecture_seule=True)}
+        for i, uri in enumerate(uris)
+    }
+
+
+# -------------------------------------------------------------
+# Fonction cle_utilisateur : identité JWT, sinon adresse IP
+# -------------------------------------------------------------
+def cle_utilisateur():
+    if not has_request_context():
+        return None
+    try:
+        identite = get_jwt_identity()
+    except RuntimeError:  # route sans @jwt_required
+        identite = None
+    return identite or f"ip:{request.remote_addr}"
+
+
+def marquer_ecriture():
+    cle = cle_utilisateur()
+    if cle is not None and has_app_context():
+        ttl = current_app.config.get("REPLICA_COLLAGE_S", 5)
+        if ttl > 0:
+            ecritures_recentes.set(cle, True, ttl)
+
+
+def _lecture_collee():
+    cle = cle_utilisateur()
+    return cle is not None and ecritures_recentes.get(cle, False)
+
+
+# -------------------------------------------------------------
+# Décorateur lecture_replica : autorise le routage vers un réplica
+# -------------------------------------------------------------
+def lecture_replica(fonction):
+    @functools.wraps(fonction)
+    def wrapper(*args, **kwargs):
+        jeton = _lecture_replica.set(True)
+        try:
+            return fonction(*args, **kwargs)
+        finally:
+            _lecture_replica.reset(jeton)
+    return wrapper
+
+
+# -------------------------------------------------------------
+# Classe SessionRoutage : choix du moteur requête par requête
+# -------------------------------------------------------------
+class SessionRoutage(Session):
+    def __init__(self, db, **kwargs):
+        super().__init__(db, **kwargs)
+        self._a_ecrit = False
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _lecture_replica.get() and not self._ecriture_en_cours():
+            replicas = [e for cle, e in self._db.engines.items()
+                        if cle and cle.startswith(PREFIXE_REPLICA)]
+            if replicas and not _lecture_collee():
+                return random.choice(replicas)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _ecriture_en_cours(self):
+        # Modifications en attente ou déjà envoyées au primaire dans cette
+        # transaction : le réplica ne les verrait pas
+        return self._flushing or self._a_ecrit or bool(self.new or self.dirty or self.deleted)
+
+
+@event.listens_for(SessionRoutage, "after_flush")
+def _apres_flush(session, contexte):
+    session._a_ecrit = True
+
+
+@event.listens_for(SessionRoutage, "after_commit")
+def _apres_commit(session):
+    if session._a_ecrit:
+        marquer_ecriture()
+    session._a_ecrit = False
+
+
+@event.listens_for(SessionRoutage, "after_soft_rollback")
+def _apres_rollback(session, transaction_precedente):
+    if not session.in_transaction():
+        session._a_ecrit = False
@@ -0,0 +1,147 @@
+# -------------------------------------------------------------
+# app/utils/serialiseurs_lignes.py
+# -------------------------------------------------------------
+# Sérialisation « voie rapide » des grandes listes :
+# - un plan décrit la sortie d'un sérialiseur de serializers.py
+#   (mêmes clés, même ordre, mêmes conversions) en colonnes SQL
+# - le plan est compilé une seule fois en une fonction Python qui
+#   construit le dict directement depuis un Row (r[0], r[1], ...)
+# - les requêtes Core select() ne créent ni objets ORM ni entrées
+#   dans l'identity map
+# La sortie doit rester identique à celle des sérialiseurs ORM
+# (vérifié par tests/test_serialiseurs_lignes.py).
+# -------------------------------------------------------------
+
+from sqlalchemy.orm import aliased
+
+from app.models import DonneesMedicale, Capteur, Analyseur, Alerte, Patient, Medecin
+
+
+class Champ:
+    """Colonne copiée telle quelle, ou convertie ("date", "enum")."""
+
+    def __init__(self, colonne, conversion=None):
+        self.colonne = colonne
+        self.conversion = conversion
+
+
+class Objet:
+    """Dict imbriqué ; None si la colonne present_si est NULL (jointure externe)."""
+
+    def __init__(self, champs, present_si=None):
+        self.champs = champs
+        self.present_si = present_si
+
+
+# -------------------------------------------------------------
+# Classe PlanSerialisation : plan compilé colonne → clé
+# -------------------------------------------------------------
+class PlanSerialisation:
+    def __init__(self, nom, champs):
+        self.nom = nom
+        self.colonnes = []
+        corps = self._objet(Objet(champs))
+        self.source = f"def {nom}(r):\n    return {corps}\n"
+        espace = {}
+        exec(compile(self.source, f"<plan {nom}>", "exec"), espace)
+        self.serialiser_ligne = espace[nom]
+
+    def _indice(self, colonne):
+        for i, existante in enumerate(self.colonnes):
+            if existante is colonne:
+                return i
+        self.colonnes.append(colonne)
+        return len(self.colonnes) - 1
+
+    def _objet(self, objet):
+        corps = "{" + ", ".join(
+            f"{cle!r}: {self._valeur(valeur)}" for cle, valeur in objet.champs.items()
+        ) + "}"
+        if objet.present_si is None:
+            return corps
+        return f"({corps} if r[{self._indice(objet.present_si)}] is not None else None)"
+
+    def _valeur(self, valeur):
+        if valeur is None:
+            return "None"
+        if isinstance(valeur, Objet):
+            return self._objet(valeur)
+        r = f"r[{self._indice(valeur.colonne)}]"
+        # Mêmes règles que safe_date / safe_enum
+        if valeur.conversion == "date":
+            return f"({r}.isoformat() if {r} else None)"
+        if valeur.conversion == "enum":
+            return f"({r}.value if {r} else None)"
+        return r
+
+    def serialiser(self, lignes):
+        serialiser_ligne = self.serialiser_ligne
+        return [serialiser_ligne(r) for r in lignes]
+
+
+# -------------------------------------------------------------
+# Plans des listes /v1/donnees, /v1/analyses et /v1/alertes
+# -------------------------------------------------------------
+# Entités aliasées pour les jointures externes (requêtes dans les services)
+CapteurMesure = aliased(Capteur, name="capteur_mesure")
+PatientAnalyse = aliased(Patient, flat=True, name="patient_analyse")
+MedecinAnalyse = aliased(Medecin, flat=True, name="medecin_analyse")
+MesureAnalyse = aliased(DonneesMedicale, name="mesure_analyse")
+CapteurAnalyse = aliased(Capteur, name="capteur_analyse")
+
+# serialize_donnee_medicale(m) (with_patient=False)
+PLAN_DONNEE = PlanSerialisation("serialiser_donnee", {
+    "id": Champ(DonneesMedicale.id),
+    "patient_id": Champ(DonneesMedicale.patient_id),
+    "capteur_id": Champ(DonneesMedicale.capteur_id),
+    "valeur_mesuree": Champ(DonneesMedicale.valeur_mesuree),
+    "date_heure_mesure": Champ(DonneesMedicale.date_heure_mesure, "date"),
+    "capteur": Objet({
+        "id": Champ(CapteurMesure.id),
+        "type": Champ(CapteurMesure.type, "enum"),
+    }, present_si=CapteurMesure.id),
+    "patient": None,
+})
+
+# serialize_analyse(a)
+PLAN_ANALYSE = PlanSerialisation("serialiser_analyse", {
+    "id": Champ(Analyseur.id),
+    "resultat": Champ(Analyseur.resultat),
+    "date_analyse": Champ(Analyseur.date_analyse, "date"),
+    "medecin_id": Champ(Analyseur.medecin_id),
+    "patient_id": Champ(Analyseur.patient_id),
+    "donnee_medicale_id": Champ(Analyseur.donnee_medicale_id),
+    "patient": Objet({
+        "id": Champ(PatientAnalyse.id),
+        "nom": Champ(PatientAnalyse.nom),
+        "prenom": Champ(PatientAnalyse.prenom),
+    }, present_si=PatientAnalyse.id),
+    "medecin": Objet({
+        "id": Champ(MedecinAnalyse.id),
+        "nom": Champ(MedecinAnalyse.nom),
+        "prenom": Champ(MedecinAnalyse.prenom),
+        "specialite": Champ(MedecinAnalyse.specialite),
+    }, present_si=MedecinAnalyse.id),
+    "donnee_medicale": Objet({
+        "id": Champ(MesureAnalyse.id),
+        "valeur_mesuree": Champ(MesureAnalyse.valeur_mesuree),
+        "capteur": Objet({
+            "id": Champ(CapteurAnalyse.id),
+            "type": Champ(CapteurAnalyse.type, "enum"),
+        }),
+    }, present_si=MesureAnalyse.id),
+})
+
+# serialize_alerte(a)
+PLAN_ALERTE = PlanSerialisation("serialiser_alerte", {
+    "id": Champ(Alerte.id),
+    "niveau_urgence": Champ(Alerte.niveau_urgence, "enum"),
+    "type_alerte": Champ(Alerte.type_alerte, "enum"),
+    "description": Champ(Alerte.description),
+    "etat_traitement": Champ(Alerte.etat_traitement),
+    "date_heure_alerte": Champ(Alerte.date_heure_alerte, "date"),
+    "patient_id": Champ(Alerte.patient_id),
+    "medecin_id": Champ(Alerte.medecin_id),
+    "date_acquittement": Champ(Alerte.date_acquittement, "date"),
+    "acquittee_par": Champ(Alerte.acquittee_par),
+})
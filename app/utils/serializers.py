@@ -9,6 +9,8 @@
 # Import optionnel pour typer correctement les modèles si besoin
 from datetime import datetime
 
+from app.services.reference_service import type_capteur
+
 
 # -------------------------------------------------------------
 # Sérialiseur de la classe de base Personne
@@ -61,9 +63,11 @@ def serialize_patient(p):
     return {
         **serialize_personne(p),
         "donnees_phys": [serialize_donnee_medicale(d) for d in getattr(p, "donnees_phys", [])],
+        # Plus récente en temps de mesure (et non d'arrivée) ; à date égale,
+        # la dernière enregistrée
         "derniere_mesure": (
         serialize_donnee_medicale(
-            sorted(p.donnees_phys, key=lambda d: d.date_heure_mesure, reverse=True)[0]
+            max(p.donnees_phys, key=lambda d: (d.date_heure_mesure, d.id))
         )
         if getattr(p, "donnees_phys", [])
             else None
@@ -107,6 +111,8 @@ def serialize_alerte(a):
         "date_heure_alerte": safe_date(a.date_heure_alerte),
         "patient_id": a.patient_id,
         "medecin_id": a.medecin_id,
+        "date_acquittement": safe_date(a.date_acquittement),
+        "acquittee_par": a.acquittee_par,
     }
 
 
@@ -123,6 +129,17 @@ def serialize_capteur(c):
         "type": safe_enum(c.type)
     }
 
+def serialize_reference_capteur(capteur_id):
+    """Sérialise un capteur d'après son ID, via la référence en cache (sans chargement ORM)."""
+    type_ = type_capteur(capteur_id)
+    if type_ is None:
+        return None
+
+    return {
+        "id": capteur_id,
+        "type": safe_enum(type_)
+    }
+
 # -------------------------------------------------------------
 # Sérialiseur du modèle DonneesMedicale
 # -------------------------------------------------------------
@@ -137,7 +154,7 @@ def serialize_donnee_medicale(m, with_patient=False):
         "capteur_id": m.capteur_id,
         "valeur_mesuree": m.valeur_mesuree,
         "date_heure_mesure": safe_date(m.date_heure_mesure),
-        "capteur": serialize_capteur(m.capteur) if getattr(m, "capteur", None) else None,
+        "capteur": serialize_reference_capteur(m.capteur_id),
         # on évite la récursion infinie ici :
         "patient": {
             "id": m.patient.id,
@@ -176,10 +193,7 @@ def serialize_analyse(a):
         "donnee_medicale": {
             "id": getattr(a.donnee_medicale, "id", None),
             "valeur_mesuree": a.donnee_medicale.valeur_mesuree,
-            "capteur": {
-                "id": a.donnee_medicale.capteur.id,
-                "type": safe_enum(a.donnee_medicale.capteur.type)
-            }
+            "capteur": serialize_reference_capteur(a.donnee_medicale.capteur_id)
         } if getattr(a, "donnee_medicale", None) else None,
     }
 
@@ -191,11 +205,10 @@ def serialize_statistique(stat):
     """
     Sérialise un tuple de statistique : (capteur_id, min, max, avg)
     """
-    from app.models import Capteur  # import local pour éviter les boucles
-    capteur = Capteur.query.get(stat[0]) if stat else None
+    type_ = type_capteur(stat[0]) if stat else None
 
     return {
-        "type": safe_enum(capteur.type) if capteur else None,
+        "type": safe_enum(type_) if type_ else None,
         "min": stat[1],
         "max": stat[2],
         "avg": round(stat[3], 2) if stat[3] is not None else None,
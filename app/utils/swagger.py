@@ -0,0 +1,94 @@
+# -------------------------------------------------------------
+# app/utils/swagger.py
+# -------------------------------------------------------------
+# Documentation Swagger chargée à la demande :
+# - swag_from : remplaçant léger du décorateur de flasgger pour les
+#   specs en dict (attribut specs_dict, sans enveloppe ni import de
+#   flasgger) ; les autres formes délèguent à flasgger
+# - installer_swagger : n'importe et n'initialise flasgger que si
+#   SWAGGER_ACTIVE (désactivable sur les workers de production) ;
+#   la spec est construite à la première requête /apispec_1.json puis
+#   gardée en mémoire par flasgger (hors mode debug)
+# - SWAGGER_SPEC_FICHIER : spec générée au build par
+#   `flask swagger-build`, servie telle quelle
+# -------------------------------------------------------------
+
+import json
+import os
+
+from flask import current_app, send_file
+
+ENDPOINT_SPEC = "apispec_1"
+
+# -------------------------------------------------------------
+# Configuration Swagger : définition du template
+# -------------------------------------------------------------
+# - Active le bouton "Authorize" dans Swagger UI
+# - Permet de tester les routes protégées par JWT
+swagger_template = {
+    "swagger": "2.0",
+    "info": {
+        "title": "API S3DPA",
+        "description": "Documentation des endpoints sécurisés",
+        "version": "1.0.0"
+    },
+    "securityDefinitions": {
+        "BearerAuth": {
+            "type": "apiKey",
+            "name": "Authorization",
+            "in": "header",
+            "description": "Token JWT au format: Bearer <votre_token>"
+        }
+    },
+    "security": [{"BearerAuth": []}]
+}
+
+
+# -------------------------------------------------------------
+# Décorateur swag_from : spec attachée à la vue, sans coût par requête
+# -------------------------------------------------------------
+def swag_from(specs=None, **options):
+    if isinstance(specs, dict) and not options:
+        def decorateur(fonction):
+            fonction.specs_dict = specs  # attribut lu par flasgger
+            return fonction
+        return decorateur
+
+    from flasgger import swag_from as swag_from_flasgger
+    return swag_from_flasgger(specs, **options)
+
+
+def _servir_spec_fichier():
+    return send_file(current_app.config["SWAGGER_SPEC_FICHIER"], mimetype="application/json")
+
+
+# -------------------------------------------------------------
+# Fonction installer_swagger : Swagger UI + spec, si activé
+# -------------------------------------------------------------
+def installer_swagger(app):
+    if not app.config.get("SWAGGER_ACTIVE", True):
+        return None
+
+    from flasgger import Swagger  # import coûteux (jsonschema, ...) évité si désactivé
+
+    swagger = Swagger(app, template=swagger_template)
+    fichier = app.config.get("SWAGGER_SPEC_FICHIER")
+    if fichier and os.path.isfile(fichier):
+        app.view_functions[f"flasgger.{ENDPOINT_SPEC}"] = _servir_spec_fichier
+    app.extensions["swagger"] = swagger
+    return swagger
+
+
+# -------------------------------------------------------------
+# Fonction ecrire_spec : spec complète dans un fichier (build)
+# -------------------------------------------------------------
+def ecrire_spec(app, chemin):
+    swagger = app.extensions.get("swagger")
+    if swagger is None:
+        raise RuntimeError("Swagger est désactivé (SWAGGER_ACTIVE=False)")
+    with app.test_request_context():
+        spec = swagger.get_apispecs(ENDPOINT_SPEC)
+    os.makedirs(os.path.dirname(os.path.abspath(chemin)), exist_ok=True)
+    with open(chemin, "w", encoding="utf-8") as fichier:
+        json.dump(spec, fichier, ensure_ascii=False, sort_keys=True, default=str)
+    return len(spec.get("paths", {}))
@@ -1,3 +1,6 @@
+from datetime import datetime, timezone
+
+
 def validate_fields(data, required_fields):
     """
     Vérifie que tous les champs requis sont présents et non vides.
@@ -24,3 +27,39 @@ def validate_fields(data, required_fields):
 
         # Autres types, on accepte aussi (bool, obj, etc.)
     return True
+
+
+def parse_periode(args):
+    """
+    Lit les paramètres ?from=&to= (ISO 8601) d'une requête.
+    Retourne un dict {depuis, jusqu_a} ne contenant que les bornes
+    fournies ; lève ValueError si une date est invalide.
+    """
+    periode = {}
+    for param, cle in (("from", "depuis"), ("to", "jusqu_a")):
+        valeur = args.get(param)
+        if valeur:
+            try:
+                periode[cle] = datetime.fromisoformat(valeur)
+            except ValueError:
+                raise ValueError(f"Paramètre '{param}' invalide (format ISO 8601 attendu)")
+    return periode
+
+
+def parse_horodatage(valeur):
+    """
+    Horodatage fourni par un appareil : chaîne ISO 8601 (avec ou sans
+    fuseau) ou secondes depuis l'époque Unix. Retourne un datetime UTC
+    naïf (convention des colonnes DateTime) ; lève ValueError sinon.
+    """
+    if isinstance(valeur, bool):
+        raise ValueError("Horodatage invalide")
+    try:
+        if isinstance(valeur, (int, float)):
+            return datetime.fromtimestamp(valeur, timezone.utc).replace(tzinfo=None)
+        moment = datetime.fromisoformat(valeur)
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise ValueError("Horodatage invalide (ISO 8601 ou secondes Unix attendu)")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
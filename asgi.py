@@ -0,0 +1,6 @@
+# Point d'entrée ASGI de l'ingestion des passerelles (app/ingestion_asgi.py)
+#   uvicorn asgi:app --host 0.0.0.0 --port 8001
+from app import create_app
+from app.ingestion_asgi import ApplicationIngestion
+
+app = ApplicationIngestion(create_app({"SWAGGER_ACTIVE": False, "MIGRATIONS_ACTIVES": False}))
@@ -0,0 +1,8 @@
+# -------------------------------------------------------------
+# benchmarks : suite de mesure de performance des routes critiques
+# -------------------------------------------------------------
+# - harness.py   : chronométrage, percentiles, export JSON
+# - donnees.py   : génération de volumes réalistes (N patients, M capteurs, K mesures)
+# - scenarios.py : scénarios HTTP mesurés (ingestion, lectures, recherches, login)
+# - run.py       : point d'entrée `python -m benchmarks.run`
+# - compare.py   : comparaison de deux fichiers de résultats
@@ -0,0 +1,71 @@
+# -------------------------------------------------------------
+# benchmarks/compare.py
+# -------------------------------------------------------------
+# Compare deux fichiers de résultats (référence → candidat) :
+#
+#   python -m benchmarks.compare results/avant.json results/apres.json --seuil 0.15
+#
+# Code de sortie 1 si un p95 régresse au-delà du seuil relatif.
+# -------------------------------------------------------------
+
+import argparse
+import json
+import sys
+
+METRIQUES = ("p50_ms", "p95_ms", "p99_ms", "debit_req_s")
+
+
+def charger(chemin):
+    with open(chemin, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def ecart_relatif(avant, apres):
+    if avant in (None, 0) or apres is None:
+        return None
+    return (apres - avant) / avant
+
+
+def comparer(reference, candidat, seuil):
+    """Retourne (lignes du rapport, liste des scénarios en régression)."""
+    lignes, regressions = [], []
+    res_ref, res_cand = reference["resultats"], candidat["resultats"]
+
+    for nom in sorted(set(res_ref) & set(res_cand)):
+        cellules = []
+        for metrique in METRIQUES:
+            delta = ecart_relatif(res_ref[nom].get(metrique), res_cand[nom].get(metrique))
+            cellules.append(f"{metrique}={res_cand[nom].get(metrique)} "
+                            f"({delta:+.1%})" if delta is not None else f"{metrique}=n/a")
+        lignes.append(f"{nom:<26} " + "  ".join(cellules))
+
+        delta_p95 = ecart_relatif(res_ref[nom].get("p95_ms"), res_cand[nom].get("p95_ms"))
+        if delta_p95 is not None and delta_p95 > seuil:
+            regressions.append(nom)
+
+    return lignes, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comparer deux résultats de benchmark")
+    parser.add_argument("reference")
+    parser.add_argument("candidat")
+    parser.add_argument("--seuil", type=float, default=0.10,
+                        help="Régression relative tolérée sur le p95 (0.10 = 10 %%)")
+    args = parser.parse_args(argv)
+
+    reference, candidat = charger(args.reference), charger(args.candidat)
+    print(f"Référence : {reference['meta'].get('commit')}  →  "
+          f"Candidat : {candidat['meta'].get('commit')}")
+
+    lignes, regressions = comparer(reference, candidat, args.seuil)
+    print("\n".join(lignes))
+
+    if regressions:
+        print(f"\nRégressions p95 > {args.seuil:.0%} : {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
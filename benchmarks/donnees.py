@@ -0,0 +1,154 @@
+# -------------------------------------------------------------
+# benchmarks/donnees.py
+# -------------------------------------------------------------
+# Génère des volumes réalistes pour les benchmarks :
+# - N patients, quelques médecins, M capteurs
+# - K mesures par patient, avec analyses et alertes cohérentes
+# Les insertions passent par des INSERT groupés (pas d'objets ORM)
+# afin que le temps de préparation reste négligeable.
+# -------------------------------------------------------------
+
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.extension import db, bcrypt
+from app.models import (
+    Medecin, Patient, Capteur, DonneesMedicale, Analyseur, Alerte, TypeCapteur
+)
+from app.utils.seuils import SEUILS_CAPTEURS
+
+MOT_DE_PASSE_BENCH = "Passer123"
+TAILLE_LOT = 5000
+
+
+# -------------------------------------------------------------
+# Fonction _inserer_par_lots : INSERT ... RETURNING id par lots
+# -------------------------------------------------------------
+def _inserer_par_lots(modele, lignes):
+    ids = []
+    for i in range(0, len(lignes), TAILLE_LOT):
+        lot = lignes[i:i + TAILLE_LOT]
+        ids.extend(db.session.scalars(
+            insert(modele).returning(modele.id, sort_by_parameter_order=True),
+            lot
+        ).all())
+    return ids
+
+
+# -------------------------------------------------------------
+# Fonction _valeur_mesure : valeur normale ou anormale selon le capteur
+# -------------------------------------------------------------
+def _valeur_mesure(type_capteur, anomalie, rng):
+    seuil = SEUILS_CAPTEURS[type_capteur]
+    if anomalie:
+        if rng.random() < 0.5:
+            return round(seuil["min"] - rng.uniform(0.5, 5), 2)
+        return round(seuil["max"] + rng.uniform(0.5, 5), 2)
+    return round(rng.uniform(seuil["min"], seuil["max"]), 2)
+
+
+# -------------------------------------------------------------
+# Fonction seed_volumes : remplit la base pour un benchmark
+# -------------------------------------------------------------
+def seed_volumes(n_patients, n_capteurs, k_mesures, n_medecins=5,
+                 taux_anomalie=0.05, graine=42):
+    """
+    Insère les volumes demandés et retourne un contexte
+    (identifiants et identifiants de connexion) utilisé par les scénarios.
+    """
+    rng = random.Random(graine)
+    hash_commun = bcrypt.generate_password_hash(MOT_DE_PASSE_BENCH).decode("utf-8")
+
+    medecin_ids = _inserer_par_lots(Medecin, [
+        {
+            "nom": f"Medecin{i}", "prenom": "Bench",
+            "email": f"medecin{i}@bench.s3dpa", "phone": f"70{i:08d}",
+            "mot_de_passe": hash_commun, "role": "medecin", "type": "medecin",
+            "specialite": "Cardiologie",
+        }
+        for i in range(n_medecins)
+    ])
+
+    patient_ids = _inserer_par_lots(Patient, [
+        {
+            "nom": f"Patient{i}", "prenom": "Bench",
+            "email": f"patient{i}@bench.s3dpa", "phone": f"77{i:08d}",
+            "mot_de_passe": hash_commun, "role": "patient", "type": "patient",
+            "adresse": "Dakar",
+        }
+        for i in range(n_patients)
+    ])
+
+    types = list(TypeCapteur)
+    capteurs = [{"type": types[i % len(types)]} for i in range(n_capteurs)]
+    capteur_ids = _inserer_par_lots(Capteur, capteurs)
+    type_par_capteur = {cid: c["type"] for cid, c in zip(capteur_ids, capteurs)}
+
+    # Mesures réparties sur les 30 derniers jours
+    maintenant = datetime.utcnow()
+    mesures, meta_mesures = [], []
+    for patient_id in patient_ids:
+        medecin_id = rng.choice(medecin_ids)
+        for _ in range(k_mesures):
+            capteur_id = rng.choice(capteur_ids)
+            anomalie = rng.random() < taux_anomalie
+            mesures.append({
+                "patient_id": patient_id,
+                "capteur_id": capteur_id,
+                "valeur_mesuree": _valeur_mesure(type_par_capteur[capteur_id], anomalie, rng),
+                "date_heure_mesure": maintenant - timedelta(seconds=rng.randint(0, 30 * 86400)),
+            })
+            meta_mesures.append((medecin_id, anomalie))
+
+    mesure_ids = _inserer_par_lots(DonneesMedicale, mesures)
+
+    # Une analyse par mesure, une alerte par anomalie (comme le pipeline réel)
+    analyses, alertes = [], []
+    for mesure_id, mesure, (medecin_id, anomalie) in zip(mesure_ids, mesures, meta_mesures):
+        seuil = SEUILS_CAPTEURS[type_par_capteur[mesure["capteur_id"]]]
+        resultat = (
+            f"Anomalie détectée : valeur {mesure['valeur_mesuree']} "
+            f"hors seuil [{seuil['min']} - {seuil['max']}]"
+            if anomalie else "Résultat normal : valeur dans les seuils"
+        )
+        analyses.append({
+            "patient_id": mesure["patient_id"],
+            "medecin_id": medecin_id,
+            "donnee_medicale_id": mesure_id,
+            "resultat": resultat,
+            "date_analyse": mesure["date_heure_mesure"],
+        })
+        if anomalie:
+            alertes.append({
+                "patient_id": mesure["patient_id"],
+                "medecin_id": medecin_id,
+                "niveau_urgence": seuil["niveau_urgence"],
+                "type_alerte": seuil["type_alerte"],
+                "description": resultat,
+                "etat_traitement": False,
+                "date_heure_alerte": mesure["date_heure_mesure"],
+            })
+
+    _inserer_par_lots(Analyseur, analyses)
+    if alertes:
+        _inserer_par_lots(Alerte, alertes)
+
+    db.session.commit()
+
+    return {
+        "medecin_ids": medecin_ids,
+        "patient_ids": patient_ids,
+        "capteur_ids": capteur_ids,
+        "email_medecin": "medecin0@bench.s3dpa",
+        "mot_de_passe": MOT_DE_PASSE_BENCH,
+        "volumes": {
+            "patients": n_patients,
+            "medecins": n_medecins,
+            "capteurs": n_capteurs,
+            "mesures_par_patient": k_mesures,
+            "mesures": len(mesure_ids),
+            "alertes": len(alertes),
+        },
+    }
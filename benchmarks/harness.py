@@ -0,0 +1,121 @@
+# -------------------------------------------------------------
+# benchmarks/harness.py
+# -------------------------------------------------------------
+# Outils génériques de mesure :
+# - exécution répétée d'un scénario avec échauffement
+# - calcul du débit et des percentiles p50 / p95 / p99
+# - sérialisation des résultats en JSON pour comparaison entre commits
+# -------------------------------------------------------------
+
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+
+
+# -------------------------------------------------------------
+# Fonction percentile : percentile par interpolation linéaire
+# -------------------------------------------------------------
+def percentile(valeurs_triees, p):
+    """Retourne le percentile p (0-100) d'une liste déjà triée."""
+    if not valeurs_triees:
+        return None
+    if len(valeurs_triees) == 1:
+        return valeurs_triees[0]
+
+    rang = (len(valeurs_triees) - 1) * (p / 100.0)
+    bas = int(rang)
+    haut = min(bas + 1, len(valeurs_triees) - 1)
+    fraction = rang - bas
+    return valeurs_triees[bas] + (valeurs_triees[haut] - valeurs_triees[bas]) * fraction
+
+
+# -------------------------------------------------------------
+# Fonction resumer : agrège les durées d'un scénario
+# -------------------------------------------------------------
+def resumer(durees, total, erreurs=0, elements_par_appel=1):
+    """Construit le résumé statistique (en millisecondes) d'une série de durées."""
+    triees = sorted(durees)
+    n = len(triees)
+
+    def ms(valeur):
+        return round(valeur * 1000, 3) if valeur is not None else None
+
+    return {
+        "iterations": n,
+        "erreurs": erreurs,
+        "duree_totale_s": round(total, 4),
+        "debit_req_s": round(n / total, 2) if total > 0 else None,
+        "debit_elements_s": round(n * elements_par_appel / total, 2) if total > 0 else None,
+        "min_ms": ms(triees[0]) if triees else None,
+        "moyenne_ms": ms(sum(triees) / n) if triees else None,
+        "p50_ms": ms(percentile(triees, 50)),
+        "p95_ms": ms(percentile(triees, 95)),
+        "p99_ms": ms(percentile(triees, 99)),
+        "max_ms": ms(triees[-1]) if triees else None,
+    }
+
+
+# -------------------------------------------------------------
+# Fonction mesurer : exécute un scénario et chronomètre chaque appel
+# -------------------------------------------------------------
+# - `fonction` renvoie une réponse Flask (ou tout objet avec status_code)
+# - Les appels dont le statut n'est pas 2xx sont comptés comme erreurs
+def mesurer(fonction, iterations=200, echauffement=10, elements_par_appel=1):
+    for _ in range(echauffement):
+        fonction()
+
+    durees = []
+    erreurs = 0
+    debut_total = time.perf_counter()
+    for _ in range(iterations):
+        debut = time.perf_counter()
+        reponse = fonction()
+        durees.append(time.perf_counter() - debut)
+
+        statut = getattr(reponse, "status_code", 200)
+        if not 200 <= statut < 300:
+            erreurs += 1
+    total = time.perf_counter() - debut_total
+
+    return resumer(durees, total, erreurs=erreurs, elements_par_appel=elements_par_appel)
+
+
+# -------------------------------------------------------------
+# Fonction commit_courant : identifiant git du code mesuré
+# -------------------------------------------------------------
+def commit_courant():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stderr=subprocess.DEVNULL,
+            text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "inconnu"
+
+
+# -------------------------------------------------------------
+# Fonction enregistrer_resultats : écrit le fichier JSON de résultats
+# -------------------------------------------------------------
+def enregistrer_resultats(resultats, meta, dossier):
+    """Écrit {meta, resultats} dans `dossier` et retourne le chemin du fichier."""
+    os.makedirs(dossier, exist_ok=True)
+
+    meta = {
+        "commit": commit_courant(),
+        "date": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        **meta,
+    }
+    horodatage = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    nom = f"{horodatage}_{meta['commit']}_{meta.get('dialecte', 'db')}.json"
+    chemin = os.path.join(dossier, nom)
+
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "resultats": resultats}, f, indent=2, ensure_ascii=False)
+
+    return chemin
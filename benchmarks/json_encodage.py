@@ -0,0 +1,102 @@
+# -------------------------------------------------------------
+# benchmarks/json_encodage.py
+# -------------------------------------------------------------
+# Compare le coût d'encodage JSON des grandes listes de l'API
+# (/v1/donnees, /v1/analyses) selon le fournisseur app.json :
+#
+#   python -m benchmarks.json_encodage --lignes 20000 --repetitions 5
+#
+# Les lignes reprennent la forme exacte des sérialiseurs, avec les
+# dates et énumérations déjà converties (sortie actuelle) ou laissées
+# natives (possible avec FournisseurOrjson).
+# -------------------------------------------------------------
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from app.models.enums import TypeCapteur
+from app.utils.json_rapide import FournisseurJSON, FournisseurOrjson, orjson
+
+DEBUT = datetime(2026, 1, 1, 8, 30, 15, 123456)
+
+
+def lignes_donnees(n, natives=False):
+    lignes = []
+    for i in range(n):
+        date_mesure = DEBUT + timedelta(minutes=i)
+        type_capteur = TypeCapteur.temperature
+        lignes.append({
+            "id": i + 1,
+            "patient_id": i % 500 + 1,
+            "capteur_id": i % 30 + 1,
+            "valeur_mesuree": 36.0 + (i % 40) / 10,
+            "date_heure_mesure": date_mesure if natives else date_mesure.isoformat(),
+            "capteur": {"id": i % 30 + 1, "type": type_capteur if natives else type_capteur.value},
+            "patient": None,
+        })
+    return lignes
+
+
+def lignes_analyses(n, natives=False):
+    lignes = []
+    for i in range(n):
+        date_analyse = DEBUT + timedelta(minutes=i)
+        type_capteur = TypeCapteur.rythme
+        lignes.append({
+            "id": i + 1,
+            "resultat": "Résultat normal : valeur dans les seuils",
+            "date_analyse": date_analyse if natives else date_analyse.isoformat(),
+            "medecin_id": i % 20 + 1,
+            "patient_id": i % 500 + 1,
+            "donnee_medicale_id": i + 1,
+            "patient": {"id": i % 500 + 1, "nom": "Diop", "prenom": "Awa"},
+            "medecin": {"id": i % 20 + 1, "nom": "Ndiaye", "prenom": "Moussa",
+                        "specialite": "Cardiologie"},
+            "donnee_medicale": {
+                "id": i + 1, "valeur_mesuree": 72.0,
+                "capteur": {"id": 3, "type": type_capteur if natives else type_capteur.value},
+            },
+        })
+    return lignes
+
+
+def chronometrer(fournisseur, lignes, repetitions):
+    durees = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        reponse = fournisseur.response(lignes)
+        durees.append(time.perf_counter() - debut)
+    return min(durees), len(reponse.get_data())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coût d'encodage JSON des grandes listes")
+    parser.add_argument("--lignes", type=int, default=20000)
+    parser.add_argument("--repetitions", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    app = Flask(__name__)
+    fournisseurs = [("json", FournisseurJSON(app), False)]
+    if orjson is not None:
+        fournisseurs += [("orjson", FournisseurOrjson(app), False),
+                         ("orjson natif", FournisseurOrjson(app), True)]
+    else:
+        print("orjson non installé : seul le module standard est mesuré")
+
+    for nom_payload, fabrique in (("/v1/donnees", lignes_donnees), ("/v1/analyses", lignes_analyses)):
+        reference = None
+        for nom, fournisseur, natives in fournisseurs:
+            lignes = fabrique(args.lignes, natives=natives)
+            duree, taille = chronometrer(fournisseur, lignes, args.repetitions)
+            reference = reference or duree
+            print(f"{nom_payload:<14} {nom:<13} {duree * 1000:9.1f} ms  "
+                  f"{args.lignes / duree:12.0f} lignes/s  x{reference / duree:5.1f}  ({taille} octets)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
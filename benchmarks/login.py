@@ -0,0 +1,124 @@
+# -------------------------------------------------------------
+# benchmarks/login.py
+# -------------------------------------------------------------
+# Débit de connexion par cœur :
+# - vérifications bcrypt brutes sur un thread (coût BCRYPT_LOG_ROUNDS)
+# - POST /v1/auth/login de bout en bout avec un thread par cœur
+#
+#   python -m benchmarks.login --database-uri postgresql://... --cout 12 --duree 10
+# -------------------------------------------------------------
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from app import create_app
+from app.extension import db, bcrypt
+from app.models import Medecin
+from benchmarks.harness import resumer, enregistrer_resultats
+
+DOSSIER_RESULTATS = os.path.join(os.path.dirname(__file__), "results")
+MOT_DE_PASSE = "Passer123"
+
+
+def mesurer_bcrypt(hache, duree):
+    durees = []
+    debut = time.perf_counter()
+    while time.perf_counter() - debut < duree:
+        t = time.perf_counter()
+        bcrypt.check_password_hash(hache, MOT_DE_PASSE)
+        durees.append(time.perf_counter() - t)
+    return resumer(durees, time.perf_counter() - debut)
+
+
+def mesurer_logins(app, emails, threads, duree):
+    durees, erreurs = [], [0]
+    verrou = threading.Lock()
+    fin = time.perf_counter() + duree
+
+    def boucle(index):
+        client = app.test_client()
+        corps = {"email": emails[index % len(emails)], "password": MOT_DE_PASSE}
+        while time.perf_counter() < fin:
+            t = time.perf_counter()
+            reponse = client.post("/v1/auth/login", json=corps)
+            d = time.perf_counter() - t
+            with verrou:
+                durees.append(d)
+                if reponse.status_code != 200:
+                    erreurs[0] += 1
+
+    debut = time.perf_counter()
+    pool = [threading.Thread(target=boucle, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return resumer(durees, time.perf_counter() - debut, erreurs=erreurs[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark du débit de connexion")
+    parser.add_argument(
+        "--database-uri",
+        default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 's3dpa_bench_login.db')}"
+    )
+    parser.add_argument("--cout", type=int, default=12, help="BCRYPT_LOG_ROUNDS")
+    parser.add_argument("--duree", type=float, default=10, help="Secondes par mesure")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--sortie", default=DOSSIER_RESULTATS)
+    args = parser.parse_args(argv)
+
+    coeurs = os.cpu_count() or 1
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": args.database_uri,
+        "PROPAGATE_EXCEPTIONS": False,
+        "BCRYPT_LOG_ROUNDS": args.cout,
+        "BCRYPT_POOL_WORKERS": args.threads,
+        "LOGIN_RAFALE_COMPTE": 10**9,
+        "LOGIN_RAFALE_IP": 10**9,
+    })
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        hache = bcrypt.generate_password_hash(MOT_DE_PASSE, args.cout).decode("utf-8")
+        emails = []
+        for i in range(args.threads):
+            emails.append(f"login{i}@bench.s3dpa")
+            db.session.add(Medecin(
+                nom=f"Login{i}", prenom="Bench", email=emails[-1], phone=f"71{i:08d}",
+                mot_de_passe=hache, role="medecin", specialite="Cardiologie"
+            ))
+        db.session.commit()
+
+        try:
+            resultats = {
+                "bcrypt_verification_1_thread": mesurer_bcrypt(hache, args.duree),
+                f"login_{args.threads}_threads": mesurer_logins(
+                    app, emails, args.threads, args.duree
+                ),
+            }
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+        dialecte = db.engine.dialect.name
+
+    for nom, r in resultats.items():
+        r["debit_par_coeur"] = round(r["debit_req_s"] / (1 if "1_thread" in nom else coeurs), 2)
+        print(f"{nom:<30} {r['debit_req_s']:>8} /s  {r['debit_par_coeur']:>8} /s/cœur  "
+              f"p50={r['p50_ms']}ms p99={r['p99_ms']}ms erreurs={r['erreurs']}")
+
+    chemin = enregistrer_resultats(resultats, {
+        "dialecte": dialecte, "cout_bcrypt": args.cout, "coeurs": coeurs, "threads": args.threads
+    }, args.sortie)
+    print(f"Résultats enregistrés dans {chemin}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+# -------------------------------------------------------------
+# benchmarks/replay.py
+# -------------------------------------------------------------
+# Générateur de charge HTTP en boucle ouverte contre une instance
+# déployée (gunicorn, Render, ...), à partir du manifeste produit
+# par `flask seed-load --manifeste seed.json` :
+#
+#   python -m benchmarks.replay --base-url http://localhost:5000 \
+#       --manifeste seed.json --debit 200 --duree 60 \
+#       --mix post_donnee=70,get_patient=15,stats_patient=10,search_alertes=5
+#
+# Les requêtes sont planifiées à débit fixe ; la latence est mesurée
+# depuis l'instant planifié (pas d'omission coordonnée).
+# -------------------------------------------------------------
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.harness import resumer, enregistrer_resultats
+
+MIX_PAR_DEFAUT = "post_donnee=70,get_patient=15,stats_patient=10,search_alertes=5"
+
+
+# -------------------------------------------------------------
+# Construction des requêtes à partir du manifeste
+# -------------------------------------------------------------
+class Operations:
+    def __init__(self, manifeste, rng):
+        self.m = manifeste
+        self.rng = rng
+        self.nb_types = len(manifeste["types_capteur"])
+
+    def _patient(self):
+        debut, fin = self.m["patient_ids"]
+        return self.rng.randint(debut, fin)
+
+    def _medecin(self):
+        debut, fin = self.m["medecin_ids"]
+        return self.rng.randint(debut, fin)
+
+    def _capteur(self, patient_id):
+        index = patient_id - self.m["patient_ids"][0]
+        return self.m["capteur_debut"] + index * self.nb_types + self.rng.randrange(self.nb_types)
+
+    def post_donnee(self):
+        patient_id = self._patient()
+        return "POST", "/v1/donnees", {
+            "patient_id": patient_id,
+            "capteur_id": self._capteur(patient_id),
+            "medecin_id": self._medecin(),
+            "valeur_mesuree": round(self.rng.uniform(36.0, 37.5), 2),
+        }
+
+    def post_donnees_liste(self):
+        return "POST", "/v1/donnees", [self.post_donnee()[2] for _ in range(50)]
+
+    def get_patient(self):
+        return "GET", f"/v1/patients/{self._patient()}", None
+
+    def stats_patient(self):
+        return "GET", f"/v1/donnees/patient/{self._patient()}/stats", None
+
+    def search_alertes(self):
+        return "GET", "/v1/alertes/search?q=anomalie", None
+
+    def get_patients(self):
+        return "GET", "/v1/patients", None
+
+    def login(self):
+        return "POST", "/v1/auth/login", {
+            "email": self.m["email_medecin"], "password": self.m["mot_de_passe"]
+        }
+
+
+def parse_mix(texte):
+    """'a=70,b=30' → [('a', 70.0), ('b', 30.0)]"""
+    mix = []
+    for element in texte.split(","):
+        nom, _, poids = element.partition("=")
+        if not hasattr(Operations, nom.strip()):
+            raise ValueError(f"Opération inconnue dans le mix : {nom}")
+        mix.append((nom.strip(), float(poids or 1)))
+    return mix
+
+
+def envoyer(base_url, methode, chemin, corps, jeton, timeout):
+    donnees = json.dumps(corps).encode("utf-8") if corps is not None else None
+    requete = urllib.request.Request(base_url + chemin, data=donnees, method=methode)
+    requete.add_header("Content-Type", "application/json")
+    if jeton:
+        requete.add_header("Authorization", f"Bearer {jeton}")
+    try:
+        with urllib.request.urlopen(requete, timeout=timeout) as reponse:
+            reponse.read()
+            return reponse.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except (urllib.error.URLError, OSError):
+        return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rejeu de charge HTTP à débit cible")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--manifeste", required=True)
+    parser.add_argument("--debit", type=float, default=50, help="Requêtes par seconde visées")
+    parser.add_argument("--duree", type=float, default=30, help="Durée en secondes")
+    parser.add_argument("--mix", default=MIX_PAR_DEFAUT)
+    parser.add_argument("--workers", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=10)
+    parser.add_argument("--graine", type=int, default=42)
+    parser.add_argument("--sortie", default=None, help="Dossier des résultats JSON")
+    args = parser.parse_args(argv)
+
+    with open(args.manifeste, encoding="utf-8") as f:
+        manifeste = json.load(f)
+
+    rng = random.Random(args.graine)
+    operations = Operations(manifeste, rng)
+    mix = parse_mix(args.mix)
+    noms, poids = zip(*mix)
+
+    # Jeton JWT obtenu une fois pour toutes les requêtes protégées
+    _, chemin, corps = operations.login()
+    jeton = None
+    requete = urllib.request.Request(args.base_url + chemin, method="POST",
+                                     data=json.dumps(corps).encode("utf-8"),
+                                     headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(requete, timeout=args.timeout) as reponse:
+        jeton = json.loads(reponse.read())["token"]
+
+    mesures = {nom: {"durees": [], "erreurs": 0} for nom in noms}
+    verrou = threading.Lock()
+
+    def executer(nom, methode, chemin, corps, planifie):
+        statut = envoyer(args.base_url, methode, chemin, corps, jeton, args.timeout)
+        duree = time.perf_counter() - planifie
+        with verrou:
+            mesures[nom]["durees"].append(duree)
+            if not 200 <= statut < 300:
+                mesures[nom]["erreurs"] += 1
+
+    total_requetes = int(args.debit * args.duree)
+    intervalle = 1.0 / args.debit
+    debut = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for i in range(total_requetes):
+            planifie = debut + i * intervalle
+            attente = planifie - time.perf_counter()
+            if attente > 0:
+                time.sleep(attente)
+            nom = rng.choices(noms, weights=poids)[0]
+            methode, chemin, corps = getattr(operations, nom)()
+            pool.submit(executer, nom, methode, chemin, corps, planifie)
+
+    total = time.perf_counter() - debut
+    resultats = {}
+    for nom, m in mesures.items():
+        if m["durees"]:
+            resultats[nom] = resumer(m["durees"], total, erreurs=m["erreurs"])
+            r = resultats[nom]
+            print(f"{nom:<22} n={r['iterations']:<6} p50={r['p50_ms']}ms "
+                  f"p95={r['p95_ms']}ms p99={r['p99_ms']}ms erreurs={r['erreurs']}")
+
+    if args.sortie:
+        chemin = enregistrer_resultats(resultats, {
+            "dialecte": "http",
+            "base_url": args.base_url,
+            "debit_cible": args.debit,
+            "mix": args.mix,
+        }, args.sortie)
+        print(f"Résultats enregistrés dans {chemin}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+# -------------------------------------------------------------
+# benchmarks/scenarios.py
+# -------------------------------------------------------------
+# Scénarios HTTP mesurés sur les chemins critiques de l'API :
+# - ingestion : POST /v1/donnees (unitaire et liste)
+# - lectures  : GET /v1/patients, GET /v1/patients/<id>, /stats
+# - listes volumineuses : GET /v1/donnees, /v1/analyses, /v1/alertes
+# - recherches d'alertes et de patients par urgence
+# - authentification : POST /v1/auth/login
+# Chaque scénario renvoie (appel, elements_par_appel).
+# -------------------------------------------------------------
+
+TAILLE_LISTE_INGESTION = 50
+
+
+def _mesure_aleatoire(ctx, rng):
+    return {
+        "patient_id": rng.choice(ctx["patient_ids"]),
+        "capteur_id": rng.choice(ctx["capteur_ids"]),
+        "medecin_id": rng.choice(ctx["medecin_ids"]),
+        "valeur_mesuree": round(rng.uniform(35.0, 39.0), 2),
+    }
+
+
+def scenario_login(client, ctx, rng, entetes):
+    corps = {"email": ctx["email_medecin"], "password": ctx["mot_de_passe"]}
+    return (lambda: client.post("/v1/auth/login", json=corps)), 1
+
+
+def scenario_post_donnee(client, ctx, rng, entetes):
+    return (lambda: client.post("/v1/donnees", json=_mesure_aleatoire(ctx, rng))), 1
+
+
+def scenario_post_donnees_liste(client, ctx, rng, entetes):
+    def appel():
+        lot = [_mesure_aleatoire(ctx, rng) for _ in range(TAILLE_LISTE_INGESTION)]
+        return client.post("/v1/donnees", json=lot)
+    return appel, TAILLE_LISTE_INGESTION
+
+
+def scenario_get_patients(client, ctx, rng, entetes):
+    return (lambda: client.get("/v1/patients", headers=entetes)), 1
+
+
+def scenario_get_patient(client, ctx, rng, entetes):
+    return (lambda: client.get(
+        f"/v1/patients/{rng.choice(ctx['patient_ids'])}", headers=entetes
+    )), 1
+
+
+def scenario_stats_patient(client, ctx, rng, entetes):
+    return (lambda: client.get(
+        f"/v1/donnees/patient/{rng.choice(ctx['patient_ids'])}/stats", headers=entetes
+    )), 1
+
+
+def scenario_get_donnees(client, ctx, rng, entetes):
+    return (lambda: client.get("/v1/donnees", headers=entetes)), 1
+
+
+def scenario_get_analyses(client, ctx, rng, entetes):
+    return (lambda: client.get("/v1/analyses", headers=entetes)), 1
+
+
+def scenario_get_alertes(client, ctx, rng, entetes):
+    return (lambda: client.get("/v1/alertes", headers=entetes)), 1
+
+
+def scenario_search_alertes(client, ctx, rng, entetes):
+    return (lambda: client.get("/v1/alertes/search?q=anomalie", headers=entetes)), 1
+
+
+def scenario_search_patients_urgence(client, ctx, rng, entetes):
+    return (lambda: client.get("/v1/patients/search?urgence=Critique", headers=entetes)), 1
+
+
+# Nom du scénario → (constructeur, facteur d'itérations)
+# Les scénarios lourds (listes complètes) tournent moins de fois ;
+# les lectures passent avant l'ingestion pour mesurer les volumes semés.
+SCENARIOS = {
+    "login": (scenario_login, 0.25),
+    "get_patient": (scenario_get_patient, 1.0),
+    "get_patients": (scenario_get_patients, 0.1),
+    "stats_patient": (scenario_stats_patient, 1.0),
+    "get_donnees": (scenario_get_donnees, 0.05),
+    "get_analyses": (scenario_get_analyses, 0.05),
+    "get_alertes": (scenario_get_alertes, 0.1),
+    "search_alertes": (scenario_search_alertes, 0.25),
+    "search_patients_urgence": (scenario_search_patients_urgence, 0.1),
+    "post_donnee": (scenario_post_donnee, 1.0),
+    "post_donnees_liste": (scenario_post_donnees_liste, 0.1),
+}
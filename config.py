@@ -40,13 +40,77 @@ class Config:
         f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Pool de connexions (SQLALCHEMY_ENGINE_OPTIONS calculé dans create_app)
+    GUNICORN_WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))          # processus gunicorn
+    GUNICORN_THREADS = int(os.getenv("GUNICORN_THREADS", "1"))         # threads par worker
+    DB_MAX_CONNEXIONS = int(os.getenv("DB_MAX_CONNEXIONS", "0"))       # budget serveur pour tous les workers (0 = non borné)
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "0"))                 # 0 = threads par worker
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "-1"))          # -1 = automatique
+    DB_POOL_TIMEOUT_S = float(os.getenv("DB_POOL_TIMEOUT_S", "10"))    # attente d'une connexion avant 503
+    DB_POOL_RECYCLE_S = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))    # sous le délai de coupure du Postgres managé
+    DB_POOL_PRE_PING = strtobool(os.getenv("DB_POOL_PRE_PING", "True"))
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    DB_IDLE_TRANSACTION_TIMEOUT_MS = int(os.getenv("DB_IDLE_TRANSACTION_TIMEOUT_MS", "60000"))
+    DB_POOLER = os.getenv("DB_POOLER", "")                             # "pgbouncer" : pooler externe en mode transaction
+
+    # Réplicas en lecture seule (listes, recherches, statistiques)
+    DB_REPLICA_URIS = os.getenv("DB_REPLICA_URIS", "")                 # URIs séparées par des virgules
+    REPLICA_COLLAGE_S = float(os.getenv("REPLICA_COLLAGE_S", "5"))     # lectures sur le primaire après une écriture
+
+    # Partitions mensuelles des mesures (flask partitions maintain)
+    PARTITIONS_MOIS_AVANCE = int(os.getenv("PARTITIONS_MOIS_AVANCE", "3"))  # mois futurs pré-créés
+    RETENTION_MOIS = int(os.getenv("RETENTION_MOIS", "0"))                  # mois conservés (0 = tout garder)
+    ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "")                              # archives CSV gzip des mois détachés
+    ARCHIVE_COLONNES_DIR = os.getenv("ARCHIVE_COLONNES_DIR", "")            # archive colonnaire des mesures anciennes
     # print(" URI PostgreSQL →", SQLALCHEMY_DATABASE_URI)
 
+    # Encodage JSON des réponses : orjson si installé
+    JSON_RAPIDE = strtobool(os.getenv("JSON_RAPIDE", "True"))
+    SERIALISATION_LIGNES = strtobool(os.getenv("SERIALISATION_LIGNES", "True"))  # listes sans objets ORM
+
+    # Compression des réponses (gzip, brotli si le module est installé)
+    COMPRESSION_ACTIVE = strtobool(os.getenv("COMPRESSION_ACTIVE", "True"))
+    COMPRESSION_TAILLE_MIN = int(os.getenv("COMPRESSION_TAILLE_MIN", "1024"))    # octets, corps plus petits envoyés tels quels
+    COMPRESSION_NIVEAU_GZIP = int(os.getenv("COMPRESSION_NIVEAU_GZIP", "6"))     # 1 (rapide) à 9
+    COMPRESSION_NIVEAU_BROTLI = int(os.getenv("COMPRESSION_NIVEAU_BROTLI", "4")) # 0 à 11
+
+    # Ingestion ASGI des passerelles (asgi.py, uvicorn)
+    INGESTION_TAILLE_LOT = int(os.getenv("INGESTION_TAILLE_LOT", "500"))        # lectures par transaction
+    INGESTION_DELAI_LOT_MS = int(os.getenv("INGESTION_DELAI_LOT_MS", "50"))     # attente max pour remplir un lot
+    INGESTION_ECRIVAINS = int(os.getenv("INGESTION_ECRIVAINS", "2"))            # transactions simultanées
+    INGESTION_FILE_MAX = int(os.getenv("INGESTION_FILE_MAX", "1000"))           # paquets en attente avant contre-pression
+    INGESTION_LIGNE_MAX = int(os.getenv("INGESTION_LIGNE_MAX", "65536"))        # octets par ligne NDJSON
+    INGESTION_DB_ASYNC = strtobool(os.getenv("INGESTION_DB_ASYNC", "True"))     # asyncpg s'il est installé
+    INGESTION_RETARD_MAX_S = int(os.getenv("INGESTION_RETARD_MAX_S", "30"))     # réordonnancement des lectures horodatées
+    INGESTION_FENETRE_MAX = int(os.getenv("INGESTION_FENETRE_MAX", "10000"))    # lectures en attente par requête
+
+    # Démarrage des workers (flask startup-profile)
+    SWAGGER_ACTIVE = strtobool(os.getenv("SWAGGER_ACTIVE", "True"))          # /apidocs et /apispec_1.json
+    SWAGGER_SPEC_FICHIER = os.getenv("SWAGGER_SPEC_FICHIER", "")             # spec pré-générée (flask swagger-build)
+    MIGRATIONS_ACTIVES = strtobool(os.getenv("MIGRATIONS_ACTIVES", "True"))  # Flask-Migrate (flask db ...)
+
     # Clés de sécurité
     SECRET_KEY = os.getenv('SESSION_SECRET_KEY')  # utilisée par Flask pour les sessions
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY')  # utilisée pour signer les tokens JWT
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(seconds=int(os.getenv("JWT_ACCESS_TOKEN_EXPIRES", "3600")))
     ENCRYPTION_KEY = os.getenv('ENCRYPTION_KEY')  # utilisée pour le chiffrement des données sensibles
+    IDENTITE_CACHE_TTL_S = float(os.getenv("IDENTITE_CACHE_TTL_S", "30"))  # cache du profil /me (0 = désactivé)
+    DASHBOARD_CACHE_TTL_S = float(os.getenv("DASHBOARD_CACHE_TTL_S", "5"))  # tableau de bord médecin (0 = désactivé)
+    APPAREILS_CACHE_TTL_S = float(os.getenv("APPAREILS_CACHE_TTL_S", "60"))  # clés et résolutions des appareils (0 = désactivé)
+    PASSERELLES_DERIVE_MAX_S = int(os.getenv("PASSERELLES_DERIVE_MAX_S", "300"))  # écart toléré de X-Horodatage
+    REFERENCES_VERIFICATION_S = float(os.getenv("REFERENCES_VERIFICATION_S", "5"))  # relecture de la version des capteurs en cache
+
+    # Hachage des mots de passe (bcrypt)
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))       # coût ; les anciens hashs sont recalculés au login
+    BCRYPT_POOL_WORKERS = int(os.getenv("BCRYPT_POOL_WORKERS", "0")) or None  # défaut : nombre de cœurs
+    BCRYPT_FILE_ATTENTE = int(os.getenv("BCRYPT_FILE_ATTENTE", "32"))   # vérifications en attente avant refus (503)
+
+    # Limitation des tentatives de connexion (seaux à jetons en mémoire)
+    LOGIN_RAFALE_COMPTE = int(os.getenv("LOGIN_RAFALE_COMPTE", "10"))           # tentatives immédiates par compte
+    LOGIN_RECHARGE_COMPTE_S = float(os.getenv("LOGIN_RECHARGE_COMPTE_S", "30"))  # secondes par tentative regagnée
+    LOGIN_RAFALE_IP = int(os.getenv("LOGIN_RAFALE_IP", "50"))
+    LOGIN_RECHARGE_IP_S = float(os.getenv("LOGIN_RECHARGE_IP_S", "2"))
 
     # Configuration Mail (Mailtrap ou autre)
     MAIL_SERVER = os.getenv("MAIL_SERVER", "sandbox.smtp.mailtrap.io")
@@ -60,6 +124,23 @@ class Config:
         os.getenv("MAIL_FROM_NAME", "e-Santé Platform")
     )
 
+    # Notifications des alertes (flask notify-worker)
+    NOTIFICATIONS_INTERVALLE_S = float(os.getenv("NOTIFICATIONS_INTERVALLE_S", "1"))        # attente entre deux passages
+    NOTIFICATIONS_TAILLE_LOT = int(os.getenv("NOTIFICATIONS_TAILLE_LOT", "100"))             # notifications dues par passage
+    NOTIFICATIONS_DELAI_RESUME_S = int(os.getenv("NOTIFICATIONS_DELAI_RESUME_S", "60"))      # regroupement des alertes non critiques
+    NOTIFICATIONS_ATTENTE_S = int(os.getenv("NOTIFICATIONS_ATTENTE_S", "30"))                # 1re attente après un échec (doublée ensuite)
+    NOTIFICATIONS_ATTENTE_MAX_S = int(os.getenv("NOTIFICATIONS_ATTENTE_MAX_S", "3600"))
+    NOTIFICATIONS_ESSAIS_MAX = int(os.getenv("NOTIFICATIONS_ESSAIS_MAX", "8"))               # tentatives avant abandon
+    NOTIFICATIONS_RETENTION_JOURS = int(os.getenv("NOTIFICATIONS_RETENTION_JOURS", "30"))    # historique conservé
+
+    # Score de risque des patients (flask risk-decay)
+    RISQUE_DEMI_VIE_H = float(os.getenv("RISQUE_DEMI_VIE_H", "24"))   # poids d'une alerte divisé par 2 toutes les N heures
+    RISQUE_TAILLE_LOT = int(os.getenv("RISQUE_TAILLE_LOT", "1000"))   # scores décrus par transaction
+
+    # Suppression des patients, médecins et capteurs (flask purge-deletions)
+    SUPPRESSION_DOUCE = strtobool(os.getenv("SUPPRESSION_DOUCE", "False"))        # DELETE archive par défaut (?douce=)
+    SUPPRESSION_TAILLE_LOT = int(os.getenv("SUPPRESSION_TAILLE_LOT", "5000"))     # au-delà : suppression différée, par lots
+
     # Environnement Flask
     # Environnement Flask
     DEBUG = strtobool(os.getenv('FLASK_DEBUG', 'False'))
@@ -0,0 +1,15 @@
+# -------------------------------------------------------------
+# gunicorn.conf.py (chargé automatiquement par gunicorn)
+# -------------------------------------------------------------
+# Mêmes variables que config.py : le pool SQLAlchemy de chaque
+# worker est dimensionné sur GUNICORN_THREADS (voir app/utils/pool_bd.py)
+# Les workers n'exécutent pas `flask db` : Flask-Migrate (et alembic)
+# n'y sont pas chargés, sauf MIGRATIONS_ACTIVES explicite
+# -------------------------------------------------------------
+import os
+
+os.environ.setdefault("MIGRATIONS_ACTIVES", "False")
+
+workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
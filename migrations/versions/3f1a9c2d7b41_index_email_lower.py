@@ -0,0 +1,24 @@
+"""index fonctionnel lower(email) pour le login
+
+Revision ID: 3f1a9c2d7b41
+Revises: 0adc3b68c195
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1a9c2d7b41'
+down_revision = '0adc3b68c195'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_personne_email_lower', 'personne', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_personne_email_lower', table_name='personne')
@@ -0,0 +1,177 @@
+"""partitionnement mensuel de donnees_medicales et analyseur
+
+Revision ID: 8b4d2e6f1a73
+Revises: 3f1a9c2d7b41
+Create Date: 2026-10-19 14:00:00.000000
+
+Sous PostgreSQL, les deux tables deviennent des tables partitionnées
+par RANGE (date_heure_mesure), une partition par mois + une partition
+par défaut. La clé primaire inclut la clé de partition ; analyseur
+référence la mesure par (donnee_medicale_id, date_heure_mesure).
+Les partitions futures sont créées par `flask partitions maintain`.
+Sur les autres SGBD, seule la colonne analyseur.date_heure_mesure
+est ajoutée.
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b4d2e6f1a73'
+down_revision = '3f1a9c2d7b41'
+branch_labels = None
+depends_on = None
+
+MOIS_AVANCE = 3
+
+
+def _mois(debut, fin):
+    mois = date(debut.year, debut.month, 1)
+    while mois <= fin:
+        suivant = date(mois.year + mois.month // 12, mois.month % 12 + 1, 1)
+        yield mois, suivant
+        mois = suivant
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    op.execute(
+        "UPDATE donnees_medicales SET date_heure_mesure = CURRENT_TIMESTAMP "
+        "WHERE date_heure_mesure IS NULL"
+    )
+    op.add_column('analyseur', sa.Column('date_heure_mesure', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE analyseur SET date_heure_mesure = ("
+        "  SELECT d.date_heure_mesure FROM donnees_medicales d "
+        "  WHERE d.id = analyseur.donnee_medicale_id)"
+    )
+
+    if bind.dialect.name != 'postgresql':
+        with op.batch_alter_table('donnees_medicales') as batch_op:
+            batch_op.alter_column('date_heure_mesure', existing_type=sa.DateTime(), nullable=False)
+        return
+
+    # --- Tables existantes mises de côté ------------------------------
+    op.execute("ALTER TABLE analyseur DROP CONSTRAINT analyseur_donnee_medicale_id_fkey")
+    for table in ('analyseur', 'donnees_medicales'):
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_ancien")
+        op.execute(f"ALTER INDEX {table}_pkey RENAME TO {table}_ancien_pkey")
+
+    # --- Tables partitionnées -----------------------------------------
+    op.execute("""
+        CREATE TABLE donnees_medicales (
+            id integer NOT NULL DEFAULT nextval('donnees_medicales_id_seq'),
+            patient_id integer NOT NULL REFERENCES patient (id),
+            capteur_id integer NOT NULL REFERENCES capteur (id),
+            valeur_mesuree double precision NOT NULL,
+            date_heure_mesure timestamp without time zone NOT NULL,
+            CONSTRAINT donnees_medicales_pkey PRIMARY KEY (id, date_heure_mesure)
+        ) PARTITION BY RANGE (date_heure_mesure)
+    """)
+    op.execute("""
+        CREATE TABLE analyseur (
+            id integer NOT NULL DEFAULT nextval('analyseur_id_seq'),
+            patient_id integer NOT NULL REFERENCES patient (id),
+            medecin_id integer NOT NULL REFERENCES medecin (id),
+            donnee_medicale_id integer NOT NULL,
+            date_heure_mesure timestamp without time zone NOT NULL,
+            resultat varchar(255),
+            date_analyse timestamp without time zone,
+            CONSTRAINT analyseur_pkey PRIMARY KEY (id, date_heure_mesure),
+            CONSTRAINT analyseur_donnee_medicale_fkey
+                FOREIGN KEY (donnee_medicale_id, date_heure_mesure)
+                REFERENCES donnees_medicales (id, date_heure_mesure)
+        ) PARTITION BY RANGE (date_heure_mesure)
+    """)
+    op.execute(
+        "CREATE INDEX ix_donnees_medicales_patient_date "
+        "ON donnees_medicales (patient_id, date_heure_mesure)"
+    )
+    op.execute("CREATE INDEX ix_analyseur_donnee ON analyseur (donnee_medicale_id)")
+    op.execute("CREATE INDEX ix_analyseur_medecin ON analyseur (medecin_id)")
+
+    # --- Partitions : du mois le plus ancien à MOIS_AVANCE mois ---------
+    plus_ancienne = bind.execute(sa.text(
+        "SELECT MIN(date_heure_mesure) FROM donnees_medicales_ancien"
+    )).scalar() or datetime.utcnow()
+    aujourd_hui = datetime.utcnow().date()
+    fin = date(aujourd_hui.year + (aujourd_hui.month - 1 + MOIS_AVANCE) // 12,
+               (aujourd_hui.month - 1 + MOIS_AVANCE) % 12 + 1, 1)
+
+    for table in ('donnees_medicales', 'analyseur'):
+        op.execute(f"CREATE TABLE {table}_defaut PARTITION OF {table} DEFAULT")
+        for mois, suivant in _mois(plus_ancienne.date(), fin):
+            op.execute(
+                f"CREATE TABLE {table}_p{mois:%Y_%m} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{mois.isoformat()}') TO ('{suivant.isoformat()}')"
+            )
+
+    # --- Recopie puis suppression des anciennes tables -----------------
+    op.execute("""
+        INSERT INTO donnees_medicales (id, patient_id, capteur_id, valeur_mesuree, date_heure_mesure)
+        SELECT id, patient_id, capteur_id, valeur_mesuree, date_heure_mesure
+        FROM donnees_medicales_ancien
+    """)
+    op.execute("""
+        INSERT INTO analyseur (id, patient_id, medecin_id, donnee_medicale_id,
+                               date_heure_mesure, resultat, date_analyse)
+        SELECT id, patient_id, medecin_id, donnee_medicale_id,
+               date_heure_mesure, resultat, date_analyse
+        FROM analyseur_ancien
+    """)
+    for table in ('analyseur', 'donnees_medicales'):
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        op.execute(f"DROP TABLE {table}_ancien")
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if bind.dialect.name != 'postgresql':
+        with op.batch_alter_table('donnees_medicales') as batch_op:
+            batch_op.alter_column('date_heure_mesure', existing_type=sa.DateTime(), nullable=True)
+        op.drop_column('analyseur', 'date_heure_mesure')
+        return
+
+    for table in ('analyseur', 'donnees_medicales'):
+        op.execute(f"ALTER TABLE {table} RENAME TO {table}_partitionnee")
+        op.execute(f"ALTER INDEX {table}_pkey RENAME TO {table}_partitionnee_pkey")
+
+    op.execute("""
+        CREATE TABLE donnees_medicales (
+            id integer NOT NULL DEFAULT nextval('donnees_medicales_id_seq'),
+            patient_id integer NOT NULL REFERENCES patient (id),
+            capteur_id integer NOT NULL REFERENCES capteur (id),
+            valeur_mesuree double precision NOT NULL,
+            date_heure_mesure timestamp without time zone,
+            CONSTRAINT donnees_medicales_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("""
+        CREATE TABLE analyseur (
+            id integer NOT NULL DEFAULT nextval('analyseur_id_seq'),
+            patient_id integer NOT NULL REFERENCES patient (id),
+            medecin_id integer NOT NULL REFERENCES medecin (id),
+            donnee_medicale_id integer NOT NULL
+                CONSTRAINT analyseur_donnee_medicale_id_fkey REFERENCES donnees_medicales (id),
+            resultat varchar(255),
+            date_analyse timestamp without time zone,
+            CONSTRAINT analyseur_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("""
+        INSERT INTO donnees_medicales (id, patient_id, capteur_id, valeur_mesuree, date_heure_mesure)
+        SELECT id, patient_id, capteur_id, valeur_mesuree, date_heure_mesure
+        FROM donnees_medicales_partitionnee
+    """)
+    op.execute("""
+        INSERT INTO analyseur (id, patient_id, medecin_id, donnee_medicale_id, resultat, date_analyse)
+        SELECT id, patient_id, medecin_id, donnee_medicale_id, resultat, date_analyse
+        FROM analyseur_partitionnee
+    """)
+    for table in ('analyseur', 'donnees_medicales'):
+        op.execute(f"ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id")
+        op.execute(f"DROP TABLE {table}_partitionnee")
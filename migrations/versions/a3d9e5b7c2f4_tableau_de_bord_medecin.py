@@ -0,0 +1,44 @@
+"""tableau de bord médecin : etats_mesures.medecin_id et index des alertes
+
+Revision ID: a3d9e5b7c2f4
+Revises: f1a7c3e9b5d2
+Create Date: 2026-10-20 09:00:00.000000
+
+etats_mesures.medecin_id est initialisé depuis l'analyse de la dernière
+mesure de chaque couple (patient, capteur).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3d9e5b7c2f4'
+down_revision = 'f1a7c3e9b5d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('etats_mesures', sa.Column('medecin_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('etats_mesures_medecin_id_fkey', 'etats_mesures', 'medecin', ['medecin_id'], ['id'])
+    op.create_index('ix_etats_mesures_medecin_id', 'etats_mesures', ['medecin_id'])
+    op.execute("""
+        UPDATE etats_mesures SET medecin_id = (
+            SELECT a.medecin_id FROM analyseur a
+            WHERE a.donnee_medicale_id = etats_mesures.derniere_donnee_id
+              AND a.date_heure_mesure = etats_mesures.date_derniere_mesure
+            LIMIT 1)
+    """)
+
+    op.create_index('ix_alerte_medecin_date', 'alerte', ['medecin_id', 'date_heure_alerte'])
+    op.create_index('ix_alerte_medecin_non_traitees', 'alerte', ['medecin_id', 'niveau_urgence'],
+                    postgresql_where=sa.text('etat_traitement = false'),
+                    sqlite_where=sa.text('etat_traitement = 0'))
+
+
+def downgrade():
+    op.drop_index('ix_alerte_medecin_non_traitees', table_name='alerte')
+    op.drop_index('ix_alerte_medecin_date', table_name='alerte')
+    op.drop_index('ix_etats_mesures_medecin_id', table_name='etats_mesures')
+    op.drop_constraint('etats_mesures_medecin_id_fkey', 'etats_mesures', type_='foreignkey')
+    op.drop_column('etats_mesures', 'medecin_id')
@@ -0,0 +1,56 @@
+"""appareils et passerelles : registre des sources d'ingestion
+
+Revision ID: a7d3f9b1c5e8
+Revises: e5b9c3d7f2a6
+Create Date: 2026-10-22 10:00:00.000000
+
+POST /v1/donnees n'accepte plus que des lectures authentifiées : clé
+d'API par appareil (seule son empreinte SHA-256 est stockée) ou lot
+signé HMAC par une passerelle. Un appareil alimente un capteur ; le
+patient est celui de l'affectation active du capteur.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d3f9b1c5e8'
+down_revision = 'e5b9c3d7f2a6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'passerelles',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('nom', sa.String(length=100), nullable=False),
+        sa.Column('secret', sa.String(length=64), nullable=False),
+        sa.Column('actif', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('date_creation', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'appareils',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('capteur_id', sa.Integer(), nullable=False),
+        sa.Column('medecin_id', sa.Integer(), nullable=True),
+        sa.Column('passerelle_id', sa.Integer(), nullable=True),
+        sa.Column('cle_hash', sa.String(length=64), nullable=False),
+        sa.Column('actif', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('date_creation', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(['capteur_id'], ['capteur.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['medecin_id'], ['medecin.id'], ondelete='SET NULL'),
+        sa.ForeignKeyConstraint(['passerelle_id'], ['passerelles.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('capteur_id'),
+    )
+    op.create_index('ix_appareils_medecin_id', 'appareils', ['medecin_id'])
+    op.create_index('ix_appareils_passerelle_id', 'appareils', ['passerelle_id'])
+
+
+def downgrade():
+    op.drop_index('ix_appareils_passerelle_id', table_name='appareils')
+    op.drop_index('ix_appareils_medecin_id', table_name='appareils')
+    op.drop_table('appareils')
+    op.drop_table('passerelles')
@@ -0,0 +1,34 @@
+"""versions_references : version partagée des références en cache
+
+Revision ID: b2e6c8f4a1d9
+Revises: a7d3f9b1c5e8
+Create Date: 2026-10-22 16:00:00.000000
+
+Les types des capteurs sont gardés en mémoire par chaque worker
+(reference_service) ; la ligne 'capteur' est incrémentée à chaque
+création, modification ou suppression de capteur, et relue
+périodiquement par les workers pour recharger leur copie.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b2e6c8f4a1d9'
+down_revision = 'a7d3f9b1c5e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    versions = op.create_table(
+        'versions_references',
+        sa.Column('nom', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('nom'),
+    )
+    op.bulk_insert(versions, [{'nom': 'capteur', 'version': 0}])
+
+
+def downgrade():
+    op.drop_table('versions_references')
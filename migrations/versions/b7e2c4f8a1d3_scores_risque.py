@@ -0,0 +1,121 @@
+"""scores_risque : score de risque matérialisé par patient
+
+Revision ID: b7e2c4f8a1d3
+Revises: a3d9e5b7c2f4
+Create Date: 2026-10-20 14:00:00.000000
+
+La table est initialisée depuis les alertes et etats_mesures existants,
+avec le calcul de risque_service.recalculer_scores figé à cette révision
+(poids des urgences, seuils des capteurs, demi-vie par défaut) : une
+demi-vie RISQUE_DEMI_VIE_H différente est prise en compte au prochain
+`flask risk-decay --recalculer`.
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e2c4f8a1d3'
+down_revision = 'a3d9e5b7c2f4'
+branch_labels = None
+depends_on = None
+
+POIDS_URGENCE = {'critique': 5.0, 'moyenne': 2.0, 'faible': 1.0}
+SEUILS_CAPTEURS = {   # type : (min, max, urgence)
+    'temperature': (36.0, 37.5, 'critique'),
+    'pression': (90.0, 140.0, 'critique'),
+    'rythme': (60.0, 100.0, 'moyenne'),
+}
+DEMI_VIE_H = 24
+NEGLIGEABLE = 1e-3
+
+
+def upgrade():
+    urgence = sa.Enum('faible', 'moyenne', 'critique', name='urgenceenum').with_variant(
+        postgresql.ENUM('faible', 'moyenne', 'critique', name='urgenceenum', create_type=False), 'postgresql')
+    op.create_table(
+        'scores_risque',
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('medecin_id', sa.Integer(), nullable=True),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.Column('score_alertes', sa.Float(), nullable=False),
+        sa.Column('score_ecarts', sa.Float(), nullable=False),
+        sa.Column('nb_alertes_non_traitees', sa.Integer(), nullable=False),
+        sa.Column('derniere_urgence', urgence, nullable=True),
+        sa.Column('date_derniere_alerte', sa.DateTime(), nullable=True),
+        sa.Column('date_reference', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['medecin_id'], ['medecin.id']),
+        sa.ForeignKeyConstraint(['patient_id'], ['patient.id']),
+        sa.PrimaryKeyConstraint('patient_id'),
+    )
+    op.create_index('ix_scores_risque_medecin_score', 'scores_risque', ['medecin_id', 'score'])
+    op.create_index('ix_scores_risque_score', 'scores_risque', ['score'])
+    op.create_index('ix_scores_risque_derniere_urgence', 'scores_risque', ['derniere_urgence'])
+
+    # --- Initialisation : tableau de bord et recherche par urgence --------
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        age_h = "EXTRACT(EPOCH FROM CAST(:maintenant AS TIMESTAMP) - COALESCE(a.date_heure_alerte, :maintenant)) / 3600"
+    else:
+        age_h = "(julianday(:maintenant) - julianday(COALESCE(a.date_heure_alerte, :maintenant))) * 24"
+    poids = " ".join(f"WHEN '{u}' THEN {p}" for u, p in POIDS_URGENCE.items())
+    ecart = " ".join(
+        f"WHEN '{t}' THEN {POIDS_URGENCE[u]} * (CASE WHEN e.derniere_valeur < {mn} THEN {mn} - e.derniere_valeur "
+        f"WHEN e.derniere_valeur > {mx} THEN e.derniere_valeur - {mx} ELSE 0 END) / {mx - mn}"
+        for t, (mn, mx, u) in SEUILS_CAPTEURS.items()
+    )
+    non_traitee = "(a.etat_traitement IS NULL OR a.etat_traitement = false)"
+    parametres = {"maintenant": datetime.utcnow()}
+
+    # Alertes non traitées décrues, écarts des dernières mesures aux seuils
+    bind.execute(sa.text(f"""
+        INSERT INTO scores_risque (patient_id, score, score_alertes, score_ecarts,
+                                   nb_alertes_non_traitees, date_reference)
+        SELECT p.patient_id, 0,
+               COALESCE((SELECT SUM((CASE a.niveau_urgence {poids} END)
+                                    * POWER(0.5, (CASE WHEN {age_h} > 0 THEN {age_h} ELSE 0 END) / {DEMI_VIE_H}))
+                         FROM alerte a WHERE a.patient_id = p.patient_id AND {non_traitee}), 0),
+               COALESCE((SELECT SUM(CASE c.type {ecart} ELSE 0 END)
+                         FROM etats_mesures e JOIN capteur c ON c.id = e.capteur_id
+                         WHERE e.patient_id = p.patient_id), 0),
+               (SELECT COUNT(*) FROM alerte a WHERE a.patient_id = p.patient_id AND {non_traitee}),
+               :maintenant
+        FROM (SELECT patient_id FROM etats_mesures UNION SELECT patient_id FROM alerte) p
+    """), parametres)
+    op.execute(f"""
+        UPDATE scores_risque SET score_alertes = 0 WHERE score_alertes < {NEGLIGEABLE}
+    """)
+    op.execute("UPDATE scores_risque SET score = score_alertes + score_ecarts")
+
+    # Dernière alerte, médecin de l'activité la plus récente (mesure ou alerte)
+    op.execute("""
+        UPDATE scores_risque SET
+            derniere_urgence = (
+                SELECT a.niveau_urgence FROM alerte a WHERE a.patient_id = scores_risque.patient_id
+                ORDER BY a.date_heure_alerte DESC, a.id DESC LIMIT 1),
+            date_derniere_alerte = (
+                SELECT MAX(a.date_heure_alerte) FROM alerte a WHERE a.patient_id = scores_risque.patient_id)
+    """)
+    bind.execute(sa.text("""
+        UPDATE scores_risque SET medecin_id = (
+            SELECT x.medecin_id FROM (
+                SELECT e.medecin_id, e.date_derniere_mesure AS date_activite, 0 AS rang, 0 AS ordre
+                FROM etats_mesures e
+                WHERE e.patient_id = scores_risque.patient_id AND e.medecin_id IS NOT NULL
+                UNION ALL
+                SELECT a.medecin_id, COALESCE(a.date_heure_alerte, :maintenant), 1, a.id
+                FROM alerte a
+                WHERE a.patient_id = scores_risque.patient_id AND a.medecin_id IS NOT NULL
+            ) x
+            ORDER BY x.date_activite IS NULL, x.date_activite DESC, x.rang DESC, x.ordre DESC LIMIT 1)
+    """), parametres)
+
+
+def downgrade():
+    op.drop_index('ix_scores_risque_derniere_urgence', table_name='scores_risque')
+    op.drop_index('ix_scores_risque_score', table_name='scores_risque')
+    op.drop_index('ix_scores_risque_medecin_score', table_name='scores_risque')
+    op.drop_table('scores_risque')
@@ -0,0 +1,31 @@
+"""alerte : date et auteur de l'acquittement
+
+Revision ID: c2f6a8d4e9b1
+Revises: b7e2c4f8a1d3
+Create Date: 2026-10-20 18:00:00.000000
+
+Les alertes déjà traitées gardent un acquittement vide (auteur et
+date inconnus).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2f6a8d4e9b1'
+down_revision = 'b7e2c4f8a1d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('alerte', sa.Column('date_acquittement', sa.DateTime(), nullable=True))
+    op.add_column('alerte', sa.Column('acquittee_par', sa.Integer(), nullable=True))
+    op.create_foreign_key('alerte_acquittee_par_fkey', 'alerte', 'personne', ['acquittee_par'], ['id'],
+                          ondelete='SET NULL')
+
+
+def downgrade():
+    op.drop_constraint('alerte_acquittee_par_fkey', 'alerte', type_='foreignkey')
+    op.drop_column('alerte', 'acquittee_par')
+    op.drop_column('alerte', 'date_acquittement')
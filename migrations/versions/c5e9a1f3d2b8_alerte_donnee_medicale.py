@@ -0,0 +1,26 @@
+"""alerte.donnee_medicale_id : mesure à l'origine de l'alerte
+
+Revision ID: c5e9a1f3d2b8
+Revises: 8b4d2e6f1a73
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e9a1f3d2b8'
+down_revision = '8b4d2e6f1a73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('alerte', sa.Column('donnee_medicale_id', sa.Integer(), nullable=True))
+    op.create_index('ix_alerte_donnee_medicale_id', 'alerte', ['donnee_medicale_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_alerte_donnee_medicale_id', table_name='alerte')
+    op.drop_column('alerte', 'donnee_medicale_id')
@@ -0,0 +1,101 @@
+"""suppressions : ON DELETE en cascade, archivage et suppressions différées
+
+Revision ID: d4a8f2c6e1b7
+Revises: c2f6a8d4e9b1
+Create Date: 2026-10-21 10:00:00.000000
+
+- Clés étrangères recréées avec leur action ON DELETE : ce qui appartient
+  à un patient ou à un capteur disparaît avec lui (CASCADE), les
+  références « dernier médecin » sont remises à NULL (SET NULL), et
+  l'historique clinique d'un médecin (alertes, analyses) reste protégé.
+  Sur donnees_medicales et analyseur (partitionnées), la contrainte est
+  posée sur la table mère et héritée par chaque partition.
+- Index sur les colonnes référençantes qui n'en avaient pas : sans eux,
+  chaque ligne supprimée parcourt toute la table fille.
+- personne.date_suppression et capteur.date_suppression : archivage.
+- Table suppressions : suppressions volumineuses traitées par lots
+  (flask purge-deletions).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8f2c6e1b7'
+down_revision = 'c2f6a8d4e9b1'
+branch_labels = None
+depends_on = None
+
+
+# (table, contrainte, colonnes, table référencée, colonnes référencées, ON DELETE)
+CLES = [
+    ('patient', 'patient_id_fkey', ['id'], 'personne', ['id'], 'CASCADE'),
+    ('medecin', 'medecin_id_fkey', ['id'], 'personne', ['id'], 'CASCADE'),
+    ('proche', 'proche_id_fkey', ['id'], 'personne', ['id'], 'CASCADE'),
+    ('proche', 'proche_patient_id_fkey', ['patient_id'], 'patient', ['id'], 'CASCADE'),
+    ('donnees_medicales', 'donnees_medicales_patient_id_fkey1', ['patient_id'], 'patient', ['id'], 'CASCADE'),
+    ('donnees_medicales', 'donnees_medicales_capteur_id_fkey1', ['capteur_id'], 'capteur', ['id'], 'CASCADE'),
+    ('analyseur', 'analyseur_patient_id_fkey1', ['patient_id'], 'patient', ['id'], 'CASCADE'),
+    ('analyseur', 'analyseur_donnee_medicale_fkey', ['donnee_medicale_id', 'date_heure_mesure'],
+     'donnees_medicales', ['id', 'date_heure_mesure'], 'CASCADE'),
+    ('alerte', 'alerte_patient_id_fkey', ['patient_id'], 'patient', ['id'], 'CASCADE'),
+    ('cles_ingestion', 'cles_ingestion_capteur_id_fkey', ['capteur_id'], 'capteur', ['id'], 'CASCADE'),
+    ('etats_mesures', 'etats_mesures_patient_id_fkey', ['patient_id'], 'patient', ['id'], 'CASCADE'),
+    ('etats_mesures', 'etats_mesures_capteur_id_fkey', ['capteur_id'], 'capteur', ['id'], 'CASCADE'),
+    ('etats_mesures', 'etats_mesures_medecin_id_fkey', ['medecin_id'], 'medecin', ['id'], 'SET NULL'),
+    ('scores_risque', 'scores_risque_patient_id_fkey', ['patient_id'], 'patient', ['id'], 'CASCADE'),
+    ('scores_risque', 'scores_risque_medecin_id_fkey', ['medecin_id'], 'medecin', ['id'], 'SET NULL'),
+]
+
+# (nom, table, colonnes)
+INDEX = [
+    ('ix_proche_patient_id', 'proche', ['patient_id']),
+    ('ix_donnees_medicales_capteur', 'donnees_medicales', ['capteur_id', 'date_heure_mesure']),
+    ('ix_analyseur_patient', 'analyseur', ['patient_id']),
+    ('ix_alerte_patient_id', 'alerte', ['patient_id']),
+    ('ix_alerte_acquittee_par', 'alerte', ['acquittee_par']),
+    ('ix_etats_mesures_capteur_id', 'etats_mesures', ['capteur_id']),
+    ('ix_notifications_destinataire_id', 'notifications', ['destinataire_id']),
+]
+
+
+def _recreer_cles(avec_action):
+    for table, nom, colonnes, reference, colonnes_ref, action in CLES:
+        op.drop_constraint(nom, table, type_='foreignkey')
+        op.create_foreign_key(nom, table, reference, colonnes, colonnes_ref,
+                              ondelete=action if avec_action else None)
+
+
+def upgrade():
+    for nom, table, colonnes in INDEX:
+        op.create_index(nom, table, colonnes)
+    _recreer_cles(avec_action=True)
+
+    op.add_column('personne', sa.Column('date_suppression', sa.DateTime(), nullable=True))
+    op.add_column('capteur', sa.Column('date_suppression', sa.DateTime(), nullable=True))
+
+    op.create_table(
+        'suppressions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('cible', sa.String(length=20), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=True),
+        sa.Column('capteur_id', sa.Integer(), nullable=True),
+        sa.Column('etat', sa.String(length=20), nullable=False),
+        sa.Column('lignes_supprimees', sa.Integer(), nullable=False),
+        sa.Column('derniere_erreur', sa.String(length=255), nullable=True),
+        sa.Column('date_creation', sa.DateTime(), nullable=False),
+        sa.Column('date_fin', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_suppressions_etat', 'suppressions', ['etat'])
+
+
+def downgrade():
+    op.drop_index('ix_suppressions_etat', table_name='suppressions')
+    op.drop_table('suppressions')
+    op.drop_column('capteur', 'date_suppression')
+    op.drop_column('personne', 'date_suppression')
+
+    _recreer_cles(avec_action=False)
+    for nom, table, _ in reversed(INDEX):
+        op.drop_index(nom, table_name=table)
@@ -0,0 +1,39 @@
+"""cles_ingestion : clés d'idempotence des lectures des passerelles
+
+Revision ID: d7b3f9a1c4e6
+Revises: c5e9a1f3d2b8
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7b3f9a1c4e6'
+down_revision = 'c5e9a1f3d2b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'cles_ingestion',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('capteur_id', sa.Integer(), nullable=False),
+        sa.Column('sequence_appareil', sa.BigInteger(), nullable=True),
+        sa.Column('id_lecture', sa.String(length=36), nullable=True),
+        sa.Column('donnee_medicale_id', sa.Integer(), nullable=True),
+        sa.Column('date_heure_mesure', sa.DateTime(), nullable=False),
+        sa.Column('date_reception', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['capteur_id'], ['capteur.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('capteur_id', 'sequence_appareil', name='uq_cles_ingestion_sequence'),
+        sa.UniqueConstraint('id_lecture', name='uq_cles_ingestion_id_lecture'),
+    )
+    op.create_index('ix_cles_ingestion_date_heure_mesure', 'cles_ingestion', ['date_heure_mesure'])
+
+
+def downgrade():
+    op.drop_index('ix_cles_ingestion_date_heure_mesure', table_name='cles_ingestion')
+    op.drop_table('cles_ingestion')
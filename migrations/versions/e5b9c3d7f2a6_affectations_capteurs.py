@@ -0,0 +1,187 @@
+"""patient_capteur : affectations des capteurs aux patients
+
+Revision ID: e5b9c3d7f2a6
+Revises: d4a8f2c6e1b7
+Create Date: 2026-10-21 15:00:00.000000
+
+Jusqu'ici, associer un capteur insérait une fausse mesure
+(valeur_mesuree = 0, sans analyse) qui faussait les statistiques. Les
+affectations sont reprises de chaque couple (patient, capteur) présent
+dans donnees_medicales, actives depuis sa première mesure, puis ces
+fausses mesures sont supprimées, puis les états des couples touchés
+(etats_mesures : dernière valeur, minimum...) et les scores de risque
+de leurs patients (écarts aux seuils, médecin) sont recalculés sans
+elles, avec les calculs figés à cette révision ; celles déjà archivées
+sont inscrites dans les fichiers .supprimees de l'archive froide
+(ARCHIVE_COLONNES_DIR). Le downgrade les recrée pour les
+affectations actives sans mesure.
+"""
+import json
+import os
+from collections import defaultdict
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b9c3d7f2a6'
+down_revision = 'd4a8f2c6e1b7'
+branch_labels = None
+depends_on = None
+
+POIDS_URGENCE = {'critique': 5.0, 'moyenne': 2.0, 'faible': 1.0}
+SEUILS_CAPTEURS = {   # type : (min, max, urgence)
+    'temperature': (36.0, 37.5, 'critique'),
+    'pression': (90.0, 140.0, 'critique'),
+    'rythme': (60.0, 100.0, 'moyenne'),
+}
+
+
+def upgrade():
+    op.create_table(
+        'patient_capteur',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('capteur_id', sa.Integer(), nullable=False),
+        sa.Column('date_debut', sa.DateTime(), nullable=False),
+        sa.Column('date_fin', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['patient_id'], ['patient.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['capteur_id'], ['capteur.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('uq_patient_capteur_active', 'patient_capteur', ['patient_id', 'capteur_id'], unique=True,
+                    postgresql_where=sa.text('date_fin IS NULL'))
+    op.create_index('ix_patient_capteur_capteur_id', 'patient_capteur', ['capteur_id'])
+
+    op.execute("""
+        INSERT INTO patient_capteur (patient_id, capteur_id, date_debut)
+        SELECT patient_id, capteur_id, MIN(date_heure_mesure)
+        FROM donnees_medicales
+        GROUP BY patient_id, capteur_id
+    """)
+    fausses = """
+        FROM donnees_medicales d
+        WHERE d.valeur_mesuree = 0
+          AND NOT EXISTS (
+              SELECT 1 FROM analyseur a
+              WHERE a.donnee_medicale_id = d.id AND a.date_heure_mesure = d.date_heure_mesure
+          )
+    """
+    bind = op.get_bind()
+    supprimees = bind.execute(sa.text(
+        f"SELECT d.id, d.patient_id, d.capteur_id, d.date_heure_mesure {fausses}")).all()
+    op.execute(f"DELETE {fausses}")
+
+    # --- États, scores et archive froide sans les fausses mesures ---------
+    couples = [{"p": p, "c": c} for p, c in sorted({(m.patient_id, m.capteur_id) for m in supprimees})]
+    if couples:
+        _recalculer_etats(bind, couples)
+        _recalculer_scores(bind, [{"p": p} for p in sorted({c["p"] for c in couples})])
+    _oublier_archivees(supprimees)
+
+
+def _recalculer_etats(bind, couples):
+    """Agrégats et dernière mesure relus ; un couple sans mesure perd son état."""
+    mesures = "FROM donnees_medicales d WHERE d.patient_id = :p AND d.capteur_id = :c"
+    bind.execute(sa.text(f"""
+        DELETE FROM etats_mesures
+        WHERE patient_id = :p AND capteur_id = :c AND NOT EXISTS (SELECT 1 {mesures})
+    """), couples)
+    bind.execute(sa.text(f"""
+        UPDATE etats_mesures SET
+            nb_mesures = (SELECT COUNT(*) {mesures}),
+            somme_valeurs = (SELECT SUM(d.valeur_mesuree) {mesures}),
+            valeur_min = (SELECT MIN(d.valeur_mesuree) {mesures}),
+            valeur_max = (SELECT MAX(d.valeur_mesuree) {mesures}),
+            nb_anomalies = (SELECT COUNT(*) {mesures}
+                            AND EXISTS (SELECT 1 FROM alerte a WHERE a.donnee_medicale_id = d.id)),
+            derniere_donnee_id = (SELECT d.id {mesures}
+                                  ORDER BY d.date_heure_mesure DESC, d.id DESC LIMIT 1),
+            date_derniere_mesure = (SELECT MAX(d.date_heure_mesure) {mesures}),
+            date_maj = CURRENT_TIMESTAMP
+        WHERE patient_id = :p AND capteur_id = :c
+    """), couples)
+    bind.execute(sa.text("""
+        UPDATE etats_mesures SET derniere_valeur = (
+            SELECT d.valeur_mesuree FROM donnees_medicales d
+            WHERE d.id = etats_mesures.derniere_donnee_id
+              AND d.date_heure_mesure = etats_mesures.date_derniere_mesure)
+        WHERE patient_id = :p AND capteur_id = :c
+    """), couples)
+
+
+def _recalculer_scores(bind, patients):
+    """Écarts aux seuils et médecin de l'activité la plus récente ; score_alertes inchangé."""
+    ecart = " ".join(
+        f"WHEN '{t}' THEN {POIDS_URGENCE[u]} * (CASE WHEN e.derniere_valeur < {mn} THEN {mn} - e.derniere_valeur "
+        f"WHEN e.derniere_valeur > {mx} THEN e.derniere_valeur - {mx} ELSE 0 END) / {mx - mn}"
+        for t, (mn, mx, u) in SEUILS_CAPTEURS.items()
+    )
+    bind.execute(sa.text("""
+        DELETE FROM scores_risque
+        WHERE patient_id = :p
+          AND NOT EXISTS (SELECT 1 FROM etats_mesures e WHERE e.patient_id = :p)
+          AND NOT EXISTS (SELECT 1 FROM alerte a WHERE a.patient_id = :p)
+    """), patients)
+    bind.execute(sa.text(f"""
+        UPDATE scores_risque SET score_ecarts = COALESCE((
+            SELECT SUM(CASE c.type {ecart} ELSE 0 END)
+            FROM etats_mesures e JOIN capteur c ON c.id = e.capteur_id
+            WHERE e.patient_id = :p), 0)
+        WHERE patient_id = :p
+    """), patients)
+    bind.execute(sa.text("""
+        UPDATE scores_risque SET
+            score = score_alertes + score_ecarts,
+            medecin_id = (
+                SELECT x.medecin_id FROM (
+                    SELECT e.medecin_id, e.date_derniere_mesure AS date_activite, 0 AS rang, 0 AS ordre
+                    FROM etats_mesures e
+                    WHERE e.patient_id = :p AND e.medecin_id IS NOT NULL
+                    UNION ALL
+                    SELECT a.medecin_id, COALESCE(a.date_heure_alerte, :maintenant), 1, a.id
+                    FROM alerte a
+                    WHERE a.patient_id = :p AND a.medecin_id IS NOT NULL
+                ) x
+                ORDER BY x.date_activite IS NULL, x.date_activite DESC, x.rang DESC, x.ordre DESC LIMIT 1)
+        WHERE patient_id = :p
+    """), [{**p, "maintenant": datetime.utcnow()} for p in patients])
+
+
+def _oublier_archivees(supprimees):
+    """Mesures déjà archivées (d'après le manifeste) écartées des lectures."""
+    dossier = os.getenv("ARCHIVE_COLONNES_DIR", "")
+    manifeste = os.path.join(dossier, "manifeste.json")
+    if not dossier or not os.path.exists(manifeste):
+        return
+    with open(manifeste, encoding="utf-8") as fichier:
+        brut = json.load(fichier)
+    horizon, id_max = datetime.fromisoformat(brut["horizon"]), brut["id_max"]
+
+    par_fichier = defaultdict(list)
+    for m in supprimees:
+        if m.date_heure_mesure < horizon and m.id <= id_max:
+            par_fichier[(m.patient_id, m.capteur_id)].append(m.id)
+    for (patient_id, capteur_id), ids in par_fichier.items():
+        chemin = os.path.join(dossier, f"p{patient_id}", f"c{capteur_id}")
+        if os.path.exists(chemin + ".s3dc"):
+            with open(chemin + ".supprimees", "a", encoding="utf-8") as fichier:
+                fichier.write("".join(f"{id_}\n" for id_ in ids))
+
+
+def downgrade():
+    op.execute("""
+        INSERT INTO donnees_medicales (patient_id, capteur_id, valeur_mesuree, date_heure_mesure)
+        SELECT pc.patient_id, pc.capteur_id, 0, pc.date_debut
+        FROM patient_capteur pc
+        WHERE pc.date_fin IS NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM donnees_medicales d
+              WHERE d.patient_id = pc.patient_id AND d.capteur_id = pc.capteur_id
+          )
+    """)
+    op.drop_index('ix_patient_capteur_capteur_id', table_name='patient_capteur')
+    op.drop_index('uq_patient_capteur_active', table_name='patient_capteur')
+    op.drop_table('patient_capteur')
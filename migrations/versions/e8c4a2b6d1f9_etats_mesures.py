@@ -0,0 +1,71 @@
+"""etats_mesures : dernière mesure et agrégats par (patient, capteur)
+
+Revision ID: e8c4a2b6d1f9
+Revises: d7b3f9a1c4e6
+Create Date: 2026-10-19 20:00:00.000000
+
+Les états sont initialisés à partir des mesures existantes ; les
+anomalies sont comptées d'après les alertes liées à une mesure.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c4a2b6d1f9'
+down_revision = 'd7b3f9a1c4e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'etats_mesures',
+        sa.Column('patient_id', sa.Integer(), nullable=False),
+        sa.Column('capteur_id', sa.Integer(), nullable=False),
+        sa.Column('derniere_donnee_id', sa.Integer(), nullable=True),
+        sa.Column('derniere_valeur', sa.Float(), nullable=True),
+        sa.Column('date_derniere_mesure', sa.DateTime(), nullable=True),
+        sa.Column('nb_mesures', sa.Integer(), nullable=False),
+        sa.Column('somme_valeurs', sa.Float(), nullable=False),
+        sa.Column('valeur_min', sa.Float(), nullable=True),
+        sa.Column('valeur_max', sa.Float(), nullable=True),
+        sa.Column('nb_anomalies', sa.Integer(), nullable=False),
+        sa.Column('nb_tardives', sa.Integer(), nullable=False),
+        sa.Column('date_maj', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['capteur_id'], ['capteur.id']),
+        sa.ForeignKeyConstraint(['patient_id'], ['patient.id']),
+        sa.PrimaryKeyConstraint('patient_id', 'capteur_id'),
+    )
+
+    # --- Initialisation depuis les mesures existantes --------------------
+    op.execute("""
+        INSERT INTO etats_mesures (patient_id, capteur_id, nb_mesures, somme_valeurs,
+                                   valeur_min, valeur_max, nb_anomalies, nb_tardives, date_maj)
+        SELECT d.patient_id, d.capteur_id, COUNT(*), SUM(d.valeur_mesuree),
+               MIN(d.valeur_mesuree), MAX(d.valeur_mesuree),
+               SUM(CASE WHEN EXISTS (SELECT 1 FROM alerte a WHERE a.donnee_medicale_id = d.id)
+                        THEN 1 ELSE 0 END), 0, CURRENT_TIMESTAMP
+        FROM donnees_medicales d
+        GROUP BY d.patient_id, d.capteur_id
+    """)
+    op.execute("""
+        UPDATE etats_mesures SET
+            derniere_donnee_id = (
+                SELECT d.id FROM donnees_medicales d
+                WHERE d.patient_id = etats_mesures.patient_id AND d.capteur_id = etats_mesures.capteur_id
+                ORDER BY d.date_heure_mesure DESC, d.id DESC LIMIT 1),
+            date_derniere_mesure = (
+                SELECT MAX(d.date_heure_mesure) FROM donnees_medicales d
+                WHERE d.patient_id = etats_mesures.patient_id AND d.capteur_id = etats_mesures.capteur_id)
+    """)
+    op.execute("""
+        UPDATE etats_mesures SET derniere_valeur = (
+            SELECT d.valeur_mesuree FROM donnees_medicales d
+            WHERE d.id = etats_mesures.derniere_donnee_id
+              AND d.date_heure_mesure = etats_mesures.date_derniere_mesure)
+    """)
+
+
+def downgrade():
+    op.drop_table('etats_mesures')
@@ -0,0 +1,44 @@
+"""notifications : file d'envoi des alertes (outbox)
+
+Revision ID: f1a7c3e9b5d2
+Revises: e8c4a2b6d1f9
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a7c3e9b5d2'
+down_revision = 'e8c4a2b6d1f9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'notifications',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('alerte_id', sa.Integer(), nullable=False),
+        sa.Column('destinataire_id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('critique', sa.Boolean(), nullable=False),
+        sa.Column('etat', sa.String(length=20), nullable=False),
+        sa.Column('tentatives', sa.Integer(), nullable=False),
+        sa.Column('prochain_essai', sa.DateTime(), nullable=False),
+        sa.Column('derniere_erreur', sa.String(length=255), nullable=True),
+        sa.Column('date_creation', sa.DateTime(), nullable=False),
+        sa.Column('date_envoi', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['alerte_id'], ['alerte.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['destinataire_id'], ['personne.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_notifications_alerte_id', 'notifications', ['alerte_id'])
+    op.create_index('ix_notifications_etat_prochain_essai', 'notifications', ['etat', 'prochain_essai'])
+
+
+def downgrade():
+    op.drop_index('ix_notifications_etat_prochain_essai', table_name='notifications')
+    op.drop_index('ix_notifications_alerte_id', table_name='notifications')
+    op.drop_table('notifications')
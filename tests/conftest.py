@@ -5,9 +5,16 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+import itertools
+from datetime import date
+from types import SimpleNamespace
+
 import pytest
 from app import create_app
 from app.extension import db
+from app.models import Patient, Medecin, Proche, Capteur
+from app.models.enums import TypeCapteur
+from app.services.auth_service import generate_token
 
 
 @pytest.fixture
@@ -34,3 +41,68 @@ def client(app):
 def runner(app):
     """CLI runner"""
     return app.test_cli_runner()
+
+
+# -------------------------------------------------------------
+# Fixture fabrique_app : application de test sur une base sqlite
+# -------------------------------------------------------------
+# - fabrique_app(patients=("paul", "lea"), capteurs=("temperature",),
+#   RISQUE_DEMI_VIE_H=24) : une base temporaire par appel
+# - patients, medecins, proches : clés de ids (prénom et email en
+#   sont tirés : « paul » → Paul Durand, paul@example.com) ; les
+#   proches sont rattachés au premier patient
+# - capteurs : noms de TypeCapteur, ou {clé: nom}
+# - options en MAJUSCULES : configuration de l'application
+# - retourne un EnvironnementTest (app, ids, entetes du premier médecin)
+class EnvironnementTest:
+    def __init__(self, app, ids, medecin_id=None):
+        self.app = app
+        self.ids = ids
+        self.entetes = self.entetes_de(medecin_id) if medecin_id is not None else {}
+
+    def entetes_de(self, id, role="medecin"):
+        """En-têtes JWT d'un utilisateur quelconque"""
+        with self.app.app_context():
+            jeton = generate_token(SimpleNamespace(id=id, role=role, specialite="Cardio"))
+        return {"Authorization": f"Bearer {jeton}"}
+
+
+@pytest.fixture
+def fabrique_app(tmp_path):
+    compteur = itertools.count(1)
+
+    def fabriquer(patients=("patient_id",), medecins=("medecin_id",), proches=(),
+                  capteurs=None, **config):
+        if capteurs is None:
+            capteurs = {"capteur_id": "temperature"}
+        elif not isinstance(capteurs, dict):
+            capteurs = {nom: nom for nom in capteurs}
+        app = create_app({
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / f'test{next(compteur)}.db'}",
+            "TESTING": True,
+            **config,
+        })
+        telephones = itertools.count(1)
+
+        def personne(classe, cle, **champs):
+            nom = cle.removesuffix("_id")
+            return classe(nom="Durand", prenom=nom.capitalize(), email=f"{nom}@example.com",
+                          phone=str(next(telephones)), mot_de_passe="x", date_naissance=date(1990, 1, 1),
+                          adresse="A", **champs)
+
+        with app.app_context():
+            db.create_all()
+            lignes = {cle: personne(Patient, cle, role="patient") for cle in patients}
+            lignes.update({cle: personne(Medecin, cle, role="medecin", specialite="Cardio") for cle in medecins})
+            db.session.add_all(lignes.values())
+            db.session.flush()
+            premier = lignes[patients[0]].id if patients else None
+            lignes.update({cle: personne(Proche, cle, role="proche", lien_parente="fille", patient_id=premier)
+                           for cle in proches})
+            lignes.update({cle: Capteur(type=TypeCapteur[type_]) for cle, type_ in capteurs.items()})
+            db.session.add_all(lignes.values())
+            db.session.commit()
+            ids = {cle: ligne.id for cle, ligne in lignes.items()}
+        return EnvironnementTest(app, ids, ids[medecins[0]] if medecins else None)
+
+    return fabriquer
@@ -0,0 +1,49 @@
+# Tests des affectations capteur-patient (table patient_capteur)
+
+import json
+import pytest
+
+from app.models import DonneesMedicale, PatientCapteur
+from app.services.donnee_medical_service import get_stats_by_patient, get_capteurs_by_patient
+
+
+@pytest.fixture
+def env(fabrique_app):
+    return fabrique_app(capteurs=("temperature", "rythme", "pression"))
+
+
+def test_affectations(env):
+    """Test de l'association sans fausse mesure, des listes, de l'ouverture à l'ingestion et de la dissociation"""
+    ids, entetes = env.ids, env.entetes
+    temperature, rythme, pression = ids["temperature"], ids["rythme"], ids["pression"]
+    client = env.app.test_client()
+    base = f"/v1/patients/{ids['patient_id']}/capteurs"
+
+    assert client.post(f"{base}/{temperature}", headers=entetes).status_code == 201
+    assert client.post(f"{base}/{temperature}", headers=entetes).status_code == 400
+    assert client.post(f"{base}/999", headers=entetes).status_code == 404
+    with env.app.app_context():
+        assert DonneesMedicale.query.count() == 0
+
+    # Première mesure d'un couple inconnu : affectation ouverte ; statistiques sans valeur 0 parasite
+    corps = "\n".join(json.dumps({"patient_id": ids["patient_id"], "medecin_id": ids["medecin_id"],
+                                  "capteur_id": c, "valeur_mesuree": v})
+                      for c, v in ((temperature, 36.9), (rythme, 72), (rythme, 80)))
+    client.post("/v1/donnees/flux", data=corps, content_type="application/x-ndjson", headers=entetes)
+    assert [c["id"] for c in client.get(base, headers=entetes).get_json()] == [temperature, rythme]
+    assert [c["id"] for c in client.get(f"{base}/disponibles", headers=entetes).get_json()] == [pression]
+    with env.app.app_context():
+        assert PatientCapteur.query.count() == 2
+        assert {s["capteur"]: s["min"] for s in get_stats_by_patient(ids["patient_id"])} == {
+            "Temperature Corporelle": 36.9, "Rythme Cardiaque": 72}
+
+    # Dissociation : période close, mesures conservées ; nouvelle association possible
+    assert client.delete(f"{base}/{rythme}", headers=entetes).status_code == 200
+    assert client.delete(f"{base}/{rythme}", headers=entetes).status_code == 404
+    assert [c["id"] for c in client.get(base, headers=entetes).get_json()] == [temperature]
+    with env.app.app_context():
+        assert DonneesMedicale.query.filter_by(capteur_id=rythme).count() == 2
+        # Capteur dissocié : absent de la liste malgré ses mesures
+        assert [c.id for c in get_capteurs_by_patient(ids["patient_id"])] == [temperature]
+        assert PatientCapteur.query.filter(PatientCapteur.date_fin.isnot(None)).count() == 1
+    assert client.post(f"{base}/{rythme}", headers=entetes).status_code == 201
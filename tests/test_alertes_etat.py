@@ -0,0 +1,102 @@
+# Tests de l'acquittement des alertes en masse (PUT /v1/alertes/etat)
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.extension import db
+from app.models import TypeAlerte, Alerte, ScoreRisque
+
+
+@pytest.fixture
+def env(fabrique_app):
+    return fabrique_app(patients=("paul",), medecins=("medecin_id", "confrere"), capteurs=("temperature", "rythme"))
+
+
+def _ingerer(env, medecin, *lectures):
+    ids = env.ids
+    corps = "\n".join(
+        json.dumps({"patient_id": ids["paul"], "medecin_id": ids[medecin],
+                    "capteur_id": ids[capteur], "valeur_mesuree": valeur})
+        for capteur, valeur in lectures
+    )
+    env.app.test_client().post("/v1/donnees/flux", data=corps, content_type="application/x-ndjson",
+                              headers=env.entetes_de(ids[medecin]))
+
+
+def test_acquittement_en_masse(env):
+    """Test des ids, du filtre, de la restriction au médecin connecté et de l'acquittement"""
+    ids = env.ids
+    _ingerer(env, "medecin_id", ("rythme", 130), ("rythme", 40), ("temperature", 39.0))
+    _ingerer(env, "confrere", ("rythme", 135))
+    client = env.app.test_client()
+    entetes = env.entetes
+    with env.app.app_context():
+        rythmes = [a.id for a in Alerte.query.filter_by(medecin_id=ids["medecin_id"],
+                                                        type_alerte=TypeAlerte.avertissement)]
+        du_confrere = Alerte.query.filter_by(medecin_id=ids["confrere"]).one().id
+
+    # Filtre : avertissements du patient ; l'alerte du confrère n'est pas touchée
+    reponse = client.put("/v1/alertes/etat", headers=entetes, json={
+        "etat_traitement": True,
+        "filtre": {"patient_id": ids["paul"], "type_alerte": "avertissement",
+                   "avant": (datetime.utcnow() + timedelta(minutes=1)).isoformat()},
+    })
+    assert reponse.status_code == 200
+    assert sorted(reponse.get_json()["ids"]) == sorted(rythmes)
+    with env.app.app_context():
+        alerte = db.session.get(Alerte, rythmes[0])
+        assert alerte.etat_traitement and alerte.acquittee_par == ids["medecin_id"]
+        assert alerte.date_acquittement is not None
+        assert db.session.get(ScoreRisque, ids["paul"]).nb_alertes_non_traitees == 2
+        assert not db.session.get(Alerte, du_confrere).etat_traitement
+
+    # IDs : déjà traitée ou d'un autre médecin → ignorée ; rouverture efface l'acquittement
+    reponse = client.put("/v1/alertes/etat", headers=entetes,
+                         json={"etat_traitement": False, "ids": [rythmes[0], du_confrere]})
+    assert reponse.get_json() == {"modifiees": 1, "ids": [rythmes[0]]}
+    with env.app.app_context():
+        alerte = db.session.get(Alerte, rythmes[0])
+        assert (alerte.etat_traitement, alerte.acquittee_par, alerte.date_acquittement) == (False, None, None)
+        assert db.session.get(ScoreRisque, ids["paul"]).nb_alertes_non_traitees == 3
+
+    # État NULL (non traitée) : acquittée, jamais « rouverte »
+    with env.app.app_context():
+        db.session.execute(update(Alerte).where(Alerte.id == rythmes[1]).values(etat_traitement=None))
+        db.session.commit()
+    assert client.put("/v1/alertes/etat", headers=entetes,
+                      json={"etat_traitement": False, "ids": [rythmes[1]]}).get_json()["modifiees"] == 0
+    assert client.put("/v1/alertes/etat", headers=entetes,
+                      json={"etat_traitement": True, "ids": [rythmes[1]]}).get_json()["ids"] == [rythmes[1]]
+
+    assert client.put("/v1/alertes/etat", headers=entetes,
+                      json={"etat_traitement": True, "filtre": {}}).status_code == 400
+    assert client.put("/v1/alertes/etat", headers=entetes,
+                      json={"etat_traitement": True, "filtre": {"niveau_urgence": "extreme"}}).status_code == 400
+    assert client.put("/v1/alertes/etat", headers=entetes,
+                      json={"etat_traitement": True, "filtre": {"patient_id": "1"}}).status_code == 400
+    assert client.put("/v1/alertes/etat", headers=env.entetes_de(ids["paul"], "patient"),
+                      json={"etat_traitement": True, "ids": rythmes}).status_code == 403
+
+
+def test_acquittement_unitaire_reserve_au_medecin(env):
+    """PUT /alertes/<id>/etat : refusé aux patients et aux autres médecins"""
+    ids = env.ids
+    _ingerer(env, "medecin_id", ("rythme", 130))
+    client = env.app.test_client()
+    with env.app.app_context():
+        alerte_id = Alerte.query.filter_by(medecin_id=ids["medecin_id"]).one().id
+
+    for entetes in (env.entetes_de(ids["paul"], "patient"), env.entetes_de(ids["confrere"])):
+        assert client.put(f"/v1/alertes/{alerte_id}/etat", headers=entetes,
+                          json={"etat_traitement": True}).status_code == 403
+    with env.app.app_context():
+        alerte = db.session.get(Alerte, alerte_id)
+        assert (alerte.etat_traitement, alerte.acquittee_par) == (False, None)
+
+    assert client.put(f"/v1/alertes/{alerte_id}/etat", headers=env.entetes,
+                      json={"etat_traitement": True}).status_code == 200
+    with env.app.app_context():
+        assert db.session.get(Alerte, alerte_id).acquittee_par == ids["medecin_id"]
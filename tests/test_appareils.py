@@ -0,0 +1,212 @@
+# Tests du registre des appareils et passerelles (POST /v1/donnees, flux, ingestion ASGI)
+
+import asyncio
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+
+import pytest
+from sqlalchemy import event
+
+from app.extension import db
+from app.ingestion_asgi import ApplicationIngestion
+from app.models import DonneesMedicale, Alerte, PatientCapteur
+from app.services.affectation_service import associer
+from app.services.appareil_service import enregistrer_appareil, enregistrer_passerelle, revoquer_appareil, \
+    vider_caches
+
+
+@pytest.fixture
+def env(fabrique_app):
+    env = fabrique_app(capteurs=("temperature", "rythme"), APPAREILS_CACHE_TTL_S=60)
+    with env.app.app_context():
+        vider_caches()
+        db.session.add(PatientCapteur(patient_id=env.ids["patient_id"], capteur_id=env.ids["temperature"],
+                                      date_debut=datetime(2026, 1, 1)))
+        db.session.commit()
+    return env
+
+
+def _requetes_registre(app, appel):
+    """Exécute appel() et compte les requêtes SQL sur appareils / passerelles"""
+    requetes = []
+
+    def compter(conn, curseur, instruction, *args):
+        if "appareils" in instruction or "passerelles" in instruction:
+            requetes.append(instruction)
+
+    with app.app_context():
+        moteur = db.engine
+    event.listen(moteur, "before_cursor_execute", compter)
+    try:
+        resultat = appel()
+    finally:
+        event.remove(moteur, "before_cursor_execute", compter)
+    return resultat, len(requetes)
+
+
+def test_cle_appareil(env):
+    """Test d'une lecture réduite aux valeurs, authentifiée par la clé de l'appareil"""
+    ids = env.ids
+    client = env.app.test_client()
+    with env.app.app_context():
+        appareil, cle = enregistrer_appareil(ids["temperature"], medecin_id=ids["medecin_id"])
+        appareil_id = appareil.id
+        _, cle_rythme = enregistrer_appareil(ids["rythme"], medecin_id=ids["medecin_id"])
+
+    reponse = client.post("/v1/donnees", json={"valeur_mesuree": 39.5}, headers={"X-Cle-Appareil": cle})
+    assert reponse.status_code == 201
+    assert reponse.get_json()["donnee"]["patient_id"] == ids["patient_id"]
+    with env.app.app_context():
+        assert (DonneesMedicale.query.count(), Alerte.query.count()) == (1, 1)
+
+    # Cache chaud : ni vérification ni résolution en base
+    reponse, requetes = _requetes_registre(env.app, lambda: client.post(
+        "/v1/donnees", json=[{"valeur_mesuree": 36.8}, {"valeur_mesuree": 36.9}], headers={"X-Cle-Appareil": cle}))
+    assert (len(reponse.get_json()["donnees"]), requetes) == (2, 0)
+
+    assert client.post("/v1/donnees", json={"valeur_mesuree": 37},
+                       headers={"X-Cle-Appareil": f"{appareil_id}.mauvaise"}).status_code == 401
+    assert client.post("/v1/donnees", json={"appareil_id": appareil_id + 1, "valeur_mesuree": 37},
+                       headers={"X-Cle-Appareil": cle}).status_code == 403
+
+    # Capteur sans affectation : refusé, puis accepté dès l'association
+    assert client.post("/v1/donnees", json={"valeur_mesuree": 72},
+                       headers={"X-Cle-Appareil": cle_rythme}).status_code == 400
+    with env.app.app_context():
+        associer(ids["patient_id"], ids["rythme"])
+    assert client.post("/v1/donnees", json={"valeur_mesuree": 72},
+                       headers={"X-Cle-Appareil": cle_rythme}).status_code == 201
+
+    with env.app.app_context():
+        revoquer_appareil(appareil_id)
+    assert client.post("/v1/donnees", json={"valeur_mesuree": 37},
+                       headers={"X-Cle-Appareil": cle}).status_code == 401
+
+
+def test_lot_signe_passerelle(env):
+    """Test d'un lot signé HMAC par une passerelle, pour ses seuls appareils"""
+    ids = env.ids
+    client = env.app.test_client()
+    with env.app.app_context():
+        passerelle, secret = enregistrer_passerelle("Service cardio")
+        passerelle_id = passerelle.id
+        appareil, _ = enregistrer_appareil(ids["temperature"], medecin_id=ids["medecin_id"],
+                                           passerelle_id=passerelle_id)
+        autre, _ = enregistrer_appareil(ids["rythme"], medecin_id=ids["medecin_id"])
+        appareil_id, autre_id = appareil.id, autre.id
+
+    def envoyer(lectures, horodatage=None, cle=secret):
+        corps = json.dumps(lectures).encode()
+        horodatage = str(horodatage or int(time.time()))
+        signature = hmac.new(cle.encode(), horodatage.encode() + b"." + corps, hashlib.sha256).hexdigest()
+        return client.post("/v1/donnees", data=corps, content_type="application/json", headers={
+            "X-Passerelle": str(passerelle_id), "X-Horodatage": horodatage, "X-Signature": signature})
+
+    lot = [{"appareil_id": appareil_id, "valeur_mesuree": 36.6, "sequence_appareil": s} for s in (1, 2)]
+    reponse = envoyer(lot)
+    assert (reponse.status_code, len(reponse.get_json()["donnees"])) == (201, 2)
+
+    assert envoyer(lot, cle="autre-secret").status_code == 401
+    assert envoyer(lot, horodatage=int(time.time()) - 3600).status_code == 401
+    # Appareil non rattaché à la passerelle : lecture écartée
+    reponse = envoyer([{"appareil_id": autre_id, "valeur_mesuree": 80}])
+    assert reponse.get_json()["donnees"] == []
+    assert envoyer({"appareil_id": autre_id, "valeur_mesuree": 80}).status_code == 403
+    with env.app.app_context():
+        assert DonneesMedicale.query.count() == 2
+
+
+def _signer(secret, passerelle_id, corps):
+    horodatage = str(int(time.time()))
+    signature = hmac.new(secret.encode(), horodatage.encode() + b"." + corps, hashlib.sha256).hexdigest()
+    return {"X-Passerelle": str(passerelle_id), "X-Horodatage": horodatage, "X-Signature": signature}
+
+
+def test_flux_appareil_et_passerelle(env):
+    """Test du flux NDJSON : patient, capteur et médecin résolus par le registre, jamais lus dans le corps"""
+    ids = env.ids
+    client = env.app.test_client()
+    with env.app.app_context():
+        passerelle, secret = enregistrer_passerelle("Service cardio")
+        passerelle_id = passerelle.id
+        appareil, cle = enregistrer_appareil(ids["temperature"], medecin_id=ids["medecin_id"],
+                                             passerelle_id=passerelle_id)
+        autre, _ = enregistrer_appareil(ids["rythme"], medecin_id=ids["medecin_id"])
+        appareil_id, autre_id = appareil.id, autre.id
+
+    def flux(lectures, entetes):
+        corps = "\n".join(json.dumps(l) for l in lectures).encode()
+        if entetes is None:
+            entetes = _signer(secret, passerelle_id, corps)
+        reponse = client.post("/v1/donnees/flux", data=corps, content_type="application/x-ndjson", headers=entetes)
+        return reponse.status_code, [json.loads(l) for l in reponse.get_data(as_text=True).splitlines()]
+
+    # Clé d'appareil : patient_id / capteur_id du corps ignorés
+    statut, bilans = flux([{"valeur_mesuree": 36.8, "patient_id": 999, "capteur_id": ids["rythme"]},
+                           {"appareil_id": autre_id, "valeur_mesuree": 36.9}], {"X-Cle-Appareil": cle})
+    assert statut == 200 and bilans[-1]["total"]["enregistrees"] == 1
+    assert bilans[0]["erreurs"] == [{"ligne": 2, "erreur": "Lecture d'un autre appareil"}]
+    assert flux([{"valeur_mesuree": 36.8}], {"X-Cle-Appareil": f"{appareil_id}.mauvaise"})[0] == 401
+
+    # Lot signé : lectures de ses seuls appareils
+    statut, bilans = flux([{"appareil_id": appareil_id, "valeur_mesuree": 37.0},
+                           {"appareil_id": autre_id, "valeur_mesuree": 80}], None)
+    assert statut == 200 and bilans[-1]["total"]["enregistrees"] == 1
+    assert bilans[0]["erreurs"][0]["ligne"] == 2
+    falsifie = _signer(secret, passerelle_id, b"autre corps")
+    assert flux([{"appareil_id": appareil_id, "valeur_mesuree": 37.1}], falsifie)[0] == 401
+
+    with env.app.app_context():
+        lignes = DonneesMedicale.query.all()
+        assert [(d.patient_id, d.capteur_id) for d in lignes] == [(ids["patient_id"], ids["temperature"])] * 2
+
+
+def test_asgi_appareil_et_passerelle(env):
+    """Test de l'ingestion ASGI authentifiée par clé d'appareil ou lot signé"""
+    ids = env.ids
+    with env.app.app_context():
+        passerelle, secret = enregistrer_passerelle("Service cardio")
+        appareil, cle = enregistrer_appareil(ids["temperature"], medecin_id=ids["medecin_id"],
+                                             passerelle_id=passerelle.id)
+        passerelle_id, appareil_id = passerelle.id, appareil.id
+    application = ApplicationIngestion(env.app)
+
+    async def requete(corps, entetes):
+        messages = [{"type": "http.request", "body": corps[:10], "more_body": True},
+                    {"type": "http.request", "body": corps[10:], "more_body": False}]
+        envoyes = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            envoyes.append(message)
+
+        scope = {"type": "http", "method": "POST", "path": "/v1/ingestion/donnees",
+                 "headers": [(n.lower().encode(), v.encode()) for n, v in entetes.items()]}
+        await application(scope, receive, send)
+        return envoyes[0]["status"], json.loads(envoyes[1]["body"])
+
+    lecture = json.dumps({"appareil_id": appareil_id, "valeur_mesuree": 36.7, "patient_id": 999}).encode()
+
+    async def scenario():
+        resultats = [
+            await requete(lecture, {"X-Cle-Appareil": cle}),
+            await requete(lecture, {"X-Cle-Appareil": f"{appareil_id}.mauvaise"}),
+            await requete(lecture, _signer(secret, passerelle_id, lecture)),
+            await requete(lecture, _signer(secret, passerelle_id, b"autre corps")),
+        ]
+        await application.lotisseur.arreter()
+        return resultats
+
+    (statut_cle, bilan_cle), (statut_mauvaise, _), (statut_signe, bilan_signe), (statut_falsifie, _) = \
+        asyncio.run(scenario())
+    assert (statut_cle, bilan_cle["enregistrees"]) == (200, 1)
+    assert (statut_signe, bilan_signe["enregistrees"]) == (200, 1)
+    assert (statut_mauvaise, statut_falsifie) == (401, 401)
+    with env.app.app_context():
+        assert {d.patient_id for d in DonneesMedicale.query} == {ids["patient_id"]}
+        assert DonneesMedicale.query.count() == 2
@@ -0,0 +1,151 @@
+# Tests de l'archive colonnaire des mesures (format, fusion chaud / froid)
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import create_app
+from app.extension import db
+from app.models import Medecin, Patient, Capteur, DonneesMedicale, Analyseur, Alerte
+from app.models.enums import TypeCapteur, UrgenceEnum, TypeAlerte
+from app.services.archive_service import construire_archive, lire_manifeste
+from app.services.export_service import ouvrir_export, generer_ndjson
+from app.services.donnee_medical_service import get_donnees_by_patient, get_stats_by_patient, delete_donnee
+from app.services.suppression_service import dissocier_capteur
+from app.utils import archive_colonnes
+from app.utils.archive_colonnes import ajouter_lignes, LecteurArchive
+
+DEBUT = datetime(2026, 1, 1)
+
+
+def test_format_aller_retour(tmp_path, monkeypatch):
+    """Test de l'écriture par blocs puis des lectures par période"""
+    monkeypatch.setattr(archive_colonnes, "TAILLE_BLOC", 10)
+    chemin = str(tmp_path / "c1.s3dc")
+    lignes = [(i + 1, DEBUT + timedelta(minutes=i), 36.0 + (i % 10) / 10) for i in range(25)]
+    ajouter_lignes(chemin, lignes[:15])
+    ajouter_lignes(chemin, lignes[15:])
+
+    with LecteurArchive(chemin) as lecteur:
+        assert len(lecteur) == 25 and len(lecteur.index) == 3
+        assert list(lecteur.lignes()) == lignes
+        extrait = list(lecteur.lignes(DEBUT + timedelta(minutes=8), DEBUT + timedelta(minutes=12)))
+        assert [l[0] for l in extrait] == [9, 10, 11, 12]
+
+        stats = lecteur.statistiques(DEBUT + timedelta(minutes=5))
+        valeurs = [l[2] for l in lignes[5:]]
+        assert stats["nombre"] == 20
+        assert stats["min"] == min(valeurs) and stats["max"] == max(valeurs)
+        assert stats["somme"] == pytest.approx(sum(valeurs))
+
+
+def test_format_lignes_tardives(tmp_path):
+    """Test que des lignes plus anciennes ajoutées après coup restent triées à la lecture"""
+    chemin = str(tmp_path / "c1.s3dc")
+    ajouter_lignes(chemin, [(2, DEBUT + timedelta(hours=2), 37.5)])
+    ajouter_lignes(chemin, [(3, DEBUT + timedelta(hours=1), 38.0)])
+    with LecteurArchive(chemin) as lecteur:
+        assert [l[0] for l in lecteur.lignes()] == [3, 2]
+        assert lecteur.statistiques()["max"] == 38.0
+
+
+@pytest.fixture
+def app_archive(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'archive.db'}",
+        "ARCHIVE_COLONNES_DIR": str(tmp_path / "archive"),
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Patient(id=2, nom="P", prenom="A", email="p@x.sn", phone="2", mot_de_passe="x",
+                    role="patient"),
+            Capteur(id=1, type=TypeCapteur.temperature),
+        ])
+        for i in range(10):
+            db.session.add(DonneesMedicale(id=i + 1, patient_id=2, capteur_id=1,
+                                           valeur_mesuree=36.0 + i / 2,
+                                           date_heure_mesure=DEBUT + timedelta(days=i)))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_fusion_chaud_froid(app_archive):
+    """Test que l'historique et les statistiques sont identiques avant et après archivage"""
+    avant = [(d.id, d.valeur_mesuree) for d in get_donnees_by_patient(2)]
+    stats_avant = get_stats_by_patient(2)
+    periode = {"depuis": DEBUT + timedelta(days=3), "jusqu_a": DEBUT + timedelta(days=8)}
+    periode_avant = [d.id for d in get_donnees_by_patient(2, **periode)]
+
+    rapport = construire_archive(DEBUT + timedelta(days=6))
+    assert rapport["lignes"] == 6 and rapport["fichiers"] == 1
+    assert lire_manifeste()["id_max"] == 6
+
+    donnees = get_donnees_by_patient(2)
+    assert [(d.id, d.valeur_mesuree) for d in donnees] == avant
+    assert donnees[-1].capteur.type == TypeCapteur.temperature
+    assert get_stats_by_patient(2) == stats_avant
+    assert [d.id for d in get_donnees_by_patient(2, **periode)] == periode_avant
+
+
+def test_export_avec_archive(app_archive):
+    """Test que l'export contient les mesures archivées, avec leurs analyses et alertes"""
+    db.session.add_all([
+        Medecin(id=1, nom="M", prenom="D", email="m@x.sn", phone="1", mot_de_passe="x", role="medecin"),
+        Analyseur(patient_id=2, medecin_id=1, donnee_medicale_id=3,
+                  date_heure_mesure=DEBUT + timedelta(days=2), resultat="Anomalie"),
+        Alerte(patient_id=2, medecin_id=1, donnee_medicale_id=3,
+               niveau_urgence=UrgenceEnum.critique, type_alerte=TypeAlerte.urgence),
+        Alerte(patient_id=2, medecin_id=1, donnee_medicale_id=3,
+               niveau_urgence=UrgenceEnum.moyenne, type_alerte=TypeAlerte.avertissement),
+    ])
+    db.session.commit()
+
+    def exporter(**periode):
+        morceaux = generer_ndjson(ouvrir_export(2, analyses=True, alertes=True, taille_lot=4, **periode))
+        return [json.loads(l) for l in b"".join(morceaux).decode().splitlines()]
+
+    periode = {"depuis": DEBUT + timedelta(days=3), "jusqu_a": DEBUT + timedelta(days=8)}
+    avant, periode_avant = exporter(), exporter(**periode)
+    construire_archive(DEBUT + timedelta(days=6))
+    # Lignes archivées encore en base : écartées de la requête, lues dans l'archive
+    assert exporter() == avant and exporter(**periode) == periode_avant
+    assert len(avant) == 11 and {l["type_capteur"] for l in avant} == {TypeCapteur.temperature.value}
+    assert [l["alerte_id"] is not None for l in avant if l["id"] == 3] == [True, True]
+
+    # Purge des lignes archivées (rétention) : l'export reste complet
+    db.session.query(Alerte).delete()
+    db.session.query(Analyseur).delete()
+    db.session.query(DonneesMedicale).filter(DonneesMedicale.id <= 6).delete()
+    db.session.commit()
+    assert [l["id"] for l in exporter()] == list(range(1, 11))
+
+
+def test_retardataire_visible(app_archive):
+    """Test qu'une mesure ancienne insérée après l'archivage reste visible puis est archivée"""
+    construire_archive(DEBUT + timedelta(days=6))
+    db.session.add(DonneesMedicale(id=11, patient_id=2, capteur_id=1, valeur_mesuree=45.0,
+                                   date_heure_mesure=DEBUT + timedelta(hours=12)))
+    db.session.commit()
+    assert [d.id for d in get_donnees_by_patient(2)][-2:] == [11, 1]
+
+    assert construire_archive(DEBUT + timedelta(days=7))["lignes"] == 2
+    assert [d.id for d in get_donnees_by_patient(2)][-2:] == [11, 1]
+    assert get_stats_by_patient(2)[0]["max"] == 45.0
+
+
+def test_suppressions_archivees(app_archive):
+    """Test qu'une mesure ou un couple supprimés après l'archivage ne réapparaissent pas"""
+    construire_archive(DEBUT + timedelta(days=6))
+    assert delete_donnee(1)
+    assert [d.id for d in get_donnees_by_patient(2)][-1] == 2
+    stats = get_stats_by_patient(2)[0]
+    assert stats["min"] == 36.5 and stats["moyenne"] == pytest.approx(sum(36.0 + i / 2 for i in range(1, 10)) / 9,
+                                                                       abs=0.01)
+
+    dissocier_capteur(2, 1)
+    assert get_donnees_by_patient(2) == [] and get_stats_by_patient(2) == []
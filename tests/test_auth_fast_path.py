@@ -0,0 +1,74 @@
+# Tests du chemin de connexion : recherche insensible à la casse, re-hachage, limitation de débit
+
+from app.extension import db, bcrypt, limiteur_login
+from app.models import Medecin, Personne
+from app.services.auth_service import authenticate_user
+from app.utils.hachage import cout_hash
+from app.utils.rate_limit import LimiteurDebit
+
+
+def _creer_medecin(cout):
+    medecin = Medecin(
+        nom="Fast", prenom="Path", email="Fast.Path@Example.com", phone="700000099",
+        mot_de_passe=bcrypt.generate_password_hash("Passer123", cout).decode("utf-8"),
+        role="medecin", specialite="Cardiologie"
+    )
+    db.session.add(medecin)
+    db.session.commit()
+    return medecin.id
+
+
+def test_seau_a_jetons_rafale_puis_recharge():
+    """Test que le seau autorise la rafale puis se recharge avec le temps"""
+    instant = [0.0]
+    limiteur = LimiteurDebit(horloge=lambda: instant[0])
+
+    assert limiteur.consommer("cle", 2, 10) == 0
+    assert limiteur.consommer("cle", 2, 10) == 0
+    assert limiteur.consommer("cle", 2, 10) == 10
+    assert limiteur.consommer("autre", 2, 10) == 0
+
+    instant[0] = 10.0
+    assert limiteur.consommer("cle", 2, 10) == 0
+
+
+def test_seau_refus_sans_consommation():
+    """Test qu'un refus par l'un des seaux n'entame pas les autres"""
+    instant = [0.0]
+    limiteur = LimiteurDebit(horloge=lambda: instant[0])
+
+    assert limiteur.consommer("ip", 1, 60) == 0
+    assert limiteur.consommer_tous([("compte", 1, 10), ("ip", 1, 60)]) == 60
+    assert limiteur.consommer("compte", 1, 10) == 0
+
+
+def test_authenticate_user_insensible_a_la_casse_et_rehache(app):
+    """Test que l'email est normalisé et que le hash est recalculé au coût configuré"""
+    app.config["BCRYPT_LOG_ROUNDS"] = 5
+    user_id = _creer_medecin(cout=4)
+
+    user = authenticate_user("  fast.path@example.COM ", "Passer123")
+    assert user is not None
+    assert user.id == user_id
+    assert user.specialite == "Cardiologie"
+
+    db.session.expire_all()
+    assert cout_hash(db.session.get(Personne, user_id).mot_de_passe) == 5
+    assert authenticate_user("fast.path@example.com", "mauvais") is None
+
+
+def test_login_limite_par_compte(app, client):
+    """Test que les tentatives au-delà de la rafale par compte renvoient 429"""
+    limiteur_login.reinitialiser()
+    app.config["LOGIN_RAFALE_COMPTE"] = 2
+    app.config["BCRYPT_LOG_ROUNDS"] = 4
+    _creer_medecin(cout=4)
+
+    corps = {"email": "fast.path@example.com", "password": "mauvais"}
+    assert client.post("/v1/auth/login", json=corps).status_code == 401
+    assert client.post("/v1/auth/login", json=corps).status_code == 401
+
+    reponse = client.post("/v1/auth/login", json=corps)
+    assert reponse.status_code == 429
+    assert int(reponse.headers["Retry-After"]) > 0
+    limiteur_login.reinitialiser()
@@ -0,0 +1,68 @@
+# Tests de l'autorisation par claims JWT et du cache d'identité de /me
+
+from types import SimpleNamespace
+
+from flask_jwt_extended import decode_token
+
+from app.services import auth_service
+from app.services.auth_service import generate_token
+
+
+def _entetes(user):
+    return {"Authorization": f"Bearer {generate_token(user)}"}
+
+
+def test_generate_token_embarque_les_claims(app):
+    """Test que le token porte le rôle, le patient du proche et la spécialité du médecin"""
+    proche = SimpleNamespace(id=7, role="proche", patient_id=3)
+    medecin = SimpleNamespace(id=1, role="medecin", specialite="Cardiologie")
+
+    claims_proche = decode_token(generate_token(proche))
+    claims_medecin = decode_token(generate_token(medecin))
+
+    assert claims_proche["role"] == "proche"
+    assert claims_proche["patient_id"] == 3
+    assert claims_medecin["specialite"] == "Cardiologie"
+
+
+def test_require_patient_access_sans_acces_base(app, client, monkeypatch):
+    """Test que l'accès d'un proche est décidé à partir des claims, sans requête sur le proche"""
+    def interdit(*args, **kwargs):
+        raise AssertionError("aucune requête base attendue")
+
+    monkeypatch.setattr("app.services.proche_service.get_proche_by_id", interdit)
+    monkeypatch.setattr(
+        "app.routes.donnees_medicales_route.get_stats_by_patient",
+        lambda patient_id: [{"capteur": "Température", "min": 36.1, "max": 37.0, "moyenne": 36.5}]
+    )
+    proche = SimpleNamespace(id=7, role="proche", patient_id=3)
+
+    assert client.get("/v1/donnees/patient/3/stats", headers=_entetes(proche)).status_code == 200
+    assert client.get("/v1/donnees/patient/4/stats", headers=_entetes(proche)).status_code == 403
+
+    patient = SimpleNamespace(id=4, role="patient")
+    assert client.get("/v1/donnees/patient/4/stats", headers=_entetes(patient)).status_code == 200
+    assert client.get("/v1/donnees/patient/3/stats", headers=_entetes(patient)).status_code == 403
+
+
+def test_me_sert_le_profil_depuis_le_cache(app, client, monkeypatch):
+    """Test que /me ne relit pas l'utilisateur en base pendant la durée du cache"""
+    app.config["IDENTITE_CACHE_TTL_S"] = 60
+    auth_service.cache_identite.vider()
+    appels = []
+
+    def faux_get_user_by_id(user_id):
+        appels.append(user_id)
+        return SimpleNamespace(id=user_id, nom="N", prenom="P", email="e@x.sn",
+                               role="medecin", specialite="Cardiologie")
+
+    monkeypatch.setattr("app.services.auth_service.get_user_by_id", faux_get_user_by_id)
+    entetes = _entetes(SimpleNamespace(id=42, role="medecin", specialite="Cardiologie"))
+
+    premier = client.get("/v1/auth/me", headers=entetes)
+    second = client.get("/v1/auth/me", headers=entetes)
+
+    assert premier.status_code == second.status_code == 200
+    assert second.get_json()["specialite"] == "Cardiologie"
+    assert appels == [42]
+    auth_service.cache_identite.vider()
@@ -0,0 +1,32 @@
+# Tests des utilitaires de la suite de benchmarks (percentiles, comparaison)
+
+from benchmarks.harness import percentile, resumer
+from benchmarks.compare import comparer
+
+
+def test_percentile_interpolation():
+    """Test que les percentiles sont interpolés linéairement"""
+    valeurs = [1, 2, 3, 4, 5]
+    assert percentile(valeurs, 50) == 3
+    assert percentile(valeurs, 0) == 1
+    assert percentile(valeurs, 100) == 5
+    assert percentile(valeurs, 95) == 4.8
+    assert percentile([], 50) is None
+
+
+def test_resumer_calcule_debit_et_percentiles():
+    """Test que le résumé expose le débit et les percentiles en millisecondes"""
+    resume = resumer([0.001, 0.002, 0.003, 0.004], total=0.01, erreurs=1, elements_par_appel=10)
+    assert resume["iterations"] == 4
+    assert resume["erreurs"] == 1
+    assert resume["debit_req_s"] == 400.0
+    assert resume["debit_elements_s"] == 4000.0
+    assert resume["p50_ms"] == 2.5
+
+
+def test_comparer_detecte_regression_p95():
+    """Test que la comparaison signale une régression du p95 au-delà du seuil"""
+    reference = {"resultats": {"login": {"p95_ms": 10.0}, "get_patient": {"p95_ms": 2.0}}}
+    candidat = {"resultats": {"login": {"p95_ms": 12.0}, "get_patient": {"p95_ms": 2.05}}}
+    _, regressions = comparer(reference, candidat, seuil=0.10)
+    assert regressions == ["login"]
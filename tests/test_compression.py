@@ -0,0 +1,97 @@
+# Tests de la compression des réponses (négociation, seuil, flux, statiques)
+
+import gzip
+import zlib
+
+import pytest
+from flask import Flask, Response, jsonify, stream_with_context
+
+from app.utils.compression import choisir_encodage, compresser_flux, installer_compression, brotli
+
+
+def test_choisir_encodage():
+    """Test de la négociation Accept-Encoding (poids q, joker, refus)"""
+    assert choisir_encodage("gzip, deflate", ("br", "gzip")) == "gzip"
+    assert choisir_encodage("gzip;q=0.5, br", ("br", "gzip")) == "br"
+    assert choisir_encodage("br;q=0.2, gzip;q=0.8", ("br", "gzip")) == "gzip"
+    assert choisir_encodage("*", ("br", "gzip")) == "br"
+    assert choisir_encodage("gzip;q=0", ("gzip",)) is None
+    assert choisir_encodage("identity", ("gzip",)) is None
+    assert choisir_encodage(None, ("gzip",)) is None
+
+
+def test_compresser_flux_gzip():
+    """Test que chaque morceau produit une sortie décodable immédiatement"""
+    morceaux = [b'{"id": %d}\n' % i * 50 for i in range(3)]
+    sorties = list(compresser_flux(iter(morceaux), "gzip", 6))
+    decompresseur = zlib.decompressobj(31)
+    assert decompresseur.decompress(sorties[0]) == morceaux[0]  # flush par morceau
+    assert gzip.decompress(b"".join(sorties)) == b"".join(morceaux)
+
+
+@pytest.fixture
+def app_compression():
+    app = Flask(__name__)
+    app.config.update(COMPRESSION_TAILLE_MIN=100)
+
+    @app.route("/grand")
+    def grand():
+        return jsonify([{"id": i, "valeur_mesuree": 36.5} for i in range(200)])
+
+    @app.route("/petit")
+    def petit():
+        return jsonify({"ok": True})
+
+    @app.route("/flux")
+    def flux():
+        def lignes():
+            for i in range(100):
+                yield f'{{"id": {i}}}\n'.encode()
+        return Response(stream_with_context(lignes()), content_type="application/x-ndjson")
+
+    @app.route("/binaire")
+    def binaire():
+        return Response(b"\x00" * 5000, content_type="application/vnd.apache.parquet")
+
+    installer_compression(app)
+    return app
+
+
+def test_reponse_json_compressee(app_compression):
+    """Test qu'un grand corps JSON est compressé et qu'un petit est envoyé tel quel"""
+    client = app_compression.test_client()
+    reponse = client.get("/grand", headers={"Accept-Encoding": "gzip"})
+    assert reponse.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in reponse.headers["Vary"]
+    assert int(reponse.headers["Content-Length"]) == len(reponse.data)
+    assert gzip.decompress(reponse.data).startswith(b'[{"id":0')
+
+    assert "Content-Encoding" not in client.get("/grand").headers
+    assert "Content-Encoding" not in client.get("/petit", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/binaire", headers={"Accept-Encoding": "gzip"}).headers
+
+
+def test_reponse_en_flux_compressee(app_compression):
+    """Test de la compression d'une réponse en flux"""
+    reponse = app_compression.test_client().get("/flux", headers={"Accept-Encoding": "gzip"})
+    assert reponse.is_streamed
+    assert reponse.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(reponse.data).count(b"\n") == 100
+
+
+@pytest.mark.skipif(brotli is None, reason="brotli non installé")
+def test_reponse_brotli(app_compression):
+    """Test de la préférence brotli quand le client l'accepte"""
+    reponse = app_compression.test_client().get("/grand", headers={"Accept-Encoding": "gzip, br"})
+    assert reponse.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(reponse.data).startswith(b'[{"id":0')
+
+
+def test_statique_swagger_precompresse(app, client):
+    """Test que les fichiers de Swagger UI sont servis compressés (et mis en cache)"""
+    reponse = client.get("/flasgger_static/swagger-ui.css", headers={"Accept-Encoding": "gzip"})
+    assert reponse.status_code == 200
+    assert reponse.headers["Content-Encoding"] == "gzip"
+    original = client.get("/flasgger_static/swagger-ui.css").data
+    assert gzip.decompress(reponse.data) == original
+    assert len(reponse.data) < len(original) / 3
@@ -0,0 +1,59 @@
+# Tests du tableau de bord de triage du médecin (GET /v1/medecins/<id>/dashboard)
+
+import json
+
+import pytest
+
+from app.models import Alerte
+
+
+@pytest.fixture
+def env(fabrique_app):
+    return fabrique_app(patients=("paul", "lea"), capteurs=("temperature", "rythme"), DASHBOARD_CACHE_TTL_S=60)
+
+
+def _ingerer(env, *lectures):
+    ids = env.ids
+    corps = "\n".join(
+        json.dumps({"patient_id": ids[patient], "medecin_id": ids["medecin_id"],
+                    "capteur_id": ids[capteur], "valeur_mesuree": valeur})
+        for patient, capteur, valeur in lectures
+    )
+    env.app.test_client().post("/v1/donnees/flux", data=corps, content_type="application/x-ndjson",
+                              headers=env.entetes)
+
+
+def test_tableau_de_bord(env):
+    """Test des compteurs par urgence, du tri par risque et des dernières constantes"""
+    ids = env.ids
+    _ingerer(env, ("paul", "rythme", 40), ("paul", "rythme", 130), ("lea", "temperature", 39.2),
+             ("lea", "rythme", 72), ("lea", "temperature", 36.9))
+    entetes = env.entetes
+    client = env.app.test_client()
+    url = f"/v1/medecins/{ids['medecin_id']}/dashboard"
+
+    tableau = client.get(url, headers=entetes).get_json()
+    assert tableau["alertes_non_traitees"] == {"Faible": 0, "Moyenne": 2, "Critique": 1, "total": 3}
+    assert len(tableau["dernieres_alertes"]) == 3
+    # Paul : deux alertes moyennes (2 x 2) + rythme à 130, 0,75 plage au-dessus (2 x 0,75) ;
+    # Léa : une alerte critique (5), constantes revenues dans les seuils
+    paul, lea = tableau["patients"]
+    assert [p["id"] for p in (paul, lea)] == [ids["paul"], ids["lea"]]
+    assert (paul["score_risque"], lea["score_risque"]) == (pytest.approx(5.5, abs=0.01), pytest.approx(5, abs=0.01))
+    assert paul["alertes_non_traitees"] == {"Faible": 0, "Moyenne": 2, "Critique": 0}
+    assert [(c["type"], c["valeur"], c["anomalie"]) for c in paul["constantes"]] == [
+        ("Rythme Cardiaque", 130, True)]
+    assert [(c["type"], c["valeur"], c["anomalie"]) for c in lea["constantes"]] == [
+        ("Temperature Corporelle", 36.9, False), ("Rythme Cardiaque", 72, False)]
+    assert len(client.get(url + "?limite=1", headers=entetes).get_json()["dernieres_alertes"]) == 1
+
+    # Traiter l'alerte de Léa invalide le cache du médecin
+    with env.app.app_context():
+        alerte_id = Alerte.query.filter_by(patient_id=ids["lea"]).one().id
+    client.put(f"/v1/alertes/{alerte_id}/etat", json={"etat_traitement": True}, headers=entetes)
+    tableau = client.get(url, headers=entetes).get_json()
+    assert tableau["alertes_non_traitees"]["Critique"] == 0
+    assert tableau["patients"][1]["score_risque"] == 0
+
+    # Réservé au médecin lui-même
+    assert client.get(url, headers=env.entetes_de(ids["medecin_id"] + 100)).status_code == 403
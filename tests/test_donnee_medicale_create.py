@@ -1,8 +1,25 @@
 # Test des donnees medicales create
 
+from types import SimpleNamespace
+
+from app.models import DonneesMedicale
+from app.services.analyse_service import create_analyse as creer_analyse
+from app.services.auth_service import generate_token
+
+
+def _entetes_medecin():
+    jeton = generate_token(SimpleNamespace(id=1, role="medecin", specialite="Cardio"))
+    return {"Authorization": f"Bearer {jeton}"}
+
+
+def test_create_donnee_sans_authentification(client):
+    """Test que la creation de donnee medicale sans cle, signature ni jeton retourne 401"""
+    response = client.post("/v1/donnees", json={"patient_id": 1, "capteur_id": 2, "valeur_mesuree": 36.7})
+    assert response.status_code == 401
+
 def test_create_donnee_missing_fields(client):
     """Test que la creation de donnee medicale sans champs requis retourne une erreur 400"""
-    response = client.post("/v1/donnees", json={})
+    response = client.post("/v1/donnees", json={}, headers=_entetes_medecin())
     assert response.status_code == 400
     assert "error" in response.get_json()
 
@@ -17,7 +34,7 @@ def test_create_donnee_success(client, monkeypatch):
 
     monkeypatch.setattr(
         "app.routes.donnees_medicales_route.create_donnee_medicale",
-        lambda data: fake_donnee
+        lambda data, appareil=None: fake_donnee
     )
 
     monkeypatch.setattr(
@@ -27,8 +44,41 @@ def test_create_donnee_success(client, monkeypatch):
 
     response = client.post(
         "/v1/donnees",
-        json={"patient_id": 1, "capteur_id": 2, "valeur_mesuree": 36.7}
+        json={"patient_id": 1, "capteur_id": 2, "medecin_id": 1, "valeur_mesuree": 36.7},
+        headers=_entetes_medecin()
     )
 
     assert response.status_code == 201
     assert response.get_json()["donnee"]["valeur_mesuree"] == 36.7
+
+
+def test_create_donnee_valeur_invalide(fabrique_app, monkeypatch):
+    """Test qu'une valeur non numérique est refusée seule (400) et écartée d'une liste sans perdre les suivantes"""
+    env = fabrique_app()
+    client = env.app.test_client()
+    lecture = {cle: env.ids[cle] for cle in ("patient_id", "capteur_id", "medecin_id")}
+
+    response = client.post("/v1/donnees", json={**lecture, "valeur_mesuree": "abc"}, headers=env.entetes)
+    assert response.status_code == 400
+
+    response = client.post("/v1/donnees", headers=env.entetes, json=[
+        {**lecture, "valeur_mesuree": "abc"},
+        {**lecture, "valeur_mesuree": 36.8},
+        {**lecture, "valeur_mesuree": 37.1},
+    ])
+    assert response.status_code == 201
+    assert [d["valeur_mesuree"] for d in response.get_json()["donnees"]] == [36.8, 37.1]
+
+    # Échec après l'écriture de la mesure : annulée, non validée avec la suivante
+    def analyse(**kwargs):
+        if kwargs["donnee"].valeur_mesuree == 99:
+            raise RuntimeError("analyse impossible")
+        return creer_analyse(**kwargs)
+
+    monkeypatch.setattr("app.services.donnee_medical_service.create_analyse", analyse)
+    response = client.post("/v1/donnees", headers=env.entetes, json=[
+        {**lecture, "valeur_mesuree": 99}, {**lecture, "valeur_mesuree": 36.9},
+    ])
+    assert len(response.get_json()["donnees"]) == 1
+    with env.app.app_context():
+        assert sorted(d.valeur_mesuree for d in DonneesMedicale.query) == [36.8, 36.9, 37.1]
@@ -6,8 +6,11 @@ def test_get_all_donnees_requires_auth(client):
     assert response.status_code in (200, 401)
 
 
-def test_get_all_donnees_success(client, monkeypatch):
+def test_get_all_donnees_success(app, client, monkeypatch):
     """Test la récupération réussie de toutes les données médicales"""
+    # Voie ORM (get_all_donnees + sérialiseur) ; la voie rapide est
+    # couverte par tests/test_serialiseurs_lignes.py
+    app.config["SERIALISATION_LIGNES"] = False
     fake_data = [
         {"id": 1, "patient_id": 1, "capteur_id": 2, "valeur_mesuree": 36.5}
     ]
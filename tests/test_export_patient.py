@@ -0,0 +1,95 @@
+# Tests de l'export en flux de l'historique d'un patient
+
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app import create_app
+from app.extension import db
+from app.models import Medecin, Patient, Capteur, DonneesMedicale, Analyseur, Alerte
+from app.models.enums import TypeCapteur, UrgenceEnum, TypeAlerte
+from app.services.auth_service import generate_token
+from app.services.export_service import parquet_disponible
+
+DEBUT = datetime(2026, 9, 1)
+
+
+@pytest.fixture
+def client_export(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'export.db'}",
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Medecin(id=1, nom="M", prenom="D", email="m@x.sn", phone="1", mot_de_passe="x",
+                    role="medecin"),
+            Patient(id=2, nom="P", prenom="A", email="p@x.sn", phone="2", mot_de_passe="x",
+                    role="patient"),
+            Capteur(id=1, type=TypeCapteur.temperature),
+        ])
+        for i in range(5):
+            db.session.add(DonneesMedicale(id=i + 1, patient_id=2, capteur_id=1,
+                                           valeur_mesuree=36.0 + i,
+                                           date_heure_mesure=DEBUT + timedelta(days=i)))
+        db.session.add(Analyseur(patient_id=2, medecin_id=1, donnee_medicale_id=5,
+                                 date_heure_mesure=DEBUT + timedelta(days=4), resultat="Anomalie"))
+        db.session.add(Alerte(patient_id=2, medecin_id=1, donnee_medicale_id=5,
+                              niveau_urgence=UrgenceEnum.critique, type_alerte=TypeAlerte.urgence))
+        db.session.commit()
+
+        jeton = generate_token(SimpleNamespace(id=1, role="medecin"))
+        yield app.test_client(), {"Authorization": f"Bearer {jeton}"}
+        db.session.remove()
+        db.drop_all()
+
+
+def test_export_ndjson_avec_jointures(client_export):
+    """Test de l'export NDJSON avec analyses et alertes jointes"""
+    client, entetes = client_export
+    reponse = client.get("/v1/patients/2/export?analyses=1&alertes=1", headers=entetes)
+
+    assert reponse.status_code == 200
+    assert reponse.is_streamed
+    lignes = [json.loads(l) for l in reponse.get_data(as_text=True).splitlines()]
+    assert [l["id"] for l in lignes] == [1, 2, 3, 4, 5]
+    assert lignes[0]["type_capteur"] == "Temperature Corporelle"
+    assert lignes[0]["analyse_id"] is None
+    assert lignes[4]["resultat"] == "Anomalie"
+    assert lignes[4]["niveau_urgence"] == "Critique"
+
+
+def test_export_csv_gzip_sur_periode(client_export):
+    """Test de l'export CSV compressé restreint à une période"""
+    client, entetes = client_export
+    reponse = client.get(
+        "/v1/patients/2/export?format=csv&from=2026-09-02&to=2026-09-04",
+        headers={**entetes, "Accept-Encoding": "gzip"}
+    )
+
+    assert reponse.status_code == 200
+    assert reponse.headers["Content-Encoding"] == "gzip"
+    lignes = list(csv.reader(io.StringIO(gzip.decompress(reponse.data).decode("utf-8"))))
+    assert lignes[0][:3] == ["id", "patient_id", "capteur_id"]
+    assert [l[0] for l in lignes[1:]] == ["2", "3"]
+
+
+def test_export_refus(client_export):
+    """Test des refus : format inconnu, patient d'un autre compte, Parquet sans pyarrow"""
+    client, entetes = client_export
+    assert client.get("/v1/patients/2/export?format=xml", headers=entetes).status_code == 400
+
+    jeton_patient = generate_token(SimpleNamespace(id=3, role="patient"))
+    reponse = client.get("/v1/patients/2/export",
+                         headers={"Authorization": f"Bearer {jeton_patient}"})
+    assert reponse.status_code == 403
+
+    if not parquet_disponible():
+        assert client.get("/v1/patients/2/export?format=parquet",
+                          headers=entetes).status_code == 501
@@ -0,0 +1,141 @@
+# Tests de l'idempotence des lectures (clés d'appareil, horodatage, renvois)
+
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import delete
+
+from app.extension import db
+from app.models import DonneesMedicale, Analyseur, Alerte, CleIngestion
+from app.services.ingestion_service import valider_lecture
+
+
+@pytest.fixture
+def env(fabrique_app):
+    return fabrique_app(INGESTION_TAILLE_LOT=3)
+
+
+def _flux(env, lectures):
+    reponse = env.app.test_client().post("/v1/donnees/flux", data="\n".join(json.dumps(l) for l in lectures),
+                                         content_type="application/x-ndjson", headers=env.entetes)
+    return [json.loads(l) for l in reponse.get_data(as_text=True).splitlines()]
+
+
+def test_valider_horodatage_et_cles():
+    """Test des champs facultatifs fournis par l'appareil"""
+    maintenant = datetime(2026, 3, 1, 12, 0)
+    base = {"patient_id": 1, "capteur_id": 1, "medecin_id": 1, "valeur_mesuree": 36.6}
+
+    lecture = valider_lecture({**base, "date_heure_mesure": "2026-03-01T13:30:00+02:00",
+                               "sequence_appareil": 7, "id_lecture": uuid.UUID(int=5).hex}, maintenant)
+    assert lecture["date_heure_mesure"] == datetime(2026, 3, 1, 11, 30)
+    assert lecture["sequence_appareil"] == 7
+    assert lecture["id_lecture"] == str(uuid.UUID(int=5))
+    assert valider_lecture({**base, "date_heure_mesure": 0}, maintenant)["date_heure_mesure"] == datetime(1970, 1, 1)
+    assert valider_lecture(base, maintenant)["date_heure_mesure"] == maintenant
+
+    for champs, message in (
+        ({"date_heure_mesure": "2026-03-01T12:10:00"}, "futur"),
+        ({"date_heure_mesure": "hier"}, "Horodatage invalide"),
+        ({"sequence_appareil": -1}, "hors limites"),
+        ({"id_lecture": "abc"}, "UUID"),
+    ):
+        with pytest.raises(ValueError, match=message):
+            valider_lecture({**base, **champs}, maintenant)
+
+
+def test_renvoi_flux(env):
+    """Test qu'un arriéré renvoyé ne crée ni mesure, ni analyse, ni alerte"""
+    ids = env.ids
+    debut = datetime(2026, 1, 10, 8, 0)
+    lectures = [
+        {**ids, "valeur_mesuree": 38.0 if i == 1 else 36.8, "sequence_appareil": i,
+         "date_heure_mesure": (debut + timedelta(minutes=i)).isoformat()}
+        for i in range(5)
+    ]
+
+    premier = _flux(env, lectures)[-1]["total"]
+    assert (premier["enregistrees"], premier["doublons"], premier["alertes"]) == (5, 0, 1)
+
+    bilans = _flux(env, lectures + [{**ids, "valeur_mesuree": 36.9, "sequence_appareil": 5}])
+    assert bilans[-1]["total"]["enregistrees"] == 1
+    assert bilans[-1]["total"]["doublons"] == 5
+    assert bilans[0]["doublons_detail"][0]["ligne"] == 1
+
+    with env.app.app_context():
+        assert DonneesMedicale.query.count() == 6
+        assert Analyseur.query.count() == 6
+        assert Alerte.query.count() == 1
+        mesures = DonneesMedicale.query.order_by(DonneesMedicale.id).all()
+        assert [m.date_heure_mesure for m in mesures[:5]] == [debut + timedelta(minutes=i) for i in range(5)]
+        # Chaque clé pointe vers sa mesure
+        liens = {c.sequence_appareil: c.donnee_medicale_id for c in CleIngestion.query}
+        assert liens == {i: mesures[i].id for i in range(6)}
+        assert bilans[0]["doublons_detail"][0]["donnee_id"] == mesures[0].id
+
+
+def test_doublon_dans_le_lot(env):
+    """Test d'une même clé deux fois dans un lot, par séquence puis par UUID"""
+    ids = env.ids
+    cle = str(uuid.uuid4())
+    bilans = _flux(env, [
+        {**ids, "valeur_mesuree": 36.6, "sequence_appareil": 1},
+        {**ids, "valeur_mesuree": 36.6, "sequence_appareil": 1},
+        {**ids, "valeur_mesuree": 36.7, "id_lecture": cle, "sequence_appareil": 2},
+        {**ids, "valeur_mesuree": 36.7, "id_lecture": cle},
+    ])
+    assert bilans[-1]["total"]["enregistrees"] == 2
+    assert bilans[-1]["total"]["doublons"] == 2
+    with env.app.app_context():
+        premiere = DonneesMedicale.query.order_by(DonneesMedicale.id).first()
+        assert bilans[0]["doublons_detail"] == [{"ligne": 2, "donnee_id": premiere.id}]
+
+
+def test_renvoi_post_unitaire(env):
+    """Test que POST /v1/donnees renvoyé avec le même id_lecture retourne la même mesure"""
+    ids = env.ids
+    client = env.app.test_client()
+    lecture = {**ids, "valeur_mesuree": 39.0, "id_lecture": str(uuid.uuid4()),
+               "date_heure_mesure": "2026-01-05T10:00:00Z"}
+    entetes = env.entetes
+
+    premiere = client.post("/v1/donnees", json=lecture, headers=entetes)
+    renvoi = client.post("/v1/donnees", json=lecture, headers=entetes)
+    assert premiere.status_code == 201
+    assert renvoi.status_code == 200
+    assert renvoi.get_json()["donnee"]["id"] == premiere.get_json()["donnee"]["id"]
+    assert premiere.get_json()["donnee"]["date_heure_mesure"].startswith("2026-01-05T10:00:00")
+    with env.app.app_context():
+        assert (DonneesMedicale.query.count(), Alerte.query.count()) == (1, 1)
+
+
+def test_renvoi_apres_suppression(env):
+    """Test qu'une lecture renvoyée après suppression de sa mesure est enregistrée une seule fois"""
+    ids = env.ids
+    client = env.app.test_client()
+    entetes = env.entetes
+    lecture = {**ids, "valeur_mesuree": 36.8, "id_lecture": str(uuid.uuid4()),
+               "date_heure_mesure": "2026-01-05T10:00:00Z"}
+
+    premiere = client.post("/v1/donnees", json=lecture, headers=entetes).get_json()["donnee"]["id"]
+    assert client.delete(f"/v1/donnees/{premiere}", headers=entetes).status_code == 200
+    with env.app.app_context():
+        assert CleIngestion.query.count() == 0   # clé supprimée avec sa mesure
+
+    # Flux : nouvelle mesure, pas un doublon d'une mesure disparue
+    total = _flux(env, [lecture])[-1]["total"]
+    assert (total["enregistrees"], total["doublons"]) == (1, 0)
+
+    # Clé orpheline (mesure supprimée hors API) : reliée à la mesure recréée
+    with env.app.app_context():
+        db.session.execute(delete(DonneesMedicale))
+        db.session.commit()
+    statuts = [client.post("/v1/donnees", json=lecture, headers=entetes) for _ in range(3)]
+    assert [r.status_code for r in statuts] == [201, 200, 200]
+    nouvelle = statuts[0].get_json()["donnee"]["id"]
+    assert {r.get_json()["donnee"]["id"] for r in statuts} == {nouvelle}
+    with env.app.app_context():
+        assert DonneesMedicale.query.count() == 1
+        assert CleIngestion.query.one().donnee_medicale_id == nouvelle
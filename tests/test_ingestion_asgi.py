@@ -0,0 +1,134 @@
+# Tests de l'ingestion ASGI (flux NDJSON, lots, contre-pression)
+
+import asyncio
+import json
+
+import pytest
+
+from app.ingestion_asgi import ApplicationIngestion
+from app.models import DonneesMedicale, Analyseur, Alerte
+from app.utils.lotisseur import Lotisseur
+
+
+@pytest.fixture
+def env(fabrique_app):
+    return fabrique_app(INGESTION_TAILLE_LOT=3, INGESTION_DELAI_LOT_MS=20)
+
+
+async def _requete(application, methode, chemin, morceaux=(), entetes=None):
+    entetes = [(n.lower().encode(), v.encode()) for n, v in (entetes or {}).items()]
+    messages = [{"type": "http.request", "body": m, "more_body": True} for m in morceaux]
+    messages.append({"type": "http.request", "body": b"", "more_body": False})
+    envoyes = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        envoyes.append(message)
+
+    await application({"type": "http", "method": methode, "path": chemin, "headers": entetes}, receive, send)
+    return envoyes[0]["status"], json.loads(envoyes[1]["body"])
+
+
+def _lecture(ids, valeur, **autres):
+    return json.dumps({**ids, "valeur_mesuree": valeur, **autres}).encode() + b"\n"
+
+
+def test_ingestion_ndjson(env):
+    """Test d'un flux découpé au milieu des lignes, avec rejets"""
+    ids = env.ids
+    application = ApplicationIngestion(env.app)
+    flux = (_lecture(ids, 36.8) + b"{pas du json}\n" + _lecture(ids, 39.5) + b"\n"
+            + json.dumps({"patient_id": 2}).encode() + b"\n"
+            + _lecture(ids, 37.0, patient_id=99) + _lecture(ids, 36.5) + _lecture(ids, 36.6).rstrip())
+    morceaux = [flux[i:i + 7] for i in range(0, len(flux), 7)]
+
+    async def scenario():
+        resultat = await _requete(application, "POST", "/v1/ingestion/donnees", morceaux, env.entetes)
+        await application.lotisseur.arreter()
+        return resultat
+
+    statut, bilan = asyncio.run(scenario())
+    assert statut == 200
+    assert bilan["recues"] == 7
+    assert bilan["enregistrees"] == 4
+    assert bilan["confirmees_jusqu_a"] == 7
+    assert {e["ligne"]: e["erreur"] for e in bilan["erreurs"]} == {
+        2: "JSON invalide",
+        4: "Champs obligatoires manquants",
+        5: "Patient, capteur ou médecin introuvable",
+    }
+
+    with env.app.app_context():
+        assert DonneesMedicale.query.count() == 4
+        assert Analyseur.query.count() == 4
+        alerte = Alerte.query.one()  # 39.5 °C hors seuil
+        assert "39.5" in alerte.description
+        assert alerte.donnee_medicale_id == DonneesMedicale.query.filter_by(valeur_mesuree=39.5).one().id
+
+
+def test_ingestion_connexions_simultanees(env):
+    """Test que les lectures de plusieurs connexions partagent les transactions"""
+    env.app.config["INGESTION_TAILLE_LOT"] = 50
+    ids = env.ids
+    application = ApplicationIngestion(env.app)
+
+    async def scenario():
+        bilans = await asyncio.gather(*(
+            _requete(application, "POST", "/v1/ingestion/donnees", [_lecture(ids, 36.5 + i / 10)], env.entetes)
+            for i in range(20)
+        ))
+        sante = await _requete(application, "GET", "/v1/ingestion/sante", entetes=env.entetes)
+        await application.lotisseur.arreter()
+        return bilans, sante
+
+    bilans, (_, sante) = asyncio.run(scenario())
+    assert all(statut == 200 and bilan["enregistrees"] == 1 for statut, bilan in bilans)
+    assert sante["lectures"] == 20
+    assert sante["lots"] < 20
+
+
+def test_ingestion_authentification(env):
+    """Test que la connexion est refusée sans JWT de médecin, avant la lecture du corps"""
+    ids = env.ids
+    application = ApplicationIngestion(env.app)
+
+    async def scenario():
+        sans_jeton = await _requete(application, "POST", "/v1/ingestion/donnees", [_lecture(ids, 36.8)])
+        invalide = await _requete(application, "POST", "/v1/ingestion/donnees", [_lecture(ids, 36.8)],
+                                  {"Authorization": "Bearer abc"})
+        patient = await _requete(application, "POST", "/v1/ingestion/donnees", [_lecture(ids, 36.8)],
+                                 env.entetes_de(ids["patient_id"], "patient"))
+        await application.lotisseur.arreter()
+        return sans_jeton, invalide, patient
+
+    sans_jeton, invalide, patient = asyncio.run(scenario())
+    assert (sans_jeton[0], invalide[0], patient[0]) == (401, 401, 403)
+    assert application.lotisseur.elements == 0
+    with env.app.app_context():
+        assert DonneesMedicale.query.count() == 0
+
+
+def test_lotisseur_erreur_et_arret():
+    """Test qu'un lot en échec rejette tous ses paquets, puis vidage à l'arrêt"""
+    executes = []
+
+    async def executer(paquets):
+        if any("boum" in p for p in paquets):
+            raise RuntimeError("base indisponible")
+        executes.append(paquets)
+        return [len(p) for p in paquets]
+
+    async def scenario():
+        lotisseur = Lotisseur(executer, taille_lot=10, delai_s=0.01)
+        await lotisseur.demarrer()
+        with pytest.raises(RuntimeError):
+            await lotisseur.soumettre(["boum"])
+        attente = asyncio.gather(lotisseur.soumettre(["a", "b"]), lotisseur.soumettre(["c"]))
+        resultats = await attente
+        await lotisseur.arreter()
+        return resultats
+
+    assert asyncio.run(scenario()) == [2, 1]
+    assert executes == [[["a", "b"], ["c"]]]
@@ -0,0 +1,144 @@
+# Tests de l'ingestion en flux (décodeurs NDJSON / CBOR / MessagePack, route)
+
+import io
+import json
+import struct
+
+import pytest
+
+from app.models import DonneesMedicale, Alerte
+from app.utils.flux_lectures import (
+    ErreurFlux, Tampon, enregistrements_ndjson, enregistrements_cbor, enregistrements_msgpack,
+)
+
+
+# Encodeurs minimaux (dicts à clés texte, entiers positifs, flottants)
+def _cbor(lecture):
+    def tete(majeur, n):
+        if n < 24:
+            return bytes([majeur << 5 | n])
+        return bytes([majeur << 5 | 25]) + struct.pack(">H", n)
+    sortie = tete(5, len(lecture))
+    for cle, valeur in lecture.items():
+        sortie += tete(3, len(cle)) + cle.encode()
+        sortie += b"\xfb" + struct.pack(">d", valeur) if isinstance(valeur, float) else tete(0, valeur)
+    return sortie
+
+
+def _msgpack(lecture):
+    sortie = bytes([0x80 | len(lecture)])
+    for cle, valeur in lecture.items():
+        sortie += bytes([0xA0 | len(cle)]) + cle.encode()
+        sortie += b"\xcb" + struct.pack(">d", valeur) if isinstance(valeur, float) else b"\xcd" + struct.pack(">H", valeur)
+    return sortie
+
+
+class FluxCompte(io.RawIOBase):
+    """Flux de n lignes NDJSON générées à la demande."""
+
+    def __init__(self, n):
+        self.lignes = (b'{"valeur_mesuree": %d}\n' % i for i in range(n))
+
+    def read(self, taille=-1):
+        return next(self.lignes, b"")
+
+
+def test_decodeurs():
+    """Test des trois formats, y compris les valeurs négatives et demi-flottants"""
+    lecture = {"patient_id": 3, "capteur_id": 300, "valeur_mesuree": 36.6}
+    assert [o for _, o, _ in enregistrements_cbor(io.BytesIO(_cbor(lecture) * 2))] == [lecture, lecture]
+    assert [o for _, o, _ in enregistrements_msgpack(io.BytesIO(_msgpack(lecture) * 3))] == [lecture] * 3
+
+    # CBOR : -5, demi-flottant 1.5, null ; MessagePack : négatif fixe, int16, nil
+    assert [o for _, o, _ in enregistrements_cbor(io.BytesIO(b"\x24\xf9\x3e\x00\xf6"))] == [-5, 1.5, None]
+    assert [o for _, o, _ in enregistrements_msgpack(io.BytesIO(b"\xfb\xd1\xff\x38\xc0"))] == [-5, -200, None]
+
+    lignes = list(enregistrements_ndjson(io.BytesIO(b'{"a": 1}\n\nnope\n{"b": 2}')))
+    assert lignes == [(1, {"a": 1}, None), (2, None, "JSON invalide"), (3, {"b": 2}, None)]
+
+    with pytest.raises(ErreurFlux):
+        list(enregistrements_cbor(io.BytesIO(_cbor(lecture)[:-3])))
+    with pytest.raises(ErreurFlux):
+        list(enregistrements_msgpack(io.BytesIO(b"\xc7\x01\x00\x00")))  # ext non pris en charge
+    with pytest.raises(ErreurFlux):
+        list(enregistrements_ndjson(io.BytesIO(b"x" * 100), taille_max=10))
+
+
+def test_memoire_bornee():
+    """Test que le tampon ne grossit pas avec la taille du corps"""
+    flux = FluxCompte(20000)
+    tampon = Tampon(flux)
+    taille_max, n = 0, 0
+    while tampon.ligne(1024) is not None:
+        n += 1
+        taille_max = max(taille_max, len(tampon.donnees))
+    assert n == 20000
+    assert taille_max < 64
+
+
+@pytest.fixture
+def env(fabrique_app):
+    return fabrique_app(INGESTION_TAILLE_LOT=4)
+
+
+def _bilans(reponse):
+    return [json.loads(l) for l in reponse.get_data(as_text=True).splitlines()]
+
+
+def test_route_flux_ndjson(env):
+    """Test des bilans par morceau d'un flux NDJSON"""
+    ids, entetes = env.ids, env.entetes
+    lignes = [json.dumps({**ids, "valeur_mesuree": 37.0 + i / 10}) for i in range(9)]
+    lignes[2] = "{"
+    lignes[5] = json.dumps({**ids, "capteur_id": 99, "valeur_mesuree": 36.6})
+    reponse = env.app.test_client().post(
+        "/v1/donnees/flux", data="\n".join(lignes), content_type="application/x-ndjson", headers=entetes
+    )
+    assert reponse.status_code == 200
+    bilans = _bilans(reponse)
+    assert [b.get("lignes") for b in bilans[:-1]] == [[1, 4], [5, 8], [9, 9]]
+    assert [b["enregistrees"] for b in bilans[:-1]] == [3, 3, 1]
+    assert bilans[0]["erreurs"] == [{"ligne": 3, "erreur": "JSON invalide"}]
+    assert bilans[1]["erreurs"] == [{"ligne": 6, "erreur": "Patient, capteur ou médecin introuvable"}]
+    assert bilans[-1] == {
+        "termine": True, "confirmees_jusqu_a": 9,
+        "total": {"recues": 9, "enregistrees": 7, "alertes": 3, "rejetees": 2, "doublons": 0,
+                  "tardives": 0, "reordonnees": 0, "morceaux": 3},
+    }
+    with env.app.app_context():
+        assert DonneesMedicale.query.count() == 7
+        assert Alerte.query.count() == 3  # 37.6, 37.7 et 37.8 °C
+
+
+def test_route_flux_binaire(env):
+    """Test MessagePack, puis CBOR tronqué : arrêt après le dernier morceau confirmé"""
+    ids, entetes = env.ids, env.entetes
+    client = env.app.test_client()
+    corps = b"".join(_msgpack({**ids, "valeur_mesuree": 36.8}) for _ in range(5))
+    bilans = _bilans(client.post("/v1/donnees/flux", data=corps, content_type="application/msgpack",
+                                 headers=entetes))
+    assert bilans[-1]["total"]["enregistrees"] == 5
+
+    corps = b"".join(_cbor({**ids, "valeur_mesuree": 36.8}) for _ in range(5))[:-4]
+    bilans = _bilans(client.post("/v1/donnees/flux", data=corps, content_type="application/cbor-seq",
+                                 headers=entetes))
+    assert bilans[-1] == {
+        "error": "Flux tronqué", "confirmees_jusqu_a": 4,
+        "total": {"recues": 4, "enregistrees": 4, "alertes": 0, "rejetees": 0, "doublons": 0,
+                  "tardives": 0, "reordonnees": 0, "morceaux": 1},
+    }
+    assert client.post("/v1/donnees/flux", data="[]", content_type="application/json",
+                       headers=entetes).status_code == 415
+
+
+def test_route_flux_authentification(env):
+    """Test que le flux exige le JWT d'un médecin"""
+    ids = env.ids
+    client = env.app.test_client()
+    corps = json.dumps({**ids, "valeur_mesuree": 36.8})
+    assert client.post("/v1/donnees/flux", data=corps, content_type="application/x-ndjson").status_code == 401
+    reponse = client.post("/v1/donnees/flux", data=corps, content_type="application/x-ndjson",
+                          headers=env.entetes_de(ids["patient_id"], "patient"))
+    assert reponse.status_code == 403
+    with env.app.app_context():
+        assert DonneesMedicale.query.count() == 0
@@ -0,0 +1,68 @@
+# Tests des fournisseurs JSON (module standard et orjson)
+
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+
+from app.models.enums import TypeCapteur
+from app.utils.json_rapide import FournisseurJSON, FournisseurOrjson, orjson
+
+
+@dataclass
+class Point:
+    date_heure: datetime
+    valeur: float
+
+
+OBJET = {
+    "b": (1, 2),
+    "a": datetime(2026, 1, 2, 3, 4, 5, 600),
+    "jour": date(2026, 1, 2),
+    "type": TypeCapteur.temperature,
+    "point": Point(datetime(2026, 1, 2), 36.5),
+    "texte": "Résultat",
+}
+ATTENDU = {
+    "a": "2026-01-02T03:04:05.000600",
+    "b": [1, 2],
+    "jour": "2026-01-02",
+    "point": {"date_heure": "2026-01-02T00:00:00", "valeur": 36.5},
+    "texte": "Résultat",
+    "type": "Temperature Corporelle",
+}
+
+FOURNISSEURS = [FournisseurJSON] + ([FournisseurOrjson] if orjson is not None else [])
+
+
+@pytest.mark.parametrize("classe", FOURNISSEURS)
+def test_types_natifs(classe):
+    """Test que dates, énumérations, tuples et dataclasses sont encodés comme les sérialiseurs"""
+    app = Flask(__name__)
+    fournisseur = classe(app)
+    assert json.loads(fournisseur.dumps(OBJET)) == ATTENDU
+    reponse = fournisseur.response(OBJET)
+    assert reponse.mimetype == "application/json"
+    assert json.loads(reponse.get_data()) == ATTENDU
+    assert fournisseur.loads('{"x": [1, 2.5]}') == {"x": [1, 2.5]}
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson non installé")
+def test_orjson_meme_sortie_que_le_standard():
+    """Test que la sortie compacte d'orjson est identique à celle du module standard (ASCII)"""
+    app = Flask(__name__)
+    lignes = [{"id": i, "valeur_mesuree": 36.5 + i, "date_heure_mesure": "2026-01-01T00:00:00",
+               "capteur": {"id": 1, "type": "Temperature Corporelle"}, "patient": None}
+              for i in range(50)]
+    assert (FournisseurOrjson(app).response(lignes).get_data()
+            == FournisseurJSON(app).response(lignes).get_data())
+
+
+def test_application_utilise_le_fournisseur(app, client):
+    """Test que create_app installe le fournisseur et que get_json le relit"""
+    attendu = FournisseurOrjson if orjson is not None else FournisseurJSON
+    assert type(app.json) is attendu
+    reponse = client.post("/v1/donnees", data="{invalide", content_type="application/json")
+    assert reponse.status_code in (400, 401)
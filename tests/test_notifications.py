@@ -0,0 +1,91 @@
+# Tests des notifications d'alertes (file transactionnelle, résumés, nouveaux essais)
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extension import db, mail
+from app.models import Alerte, Notification, UrgenceEnum
+from app.services.notification_service import traiter_lot
+
+
+@pytest.fixture
+def env(fabrique_app):
+    # TESTING : Flask-Mail n'envoie rien, les messages sont enregistrés
+    return fabrique_app(patients=("paul",), proches=("lea",), capteurs=("temperature", "rythme"),
+                        NOTIFICATIONS_DELAI_RESUME_S=60, NOTIFICATIONS_ATTENTE_S=10, NOTIFICATIONS_ESSAIS_MAX=2)
+
+
+def _ingerer(env, *valeurs):
+    ids = env.ids
+    corps = "\n".join(
+        json.dumps({"patient_id": ids["paul"], "medecin_id": ids["medecin_id"],
+                    "capteur_id": ids[capteur], "valeur_mesuree": valeur})
+        for capteur, valeur in valeurs
+    )
+    env.app.test_client().post("/v1/donnees/flux", data=corps, content_type="application/x-ndjson",
+                              headers=env.entetes)
+
+
+def test_file_et_resumes(env):
+    """Test de la mise en file avec l'alerte et du regroupement par destinataire"""
+    _ingerer(env, ("temperature", 39.5), ("rythme", 130), ("temperature", 36.8))
+    with env.app.app_context():
+        assert Alerte.query.count() == 2
+        # Médecin + proche pour chaque alerte, écrits avec les alertes
+        assert Notification.query.count() == 4
+        assert Notification.query.filter_by(critique=True).count() == 2
+
+        with mail.record_messages() as envois:
+            bilan = traiter_lot()
+        # L'alerte critique est due : elle emporte l'alerte moyenne en attente
+        assert bilan == {"dues": 2, "emails": 2, "notifications": 4, "echecs": 0, "abandons": 0}
+        assert sorted(m.recipients[0] for m in envois) == ["lea@example.com", "medecin@example.com"]
+        assert all(m.subject == "[e-Santé] 2 alertes, dont 1 critique(s)" for m in envois)
+        assert "Paul Durand" in envois[0].body
+
+        # Alerte non critique seule : attend le délai de regroupement
+        _ingerer(env, ("rythme", 40))
+        with mail.record_messages() as envois:
+            assert traiter_lot()["emails"] == 0
+            assert traiter_lot(maintenant=datetime.utcnow() + timedelta(seconds=61))["emails"] == 2
+        assert envois[0].subject == "[e-Santé] Alerte Moyenne - Paul Durand"
+        assert Notification.query.filter_by(etat="envoyee").count() == 6
+
+
+def test_nouveaux_essais_puis_abandon(env, monkeypatch):
+    """Test de l'attente exponentielle et de l'abandon après NOTIFICATIONS_ESSAIS_MAX échecs"""
+    def connexion_impossible():
+        raise ConnectionRefusedError("SMTP indisponible")
+
+    _ingerer(env, ("temperature", 40.1))
+    monkeypatch.setattr(mail, "connect", connexion_impossible)
+    with env.app.app_context():
+        maintenant = datetime.utcnow()
+        assert traiter_lot(maintenant=maintenant)["echecs"] == 2
+        notification = Notification.query.first()
+        assert (notification.etat, notification.tentatives) == ("en_attente", 1)
+        assert notification.prochain_essai == maintenant + timedelta(seconds=10)
+        assert "SMTP indisponible" in notification.derniere_erreur
+
+        assert traiter_lot(maintenant=maintenant + timedelta(seconds=5))["dues"] == 0
+        bilan = traiter_lot(maintenant=maintenant + timedelta(seconds=11))
+        assert bilan["abandons"] == 2
+        assert Notification.query.filter_by(etat="echec").count() == 2
+
+
+def test_alerte_acquittee_avant_envoi(env):
+    """Test qu'une alerte acquittée avant l'envoi n'est pas notifiée"""
+    _ingerer(env, ("temperature", 39.5), ("rythme", 130))
+    with env.app.app_context():
+        critique = Alerte.query.filter_by(niveau_urgence=UrgenceEnum.critique).one()
+        critique.etat_traitement = True
+        db.session.commit()
+
+        with mail.record_messages() as envois:
+            bilan = traiter_lot()
+        # L'alerte moyenne part seule ; les notifications de l'alerte acquittée sont closes
+        assert (bilan["emails"], bilan["notifications"]) == (2, 2)
+        assert all(m.subject == "[e-Santé] Alerte Moyenne - Paul Durand" for m in envois)
+        assert Notification.query.filter_by(etat="annulee", alerte_id=critique.id).count() == 2
@@ -0,0 +1,45 @@
+# Tests du partitionnement mensuel (calendrier, commande, filtrage par période)
+
+from datetime import date
+
+from app.services.partition_service import (
+    decaler_mois, mois_entre, nom_partition, maintenir_partitions
+)
+from app.utils.validation import parse_periode
+
+
+def test_calendrier_des_partitions():
+    """Test du calcul des mois et des noms de partitions"""
+    assert decaler_mois(date(2026, 11, 1), 3) == date(2027, 2, 1)
+    assert decaler_mois(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    assert list(mois_entre(date(2026, 11, 20), date(2027, 1, 3))) == [
+        date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1)
+    ]
+    assert nom_partition("donnees_medicales", date(2027, 1, 1)) == "donnees_medicales_p2027_01"
+
+
+def test_maintain_sans_partitionnement(app, runner):
+    """Test que la maintenance est sans effet sur des tables non partitionnées"""
+    assert maintenir_partitions(retention_mois=1) == {
+        "partitionnee": False, "creees": [], "detachees": []
+    }
+    result = runner.invoke(args=["partitions", "maintain"])
+    assert result.exit_code == 0, result.output
+    assert "non partitionnées" in result.output
+
+
+def test_parse_periode():
+    """Test de la lecture des bornes ?from=&to="""
+    assert parse_periode({}) == {}
+    periode = parse_periode({"from": "2026-10-01", "to": "2026-11-01T00:00:00"})
+    assert periode["depuis"].month == 10 and periode["jusqu_a"].month == 11
+
+
+def test_route_periode_invalide(client, monkeypatch):
+    """Test qu'une borne invalide est refusée avant toute requête"""
+    monkeypatch.setattr("app.utils.autorisation.get_identite",
+                        lambda: {"id": 1, "role": "medecin"})
+    monkeypatch.setattr("flask_jwt_extended.view_decorators.verify_jwt_in_request",
+                        lambda *a, **k: None)
+    reponse = client.get("/v1/donnees/patient/1?from=hier")
+    assert reponse.status_code == 400
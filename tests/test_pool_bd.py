@@ -0,0 +1,87 @@
+# Tests du profil du moteur SQLAlchemy et des métriques du pool
+
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, text
+
+from app.services.auth_service import generate_token
+
+from app.utils.pool_bd import (
+    taille_pool, options_moteur, installer_metriques_pool, etat_pool, metriques_pool
+)
+
+URI_PG = "postgresql://u:p@localhost:5432/s3dpa"
+
+
+def test_taille_pool_depuis_gunicorn():
+    """Test que le pool suit les threads par worker et respecte le budget serveur"""
+    assert taille_pool(workers=4, threads=8) == (8, 4)
+    # 4 workers × (taille + débordement) ≤ 20 connexions
+    taille, debordement = taille_pool(workers=4, threads=8, max_connexions=20)
+    assert (taille, debordement) == (5, 0)
+    assert taille_pool(workers=1, threads=1, pool_size=3, max_overflow=0) == (3, 0)
+
+
+def test_options_moteur_postgres_direct():
+    """Test que les délais serveur sont posés à la connexion"""
+    options = options_moteur({
+        "SQLALCHEMY_DATABASE_URI": URI_PG, "GUNICORN_THREADS": 4,
+        "DB_STATEMENT_TIMEOUT_MS": 30000, "DB_IDLE_TRANSACTION_TIMEOUT_MS": 60000,
+    })
+    assert options["pool_pre_ping"] is True
+    assert options["pool_size"] == 4
+    assert options["pool_recycle"] == 1800
+    assert "-c statement_timeout=30000" in options["connect_args"]["options"]
+    assert "idle_in_transaction_session_timeout=60000" in options["connect_args"]["options"]
+
+
+def test_options_moteur_pgbouncer():
+    """Test qu'en mode pooler externe ni paramètres de démarrage ni requêtes préparées"""
+    options = options_moteur({
+        "SQLALCHEMY_DATABASE_URI": URI_PG.replace("postgresql", "postgresql+psycopg"),
+        "DB_POOLER": "pgbouncer", "DB_STATEMENT_TIMEOUT_MS": 30000,
+    })
+    assert options["connect_args"] == {"prepare_threshold": None}
+
+    options = options_moteur({"SQLALCHEMY_DATABASE_URI": URI_PG, "DB_POOLER": "pgbouncer"})
+    assert "connect_args" not in options
+
+
+def test_options_moteur_sqlite():
+    """Test que SQLite garde le pool choisi par Flask-SQLAlchemy"""
+    assert options_moteur({"SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:"}) == {
+        "pool_pre_ping": True
+    }
+
+
+def test_metriques_saturation(tmp_path):
+    """Test que l'occupation et le pic d'emprunts sont mesurés"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=2, max_overflow=1)
+    installer_metriques_pool(engine)
+    metriques_pool.reinitialiser()
+
+    connexions = [engine.connect() for _ in range(3)]
+    for c in connexions:
+        c.execute(text("SELECT 1"))
+    etat = etat_pool(engine)
+    assert etat["empruntees"] == 3
+    assert etat["debordement"] == 1
+    assert etat["saturation"] == 1.0
+
+    for c in connexions:
+        c.close()
+    etat = etat_pool(engine)
+    assert etat["en_cours"] == 0
+    assert etat["pic_en_cours"] == 3
+    engine.dispose()
+
+
+def test_route_etat_pool(client):
+    """Test que les métriques sont exposées aux seuls médecins authentifiés"""
+    assert client.get("/v1/sante/pool").status_code == 401
+    entetes = lambda role: {"Authorization": f"Bearer {generate_token(SimpleNamespace(id=1, role=role, specialite=None))}"}
+    assert client.get("/v1/sante/pool", headers=entetes("patient")).status_code == 403
+
+    reponse = client.get("/v1/sante/pool", headers=entetes("medecin"))
+    assert reponse.status_code == 200
+    assert "emprunts" in reponse.get_json()
@@ -0,0 +1,76 @@
+# Tests de la référence des capteurs en mémoire (version partagée en base)
+
+import pytest
+from sqlalchemy import event, text
+
+from app.extension import db
+from app.models import Capteur, TypeCapteur
+from app.services.capteur_service import create_capteur, update_capteur
+from app.services.donnee_medical_service import create_donnee_medicale, get_stats_by_patient
+from app.services.reference_service import type_capteur
+
+
+@pytest.fixture
+def env(fabrique_app):
+    return fabrique_app(capteurs=(), REFERENCES_VERIFICATION_S=60)
+
+
+def _requetes_capteur(appel):
+    """Exécute appel() et compte les requêtes SQL lisant capteur ou versions_references"""
+    requetes = []
+
+    def compter(conn, curseur, instruction, *args):
+        if instruction.lstrip().upper().startswith("SELECT") and (
+                "FROM capteur" in instruction or "versions_references" in instruction):
+            requetes.append(instruction)
+
+    event.listen(db.engine, "before_cursor_execute", compter)
+    try:
+        resultat = appel()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", compter)
+    return resultat, len(requetes)
+
+
+def test_chemins_chauds_sans_lecture(env):
+    """Test que mesures et statistiques résolvent le type des capteurs sans requête une fois la référence chargée"""
+    ids = env.ids
+    with env.app.app_context():
+        temperature = create_capteur({"type": TypeCapteur.temperature})
+        rythme = create_capteur({"type": TypeCapteur.rythme})
+        lectures = [(temperature.id, 39.5), (rythme.id, 72), (rythme.id, 80)]
+        type_capteur(temperature.id)
+
+        def ingerer():
+            for capteur_id, valeur in lectures:
+                create_donnee_medicale({**ids, "capteur_id": capteur_id, "valeur_mesuree": valeur})
+            return get_stats_by_patient(ids["patient_id"])
+
+        stats, requetes = _requetes_capteur(ingerer)
+        assert requetes == 0
+        assert {s["capteur"]: s["max"] for s in stats} == {"Temperature Corporelle": 39.5, "Rythme Cardiaque": 80}
+
+
+def test_invalidation_par_version(env):
+    """Test de la version partagée : écriture locale vue aussitôt, écriture d'un autre worker vue à la vérification"""
+    with env.app.app_context():
+        capteur = create_capteur({"type": TypeCapteur.temperature})
+        assert type_capteur(capteur.id) is TypeCapteur.temperature
+
+        update_capteur(capteur, {"type": TypeCapteur.pression})
+        assert type_capteur(capteur.id) is TypeCapteur.pression
+
+        # Autre worker : capteur modifié et version incrémentée en base
+        db.session.execute(text("UPDATE capteur SET type = 'rythme' WHERE id = :id"), {"id": capteur.id})
+        db.session.execute(text("UPDATE versions_references SET version = version + 1 WHERE nom = 'capteur'"))
+        db.session.commit()
+        assert type_capteur(capteur.id) is TypeCapteur.pression   # avant REFERENCES_VERIFICATION_S
+        env.app.config["REFERENCES_VERIFICATION_S"] = 0
+        assert type_capteur(capteur.id) is TypeCapteur.rythme
+
+        # Capteur créé hors capteur_service : lu seul à la première demande
+        autre = Capteur(type=TypeCapteur.temperature)
+        db.session.add(autre)
+        db.session.commit()
+        assert type_capteur(autre.id) is TypeCapteur.temperature
+        assert type_capteur(10_000) is None
@@ -0,0 +1,117 @@
+# Tests du réordonnancement des lectures horodatées (fenêtre, état par couple, rejeu)
+
+import json
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import DonneesMedicale, EtatMesure
+from app.utils.reordonnancement import FenetreReordonnancement
+
+DEBUT = datetime(2026, 10, 1, 8, 0)
+
+
+def _lecture(i, decalage_s=0):
+    return {"patient_id": 1, "capteur_id": 1, "medecin_id": 1, "valeur_mesuree": 36.5 + (i % 10) / 20,
+            "date_heure_mesure": DEBUT + timedelta(seconds=10 * i + decalage_s)}
+
+
+def _rafale(graine):
+    """
+    Lectures toutes les 10 s, indices 0 à 79 :
+    - 0-39 en direct, chacune retardée de 0 à 25 s (réseau)
+    - 40-59 perdues pendant une coupure, renvoyées à la reconnexion
+      par blocs de 3 mélangés
+    - 60-79 en direct, retardées comme les premières
+    - deux retardataires (5 et 12, décalées de 5 s) en toute fin
+    Retourne les indices (ou (indice, 5)) dans l'ordre d'arrivée.
+    """
+    aleatoire = random.Random(graine)
+    direct = sorted(range(40), key=lambda i: i * 10 + aleatoire.uniform(0, 25))
+    arriere = []
+    for debut in range(40, 60, 3):
+        bloc = list(range(debut, min(debut + 3, 60)))
+        aleatoire.shuffle(bloc)
+        arriere += bloc
+    reprise = sorted(range(60, 80), key=lambda i: i * 10 + aleatoire.uniform(0, 25))
+    return direct + arriere + reprise + [(5, 5), (12, 5)]
+
+
+def _lectures(arrivees):
+    return [_lecture(*a) if isinstance(a, tuple) else _lecture(a) for a in arrivees]
+
+
+def test_fenetre_rafale_de_reconnexion():
+    """Test que la sortie suit l'ordre des mesures, hors retardataires, et se rejoue à l'identique"""
+    def rejouer():
+        fenetre = FenetreReordonnancement(retard_max_s=30)
+        sorties = []
+        for numero, lecture in enumerate(_lectures(_rafale(2026)), start=1):
+            sorties += fenetre.ajouter(numero, lecture)
+        sorties += fenetre.vider()
+        return fenetre, [(n, l["date_heure_mesure"]) for n, l in sorties]
+
+    fenetre, sorties = rejouer()
+    assert len(sorties) == 82 and fenetre.en_attente == 0
+    assert fenetre.tardives == 2 and fenetre.reordonnees > 0
+    dates = [d for n, d in sorties if n <= 80]
+    assert dates == sorted(dates)
+    assert rejouer()[1] == sorties
+
+
+def test_fenetre_capacite_et_attente():
+    """Test de la borne mémoire et du premier numéro en attente"""
+    fenetre = FenetreReordonnancement(retard_max_s=3600, capacite=3)
+    sorties = []
+    for numero in range(1, 6):
+        sorties += fenetre.ajouter(numero, _lecture(10 - numero))
+    assert fenetre.en_attente == 3
+    # 4 libérée par la borne de capacité, puis 5, plus ancienne, arrive trop tard
+    assert [n for n, _ in sorties] == [4, 5] and fenetre.tardives == 1
+    assert fenetre.premier_en_attente() == 1
+    assert [n for n, _ in fenetre.vider()] == [3, 2, 1]
+    assert fenetre.premier_en_attente() is None
+
+
+@pytest.fixture
+def fabrique(fabrique_app):
+    def creer(taille_lot):
+        return fabrique_app(INGESTION_TAILLE_LOT=taille_lot, INGESTION_RETARD_MAX_S=30)
+    return creer
+
+
+def _envoyer(env, lectures):
+    app, ids = env.app, env.ids
+    corps = "\n".join(
+        json.dumps({**l, **ids, "date_heure_mesure": l["date_heure_mesure"].isoformat()}) for l in lectures
+    )
+    reponse = app.test_client().post("/v1/donnees/flux", data=corps, content_type="application/x-ndjson",
+                                     headers=env.entetes)
+    bilans = [json.loads(l) for l in reponse.get_data(as_text=True).splitlines()]
+    with app.app_context():
+        etat = EtatMesure.query.one()
+        resume = (etat.nb_mesures, round(etat.somme_valeurs, 6), etat.valeur_min, etat.valeur_max,
+                  etat.derniere_valeur, etat.date_derniere_mesure)
+        ordre = [(d.date_heure_mesure, d.id) for d in DonneesMedicale.query.order_by(DonneesMedicale.id)]
+        return bilans[-1], resume, etat.nb_tardives, ordre
+
+
+def test_rejeu_deterministe(fabrique):
+    """Test qu'une rafale de reconnexion donne le même état qu'un envoi dans l'ordre"""
+    lectures = _lectures(_rafale(2026))
+    final, resume, tardives, ordre = _envoyer(fabrique(4), lectures)
+    assert final["termine"] and final["confirmees_jusqu_a"] == 82
+    assert final["total"]["enregistrees"] == 82 and final["total"]["reordonnees"] > 0
+    # Les deux retardataires passent par la voie de correction
+    assert final["total"]["tardives"] == tardives == 2
+    assert resume[0] == 82 and resume[-1] == DEBUT + timedelta(seconds=790)
+    dates = [d for d, _ in ordre if d.second % 10 == 0]  # hors retardataires
+    assert len(dates) == 80 and dates == sorted(dates)  # insérées dans l'ordre des mesures
+
+    # Même rafale en un seul morceau, puis dans l'ordre : même état final
+    assert _envoyer(fabrique(1000), lectures)[1] == resume
+    ordonnees = sorted(lectures, key=lambda l: l["date_heure_mesure"])
+    final, resume_ordre, tardives, _ = _envoyer(fabrique(4), ordonnees)
+    assert resume_ordre == resume
+    assert final["total"]["tardives"] == tardives == 0
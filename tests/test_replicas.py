@@ -0,0 +1,61 @@
+# Tests du routage des lectures vers un réplica (deux fichiers SQLite)
+
+import pytest
+
+from app import create_app
+from app.extension import db
+from app.models import Capteur
+from app.models.enums import TypeCapteur
+from app.services.capteur_service import get_all_capteurs, get_capteur_by_id
+from app.utils.replicas import ecritures_recentes
+
+
+@pytest.fixture
+def app_replica(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'primaire.db'}",
+        "SQLALCHEMY_BINDS": {"replica_0": f"sqlite:///{tmp_path / 'replica.db'}"},
+        "REPLICA_COLLAGE_S": 5,
+    })
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines["replica_0"])
+        # Le réplica « en retard » ne contient qu'un capteur différent
+        with db.engines["replica_0"].begin() as connexion:
+            connexion.execute(Capteur.__table__.insert(), {"id": 99, "type": TypeCapteur.pression})
+        ecritures_recentes.vider()
+        yield app
+        db.session.remove()
+    # Les métadonnées par bind sont globales à l'extension
+    db.metadatas.pop("replica_0", None)
+    ecritures_recentes.vider()
+
+
+def test_lectures_lourdes_sur_replica(app_replica):
+    """Test que les listes passent par le réplica et les lectures unitaires par le primaire"""
+    with app_replica.test_request_context():
+        db.session.add(Capteur(id=1, type=TypeCapteur.temperature))
+        db.session.flush()
+        # Écriture non validée dans la transaction : lecture sur le primaire
+        assert [c.id for c in get_all_capteurs()] == [1]
+        db.session.rollback()
+
+    with app_replica.test_request_context():
+        assert [c.id for c in get_all_capteurs()] == [99]
+        assert get_capteur_by_id(99) is None
+
+
+def test_lecture_de_ses_propres_ecritures(app_replica):
+    """Test qu'après une écriture, les lectures du même client restent sur le primaire"""
+    with app_replica.test_request_context(environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+        db.session.add(Capteur(type=TypeCapteur.temperature))
+        db.session.commit()
+
+    with app_replica.test_request_context(environ_base={"REMOTE_ADDR": "10.0.0.1"}):
+        assert [c.type for c in get_all_capteurs()] == [TypeCapteur.temperature]
+        db.session.remove()
+
+    # Un autre client n'est pas concerné par la fenêtre de collage
+    with app_replica.test_request_context(environ_base={"REMOTE_ADDR": "10.0.0.2"}):
+        assert [c.id for c in get_all_capteurs()] == [99]
@@ -0,0 +1,102 @@
+# Tests du score de risque matérialisé (mises à jour incrémentales, décroissance, tri)
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.extension import db
+from app.models import Alerte, ScoreRisque, UrgenceEnum, DonneesMedicale, EtatMesure
+from app.services.alerte_service import update_alerte_etat, delete_alerte
+from app.services.donnee_medical_service import delete_donnee
+from app.services.risque_service import decroitre_scores, recalculer_scores
+
+
+@pytest.fixture
+def env(fabrique_app):
+    return fabrique_app(patients=("paul", "lea"), capteurs=("temperature", "rythme"), RISQUE_DEMI_VIE_H=24)
+
+
+def _ingerer(env, *lectures):
+    ids = env.ids
+    corps = "\n".join(
+        json.dumps({"patient_id": ids[patient], "medecin_id": ids["medecin_id"],
+                    "capteur_id": ids[capteur], "valeur_mesuree": valeur})
+        for patient, capteur, valeur in lectures
+    )
+    env.app.test_client().post("/v1/donnees/flux", data=corps, content_type="application/x-ndjson",
+                              headers=env.entetes)
+
+
+def _scores():
+    return {s.patient_id: (round(s.score, 3), s.nb_alertes_non_traitees, s.derniere_urgence)
+            for s in ScoreRisque.query.all()}
+
+
+def test_incremental_egal_recalcul(env):
+    """Test que les mises à jour incrémentales donnent le score d'une reconstruction complète"""
+    ids = env.ids
+    _ingerer(env, ("paul", "rythme", 130), ("lea", "temperature", 39.5), ("paul", "temperature", 38.0))
+    with env.app.app_context():
+        # Paul : moyenne (2) + critique (5) + écarts 2 x 30/40 et 5 x 0,5/1,5
+        assert db.session.get(ScoreRisque, ids["paul"]).score == pytest.approx(7 + 1.5 + 5 / 3, abs=1e-3)
+
+        alerte_lea = Alerte.query.filter_by(patient_id=ids["lea"]).one()
+        update_alerte_etat(alerte_lea, True)
+        update_alerte_etat(Alerte.query.filter_by(patient_id=ids["paul"]).first(), True)
+        update_alerte_etat(alerte_lea, False)
+        delete_alerte(Alerte.query.filter_by(patient_id=ids["paul"], etat_traitement=False).one())
+        incremental = _scores()
+        # Paul : plus d'alerte non traitée, dernière alerte restante moyenne ;
+        # Léa : alerte critique rouverte + température à 39,5
+        assert incremental[ids["paul"]] == (pytest.approx(1.5 + 5 / 3, abs=1e-3), 0, UrgenceEnum.moyenne)
+        assert incremental[ids["lea"]] == (pytest.approx(5 + 10 / 1.5, abs=1e-3), 1, UrgenceEnum.critique)
+
+        maintenant = max(s.date_reference for s in ScoreRisque.query)
+        recalculer_scores(db.session.connection(), maintenant=maintenant)
+        db.session.commit()
+        assert _scores() == incremental
+
+
+def test_decroissance_et_tri(env):
+    """Test de la demi-vie, du passage périodique et de la recherche triée par risque"""
+    ids = env.ids
+    _ingerer(env, ("paul", "rythme", 130), ("paul", "rythme", 80),
+             ("lea", "temperature", 39.5), ("lea", "temperature", 36.8))
+    with env.app.app_context():
+        assert db.session.get(ScoreRisque, ids["lea"]).score == pytest.approx(5, abs=1e-3)
+        assert db.session.get(ScoreRisque, ids["paul"]).score == pytest.approx(2, abs=1e-3)
+
+        dans_un_jour = datetime.utcnow() + timedelta(hours=24)
+        assert decroitre_scores(db.session, maintenant=dans_un_jour, taille_lot=1) == 2
+        assert db.session.get(ScoreRisque, ids["lea"]).score == pytest.approx(2.5, abs=1e-3)
+        # Bien après : poids négligeables ramenés à 0, plus rien à décroître
+        decroitre_scores(db.session, maintenant=dans_un_jour + timedelta(days=30))
+        assert db.session.get(ScoreRisque, ids["lea"]).score == 0
+        assert decroitre_scores(db.session, maintenant=dans_un_jour + timedelta(days=31)) == 0
+
+    # Paul : nouvelle alerte moyenne (2) + rythme à 40, une demi-plage sous le seuil (1)
+    _ingerer(env, ("paul", "rythme", 40))
+    client = env.app.test_client()
+    entetes = env.entetes
+    tries = client.get("/v1/patients/search?tri=risque", headers=entetes).get_json()
+    assert [p["id"] for p in tries] == [ids["paul"], ids["lea"]]
+    for urgence, attendus in (("moyenne", [ids["paul"]]), ("Critique", [ids["lea"]]), ("faible", [])):
+        trouves = client.get(f"/v1/patients/search?urgence={urgence}", headers=entetes).get_json()
+        assert [p["id"] for p in trouves] == attendus
+
+
+def test_suppression_mesure(env):
+    """Test que supprimer une mesure recalcule l'état du couple et l'écart du patient"""
+    ids = env.ids
+    _ingerer(env, ("paul", "temperature", 37.0), ("paul", "temperature", 39.5))
+    with env.app.app_context():
+        derniere = DonneesMedicale.query.filter_by(valeur_mesuree=39.5).one().id
+        assert delete_donnee(derniere)
+        etat = db.session.get(EtatMesure, (ids["paul"], ids["temperature"]))
+        assert (etat.nb_mesures, etat.derniere_valeur, etat.valeur_max) == (1, 37.0, 37.0)
+        # Plus d'écart au seuil : seul reste le poids de l'alerte critique
+        assert db.session.get(ScoreRisque, ids["paul"]).score_ecarts == 0
+
+        assert delete_donnee(DonneesMedicale.query.one().id)
+        assert db.session.get(EtatMesure, (ids["paul"], ids["temperature"])) is None
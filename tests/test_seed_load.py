@@ -0,0 +1,56 @@
+# Tests de la commande flask seed-load et du générateur de signes vitaux
+
+import random
+from datetime import datetime
+
+from app.models import Personne, Proche, Capteur, DonneesMedicale, Analyseur, Alerte, TypeCapteur, PatientCapteur, \
+    EtatMesure, ScoreRisque
+from app.services.affectation_service import capteurs_du_patient
+from app.utils.generateur import generer_mesure
+from app.utils.seuils import SEUILS_CAPTEURS
+
+
+def test_generer_mesure_sans_anomalie_reste_dans_les_seuils():
+    """Test qu'avec un taux d'anomalie nul les valeurs restent dans les seuils"""
+    rng = random.Random(1)
+    for type_capteur in TypeCapteur:
+        seuil = SEUILS_CAPTEURS[type_capteur]
+        for heure in range(24):
+            valeur, anomalie = generer_mesure(
+                type_capteur, datetime(2025, 1, 1, heure), 0.0, 0.0, rng
+            )
+            assert not anomalie
+            assert seuil["min"] <= valeur <= seuil["max"]
+
+
+def test_seed_load_ecrit_les_volumes_demandes(app, runner):
+    """Test que seed-load crée utilisateurs, capteurs, affectations, mesures, analyses et alertes cohérents"""
+    result = runner.invoke(args=[
+        "seed-load", "--medecins", "2", "--patients", "3",
+        "--jours", "0.25", "--intervalle", "60", "--taux-anomalie", "0.5"
+    ])
+    assert result.exit_code == 0, result.output
+
+    assert Personne.query.count() == 2 + 3 + 3
+    assert Proche.query.count() == 3
+    assert Capteur.query.count() == 3 * 3
+    assert DonneesMedicale.query.count() == 3 * 3 * 6
+    assert Analyseur.query.count() == DonneesMedicale.query.count()
+    assert Alerte.query.count() == Analyseur.query.filter(
+        Analyseur.resultat.like("Anomalie%")
+    ).count()
+
+    # Chaque capteur affecté à son patient : listes et registre des appareils
+    assert PatientCapteur.query.filter(PatientCapteur.date_fin.is_(None)).count() == 3 * 3
+    patient = DonneesMedicale.query.first().patient_id
+    assert len(capteurs_du_patient(patient)) == 3
+
+    # États et scores : tableau de bord, tri par risque et purges dimensionnées
+    etats = EtatMesure.query.all()
+    assert len(etats) == 3 * 3
+    assert sum(e.nb_mesures for e in etats) == DonneesMedicale.query.count()
+    assert sum(e.nb_anomalies for e in etats) == Alerte.query.count()
+    assert all(e.medecin_id is not None and e.derniere_donnee_id is not None for e in etats)
+    scores = ScoreRisque.query.all()
+    assert len(scores) == 3 and all(s.medecin_id is not None for s in scores)
+    assert sum(s.nb_alertes_non_traitees for s in scores) == Alerte.query.count()
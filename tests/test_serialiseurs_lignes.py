@@ -0,0 +1,85 @@
+# Tests de la voie rapide des listes : sortie identique aux sérialiseurs ORM
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app import create_app
+from app.extension import db
+from app.models import Medecin, Patient, Capteur, DonneesMedicale, Analyseur, Alerte
+from app.models.enums import TypeCapteur, UrgenceEnum, TypeAlerte
+from app.services.auth_service import generate_token
+from app.services.donnee_medical_service import get_all_donnees, lister_donnees_serialisees
+from app.services.analyse_service import get_all_analyses, lister_analyses_serialisees
+from app.services.alerte_service import get_all_alertes, lister_alertes_serialisees
+from app.utils.serializers import serialize_donnee_medicale, serialize_analyse, serialize_alerte
+
+DEBUT = datetime(2026, 3, 1, 8, 0, 0, 250000)
+
+
+@pytest.fixture
+def app_listes(tmp_path):
+    app = create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'listes.db'}",
+    })
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Medecin(id=1, nom="Ndiaye", prenom="Moussa", email="m@x.sn", phone="1",
+                    mot_de_passe="x", role="medecin", specialite="Cardiologie"),
+            Medecin(id=3, nom="Fall", prenom="Binta", email="f@x.sn", phone="3",
+                    mot_de_passe="x", role="medecin"),
+            Patient(id=2, nom="Diop", prenom="Awa", email="p@x.sn", phone="2",
+                    mot_de_passe="x", role="patient"),
+            Capteur(id=1, type=TypeCapteur.temperature),
+            Capteur(id=2, type=TypeCapteur.rythme),
+        ])
+        for i in range(6):
+            db.session.add(DonneesMedicale(id=i + 1, patient_id=2, capteur_id=i % 2 + 1,
+                                           valeur_mesuree=36.5 + i * 1.25,
+                                           date_heure_mesure=DEBUT + timedelta(hours=i)))
+            db.session.add(Analyseur(id=i + 1, patient_id=2, medecin_id=1 + 2 * (i % 2),
+                                     donnee_medicale_id=i + 1,
+                                     date_heure_mesure=DEBUT + timedelta(hours=i),
+                                     resultat="Résultat normal" if i % 3 else None,
+                                     date_analyse=DEBUT + timedelta(hours=i, minutes=1)))
+        db.session.add_all([
+            Alerte(id=1, patient_id=2, medecin_id=1, donnee_medicale_id=3,
+                   niveau_urgence=UrgenceEnum.critique, type_alerte=TypeAlerte.urgence,
+                   description="Anomalie détectée", etat_traitement=False,
+                   date_heure_alerte=DEBUT),
+            Alerte(id=2, patient_id=2, medecin_id=3, niveau_urgence=UrgenceEnum.critique,
+                   type_alerte=TypeAlerte.urgence, etat_traitement=True),
+        ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.mark.parametrize("orm, serialiseur, rapide", [
+    (get_all_donnees, serialize_donnee_medicale, lister_donnees_serialisees),
+    (get_all_analyses, serialize_analyse, lister_analyses_serialisees),
+    (get_all_alertes, serialize_alerte, lister_alertes_serialisees),
+])
+def test_sortie_identique(app_listes, orm, serialiseur, rapide):
+    """Test que la voie rapide produit exactement les mêmes octets JSON que les sérialiseurs ORM"""
+    attendu = app_listes.json.dumps([serialiseur(o) for o in orm()])
+    db.session.expire_all()
+    obtenu = app_listes.json.dumps(rapide())
+    assert obtenu == attendu
+    assert [list(d) for d in rapide()] == [list(serialiseur(o)) for o in orm()]  # ordre des clés
+
+
+@pytest.mark.parametrize("url", ["/v1/donnees", "/v1/analyses", "/v1/alertes"])
+def test_routes_identiques(app_listes, url):
+    """Test que les routes de liste renvoient le même corps avec et sans voie rapide"""
+    client = app_listes.test_client()
+    entetes = {"Authorization": f"Bearer {generate_token(SimpleNamespace(id=1, role='medecin'))}"}
+    rapide = client.get(url, headers=entetes)
+    app_listes.config["SERIALISATION_LIGNES"] = False
+    orm = client.get(url, headers=entetes)
+    assert rapide.status_code == orm.status_code == 200
+    assert rapide.get_data() == orm.get_data()
@@ -0,0 +1,110 @@
+# Tests des suppressions ensemblistes, différées (par lots) et douces (archivage)
+
+import json
+import uuid
+
+import pytest
+
+from app.extension import db
+from app.models import (Personne, DonneesMedicale, Analyseur, Alerte, CleIngestion, EtatMesure, Notification,
+                        ScoreRisque, Suppression)
+from app.services.suppression_service import traiter_suppressions
+
+
+@pytest.fixture
+def env(fabrique_app):
+    return fabrique_app(patients=("paul", "lea"), proches=("proche",), capteurs=("temperature", "rythme"),
+                        SUPPRESSION_TAILLE_LOT=3)
+
+
+def _ingerer(env, *lectures):
+    ids = env.ids
+    corps = "\n".join(
+        json.dumps({"patient_id": ids[patient], "medecin_id": ids["medecin_id"],
+                    "capteur_id": ids[capteur], "valeur_mesuree": valeur, "id_lecture": str(uuid.uuid4())})
+        for patient, capteur, valeur in lectures
+    )
+    env.app.test_client().post("/v1/donnees/flux", data=corps, content_type="application/x-ndjson",
+                              headers=env.entetes)
+
+
+def _restant(patient_id):
+    return {
+        "mesures": DonneesMedicale.query.filter_by(patient_id=patient_id).count(),
+        "analyses": Analyseur.query.filter_by(patient_id=patient_id).count(),
+        "alertes": Alerte.query.filter_by(patient_id=patient_id).count(),
+        "etats": EtatMesure.query.filter_by(patient_id=patient_id).count(),
+        "scores": ScoreRisque.query.filter_by(patient_id=patient_id).count(),
+    }
+
+
+def _cles_orphelines():
+    """Clés d'ingestion dont la mesure n'existe plus"""
+    return CleIngestion.query.filter(CleIngestion.donnee_medicale_id.not_in(
+        db.session.query(DonneesMedicale.id))).count()
+
+
+def test_suppression_immediate_et_dissociation(env):
+    """Test de la suppression d'un patient et de la dissociation d'un capteur, par instructions ensemblistes"""
+    ids, entetes = env.ids, env.entetes
+    _ingerer(env, ("paul", "temperature", 39.5), ("paul", "rythme", 130),
+             ("lea", "temperature", 36.8), ("lea", "rythme", 140))
+    client = env.app.test_client()
+
+    reponse = client.delete(f"/v1/patients/{ids['paul']}", headers=entetes)
+    assert (reponse.status_code, reponse.get_json()["mode"]) == (200, "immediate")
+    with env.app.app_context():
+        assert _restant(ids["paul"]) == {"mesures": 0, "analyses": 0, "alertes": 0, "etats": 0, "scores": 0}
+        assert db.session.get(Personne, ids["proche"]) is None
+        assert Notification.query.filter_by(destinataire_id=ids["proche"]).count() == 0
+        assert _restant(ids["lea"])["mesures"] == 2
+        assert (CleIngestion.query.count(), _cles_orphelines()) == (2, 0)
+
+    # Dissociation : mesures et état du couple supprimés, alerte conservée, score recalculé
+    url = f"/v1/patients/{ids['lea']}/capteurs/{ids['rythme']}"
+    assert client.delete(url + "?purger=true", headers=entetes).status_code == 200
+    with env.app.app_context():
+        assert _restant(ids["lea"]) == {"mesures": 1, "analyses": 1, "alertes": 1, "etats": 1, "scores": 1}
+        assert db.session.get(ScoreRisque, ids["lea"]).score_ecarts == 0
+        assert (CleIngestion.query.count(), _cles_orphelines()) == (1, 0)
+    assert client.delete(url, headers=entetes).status_code == 404
+
+    # Médecin avec un historique clinique : archivage seulement
+    url = f"/v1/medecins/{ids['medecin_id']}"
+    assert client.delete(url, headers=entetes).status_code == 409
+    assert client.delete(url + "?douce=true", headers=entetes).get_json()["mode"] == "douce"
+    assert client.get(url, headers=entetes).status_code == 404
+    with env.app.app_context():
+        assert Alerte.query.filter_by(medecin_id=ids["medecin_id"]).count() == 1
+
+
+def test_suppression_differee_par_lots(env):
+    """Test de l'archivage immédiat puis de la purge par lots au-delà de SUPPRESSION_TAILLE_LOT"""
+    ids, entetes = env.ids, env.entetes
+    _ingerer(env, *[("paul", "temperature", 36.5 + i) for i in range(5)], ("lea", "rythme", 72))
+    client = env.app.test_client()
+
+    reponse = client.delete(f"/v1/patients/{ids['paul']}", headers=entetes)
+    assert reponse.status_code == 202
+    suppression_id = reponse.get_json()["suppression_id"]
+    # Archivé tout de suite : absent de l'API et du login, mesures encore en base
+    assert client.get(f"/v1/patients/{ids['paul']}", headers=entetes).status_code == 404
+    assert ids["paul"] not in [p["id"] for p in client.get("/v1/patients", headers=entetes).get_json()]
+    with env.app.app_context():
+        assert _restant(ids["paul"])["mesures"] == 5
+
+        assert traiter_suppressions(lot=2) == {"terminees": 1, "mesures": 5, "echecs": 0}
+        suppression = db.session.get(Suppression, suppression_id)
+        assert (suppression.etat, suppression.lignes_supprimees) == ("terminee", 5)
+        assert _restant(ids["paul"]) == {"mesures": 0, "analyses": 0, "alertes": 0, "etats": 0, "scores": 0}
+        assert db.session.get(Personne, ids["paul"]) is None
+        assert _restant(ids["lea"])["mesures"] == 1
+        assert (CleIngestion.query.count(), _cles_orphelines()) == (1, 0)
+        assert traiter_suppressions()["terminees"] == 0
+
+    # Suppression douce d'un capteur : masqué, mesures conservées
+    reponse = client.delete(f"/v1/capteurs/{ids['rythme']}?douce=1", headers=entetes)
+    assert reponse.get_json()["mode"] == "douce"
+    assert client.get(f"/v1/capteurs/{ids['rythme']}", headers=entetes).status_code == 404
+    with env.app.app_context():
+        assert DonneesMedicale.query.filter_by(capteur_id=ids["rythme"]).count() == 1
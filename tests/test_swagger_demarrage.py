@@ -0,0 +1,70 @@
+# Tests de Swagger à la demande et du profilage du démarrage
+
+import json
+
+import pytest
+
+from app import create_app
+from app.utils.demarrage import ChronoDemarrage
+from app.utils.swagger import swag_from
+
+
+def _app(tmp_path, **config):
+    return create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'swagger.db'}",
+        "TESTING": True,
+        **config,
+    })
+
+
+def test_swag_from_sans_enveloppe():
+    """Test que le décorateur pose la spec sans envelopper la vue"""
+    spec = {"tags": ["Test"], "responses": {"200": {"description": "OK"}}}
+
+    def vue():
+        return "ok"
+
+    assert swag_from(spec)(vue) is vue
+    assert vue.specs_dict is spec
+
+
+def test_swagger_desactive(tmp_path):
+    """Test que SWAGGER_ACTIVE=False ne publie ni /apidocs ni la spec"""
+    app = _app(tmp_path, SWAGGER_ACTIVE=False)
+    assert "swagger" not in app.extensions
+    assert not any(e.startswith("flasgger.") for e in app.view_functions)
+    client = app.test_client()
+    assert client.get("/apidocs/").status_code == 404
+    assert client.get("/apispec_1.json").status_code == 404
+
+
+def test_spec_generee_et_servie(tmp_path):
+    """Test de `flask swagger-build` puis du service de la spec pré-générée"""
+    app = _app(tmp_path)
+    fichier = tmp_path / "apispec.json"
+    resultat = app.test_cli_runner().invoke(args=["swagger-build", str(fichier)])
+    assert resultat.exit_code == 0, resultat.output
+
+    spec = json.loads(fichier.read_text(encoding="utf-8"))
+    assert "/v1/alertes" in spec["paths"]
+    # La spec générée est identique à celle construite à la demande
+    assert app.test_client().get("/apispec_1.json").get_json() == spec
+
+    spec["info"]["title"] = "Spec du build"
+    fichier.write_text(json.dumps(spec), encoding="utf-8")
+    app = _app(tmp_path, SWAGGER_SPEC_FICHIER=str(fichier))
+    reponse = app.test_client().get("/apispec_1.json")
+    assert reponse.status_code == 200
+    assert reponse.get_json()["info"]["title"] == "Spec du build"
+
+
+def test_phases_demarrage(tmp_path):
+    """Test de la mesure des phases de create_app"""
+    chrono = ChronoDemarrage()
+    with pytest.raises(ValueError):
+        with chrono.phase("echec"):
+            raise ValueError
+    assert chrono.durees["echec"] >= 0
+
+    app = _app(tmp_path)
+    assert {"extensions", "routes", "commandes"} <= set(app.extensions["demarrage"])